@@ -158,7 +158,7 @@ class PDVInstaller:
         try:
             subprocess.run(
                 [str(self.python_exe), "-c", 
-                 "from src.database.connection import db; db.create_tables()"],
+                 "from src.bootstrap import inicializar; inicializar()"],
                 cwd=str(self.root_dir),
                 check=False,
                 capture_output=True,
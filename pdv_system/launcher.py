@@ -13,10 +13,16 @@ sys.path.insert(0, str(ROOT_DIR))
 
 try:
     # Importa e executa a aplicação principal
+    from src.bootstrap import inicializar, iniciar_tarefas_fundo, parar_tarefas_fundo
     from src.ui.main_app import main
     
     if __name__ == '__main__':
-        main()
+        if inicializar():
+            iniciar_tarefas_fundo()
+        try:
+            main()
+        finally:
+            parar_tarefas_fundo()
         
 except ImportError as e:
     print(f"❌ ERRO: Módulo não encontrado: {e}")
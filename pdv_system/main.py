@@ -99,6 +99,34 @@ STORE_NAME=Minha Loja
 RECEIPT_WIDTH=58
 TIMEZONE=UTC-3
 DEBUG=False
+BACKUP_INTERVALO_HORAS=0      # backup online periódico (0 = desativado)
+BACKUP_MANTER=7
+BACKUP_DIR=./backups
+SYNC_URL=                      # nó central, ex.: http://servidor:8765; vazio = só local
+SYNC_TOKEN=                    # segredo compartilhado com o nó central (--token)
+SYNC_TERMINAL=caixa-01
+DIARIO_VENDAS=False            # finalização grava no diário (data/vendas.diario) e aplica depois
+OUTBOX_ARQUIVO=                # exporta o feed de mudanças em JSONL (python -m src.services.outbox_service)
+OUTBOX_MANTER_DIAS=7
+CACHE_CONSULTAS_TAMANHO=256    # cache de leituras invalidado por escrita (0 = desativado)
+DASHBOARD_RECONCILIAR_SEGUNDOS=300
+API_HOST=127.0.0.1             # API HTTP/JSON (python -m src.api.servidor)
+API_PORTA=8080
+API_WORKERS=8
+DB_LEITORES=4                  # threads de leitura do banco usadas pela interface
+DB_FILA_MAXIMA=32
+DB_TIMEOUT_SEGUNDOS=10
+RESERVA_TTL_SEGUNDOS=900       # validade da reserva de estoque de um carrinho aberto
+RELATORIO_PROCESSOS=0          # relatórios em lote (0 = um processo por núcleo)
+CONSULTAS_INSTRUMENTADAS=False # conta as consultas SQL por operação e avisa N+1 no log
+CONSULTAS_LIMITE_REPETICAO=5   # (python -m src.utils.orcamento_consultas confere as chamadas quentes)
+CONSULTAS_LENTAS_MS=0          # grava as consultas acima do limite com o plano (0 = desativado)
+CONSULTAS_LENTAS_ARQUIVO=./logs/consultas_lentas.jsonl   # agregação: python -m src.database.consultas_lentas
+PERFIL_ATIVO=False             # perfil (cProfile) por ação do PDV e serviço; Ctrl+Shift+P liga/desliga
+PERFIL_MEMORIA=False           # também as maiores alocações por ação (tracemalloc)
+PERFIL_DIR=./logs/profiles     # relatório do dia: python -m src.utils.perfilador
+PERFIL_MANTER_DIAS=7
+TELAS_EM_MEMORIA=4             # telas ocultas mantidas montadas (carrinho do PDV nunca é descartado)
 
 LICENÇA:
 --------
@@ -118,25 +146,17 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-# Inicializar logger
+# Inicializar logger e banco de dados
 try:
+    from src.bootstrap import inicializar, iniciar_tarefas_fundo, parar_tarefas_fundo
     from src.utils.logger import log_info, log_error
-    log_info("=" * 70)
-    log_info("INICIANDO PDV SYSTEM v1.0.0")
-    log_info("=" * 70)
-except ImportError as e:
-    print(f"⚠️  Aviso ao inicializar logger: {e}")
-
-# Inicializar banco de dados
-try:
-    from src.database import init_db
     print("🔧 Inicializando banco de dados...")
-    if init_db():
+    if inicializar():
         print("✅ Banco de dados pronto")
-        log_info("Banco de dados inicializado com sucesso")
-except (ImportError, OSError) as e:
-    print(f"⚠️  Aviso ao inicializar banco: {e}")
-    log_error(f"Erro ao inicializar banco de dados: {e}")
+        iniciar_tarefas_fundo()
+except ImportError as e:
+    print(f"⚠️  Aviso ao inicializar: {e}")
+    sys.exit(1)
 
 # Importar e executar aplicação Flet
 try:
@@ -151,4 +171,5 @@ except ImportError as e:
     traceback.print_exc()
     sys.exit(1)
 finally:
+    parar_tarefas_fundo()
     log_info("Encerrando PDV SYSTEM")
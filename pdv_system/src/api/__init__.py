@@ -0,0 +1,11 @@
+"""
+API HTTP/JSON local sobre a camada de serviços
+
+- servidor: servidor HTTP (http.server) com um pool fixo de workers, uma
+            conexão SQLite por worker e tempo medido por rota
+- carga:    teste de carga (requisições/s) dos fluxos de leitura de código
+            e de finalização de venda
+
+Permite que outros clientes (tablets, autoatendimento, front-end web) usem o
+PDV sem passar pela interface Flet.
+"""
@@ -0,0 +1,161 @@
+"""
+Teste de carga da API do PDV
+
+Cenários:
+  - scan:      GET /api/produtos/{codigo} com códigos sorteados
+  - checkout:  abre a venda, adiciona ``--itens`` produtos e finaliza
+               (4+ requisições por operação)
+
+Cada cliente é uma thread com uma conexão keep-alive. Ao final mostra
+requisições/s, operações/s e latência (p50/p95/p99) das operações.
+
+O checkout grava vendas e baixa estoque de verdade: rode contra uma cópia do
+banco (outra pasta do PDV) ou um banco de teste.
+
+Uso:
+    python -m src.api.servidor --porta 8080 &
+    python -m src.api.carga --cenario scan --clientes 8 --duracao 10
+    python -m src.api.carga --cenario checkout --clientes 4 --duracao 10 --itens 3
+"""
+from http.client import HTTPConnection
+from typing import Dict, List
+from urllib.parse import urlparse
+import json
+import random
+import threading
+import time
+
+
+class ClienteCarga:
+    """Conexão keep-alive de um cliente do teste"""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        endereco = urlparse(url)
+        self._conexao = HTTPConnection(endereco.hostname, endereco.port or 80, timeout=timeout)
+        self.requisicoes = 0
+
+    def requisitar(self, metodo: str, caminho: str, corpo: Dict = None):
+        dados = json.dumps(corpo).encode('utf-8') if corpo is not None else None
+        cabecalhos = {'Content-Type': 'application/json'} if dados else {}
+        self._conexao.request(metodo, caminho, body=dados, headers=cabecalhos)
+        resposta = self._conexao.getresponse()
+        conteudo = resposta.read()
+        self.requisicoes += 1
+        if resposta.status >= 400:
+            raise RuntimeError(f"{metodo} {caminho}: {resposta.status} {conteudo[:200]!r}")
+        return json.loads(conteudo)
+
+    def fechar(self):
+        self._conexao.close()
+
+
+def _scan(cliente: ClienteCarga, codigos: List[str], itens: int):
+    cliente.requisitar('GET', f"/api/produtos/{random.choice(codigos)}")
+
+
+def _checkout(cliente: ClienteCarga, codigos: List[str], itens: int):
+    venda = cliente.requisitar('POST', '/api/vendas', {'forma_pagamento': 'Dinheiro'})
+    total = 0.0
+    for codigo in random.sample(codigos, min(itens, len(codigos))):
+        item = cliente.requisitar('POST', f"/api/vendas/{venda['id']}/itens",
+                                  {'codigo': codigo, 'quantidade': 1})
+        total += item['subtotal']
+    cliente.requisitar('POST', f"/api/vendas/{venda['id']}/finalizar",
+                       {'valor_pago': round(total, 2)})
+
+
+CENARIOS = {'scan': _scan, 'checkout': _checkout}
+
+
+def _percentil(tempos: List[float], fracao: float) -> float:
+    return tempos[min(len(tempos) - 1, int(len(tempos) * fracao))] if tempos else 0.0
+
+
+def executar(url: str, cenario: str = 'scan', clientes: int = 8, duracao: float = 10.0,
+             itens: int = 3, aquecimento: float = 1.0) -> Dict:
+    """
+    Executa o cenário por ``duracao`` segundos (após o aquecimento)
+
+    Returns:
+        dict: {'cenario', 'clientes', 'segundos', 'operacoes', 'requisicoes', 'erros',
+               'operacoes_por_segundo', 'requisicoes_por_segundo',
+               'p50_ms', 'p95_ms', 'p99_ms'}
+    """
+    operacao = CENARIOS[cenario]
+
+    preparo = ClienteCarga(url)
+    pagina = preparo.requisitar('GET', '/api/produtos?limite=500')
+    preparo.fechar()
+    codigos = [p['codigo'] for p in pagina['itens'] if p['estoque'] > 0]
+    if not codigos:
+        raise ValueError("Nenhum produto com estoque para o teste")
+
+    inicio_medicao = time.perf_counter() + aquecimento
+    fim = inicio_medicao + duracao
+    resultados = []
+    trava = threading.Lock()
+
+    def cliente_carga():
+        cliente = ClienteCarga(url)
+        tempos, requisicoes, erros = [], 0, 0
+        try:
+            while True:
+                antes = time.perf_counter()
+                if antes >= fim:
+                    break
+                feitas = cliente.requisicoes
+                try:
+                    operacao(cliente, codigos, itens)
+                    falhou = False
+                except (RuntimeError, OSError):
+                    falhou = True
+                    cliente.fechar()
+                    cliente = ClienteCarga(url)
+                if antes >= inicio_medicao:
+                    tempos.append((time.perf_counter() - antes) * 1000)
+                    requisicoes += cliente.requisicoes - feitas if not falhou else 0
+                    erros += falhou
+        finally:
+            cliente.fechar()
+        with trava:
+            resultados.append((tempos, requisicoes, erros))
+
+    threads = [threading.Thread(target=cliente_carga, name=f"carga-{i}")
+               for i in range(clientes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    tempos = sorted(t for r in resultados for t in r[0])
+    requisicoes = sum(r[1] for r in resultados)
+    erros = sum(r[2] for r in resultados)
+    operacoes = len(tempos) - erros
+    return {
+        'cenario': cenario,
+        'clientes': clientes,
+        'segundos': duracao,
+        'operacoes': operacoes,
+        'requisicoes': requisicoes,
+        'erros': erros,
+        'operacoes_por_segundo': round(operacoes / duracao, 1),
+        'requisicoes_por_segundo': round(requisicoes / duracao, 1),
+        'p50_ms': round(_percentil(tempos, 0.50), 2),
+        'p95_ms': round(_percentil(tempos, 0.95), 2),
+        'p99_ms': round(_percentil(tempos, 0.99), 2),
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Teste de carga da API do PDV")
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--cenario', choices=sorted(CENARIOS), default='scan')
+    parser.add_argument('--clientes', type=int, default=8)
+    parser.add_argument('--duracao', type=float, default=10.0, help="Segundos medidos")
+    parser.add_argument('--itens', type=int, default=3, help="Itens por venda (checkout)")
+    args = parser.parse_args()
+
+    print(json.dumps(executar(args.url, args.cenario, args.clientes, args.duracao, args.itens),
+                     indent=2, ensure_ascii=False))
@@ -0,0 +1,507 @@
+"""
+Servidor da API HTTP/JSON do PDV
+
+Endpoints (JSON; erros como {'erro': mensagem}):
+    GET    /api/produtos/{codigo}              leitura do código de barras
+    GET    /api/produtos?busca=T               busca por nome/código
+    GET    /api/produtos?cursor=C&limite=N&ordem=nome
+                                               página de produtos (ver listar_produtos_paginado)
+    POST   /api/vendas                         {'forma_pagamento', 'observacoes'?}
+    GET    /api/vendas?data=AAAA-MM-DD         vendas finalizadas do dia
+    GET    /api/vendas/{id}                    carrinho
+    POST   /api/vendas/{id}/itens              {'codigo', 'quantidade'?}
+    PUT    /api/vendas/{id}/itens/{item}       {'quantidade'}
+    DELETE /api/vendas/{id}/itens/{item}
+    POST   /api/vendas/{id}/desconto           {'desconto'}
+    POST   /api/vendas/{id}/finalizar          {'valor_pago'}
+    POST   /api/vendas/{id}/cancelar
+    GET    /api/vendas/{id}/cupom              PDF
+    POST   /api/despesas                       {'descricao', 'valor', 'observacoes'?}
+    GET    /api/transacoes?data=D | ?inicio=D&fim=D
+    GET    /api/resumo/dia?data=D
+    GET    /api/resumo/periodo?inicio=D&fim=D
+    POST   /api/fechamentos                    {'inicio', 'fim'?} fecha os dias pendentes
+    POST   /api/entradas                       {'documento', 'fornecedor'?, 'lancar_despesa'?,
+                                                'itens': [{'codigo', 'quantidade', 'preco_custo'?}]}
+    GET    /api/entradas?limite=N              entregas de fornecedor recebidas
+    GET    /api/entradas/{id}                  entrega com os itens
+    GET    /api/relatorios/dia?data=D          PDF
+    GET    /api/relatorios/lote?inicio=D&fim=D&cupons=1
+                                               ZIP com os PDFs do período (processos em paralelo)
+    GET    /api/metricas                       tempo por rota
+
+Execução:
+  - um pool fixo de workers atende as conexões (HTTP/1.1 com keep-alive);
+    uma conexão ociosa por mais de ``espera_keep_alive`` segundos é fechada
+    para liberar o worker
+  - cada worker abre a sua conexão SQLite ao iniciar e a reutiliza (o
+    Peewee guarda uma conexão por thread)
+  - leituras rodam em paralelo; operações que gravam passam por uma trava
+    única, como no nó central: o SQLite aceita um escritor por vez e a
+    numeração das vendas depende disso. Cada uma roda numa transação
+    IMMEDIATE (a trava de escrita do banco é pedida no BEGIN, esperando a de
+    outro processo, em vez de falhar ao passar de leitura para escrita)
+  - banco ocupado ('database is locked') responde 503; outros erros do
+    SQLite, 500; finalizar de novo uma venda já finalizada, 409
+  - o tempo de cada requisição vai no cabeçalho ``Server-Timing`` e nas
+    métricas por rota; com CONSULTAS_INSTRUMENTADAS, também as consultas
+    SQL por requisição (e o aviso de possível N+1 no log); com PERFIL_ATIVO,
+    cada requisição grava um perfil (src.utils.perfilador)
+
+Uso:
+    python -m src.api.servidor [--host 127.0.0.1] [--porta 8080] [--workers 8]
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import BytesIO
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+import json
+import re
+import sqlite3
+import threading
+import time
+
+from peewee import OperationalError
+
+from src.database.connection import get_db
+from src.database.instrumentacao import instrumentar
+from src.utils.perfilador import perfilar
+from src.models.leitura import Leitura
+from src.utils.logger import log_info, log_error
+
+
+def _erro_do_banco(erro: BaseException):
+    """OperationalError do SQLite na cadeia de causas (os serviços embrulham em ValueError)"""
+    while erro is not None:
+        if isinstance(erro, (OperationalError, sqlite3.OperationalError)):
+            return erro
+        erro = erro.__cause__ or erro.__context__
+    return None
+
+
+def _json_padrao(valor):
+    """Tipos que o json não serializa sozinho"""
+    if isinstance(valor, Leitura):
+        return valor.como_dict()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def _data(texto: str = None) -> date:
+    return date.fromisoformat(texto) if texto else None
+
+
+class MetricasRotas:
+    """Quantidade, erros e tempos (ms) das requisições por rota"""
+
+    def __init__(self, amostras: int = 1000):
+        self._amostras = amostras
+        self._rotas: Dict[str, Dict] = {}
+        self._trava = threading.Lock()
+
+    def registrar(self, rota: str, duracao_ms: float, erro: bool, consultas: int = None):
+        with self._trava:
+            rota_atual = self._rotas.get(rota)
+            if rota_atual is None:
+                rota_atual = self._rotas[rota] = {
+                    'requisicoes': 0, 'erros': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'tempos': deque(maxlen=self._amostras),
+                    'medidas': 0, 'consultas': 0, 'max_consultas': 0,
+                }
+            if consultas is not None:
+                rota_atual['medidas'] += 1
+                rota_atual['consultas'] += consultas
+                rota_atual['max_consultas'] = max(rota_atual['max_consultas'], consultas)
+            rota_atual['requisicoes'] += 1
+            rota_atual['erros'] += erro
+            rota_atual['total_ms'] += duracao_ms
+            rota_atual['max_ms'] = max(rota_atual['max_ms'], duracao_ms)
+            rota_atual['tempos'].append(duracao_ms)
+
+    def resumo(self) -> Dict:
+        """Por rota: requisições, erros, média, p50/p95 (últimas amostras) e máximo"""
+        with self._trava:
+            rotas = {nome: dict(dados, tempos=sorted(dados['tempos']))
+                     for nome, dados in self._rotas.items()}
+        resumo = {}
+        for nome, dados in sorted(rotas.items()):
+            tempos = dados['tempos']
+            resumo[nome] = {
+                'requisicoes': dados['requisicoes'],
+                'erros': dados['erros'],
+                'media_ms': round(dados['total_ms'] / dados['requisicoes'], 3),
+                'p50_ms': round(tempos[len(tempos) // 2], 3),
+                'p95_ms': round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))], 3),
+                'max_ms': round(dados['max_ms'], 3),
+            }
+            if dados['medidas']:
+                resumo[nome]['consultas_media'] = round(dados['consultas'] / dados['medidas'], 2)
+                resumo[nome]['consultas_max'] = dados['max_consultas']
+        return resumo
+
+
+class ApiPdv:
+    """Rotas da API, traduzidas para os serviços"""
+
+    def __init__(self):
+        from src.services.produto_service import ProdutoService
+        from src.services.venda_service import VendaService
+        from src.services.financeiro_service import FinanceiroService
+        from src.services.entrada_service import EntradaMercadoriaService
+
+        self.produtos = ProdutoService()
+        self.vendas = VendaService()
+        self.financeiro = FinanceiroService()
+        self.entradas = EntradaMercadoriaService()
+        self.metricas = MetricasRotas()
+        self._escrita = threading.Lock()
+        self._lote = threading.Lock()
+
+        # (método, padrão, nome da rota, função, grava)
+        self._rotas: List[Tuple[str, re.Pattern, str, Callable, bool]] = []
+        for metodo, padrao, funcao, grava in (
+            ('GET', r'/api/produtos/(?P<codigo>[^/]+)', self.produto, False),
+            ('GET', r'/api/produtos', self.listar_produtos, False),
+            ('POST', r'/api/vendas', self.iniciar_venda, True),
+            ('GET', r'/api/vendas', self.listar_vendas, False),
+            ('GET', r'/api/vendas/(?P<venda_id>\d+)', self.carrinho, False),
+            ('POST', r'/api/vendas/(?P<venda_id>\d+)/itens', self.adicionar_item, True),
+            ('PUT', r'/api/vendas/(?P<venda_id>\d+)/itens/(?P<item_id>\d+)',
+             self.atualizar_item, True),
+            ('DELETE', r'/api/vendas/(?P<venda_id>\d+)/itens/(?P<item_id>\d+)',
+             self.remover_item, True),
+            ('POST', r'/api/vendas/(?P<venda_id>\d+)/desconto', self.aplicar_desconto, True),
+            ('POST', r'/api/vendas/(?P<venda_id>\d+)/finalizar', self.finalizar, True),
+            ('POST', r'/api/vendas/(?P<venda_id>\d+)/cancelar', self.cancelar, True),
+            ('GET', r'/api/vendas/(?P<venda_id>\d+)/cupom', self.cupom, False),
+            ('POST', r'/api/despesas', self.registrar_despesa, True),
+            ('GET', r'/api/transacoes', self.transacoes, False),
+            ('GET', r'/api/resumo/dia', self.resumo_dia, False),
+            ('GET', r'/api/resumo/periodo', self.resumo_periodo, False),
+            ('POST', r'/api/fechamentos', self.criar_fechamentos, True),
+            ('POST', r'/api/entradas', self.registrar_entrada, True),
+            ('GET', r'/api/entradas', self.listar_entradas, False),
+            ('GET', r'/api/entradas/(?P<entrada_id>\d+)', self.entrada, False),
+            ('GET', r'/api/relatorios/dia', self.relatorio_dia, False),
+            ('GET', r'/api/relatorios/lote', self.relatorio_lote, False),
+            ('GET', r'/api/metricas', self.obter_metricas, False),
+        ):
+            nome = re.sub(r'\(\?P<(\w+)>[^)]*\)', r'{\1}', padrao)
+            self._rotas.append((metodo, re.compile(padrao + '$'), nome, funcao, grava))
+
+    def resolver(self, metodo: str, caminho: str):
+        """
+        Rota da requisição
+
+        Returns:
+            tuple: (nome da rota, função, grava, parâmetros do caminho) ou
+            None se o caminho não existe; (None, ...) se existe com outro método
+        """
+        existe = False
+        for metodo_rota, padrao, nome, funcao, grava in self._rotas:
+            encontrado = padrao.match(caminho)
+            if encontrado:
+                if metodo_rota == metodo:
+                    return nome, funcao, grava, {
+                        chave: unquote(valor) for chave, valor in encontrado.groupdict().items()
+                    }
+                existe = True
+        return (None, None, False, {}) if existe else None
+
+    def executar(self, funcao: Callable, grava: bool, parametros: Dict,
+                 consulta: Dict, corpo: Dict):
+        if grava:
+            with self._escrita, get_db().atomic('IMMEDIATE'):
+                return funcao(parametros, consulta, corpo)
+        return funcao(parametros, consulta, corpo)
+
+    # Produtos
+
+    def produto(self, parametros, consulta, corpo):
+        return self.produtos.obter_produto_por_codigo(parametros['codigo'])
+
+    def listar_produtos(self, parametros, consulta, corpo):
+        if consulta.get('busca'):
+            return self.produtos.buscar_produtos(consulta['busca'])
+        return self.produtos.listar_produtos_paginado(
+            cursor=consulta.get('cursor'),
+            limite=min(int(consulta.get('limite', 50)), 500),
+            ordem=consulta.get('ordem', 'nome'),
+            decrescente=consulta.get('decrescente') == '1',
+            anterior=consulta.get('anterior') == '1',
+            contar=consulta.get('contar') == '1',
+        )
+
+    # Vendas
+
+    def iniciar_venda(self, parametros, consulta, corpo):
+        return self.vendas.iniciar_venda(corpo['forma_pagamento'], corpo.get('observacoes'))
+
+    def listar_vendas(self, parametros, consulta, corpo):
+        return self.vendas.listar_vendas_dia(_data(consulta.get('data')))
+
+    def carrinho(self, parametros, consulta, corpo):
+        return self.vendas.obter_carrinho(int(parametros['venda_id']))
+
+    def adicionar_item(self, parametros, consulta, corpo):
+        return self.vendas.adicionar_item_carrinho(
+            int(parametros['venda_id']), corpo['codigo'], int(corpo.get('quantidade', 1))
+        )
+
+    def atualizar_item(self, parametros, consulta, corpo):
+        quantidade = int(corpo['quantidade'])
+        if quantidade <= 0:
+            return self.remover_item(parametros, consulta, corpo)
+        return self.vendas.atualizar_quantidade_item(int(parametros['item_id']), quantidade)
+
+    def remover_item(self, parametros, consulta, corpo):
+        return {'removido': self.vendas.remover_item_carrinho(int(parametros['item_id']))}
+
+    def aplicar_desconto(self, parametros, consulta, corpo):
+        return self.vendas.aplicar_desconto(int(parametros['venda_id']), corpo['desconto'])
+
+    def finalizar(self, parametros, consulta, corpo):
+        return self.vendas.finalizar_venda(int(parametros['venda_id']), corpo['valor_pago'])
+
+    def cancelar(self, parametros, consulta, corpo):
+        return {'cancelada': self.vendas.cancelar_venda(int(parametros['venda_id']))}
+
+    def cupom(self, parametros, consulta, corpo):
+        from src.services.relatorio_service import RelatorioService
+        from src.utils import config
+        return RelatorioService.gerar_cupom_venda(
+            int(parametros['venda_id']), config.STORE_NAME,
+            int(consulta.get('largura', config.RECEIPT_WIDTH))
+        )
+
+    # Financeiro
+
+    def registrar_despesa(self, parametros, consulta, corpo):
+        return self.financeiro.registrar_despesa(corpo['descricao'], corpo['valor'],
+                                                 corpo.get('observacoes'))
+
+    def transacoes(self, parametros, consulta, corpo):
+        if consulta.get('inicio'):
+            return self.financeiro.listar_transacoes_periodo(
+                _data(consulta['inicio']), _data(consulta.get('fim')) or date.today()
+            )
+        return self.financeiro.listar_transacoes_dia(_data(consulta.get('data')))
+
+    def resumo_dia(self, parametros, consulta, corpo):
+        return self.financeiro.obter_resumo_dia(_data(consulta.get('data')))
+
+    def resumo_periodo(self, parametros, consulta, corpo):
+        return self.financeiro.obter_resumo_periodo(
+            _data(consulta['inicio']), _data(consulta.get('fim')) or date.today()
+        )
+
+    def criar_fechamentos(self, parametros, consulta, corpo):
+        return self.financeiro.criar_fechamentos_periodo(
+            _data(corpo['inicio']), _data(corpo.get('fim')) or date.today()
+        )
+
+    def registrar_entrada(self, parametros, consulta, corpo):
+        return self.entradas.registrar_entrada(
+            corpo['documento'], corpo['itens'], corpo.get('fornecedor') or '',
+            corpo.get('lancar_despesa', True), corpo.get('observacoes')
+        )
+
+    def listar_entradas(self, parametros, consulta, corpo):
+        return self.entradas.listar_entradas(min(int(consulta.get('limite', 50)), 500))
+
+    def entrada(self, parametros, consulta, corpo):
+        return self.entradas.obter_entrada(int(parametros['entrada_id']))
+
+    def relatorio_dia(self, parametros, consulta, corpo):
+        from src.services.relatorio_service import RelatorioService
+        from src.utils import config
+        return RelatorioService.gerar_relatorio_dia(_data(consulta.get('data')),
+                                                    config.STORE_NAME)
+
+    def relatorio_lote(self, parametros, consulta, corpo):
+        from src.services.relatorio_lote_service import RelatorioLoteService
+        # Um lote por vez: cada um já ocupa todos os núcleos
+        with self._lote:
+            return RelatorioLoteService().gerar_zip(
+                _data(consulta['inicio']), _data(consulta.get('fim')) or date.today(),
+                cupons=consulta.get('cupons') == '1'
+            )['zip']
+
+    def obter_metricas(self, parametros, consulta, corpo):
+        return self.metricas.resumo()
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    """Traduz as requisições HTTP para a ApiPdv do servidor"""
+
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalhos e corpo saem em escritas separadas: com o Nagle ligado, cada
+    # resposta esperaria o ACK atrasado do cliente (~40 ms) no keep-alive
+    disable_nagle_algorithm = True
+
+    def log_message(self, formato, *args):
+        pass  # o acesso não vai para o stderr (ver /api/metricas)
+
+    def setup(self):
+        self.timeout = self.server.espera_keep_alive
+        super().setup()
+
+    def _enviar(self, status: int, dados: bytes, tipo: str, inicio: float):
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(dados)))
+        self.send_header('Server-Timing', f"app;dur={(time.perf_counter() - inicio) * 1000:.2f}")
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _responder(self, status: int, corpo, inicio: float):
+        if isinstance(corpo, BytesIO):
+            dados = corpo.getvalue()
+            tipo = 'application/zip' if dados[:2] == b'PK' else 'application/pdf'
+            self._enviar(status, dados, tipo, inicio)
+            return
+        dados = json.dumps(corpo, default=_json_padrao, ensure_ascii=False,
+                           separators=(',', ':')).encode('utf-8')
+        self._enviar(status, dados, 'application/json; charset=utf-8', inicio)
+
+    def _ler_json(self) -> Dict:
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(tamanho) or b'{}') if tamanho else {}
+
+    def _atender(self, metodo: str):
+        inicio = time.perf_counter()
+        api = self.server.api
+        url = urlparse(self.path)
+        rota = api.resolver(metodo, url.path)
+
+        if rota is None or rota[1] is None:
+            # Descarta o corpo para a conexão continuar utilizável
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            status = 404 if rota is None else 405
+            self._responder(status, {'erro': 'não encontrado' if rota is None
+                                     else 'método não permitido'}, inicio)
+            return
+
+        nome, funcao, grava, parametros = rota
+        status = 200
+        medicao = None
+        try:
+            corpo = self._ler_json()
+            consulta = {chave: valores[-1] for chave, valores in parse_qs(url.query).items()}
+            with instrumentar(f"{metodo} {nome}") as medicao, perfilar(f"api.{metodo} {nome}"):
+                resposta = api.executar(funcao, grava, parametros, consulta, corpo)
+        except Exception as e:
+            status, resposta = self._erro(metodo, url.path, e)
+
+        self._responder(status, resposta, inicio)
+        api.metricas.registrar(f"{metodo} {nome}", (time.perf_counter() - inicio) * 1000,
+                               status >= 400, medicao.consultas if medicao else None)
+
+    @staticmethod
+    def _erro(metodo: str, caminho: str, e: Exception) -> Tuple[int, Dict]:
+        """Status e corpo da resposta de erro"""
+        banco = _erro_do_banco(e)
+        if banco is not None:
+            log_error(f"Erro do banco na API ({metodo} {caminho}): {str(banco)}", exc_info=True)
+            ocupado = 'locked' in str(banco) or 'busy' in str(banco)
+            return (503 if ocupado else 500), {'erro': str(banco)}
+        if isinstance(e, (ValueError, KeyError, TypeError)):
+            mensagem = f"Campo obrigatório: {e}" if isinstance(e, KeyError) else str(e)
+            if 'não encontrad' in mensagem:
+                return 404, {'erro': mensagem}
+            return (409 if 'já foi finalizada' in mensagem else 400), {'erro': mensagem}
+        log_error(f"Erro na API ({metodo} {caminho}): {str(e)}", exc_info=True)
+        return 500, {'erro': str(e)}
+
+    def do_GET(self):
+        self._atender('GET')
+
+    def do_POST(self):
+        self._atender('POST')
+
+    def do_PUT(self):
+        self._atender('PUT')
+
+    def do_DELETE(self):
+        self._atender('DELETE')
+
+
+class ServidorApi(HTTPServer):
+    """HTTPServer que entrega cada conexão a um pool fixo de workers"""
+
+    def __init__(self, endereco: Tuple[str, int], api: ApiPdv, workers: int = 8,
+                 espera_keep_alive: float = 5.0):
+        super().__init__(endereco, _Manipulador)
+        self.api = api
+        self.workers = workers
+        self.espera_keep_alive = espera_keep_alive
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix='api',
+                                        initializer=self._abrir_conexao)
+
+    @staticmethod
+    def _abrir_conexao():
+        """Conexão SQLite do worker, aberta uma vez e reutilizada"""
+        get_db().connect(reuse_if_open=True)
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._processar, request, client_address)
+
+    def _processar(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def criar_servidor(host: str = '127.0.0.1', porta: int = 8080,
+                   workers: int = 8) -> ServidorApi:
+    """Cria o servidor da API (porta 0 escolhe uma livre); o banco já deve estar inicializado"""
+    return ServidorApi((host, porta), ApiPdv(), workers)
+
+
+def iniciar_em_thread(host: str = '127.0.0.1', porta: int = 0,
+                      workers: int = 8) -> ServidorApi:
+    """Sobe a API numa thread do próprio processo (testes, demonstração)"""
+    servidor = criar_servidor(host, porta, workers)
+    threading.Thread(target=servidor.serve_forever, name="api", daemon=True).start()
+    return servidor
+
+
+if __name__ == '__main__':
+    import argparse
+    from src.bootstrap import inicializar, iniciar_tarefas_fundo, parar_tarefas_fundo
+    from src.utils import config
+
+    parser = argparse.ArgumentParser(description="API HTTP/JSON do PDV")
+    parser.add_argument('--host', default=config.API_HOST)
+    parser.add_argument('--porta', type=int, default=config.API_PORTA)
+    parser.add_argument('--workers', type=int, default=config.API_WORKERS)
+    args = parser.parse_args()
+
+    if not inicializar():
+        raise SystemExit(1)
+    iniciar_tarefas_fundo()
+
+    servidor = criar_servidor(args.host, args.porta, args.workers)
+    log_info(f"API do PDV em http://{args.host}:{args.porta} ({args.workers} workers)")
+    print(f"API do PDV em http://{args.host}:{args.porta} ({args.workers} workers)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        parar_tarefas_fundo()
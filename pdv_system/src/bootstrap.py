@@ -0,0 +1,101 @@
+"""
+Inicialização explícita da aplicação
+
+Concentra os efeitos colaterais que antes aconteciam ao importar módulos
+(criação de diretórios, abertura dos logs, criação das tabelas). Os pontos de
+entrada (main.py, launcher.py) chamam ``inicializar()`` uma vez antes de abrir
+a interface; o restante do código pode ser importado sem custo.
+
+Tarefas em segundo plano (aplicação do diário de vendas, backup automático,
+manutenção do banco, sincronização, exportação do outbox, totais do
+dashboard) são iniciadas à parte, por ``iniciar_tarefas_fundo()``, para que
+scripts de linha de comando possam inicializar o banco sem disparar threads.
+"""
+from src.utils.logger import configurar_logger, log_info, log_error
+
+
+def inicializar() -> bool:
+    """
+    Prepara logger e banco de dados
+
+    Returns:
+        bool: True se o banco foi inicializado com sucesso
+    """
+    configurar_logger()
+    log_info("=" * 70)
+    log_info("INICIANDO PDV SYSTEM v1.0.0")
+    log_info("=" * 70)
+
+    from src.database import init_db
+    from src.database.diario import diario_ativo
+
+    try:
+        if init_db():
+            log_info("Banco de dados inicializado com sucesso")
+            if diario_ativo():
+                # Vendas finalizadas no diário antes de uma queda entram agora,
+                # antes de o caixa abrir
+                from src.services.diario_service import AplicadorDiario
+                AplicadorDiario().recuperar()
+            return True
+    except OSError as e:
+        log_error(f"Erro ao inicializar banco de dados: {e}")
+    return False
+
+
+_tarefas = {}
+
+
+def iniciar_tarefas_fundo() -> None:
+    """Inicia as tarefas em segundo plano habilitadas na configuração (.env)"""
+    from src.utils import config
+    from src.database.diario import diario_ativo
+
+    if diario_ativo():
+        from src.services.diario_service import AplicadorDiario
+
+        _tarefas['diario'] = AplicadorDiario()
+
+    if config.BACKUP_INTERVALO_HORAS > 0:
+        from src.services.backup_service import AgendadorBackup, BackupService
+
+        _tarefas['backup'] = AgendadorBackup(
+            config.BACKUP_INTERVALO_HORAS,
+            BackupService(destino=config.BACKUP_DIR, manter=config.BACKUP_MANTER)
+        )
+
+    if config.MANUTENCAO_OCIOSIDADE_SEGUNDOS > 0:
+        from src.services.manutencao_service import AgendadorManutencao
+
+        _tarefas['manutencao'] = AgendadorManutencao(config.MANUTENCAO_OCIOSIDADE_SEGUNDOS)
+
+    if config.SYNC_URL:
+        from src.sync.cliente import AgendadorSync, ClienteSync
+
+        _tarefas['sync'] = AgendadorSync(
+            ClienteSync(config.SYNC_URL, config.SYNC_TERMINAL, config.SYNC_TOKEN),
+            config.SYNC_INTERVALO_SEGUNDOS
+        )
+
+    if config.OUTBOX_ARQUIVO:
+        from src.services.outbox_service import DespachanteOutbox, ExportadorJsonl
+
+        _tarefas['outbox'] = DespachanteOutbox('arquivo', ExportadorJsonl(config.OUTBOX_ARQUIVO))
+
+    from src.utils.dashboard import painel_dia
+
+    _tarefas['painel'] = painel_dia()
+
+    for tarefa in _tarefas.values():
+        tarefa.iniciar()
+
+
+def obter_tarefa(nome: str):
+    """Tarefa em segundo plano em execução ('diario', 'backup', 'manutencao', 'sync', 'outbox', 'painel') ou None"""
+    return _tarefas.get(nome)
+
+
+def parar_tarefas_fundo() -> None:
+    """Para as tarefas iniciadas por iniciar_tarefas_fundo()"""
+    while _tarefas:
+        _tarefas.popitem()[1].parar()
@@ -0,0 +1,136 @@
+"""
+Arquivos mensais do histórico de vendas
+
+Meses já fechados são movidos de ``loja.db`` para um arquivo SQLite por mês
+(``data/arquivo/loja_AAAA_MM.db``) com as mesmas tabelas de vendas, itens e
+transações. As consultas que alcançam esses meses anexam os arquivos com
+``ATTACH`` e unem as tabelas (ver ArquivoRepository).
+
+O SQLite limita a quantidade de bancos anexados por conexão, por isso os
+arquivos são anexados em grupos de no máximo LIMITE_ANEXOS e desanexados ao
+final de cada consulta. ATTACH/DETACH não podem rodar dentro de transação.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from .connection import DATA_DIR, get_db
+
+ARQUIVO_DIR = DATA_DIR / "arquivo"
+
+# Tabelas movidas para o arquivo e a coluna de data que define o mês
+TABELAS_ARQUIVADAS = ['vendas', 'itens_venda', 'transacoes']
+
+# Índices criados em cada arquivo mensal
+INDICES_ARQUIVO = [
+    ('vendas', ('data_hora',)),
+    ('itens_venda', ('venda_id',)),
+    ('transacoes', ('data_transacao',)),
+]
+
+# SQLITE_MAX_ATTACHED padrão é 10; fica folga para outros anexos
+LIMITE_ANEXOS = 8
+
+
+def nome_mes(ano: int, mes: int) -> str:
+    """Chave do mês ('2024-01')"""
+    return f"{ano:04d}-{mes:02d}"
+
+
+def caminho_arquivo(ano: int, mes: int) -> Path:
+    """Caminho do arquivo do mês"""
+    return ARQUIVO_DIR / f"loja_{ano:04d}_{mes:02d}.db"
+
+
+def esquema_arquivo(ano: int, mes: int) -> str:
+    """Nome do esquema com que o arquivo do mês é anexado"""
+    return f"arq_{ano:04d}_{mes:02d}"
+
+
+def _verificar_fora_de_transacao(db):
+    if db.in_transaction():
+        raise ValueError("Arquivos mensais não podem ser anexados dentro de uma transação")
+
+
+@contextmanager
+def anexados(meses: List[Tuple[int, int]]) -> Iterator[List[str]]:
+    """
+    Anexa os arquivos dos meses e devolve os nomes de esquema
+
+    Meses sem arquivo em disco são ignorados. Os arquivos são desanexados na
+    saída do bloco.
+    """
+    db = get_db()
+    _verificar_fora_de_transacao(db)
+
+    esquemas = []
+    try:
+        for ano, mes in meses:
+            caminho = caminho_arquivo(ano, mes)
+            if not caminho.exists():
+                continue
+            esquema = esquema_arquivo(ano, mes)
+            db.execute_sql('ATTACH DATABASE ? AS "%s"' % esquema, (str(caminho),))
+            esquemas.append(esquema)
+        yield esquemas
+    finally:
+        for esquema in esquemas:
+            db.execute_sql('DETACH DATABASE "%s"' % esquema)
+
+
+@contextmanager
+def anexado_para_escrita(ano: int, mes: int) -> Iterator[str]:
+    """
+    Anexa (criando se preciso) o arquivo do mês com as tabelas arquivadas
+
+    A estrutura é copiada das tabelas de ``main`` (colunas, tipos e chave
+    primária); chaves estrangeiras não são copiadas, pois os produtos ficam
+    apenas no banco principal.
+    """
+    db = get_db()
+    _verificar_fora_de_transacao(db)
+
+    ARQUIVO_DIR.mkdir(parents=True, exist_ok=True)
+    esquema = esquema_arquivo(ano, mes)
+    db.execute_sql('ATTACH DATABASE ? AS "%s"' % esquema,
+                   (str(caminho_arquivo(ano, mes)),))
+    try:
+        with db.atomic():
+            for tabela in TABELAS_ARQUIVADAS:
+                _copiar_estrutura(db, tabela, esquema)
+            for tabela, colunas in INDICES_ARQUIVO:
+                nome_indice = f"idx_{tabela}_{'_'.join(colunas)}"
+                db.execute_sql(
+                    f'CREATE INDEX IF NOT EXISTS "{esquema}"."{nome_indice}" '
+                    f'ON "{tabela}" ({", ".join(colunas)})'
+                )
+        yield esquema
+    finally:
+        db.execute_sql('DETACH DATABASE "%s"' % esquema)
+
+
+def colunas_tabela(tabela: str, esquema: str = 'main') -> List[str]:
+    """Nomes das colunas, na ordem da tabela"""
+    cursor = get_db().execute_sql(f'PRAGMA "{esquema}".table_info("{tabela}")')
+    return [linha[1] for linha in cursor.fetchall()]
+
+
+def _copiar_estrutura(db, tabela: str, esquema: str):
+    colunas = db.execute_sql(f'PRAGMA main.table_info("{tabela}")').fetchall()
+
+    definicoes = []
+    for _cid, nome, tipo, _notnull, _padrao, pk in colunas:
+        definicao = f'"{nome}" {tipo}'
+        if pk:
+            definicao += ' PRIMARY KEY'
+        definicoes.append(definicao)
+
+    db.execute_sql(
+        f'CREATE TABLE IF NOT EXISTS "{esquema}"."{tabela}" ({", ".join(definicoes)})'
+    )
+
+    # Arquivos antigos recebem as colunas acrescentadas depois por migrações
+    existentes = set(colunas_tabela(tabela, esquema))
+    for _cid, nome, tipo, _notnull, _padrao, _pk in colunas:
+        if nome not in existentes:
+            db.execute_sql(f'ALTER TABLE "{esquema}"."{tabela}" ADD COLUMN "{nome}" {tipo}')
@@ -0,0 +1,214 @@
+"""
+Cache de resultados de consultas, invalidado pelo próprio SQLite
+
+Cada resultado guardado lembra a versão das tabelas de que depende
+(``cache_versoes``, incrementada por gatilhos em toda escrita - migração 4).
+Para não consultar essas versões a cada leitura:
+
+  - ``PRAGMA data_version`` muda quando *outra* conexão (outra thread, outro
+    processo ou outro terminal no mesmo arquivo) faz commit
+  - ``total_changes`` da conexão muda quando ela mesma escreve
+
+Se nenhum dos dois mudou desde a última leitura, nada mudou no banco e o
+resultado é devolvido sem tocar em tabela nenhuma. Se algo mudou, as versões
+são relidas (uma consulta a uma tabela de poucas linhas) e só as entradas das
+tabelas alteradas deixam de valer.
+
+Dentro de uma transação o cache é ignorado: a escrita ainda pode ser desfeita
+e a versão voltaria a um número que outra escrita reutilizaria.
+
+Cada chamada recebe uma cópia dos dicionários e listas do resultado guardado,
+então alterar o que foi recebido não afeta as próximas leituras. Os demais
+valores (números, datas, modelos de leitura de src/models/leitura.py, que não
+aceitam atribuição por chave) são devolvidos sem cópia.
+
+Uso:
+    @em_cache('produtos')
+    def buscar_produtos(self, termo): ...
+
+    with cache_consultas.ignorado():   # leitura sempre direto do banco
+        ...
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable
+import json
+import threading
+
+from .connection import get_db
+
+
+def _copia(valor):
+    """Copia os dicionários e listas (também aninhados) de um resultado"""
+    if isinstance(valor, dict):
+        return {chave: _copia(item) for chave, item in valor.items()}
+    if isinstance(valor, list):
+        return [_copia(item) for item in valor]
+    return valor
+
+
+class CacheConsultas:
+    """Cache LRU de resultados, validado pelas versões das tabelas"""
+
+    def __init__(self, capacidade: int = None):
+        self._capacidade = capacidade
+        self._entradas = OrderedDict()  # chave -> (valor, {tabela: versao})
+        self._trava = threading.Lock()
+        self._local = threading.local()
+        self.zerar_metricas()
+
+    @property
+    def capacidade(self) -> int:
+        if self._capacidade is None:
+            from src.utils import config
+            self._capacidade = config.CACHE_CONSULTAS_TAMANHO
+        return self._capacidade
+
+    def zerar_metricas(self):
+        self._metricas = {
+            'acertos': 0,
+            'falhas': 0,
+            'invalidadas': 0,  # falhas por versão desatualizada
+            'descartadas': 0,  # removidas pelo limite de tamanho (LRU)
+            'ignoradas': 0,    # leituras com o cache ignorado
+        }
+
+    def _versoes(self) -> Dict[str, int]:
+        """Versões das tabelas, relidas só se o banco mudou"""
+        conexao = get_db().connection()
+        versao_dados = conexao.execute("PRAGMA data_version").fetchone()[0]
+        alteracoes = conexao.total_changes
+
+        estado = self._local
+        if (getattr(estado, 'conexao', None) is conexao
+                and estado.versao_dados == versao_dados
+                and estado.alteracoes == alteracoes):
+            return estado.versoes
+
+        estado.versoes = dict(conexao.execute(
+            "SELECT tabela, versao FROM cache_versoes"
+        ).fetchall())
+        estado.conexao = conexao
+        estado.versao_dados = versao_dados
+        estado.alteracoes = alteracoes
+        return estado.versoes
+
+    def _ativo(self) -> bool:
+        return (self.capacidade > 0
+                and not getattr(self._local, 'ignorar', False)
+                and not get_db().in_transaction())
+
+    def obter(self, chave, tabelas: Iterable[str], funcao: Callable):
+        """
+        Devolve o resultado guardado em ``chave`` ou executa ``funcao()``
+
+        Args:
+            chave: Identificador hashable da consulta (nome + argumentos)
+            tabelas: Tabelas lidas pela consulta
+            funcao: Executa a consulta
+        """
+        if not self._ativo():
+            self._metricas['ignoradas'] += 1
+            return funcao()
+
+        versoes = self._versoes()
+        if any(t not in versoes for t in tabelas):
+            # Tabela sem gatilho de versão: não há como saber se mudou
+            self._metricas['ignoradas'] += 1
+            return funcao()
+
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                valor, dependencias = entrada
+                if all(versoes.get(t) == v for t, v in dependencias.items()):
+                    self._entradas.move_to_end(chave)
+                    self._metricas['acertos'] += 1
+                    return _copia(valor)
+                del self._entradas[chave]
+                self._metricas['invalidadas'] += 1
+            self._metricas['falhas'] += 1
+
+        # Versões lidas antes da consulta: uma escrita no meio invalida a entrada
+        dependencias = {t: versoes.get(t) for t in tabelas}
+        valor = funcao()
+
+        with self._trava:
+            self._entradas[chave] = (valor, dependencias)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+                self._metricas['descartadas'] += 1
+        return _copia(valor)
+
+    def invalidar(self, tabela: str = None):
+        """Descarta as entradas de uma tabela (ou todas)"""
+        with self._trava:
+            if tabela is None:
+                self._entradas.clear()
+            else:
+                for chave in [c for c, (_, dep) in self._entradas.items() if tabela in dep]:
+                    del self._entradas[chave]
+        self._local = threading.local()
+
+    @contextmanager
+    def ignorado(self):
+        """Bloco em que as leituras vão sempre ao banco (nesta thread)"""
+        anterior = getattr(self._local, 'ignorar', False)
+        self._local.ignorar = True
+        try:
+            yield
+        finally:
+            self._local.ignorar = anterior
+
+    def metricas(self) -> Dict:
+        consultas = self._metricas['acertos'] + self._metricas['falhas']
+        return {
+            **self._metricas,
+            'entradas': len(self._entradas),
+            'capacidade': self.capacidade,
+            'taxa_acerto': round(self._metricas['acertos'] / consultas, 3) if consultas else 0.0,
+        }
+
+
+# Instância usada pelos serviços
+cache_consultas = CacheConsultas()
+
+
+def em_cache(*tabelas: str):
+    """
+    Guarda o resultado da função no cache, por argumentos
+
+    Em métodos, ``self`` não entra na chave (os serviços não têm estado que
+    mude o resultado).
+    """
+    def decorador(funcao):
+        metodo = funcao.__code__.co_varnames[:1] == ('self',)
+        nome = funcao.__qualname__
+
+        @wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            argumentos = args[1:] if metodo else args
+            chave = (nome, json.dumps([argumentos, kwargs], sort_keys=True, default=str))
+            return cache_consultas.obter(chave, tabelas, lambda: funcao(*args, **kwargs))
+        return envoltorio
+    return decorador
+
+
+if __name__ == '__main__':
+    import time
+    from src.bootstrap import inicializar
+    from src.utils.dashboard import obter_dados_dashboard
+
+    def medir(rodadas: int = 200) -> float:
+        inicio = time.perf_counter()
+        for _ in range(rodadas):
+            obter_dados_dashboard()
+        return (time.perf_counter() - inicio) / rodadas * 1000
+
+    inicializar()
+    with cache_consultas.ignorado():
+        print(f"sem cache: {medir():.3f} ms por leitura")
+    print(f"com cache: {medir():.3f} ms por leitura")
+    print(cache_consultas.metricas())
@@ -1,42 +1,119 @@
 """
 Gerenciamento de conexão com banco de dados SQLite
+
+Nada acontece ao importar este módulo: o diretório de dados e a instância
+SqliteDatabase são criados no primeiro uso (``get_db`` ou qualquer acesso ao
+proxy ``db`` usado pelos modelos).
 """
 from pathlib import Path
-from peewee import SqliteDatabase
+from typing import Callable, List
+from peewee import DatabaseProxy, SqliteDatabase
+import time
 
 # Caminho do banco de dados
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DATA_DIR = BASE_DIR / "data"
 DB_PATH = DATA_DIR / "loja.db"
 
-# Criar diretório de dados se não existir
-DATA_DIR.mkdir(exist_ok=True)
-
 # Instância única do banco de dados
 _db_instance = None
 
 
+class _BancoSobDemanda(DatabaseProxy):
+    """Proxy que cria o banco real (get_db) no primeiro acesso"""
+
+    def __getattr__(self, attr):
+        if self.obj is None:
+            get_db()
+        return super().__getattr__(attr)
+
+
+# Proxy ao qual os modelos são vinculados (ver models.BaseModel)
+db = _BancoSobDemanda()
+
+
+class BancoObservado(SqliteDatabase):
+    """
+    SqliteDatabase que repassa cada ``execute_sql`` aos observadores registrados
+
+    Um observador recebe (sql, parâmetros, cursor, duração em segundos) e
+    devolve o cursor (o mesmo ou um que o envolva). Sem observadores o custo
+    é o de conferir uma lista vazia (ver src.database.instrumentacao).
+    """
+    observadores: List[Callable] = []
+
+    def execute_sql(self, sql, params=None, commit=None):
+        if not BancoObservado.observadores:
+            return super().execute_sql(sql, params)
+        inicio = time.perf_counter()
+        cursor = super().execute_sql(sql, params)
+        duracao = time.perf_counter() - inicio
+        for observador in BancoObservado.observadores:
+            cursor = observador(sql, params, cursor, duracao)
+        return cursor
+
+
 def get_db():
     """Retorna a instância única do banco de dados"""
     global _db_instance
     if _db_instance is None:
-        _db_instance = SqliteDatabase(
+        # Criar diretório de dados se não existir
+        DATA_DIR.mkdir(exist_ok=True)
+
+        _db_instance = BancoObservado(
             str(DB_PATH),
             pragmas={
+                # Antes do journal_mode: só vale enquanto o arquivo está vazio
+                # (bancos existentes são convertidos com
+                # python -m src.services.manutencao_service --ativar-vacuo-incremental)
+                'auto_vacuum': 'incremental',
                 'journal_mode': 'wal',
                 'cache_size': -1 * 64000,  # 64MB
                 'foreign_keys': 1,
                 'synchronous': 1,
             }
         )
+        db.initialize(_db_instance)
+        _instalar_observadores()
+    return _db_instance
+
+
+def usar_somente_leitura(caminho: Path = None):
+    """
+    Faz este processo usar uma conexão só de leitura (``query_only``)
+
+    Para processos auxiliares que só consultam (ex.: relatórios em lote):
+    qualquer gravação falha em vez de disputar a trava de escrita com o caixa.
+    """
+    global _db_instance
+    _db_instance = BancoObservado(
+        str(caminho or DB_PATH),
+        pragmas={
+            'query_only': 1,
+            'cache_size': -1 * 16000,  # 16MB por processo
+            'foreign_keys': 1,
+        }
+    )
+    db.initialize(_db_instance)
+    _instalar_observadores()
     return _db_instance
 
 
+def _instalar_observadores():
+    """Log de consultas lentas, se configurado (CONSULTAS_LENTAS_MS)"""
+    from .consultas_lentas import instalar_se_configurado
+    instalar_se_configurado()
+
+
 def init_db():
-    """Inicializa o banco de dados criando as tabelas"""
+    """Inicializa o banco de dados criando as tabelas e aplicando as migrações"""
     from .models import (
-        Produto, Venda, ItemVenda, Transacao, FechamentoDia
+        Produto, Venda, ItemVenda, Transacao, FechamentoDia, HistoricoPreco,
+        ArquivoMensal, MudancaSync, EstadoSync, PosicaoDiario, EventoOutbox,
+        ConsumidorOutbox, VersaoTabela, ReservaEstoque, EntradaMercadoria,
+        ItemEntradaMercadoria
     )
+    from .migrations import aplicar_migracoes
     
     db = get_db()
     
@@ -47,8 +124,20 @@ def init_db():
             Venda,
             ItemVenda,
             Transacao,
-            FechamentoDia
+            FechamentoDia,
+            HistoricoPreco,
+            ArquivoMensal,
+            MudancaSync,
+            EstadoSync,
+            PosicaoDiario,
+            EventoOutbox,
+            ConsumidorOutbox,
+            VersaoTabela,
+            ReservaEstoque,
+            EntradaMercadoria,
+            ItemEntradaMercadoria
         ], safe=True)
+        aplicar_migracoes(db)
         print("✓ Banco de dados inicializado com sucesso")
         return True
     except OSError as e:
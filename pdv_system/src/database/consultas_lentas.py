@@ -0,0 +1,320 @@
+"""
+Log de consultas lentas com o plano de execução
+
+Opcional (CONSULTAS_LENTAS_MS > 0): todo comando que passar do limite vai,
+como uma linha JSON, para CONSULTAS_LENTAS_ARQUIVO com
+
+  - o SQL, o formato (ver ``instrumentacao.formato``) e os parâmetros
+    mascarados (textos viram ``<texto N>``; curingas de LIKE são mantidos)
+  - a duração em ms (execução + leitura das linhas) e as linhas devolvidas
+    (ou alteradas, em escritas)
+  - a saída de ``EXPLAIN QUERY PLAN`` e as tabelas grandes varridas por
+    inteiro (``SCAN`` de vendas, itens_venda, transacoes ou produtos)
+
+A duração de um SELECT só é conhecida quando as linhas acabam de ser lidas;
+por isso os cursores de leitura são envolvidos e o registro acontece no fim
+da leitura (ou quando o cursor é fechado/descartado). O plano é obtido
+depois, pela conexão sqlite3 direta, e não entra no log.
+
+Com o limite em 0 nada é instalado: ``execute_sql`` segue sem observador.
+
+Uso (agregação do log pelos formatos mais custosos):
+    python -m src.database.consultas_lentas [--top 10] [--ordenar total|max|vezes]
+        [--desde AAAA-MM-DD] [--arquivo logs/consultas_lentas.jsonl]
+"""
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import json
+import re
+import sys
+import threading
+import time
+
+from src.database.connection import BancoObservado, get_db
+from src.utils.logger import log_warning
+
+# Tabelas cujo SCAN completo é sinal de índice faltando
+TABELAS_GRANDES = ('vendas', 'itens_venda', 'transacoes', 'produtos')
+
+_COM_PLANO = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'WITH')
+_PALAVRAS = {'where', 'on', 'set', 'inner', 'left', 'right', 'cross', 'join', 'order',
+             'group', 'limit', 'using', 'natural', 'values', 'select', 'as', 'union',
+             'having', 'window', 'default', 'outer', 'full'}
+_TABELA_ALIAS = re.compile(
+    r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(?:"?\w+"?\.)?"?(\w+)"?(?:\s+(?:AS\s+)?"?(\w+)"?)?',
+    re.IGNORECASE
+)
+_SCAN = re.compile(r'^SCAN (\w+)')
+
+_log = None
+_trava_instalacao = threading.Lock()
+
+
+def mascarar(params) -> List:
+    """Parâmetros sem o conteúdo dos textos (tamanho e curingas de LIKE ficam)"""
+    mascarados = []
+    for valor in params or ():
+        if isinstance(valor, str):
+            inicio = '%' if valor.startswith('%') else ''
+            fim = '%' if len(valor) > 1 and valor.endswith('%') else ''
+            mascarados.append(f"{inicio}<texto {len(valor) - len(inicio) - len(fim)}>{fim}")
+        elif isinstance(valor, (bytes, bytearray, memoryview)):
+            mascarados.append(f"<bytes {len(valor)}>")
+        elif valor is None or isinstance(valor, (int, float)):
+            mascarados.append(valor)
+        else:
+            mascarados.append(str(valor))
+    return mascarados
+
+
+def tabelas_varridas(sql: str, plano: List[str]) -> List[str]:
+    """Tabelas grandes com ``SCAN`` no plano (apelidos resolvidos pelo SQL)"""
+    apelidos = {}
+    for tabela, apelido in _TABELA_ALIAS.findall(sql):
+        apelidos[tabela.lower()] = tabela.lower()
+        if apelido and apelido.lower() not in _PALAVRAS:
+            apelidos[apelido.lower()] = tabela.lower()
+
+    varridas = []
+    for detalhe in plano:
+        encontrado = _SCAN.match(detalhe)
+        if encontrado:
+            tabela = apelidos.get(encontrado.group(1).lower(), encontrado.group(1).lower())
+            if tabela in TABELAS_GRANDES and tabela not in varridas:
+                varridas.append(tabela)
+    return varridas
+
+
+class _CursorCronometrado:
+    """Cursor de leitura que soma o tempo e as linhas até o fim do resultado"""
+
+    def __init__(self, log: 'LogConsultasLentas', cursor, sql: str, params, segundos: float):
+        self._log = log
+        self._cursor = cursor
+        self._sql = sql
+        self._params = params
+        self._segundos = segundos
+        self._linhas = 0
+        self._encerrado = False
+
+    def _ler(self, metodo, *args):
+        inicio = time.perf_counter()
+        resultado = metodo(*args)
+        self._segundos += time.perf_counter() - inicio
+        return resultado
+
+    def fetchone(self):
+        linha = self._ler(self._cursor.fetchone)
+        if linha is None:
+            self._encerrar()
+        else:
+            self._linhas += 1
+        return linha
+
+    def fetchmany(self, *args):
+        linhas = self._ler(self._cursor.fetchmany, *args)
+        self._linhas += len(linhas)
+        if not linhas:
+            self._encerrar()
+        return linhas
+
+    def fetchall(self):
+        linhas = self._ler(self._cursor.fetchall)
+        self._linhas += len(linhas)
+        self._encerrar()
+        return linhas
+
+    def __iter__(self):
+        while True:
+            linha = self.fetchone()
+            if linha is None:
+                return
+            yield linha
+
+    def close(self):
+        self._cursor.close()
+        self._encerrar()
+
+    def __del__(self):
+        if not sys.is_finalizing():
+            self._encerrar()
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+    def _encerrar(self):
+        if not self._encerrado:
+            self._encerrado = True
+            if self._segundos * 1000 >= self._log.limite_ms:
+                self._log.registrar(self._sql, self._params, self._segundos, self._linhas)
+
+
+class LogConsultasLentas:
+    """Observador de ``BancoObservado`` que grava as consultas acima do limite"""
+
+    def __init__(self, limite_ms: float, arquivo: Path, tamanho_maximo: int = 5_000_000):
+        self.limite_ms = limite_ms
+        self.arquivo = Path(arquivo)
+        self.tamanho_maximo = tamanho_maximo
+        self._trava = threading.Lock()
+
+    def observar(self, sql, params, cursor, duracao: float):
+        if cursor.description is not None:
+            return _CursorCronometrado(self, cursor, sql, params, duracao)
+        if duracao * 1000 >= self.limite_ms:
+            self.registrar(sql, params, duracao, max(cursor.rowcount, 0))
+        return cursor
+
+    @staticmethod
+    def plano(sql: str, params) -> List[str]:
+        """Detalhes de ``EXPLAIN QUERY PLAN`` (pela conexão direta, fora do observador)"""
+        if not sql.lstrip().upper().startswith(_COM_PLANO):
+            return []
+        try:
+            linhas = get_db().connection().execute(
+                'EXPLAIN QUERY PLAN ' + sql, params or ()
+            ).fetchall()
+        except Exception as e:
+            return [f"(plano indisponível: {e})"]
+        return [linha[3] for linha in linhas]
+
+    def registrar(self, sql: str, params, segundos: float, linhas: int) -> Dict:
+        from src.database.instrumentacao import formato
+
+        plano = self.plano(sql, params)
+        entrada = {
+            'quando': datetime.now().isoformat(timespec='seconds'),
+            'ms': round(segundos * 1000, 2),
+            'linhas': linhas,
+            'sql': sql,
+            'formato': formato(sql),
+            'parametros': mascarar(params),
+            'plano': plano,
+            'varreduras': tabelas_varridas(sql, plano),
+            'thread': threading.current_thread().name,
+        }
+        texto = json.dumps(entrada, ensure_ascii=False, default=str) + '\n'
+        with self._trava:
+            self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+            if self.arquivo.exists() and self.arquivo.stat().st_size > self.tamanho_maximo:
+                self.arquivo.replace(self.arquivo.with_name(self.arquivo.name + '.1'))
+            with open(self.arquivo, 'a', encoding='utf-8') as arquivo:
+                arquivo.write(texto)
+
+        aviso = f" - SCAN de {', '.join(entrada['varreduras'])}" if entrada['varreduras'] else ''
+        log_warning(f"Consulta lenta ({entrada['ms']:.0f} ms, {linhas} linha(s)){aviso}: "
+                    f"{entrada['formato'][:200]}")
+        return entrada
+
+
+def instalar(limite_ms: float, arquivo: Path = None) -> LogConsultasLentas:
+    """Liga o log (substitui um já instalado)"""
+    global _log
+    if arquivo is None:
+        from src.utils import config
+        arquivo = config.CONSULTAS_LENTAS_ARQUIVO
+    with _trava_instalacao:
+        desinstalar()
+        _log = LogConsultasLentas(limite_ms, arquivo)
+        BancoObservado.observadores.append(_log.observar)
+        return _log
+
+
+def desinstalar() -> None:
+    global _log
+    if _log is not None and _log.observar in BancoObservado.observadores:
+        BancoObservado.observadores.remove(_log.observar)
+    _log = None
+
+
+def instalar_se_configurado() -> Optional[LogConsultasLentas]:
+    """Instala o log se CONSULTAS_LENTAS_MS > 0 (chamado ao criar o banco)"""
+    from src.utils import config
+    if config.CONSULTAS_LENTAS_MS > 0 and _log is None:
+        return instalar(config.CONSULTAS_LENTAS_MS)
+    return _log
+
+
+def ler_log(arquivo: Path, desde: date = None) -> List[Dict]:
+    """Entradas do log (e do arquivo rotacionado ``.1``), ignorando linhas corrompidas"""
+    entradas = []
+    for caminho in (arquivo.with_name(arquivo.name + '.1'), arquivo):
+        if not caminho.exists():
+            continue
+        with open(caminho, encoding='utf-8') as origem:
+            for linha in origem:
+                try:
+                    entrada = json.loads(linha)
+                except ValueError:
+                    continue
+                if desde is None or entrada['quando'][:10] >= desde.isoformat():
+                    entradas.append(entrada)
+    return entradas
+
+
+def agregar(entradas: List[Dict], ordenar: str = 'total', top: int = 10) -> List[Dict]:
+    """
+    Agrupa as entradas por formato de comando
+
+    Returns:
+        list: [{'formato', 'vezes', 'total_ms', 'media_ms', 'max_ms',
+                'media_linhas', 'varreduras', 'plano', 'exemplo'}]
+    """
+    grupos: Dict[str, Dict] = {}
+    for entrada in entradas:
+        grupo = grupos.setdefault(entrada['formato'], {
+            'formato': entrada['formato'], 'vezes': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            'linhas': 0, 'varreduras': set(), 'plano': entrada['plano'],
+            'exemplo': entrada['parametros'],
+        })
+        grupo['vezes'] += 1
+        grupo['total_ms'] += entrada['ms']
+        grupo['linhas'] += entrada['linhas']
+        grupo['varreduras'].update(entrada['varreduras'])
+        if entrada['ms'] > grupo['max_ms']:
+            grupo['max_ms'] = entrada['ms']
+            grupo['plano'] = entrada['plano']
+            grupo['exemplo'] = entrada['parametros']
+
+    chaves = {'total': 'total_ms', 'max': 'max_ms', 'vezes': 'vezes'}
+    resultado = sorted(grupos.values(), key=lambda g: g[chaves[ordenar]], reverse=True)[:top]
+    for grupo in resultado:
+        grupo['total_ms'] = round(grupo['total_ms'], 2)
+        grupo['media_ms'] = round(grupo['total_ms'] / grupo['vezes'], 2)
+        grupo['media_linhas'] = round(grupo.pop('linhas') / grupo['vezes'], 1)
+        grupo['varreduras'] = sorted(grupo['varreduras'])
+    return resultado
+
+
+if __name__ == '__main__':
+    import argparse
+    from src.utils import config
+
+    parser = argparse.ArgumentParser(description="Formatos de comando mais custosos do log de consultas lentas")
+    parser.add_argument('--arquivo', type=Path, default=None)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--ordenar', choices=('total', 'max', 'vezes'), default='total')
+    parser.add_argument('--desde', type=date.fromisoformat, default=None)
+    parser.add_argument('--json', action='store_true', help="Saída em JSON")
+    args = parser.parse_args()
+
+    arquivo = args.arquivo or Path(config.CONSULTAS_LENTAS_ARQUIVO)
+    entradas = ler_log(arquivo, args.desde)
+    grupos = agregar(entradas, args.ordenar, args.top)
+
+    if args.json:
+        print(json.dumps(grupos, ensure_ascii=False, indent=2))
+        sys.exit(0)
+
+    print(f"{len(entradas)} consulta(s) lenta(s) em {arquivo}, "
+          f"{len(grupos)} formato(s) mais custoso(s) por {args.ordenar}:")
+    for posicao, grupo in enumerate(grupos, start=1):
+        alerta = f"  ⚠ SCAN de {', '.join(grupo['varreduras'])}" if grupo['varreduras'] else ''
+        print(f"\n{posicao}. {grupo['vezes']}x  total {grupo['total_ms']:.1f} ms  "
+              f"média {grupo['media_ms']:.1f} ms  máx {grupo['max_ms']:.1f} ms  "
+              f"~{grupo['media_linhas']:g} linha(s){alerta}")
+        print(f"   {grupo['formato'][:400]}")
+        print(f"   parâmetros (mais lenta): {grupo['exemplo']}")
+        for detalhe in grupo['plano']:
+            print(f"   plano: {detalhe}")
@@ -0,0 +1,159 @@
+"""
+Diário de vendas (append-only)
+
+No modo diário (DIARIO_VENDAS=true no .env) a finalização da venda não abre a
+transação de escrita no SQLite: grava um registro curto neste arquivo, faz
+fsync e retorna. O AplicadorDiario (src/services/diario_service.py) depois
+aplica os registros no banco em transações agrupadas.
+
+Formato de cada registro:
+    <tamanho: uint32 LE><crc32: uint32 LE><JSON utf-8 de ``tamanho`` bytes>
+
+Um registro truncado ou com CRC inválido no fim do arquivo (queda de energia
+durante a gravação) marca o fim do diário; ``reparar()`` corta o arquivo nesse
+ponto. A posição já aplicada fica no banco (tabela posicoes_diario), gravada
+na mesma transação que aplica os registros. O arquivo só é zerado depois que
+a posição 0 está no disco (ver ``esvaziar_se``).
+"""
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Tuple
+import json
+import os
+import struct
+import threading
+import zlib
+
+from .connection import DATA_DIR
+
+CABECALHO = struct.Struct('<II')
+
+
+class Diario:
+    """Arquivo append-only de registros JSON com checksum"""
+
+    def __init__(self, caminho: Path):
+        self.caminho = Path(caminho)
+        self._trava = threading.Lock()
+        self._arquivo = None
+
+    def anexar(self, dados: Dict) -> int:
+        """
+        Grava um registro e espera o fsync
+
+        Returns:
+            int: Posição (em bytes) do fim do registro
+        """
+        corpo = json.dumps(dados, separators=(',', ':'), default=str).encode('utf-8')
+        registro = CABECALHO.pack(len(corpo), zlib.crc32(corpo)) + corpo
+
+        with self._trava:
+            if self._arquivo is None:
+                self.caminho.parent.mkdir(parents=True, exist_ok=True)
+                self._arquivo = open(self.caminho, 'ab')
+            self._arquivo.write(registro)
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            return self._arquivo.tell()
+
+    def ler(self, desde: int = 0) -> Iterator[Tuple[int, int, Dict]]:
+        """
+        Lê os registros íntegros a partir da posição ``desde``
+
+        Yields:
+            tuple: (posição inicial, posição final, dados)
+        """
+        if not self.caminho.exists():
+            return
+
+        with open(self.caminho, 'rb') as arquivo:
+            arquivo.seek(desde)
+            posicao = desde
+            while True:
+                cabecalho = arquivo.read(CABECALHO.size)
+                if len(cabecalho) < CABECALHO.size:
+                    return
+                tamanho, crc = CABECALHO.unpack(cabecalho)
+                corpo = arquivo.read(tamanho)
+                if len(corpo) < tamanho or zlib.crc32(corpo) != crc:
+                    return
+                fim = posicao + CABECALHO.size + tamanho
+                yield posicao, fim, json.loads(corpo)
+                posicao = fim
+
+    def tamanho(self) -> int:
+        return self.caminho.stat().st_size if self.caminho.exists() else 0
+
+    def reparar(self, desde: int = 0) -> int:
+        """
+        Corta um registro incompleto no fim do arquivo
+
+        Returns:
+            int: Bytes descartados
+        """
+        fim = desde
+        for _inicio, fim, _dados in self.ler(desde):
+            pass
+
+        descartados = self.tamanho() - fim
+        if descartados > 0:
+            with self._trava:
+                self._fechar()
+                with open(self.caminho, 'r+b') as arquivo:
+                    arquivo.truncate(fim)
+        return max(descartados, 0)
+
+    def esvaziar_se(self, aplicado_ate: int, confirmar: Callable[[], bool] = None) -> bool:
+        """
+        Zera o arquivo quando tudo até o fim já foi aplicado
+
+        Feito sob a trava de gravação: nenhum registro novo entra entre a
+        conferência do tamanho e o truncamento. ``confirmar`` roda antes do
+        truncamento, ainda sob a trava, e o cancela se devolver False (o
+        AplicadorDiario zera ali a posição gravada e espera ela chegar ao disco).
+        """
+        with self._trava:
+            if aplicado_ate <= 0 or aplicado_ate != self.tamanho():
+                return False
+            if confirmar is not None and not confirmar():
+                return False
+            self._fechar()
+            with open(self.caminho, 'r+b') as arquivo:
+                arquivo.truncate(0)
+                os.fsync(arquivo.fileno())
+            return True
+
+    def _fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def fechar(self):
+        with self._trava:
+            self._fechar()
+
+
+_diario_vendas = None
+_ativo = None
+
+
+def diario_ativo() -> bool:
+    """True se a finalização de vendas usa o diário (DIARIO_VENDAS)"""
+    global _ativo
+    if _ativo is None:
+        from src.utils import config
+        _ativo = config.DIARIO_VENDAS
+    return _ativo
+
+
+def definir_ativo(ativo: bool) -> None:
+    """Liga/desliga o modo diário (linha de comando, medições)"""
+    global _ativo
+    _ativo = ativo
+
+
+def diario_vendas() -> Diario:
+    """Instância única do diário de vendas (data/vendas.diario)"""
+    global _diario_vendas
+    if _diario_vendas is None:
+        _diario_vendas = Diario(DATA_DIR / "vendas.diario")
+    return _diario_vendas
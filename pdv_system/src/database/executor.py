@@ -0,0 +1,202 @@
+"""
+Executor do banco para código assíncrono (interface Flet)
+
+O SQLite aceita um escritor por vez e leitores em paralelo (WAL). O executor
+segue isso:
+
+  - escrita: uma única thread, em ordem de chegada
+  - leitura: um pool de threads (``leitores``)
+
+Cada thread abre a sua conexão (o Peewee guarda uma por thread) e a reutiliza.
+
+Pressão de retorno: cada pista aceita no máximo ``fila_maxima`` operações
+entre em espera e em execução; quem chega depois aguarda uma vaga (até o
+timeout) em vez de empilhar trabalho sem limite.
+
+Timeout e cancelamento:
+  - leitura: se o tempo acabar ou a tarefa que aguarda for cancelada, a
+    operação que ainda não começou é descartada e a que está em execução é
+    interrompida (``sqlite3.Connection.interrupt``)
+  - escrita: o timeout vale só para começar. Uma escrita que já começou
+    sempre termina (dentro da sua transação) e o resultado é entregue, então
+    um timeout nunca é informado para uma venda que foi gravada; cancelar a
+    tarefa que aguarda descarta a escrita só se ela ainda não começou.
+
+Uso:
+    executor = executor_banco()
+    produtos = await executor.ler(servico.buscar_produtos, termo)
+    venda = await executor.escrever(servico.finalizar_venda, venda_id, valor)
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+import asyncio
+import threading
+import weakref
+
+from .connection import get_db
+from .instrumentacao import instrumentar
+from src.utils.perfilador import perfilar
+
+
+def _abrir_conexao():
+    """Conexão da thread do executor, aberta uma vez e reutilizada"""
+    get_db().connect(reuse_if_open=True)
+
+
+class _Operacao:
+    """Chamada de uma função numa thread do executor, interrompível durante a execução"""
+
+    def __init__(self, funcao: Callable, args: tuple, kwargs: Dict, ao_iniciar: Callable):
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        self._ao_iniciar = ao_iniciar
+        self._trava = threading.Lock()
+        self._conexao = None
+
+    def executar(self):
+        with self._trava:
+            self._conexao = get_db().connection()
+        self._ao_iniciar()
+        try:
+            nome = getattr(self.funcao, '__qualname__', repr(self.funcao))
+            with instrumentar(nome), perfilar(f"servico.{nome}"):
+                return self.funcao(*self.args, **self.kwargs)
+        finally:
+            with self._trava:
+                self._conexao = None
+
+    def interromper(self) -> bool:
+        """Interrompe a consulta em andamento; False se não está executando"""
+        with self._trava:
+            if self._conexao is None:
+                return False
+            self._conexao.interrupt()
+            return True
+
+
+class ExecutorBanco:
+    """Uma thread de escrita e um pool de leitura, com fila limitada"""
+
+    def __init__(self, leitores: int = None, fila_maxima: int = None,
+                 timeout: float = None):
+        from src.utils import config
+
+        self.leitores = leitores or config.DB_LEITORES
+        self.fila_maxima = fila_maxima or config.DB_FILA_MAXIMA
+        self.timeout = timeout if timeout is not None else config.DB_TIMEOUT_SEGUNDOS
+        self._pools = {
+            'escrita': ThreadPoolExecutor(1, thread_name_prefix='db-escrita',
+                                          initializer=_abrir_conexao),
+            'leitura': ThreadPoolExecutor(self.leitores, thread_name_prefix='db-leitura',
+                                          initializer=_abrir_conexao),
+        }
+        # Semáforos por loop de eventos (asyncio.Semaphore fica preso ao loop)
+        self._vagas = weakref.WeakKeyDictionary()
+        self._metricas = {
+            'enviadas': 0,
+            'sem_vaga': 0,       # timeout esperando vaga na fila
+            'descartadas': 0,    # canceladas/timeout antes de começar
+            'interrompidas': 0,  # leituras interrompidas em execução
+        }
+
+    def _vaga(self, loop, pista: str) -> asyncio.Semaphore:
+        vagas = self._vagas.get(loop)
+        if vagas is None:
+            vagas = self._vagas[loop] = {
+                'escrita': asyncio.Semaphore(self.fila_maxima),
+                'leitura': asyncio.Semaphore(self.fila_maxima),
+            }
+        return vagas[pista]
+
+    async def ler(self, funcao: Callable, *args, timeout: float = None, **kwargs):
+        """Executa uma leitura no pool de leitura"""
+        return await self._executar('leitura', funcao, args, kwargs, timeout)
+
+    async def escrever(self, funcao: Callable, *args, timeout: float = None, **kwargs):
+        """Executa uma escrita na thread de escrita"""
+        return await self._executar('escrita', funcao, args, kwargs, timeout)
+
+    async def _executar(self, pista: str, funcao: Callable, args: tuple, kwargs: Dict,
+                        timeout: float = None):
+        loop = asyncio.get_running_loop()
+        timeout = self.timeout if timeout is None else timeout
+        prazo = loop.time() + timeout if timeout else None
+
+        def restante():
+            return max(prazo - loop.time(), 0) if prazo is not None else None
+
+        vaga = self._vaga(loop, pista)
+        try:
+            await asyncio.wait_for(vaga.acquire(), restante())
+        except TimeoutError:
+            self._metricas['sem_vaga'] += 1
+            raise TimeoutError(f"Banco ocupado: sem vaga na fila de {pista}") from None
+
+        iniciada = loop.create_future()
+
+        def ao_iniciar():
+            loop.call_soon_threadsafe(lambda: iniciada.done() or iniciada.set_result(None))
+
+        operacao = _Operacao(funcao, args, kwargs, ao_iniciar)
+        try:
+            futuro = self._pools[pista].submit(operacao.executar)
+        except BaseException:
+            vaga.release()
+            raise
+        # A vaga só é devolvida quando a thread termina (ou a operação é descartada)
+        futuro.add_done_callback(lambda _: loop.call_soon_threadsafe(vaga.release))
+        self._metricas['enviadas'] += 1
+
+        if pista == 'escrita':
+            return await self._aguardar_escrita(futuro, iniciada, restante())
+        return await self._aguardar_leitura(futuro, operacao, restante())
+
+    async def _aguardar_escrita(self, futuro, iniciada, timeout):
+        try:
+            await asyncio.wait_for(asyncio.shield(iniciada), timeout)
+        except TimeoutError:
+            if futuro.cancel():
+                self._metricas['descartadas'] += 1
+                raise TimeoutError("Banco ocupado: a escrita não começou a tempo") from None
+            # Começou neste instante: o resultado é entregue
+        except asyncio.CancelledError:
+            if futuro.cancel():
+                self._metricas['descartadas'] += 1
+            raise
+        # Cancelar quem aguarda não interrompe a escrita em andamento
+        return await asyncio.shield(asyncio.wrap_future(futuro))
+
+    async def _aguardar_leitura(self, futuro, operacao: _Operacao, timeout):
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(futuro), timeout)
+        except (TimeoutError, asyncio.CancelledError):
+            if futuro.cancel():
+                self._metricas['descartadas'] += 1
+            elif operacao.interromper():
+                self._metricas['interrompidas'] += 1
+            raise
+
+    def metricas(self) -> Dict:
+        return {
+            **self._metricas,
+            'leitores': self.leitores,
+            'fila_maxima': self.fila_maxima,
+        }
+
+    def encerrar(self, esperar: bool = True):
+        for pool in self._pools.values():
+            pool.shutdown(wait=esperar, cancel_futures=True)
+
+
+_executor = None
+_trava_executor = threading.Lock()
+
+
+def executor_banco() -> ExecutorBanco:
+    """Executor compartilhado pela interface"""
+    global _executor
+    with _trava_executor:
+        if _executor is None:
+            _executor = ExecutorBanco()
+        return _executor
@@ -0,0 +1,221 @@
+"""
+Instrumentação das consultas SQL por operação
+
+Conta comandos e linhas de cada operação lógica (uma chamada de serviço,
+uma requisição da API) observando ``execute_sql`` (``BancoObservado``), e
+aponta formatos de comando repetidos dentro da operação - o sinal de um
+N+1 (ex.: ``item.produto`` consultado a cada item do carrinho).
+
+  - ``medir_operacao(nome)``: mede um bloco; com ``limite_repeticao``,
+    avisa no log os formatos executados tantas vezes ou mais
+  - ``instrumentar(nome)``: ``medir_operacao`` só com CONSULTAS_INSTRUMENTADAS
+    ligado - usado por operação na API e no executor da interface
+  - ``orcamento_consultas(maximo=3)``: o mesmo, mas falha
+    (``OrcamentoConsultasExcedido``) se o bloco passar do orçamento - para
+    verificações automáticas das chamadas quentes (ver
+    src.utils.orcamento_consultas)
+
+O formato de um comando é o SQL com literais e listas ``IN (?, ?, ...)``
+reduzidos, então o mesmo SELECT com ids diferentes conta como repetição.
+
+As medições valem para o contexto (thread/tarefa) que as abriu; blocos
+aninhados contam nos dois níveis.
+
+Uso:
+    with orcamento_consultas(maximo=6, repeticoes=2) as medicao:
+        servico.finalizar_venda(venda_id, valor_pago)
+    print(medicao.consultas, medicao.linhas)
+"""
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import List, Tuple
+import re
+import threading
+
+from src.database.connection import BancoObservado
+from src.utils.logger import log_warning
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMERO = re.compile(r'(?<![\w".])-?\d+(?:\.\d+)?\b')
+_LISTA = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_ESPACOS = re.compile(r'\s+')
+
+_medicoes: ContextVar[Tuple['MedicaoConsultas', ...]] = ContextVar('medicoes_consultas',
+                                                                   default=())
+_instalado = False
+_trava = threading.Lock()
+_ativo = None
+
+
+def formato(sql: str) -> str:
+    """SQL sem literais nem tamanho de listas IN, para agrupar comandos iguais"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMERO.sub('?', sql)
+    sql = _LISTA.sub('(?...)', sql)
+    return _ESPACOS.sub(' ', sql).strip()
+
+
+class MedicaoConsultas:
+    """Comandos, linhas (lidas ou alteradas) e tempo de execução de uma operação"""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.consultas = 0
+        self.linhas = 0
+        self.segundos = 0.0
+        self.formatos: Counter = Counter()
+
+    def repetidas(self, limite: int = 2) -> List[Tuple[str, int]]:
+        """Formatos executados ``limite`` vezes ou mais, mais repetidos primeiro"""
+        return [(sql, vezes) for sql, vezes in self.formatos.most_common() if vezes >= limite]
+
+    def resumo(self, formatos: int = 5) -> str:
+        linhas = [f"{self.nome}: {self.consultas} consulta(s), {self.linhas} linha(s), "
+                  f"{self.segundos * 1000:.1f} ms"]
+        linhas += [f"  {vezes}x {sql[:200]}" for sql, vezes in self.formatos.most_common(formatos)]
+        return '\n'.join(linhas)
+
+
+class OrcamentoConsultasExcedido(AssertionError):
+    """Operação passou do número de consultas, linhas ou repetições permitido"""
+
+
+class _CursorContado:
+    """Cursor que soma às medições as linhas efetivamente lidas"""
+
+    def __init__(self, cursor, medicoes: Tuple[MedicaoConsultas, ...]):
+        self._cursor = cursor
+        self._medicoes = medicoes
+
+    def _contar(self, quantidade: int):
+        for medicao in self._medicoes:
+            medicao.linhas += quantidade
+
+    def fetchone(self):
+        linha = self._cursor.fetchone()
+        if linha is not None:
+            self._contar(1)
+        return linha
+
+    def fetchmany(self, *args):
+        linhas = self._cursor.fetchmany(*args)
+        self._contar(len(linhas))
+        return linhas
+
+    def fetchall(self):
+        linhas = self._cursor.fetchall()
+        self._contar(len(linhas))
+        return linhas
+
+    def __iter__(self):
+        for linha in self._cursor:
+            self._contar(1)
+            yield linha
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+
+def _observar(sql, params, cursor, duracao: float):
+    """Observador de ``BancoObservado``: contabiliza o comando nas medições abertas"""
+    medicoes = _medicoes.get()
+    if not medicoes:
+        return cursor
+
+    forma = formato(sql)
+    for medicao in medicoes:
+        medicao.consultas += 1
+        medicao.segundos += duracao
+        medicao.formatos[forma] += 1
+
+    if cursor.description is None:
+        # Comando de escrita: linhas alteradas
+        alteradas = max(cursor.rowcount, 0)
+        for medicao in medicoes:
+            medicao.linhas += alteradas
+        return cursor
+    return _CursorContado(cursor, medicoes)
+
+
+def _instalar():
+    global _instalado
+    with _trava:
+        if not _instalado:
+            BancoObservado.observadores.append(_observar)
+            _instalado = True
+
+
+@contextmanager
+def medir_operacao(nome: str, limite_repeticao: int = None):
+    """
+    Mede as consultas do bloco
+
+    Args:
+        limite_repeticao: Avisa no log (possível N+1) os formatos executados
+            tantas vezes ou mais no bloco
+    """
+    _instalar()
+    medicao = MedicaoConsultas(nome)
+    token = _medicoes.set(_medicoes.get() + (medicao,))
+    try:
+        yield medicao
+    finally:
+        _medicoes.reset(token)
+        if limite_repeticao:
+            for sql, vezes in medicao.repetidas(limite_repeticao):
+                log_warning(f"Possível N+1 em {nome}: {vezes}x {sql[:300]}")
+
+
+def instrumentacao_ativa() -> bool:
+    """True se as operações da API e da interface são medidas (CONSULTAS_INSTRUMENTADAS)"""
+    global _ativo
+    if _ativo is None:
+        from src.utils import config
+        _ativo = config.CONSULTAS_INSTRUMENTADAS
+    return _ativo
+
+
+def definir_ativo(ativo: bool) -> None:
+    """Liga/desliga a instrumentação por operação (linha de comando, medições)"""
+    global _ativo
+    _ativo = ativo
+
+
+def instrumentar(nome: str):
+    """``medir_operacao`` com o limite de repetição configurado, ou um bloco vazio (None)"""
+    if not instrumentacao_ativa():
+        return nullcontext()
+    from src.utils import config
+    return medir_operacao(nome, config.CONSULTAS_LIMITE_REPETICAO)
+
+
+@contextmanager
+def orcamento_consultas(maximo: int, linhas: int = None, repeticoes: int = None,
+                        nome: str = 'bloco'):
+    """
+    Falha se o bloco executar mais de ``maximo`` consultas
+
+    Args:
+        linhas: Máximo de linhas lidas/alteradas (None não confere)
+        repeticoes: Máximo de execuções de um mesmo formato (None não confere)
+
+    Raises:
+        OrcamentoConsultasExcedido: Ao sair do bloco sem exceção própria
+    """
+    with medir_operacao(nome) as medicao:
+        yield medicao
+
+    problemas = []
+    if medicao.consultas > maximo:
+        problemas.append(f"{medicao.consultas} consultas (máximo {maximo})")
+    if linhas is not None and medicao.linhas > linhas:
+        problemas.append(f"{medicao.linhas} linhas (máximo {linhas})")
+    if repeticoes is not None and medicao.repetidas(repeticoes + 1):
+        sql, vezes = medicao.repetidas(repeticoes + 1)[0]
+        problemas.append(f"formato repetido {vezes}x (máximo {repeticoes}): {sql[:200]}")
+    if problemas:
+        raise OrcamentoConsultasExcedido(
+            f"Orçamento de consultas excedido em {nome}: {'; '.join(problemas)}\n"
+            + medicao.resumo()
+        )
@@ -0,0 +1,188 @@
+"""
+Migrações versionadas do esquema
+
+``create_tables(safe=True)`` só cria o que não existe; mudanças em bancos já
+instalados (índices, colunas, tabelas novas com dados) são feitas aqui.
+
+Cada migração é uma função que recebe o banco e roda dentro de uma transação.
+A tabela ``schema_versao`` guarda as versões já aplicadas; ``aplicar_migracoes``
+executa apenas as pendentes, em ordem. Migrações nunca são editadas depois de
+publicadas: para mudar algo, acrescente uma nova ao final de ``MIGRACOES``.
+
+Uso:
+    python -m src.database.migrations [--status]
+"""
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from src.utils.logger import log_info, log_error
+
+
+def _redesenhar_indices(db):
+    """
+    Índices a partir das consultas reais
+
+    - produtos: nome e código ficam só com o índice UNIQUE (havia também índice
+      de campo e de Meta); (ativo, nome) atende a listagem de ativos ordenada
+    - vendas: (processada, data_hora) para o filtro ``processada = 1 AND
+      data_hora BETWEEN``; total e desconto no fim tornam as somas dos
+      relatórios e do fechamento cobertas pelo índice
+    - itens_venda: (venda_id, produto_id) atende o carrinho e a busca do item
+      de um produto na venda, substituindo o índice só de venda_id
+    - transacoes: (data_transacao, tipo, categoria, valor) cobre as somas por
+      tipo/categoria do período; tipo e categoria sozinhos eram pouco seletivos
+    """
+    for indice in (
+        'produto_ativo',
+        'venda_data_hora',
+        'itemvenda_venda_id',
+        'transacao_data_transacao',
+        'transacao_tipo',
+        'transacao_categoria',
+    ):
+        db.execute_sql(f'DROP INDEX IF EXISTS "{indice}"')
+
+    db.execute_sql(
+        'CREATE INDEX IF NOT EXISTS "idx_produtos_ativo_nome" '
+        'ON "produtos" ("ativo", "nome")'
+    )
+    db.execute_sql(
+        'CREATE INDEX IF NOT EXISTS "idx_vendas_processada_data" '
+        'ON "vendas" ("processada", "data_hora", "total", "desconto")'
+    )
+    db.execute_sql(
+        'CREATE INDEX IF NOT EXISTS "idx_itens_venda_venda_produto" '
+        'ON "itens_venda" ("venda_id", "produto_id")'
+    )
+    db.execute_sql(
+        'CREATE INDEX IF NOT EXISTS "idx_transacoes_data_tipo" '
+        'ON "transacoes" ("data_transacao", "tipo", "categoria", "valor")'
+    )
+
+    # Estatísticas para o planejador escolher os índices novos
+    db.execute_sql('ANALYZE')
+
+
+def _indice_mudancas_pendentes(db):
+    """
+    Índice parcial das mudanças ainda não enviadas ao nó central
+
+    ``enviado_em IS NULL`` não usa parâmetro, então o planejador consegue usar
+    o índice parcial; ele fica pequeno porque as linhas enviadas saem dele.
+    """
+    db.execute_sql(
+        'CREATE INDEX IF NOT EXISTS "idx_sync_mudancas_pendentes" '
+        'ON "sync_mudancas" ("id") WHERE "enviado_em" IS NULL'
+    )
+
+
+def _indice_outbox_chave(db):
+    """Índice da compactação por chave do outbox (último evento de cada chave)"""
+    db.execute_sql(
+        'CREATE INDEX IF NOT EXISTS "idx_outbox_eventos_tipo_chave" '
+        'ON "outbox_eventos" ("tipo", "chave", "id")'
+    )
+
+
+def _contadores_escrita(db):
+    """
+    Contadores de escrita por tabela para o cache de consultas
+
+    Cada INSERT/UPDATE/DELETE nas tabelas abaixo incrementa a linha da tabela
+    em ``cache_versoes``, no mesmo commit - vale para escritas de qualquer
+    processo ou terminal que use o arquivo (src/database/cache.py).
+    """
+    for tabela in ('produtos', 'vendas', 'itens_venda', 'transacoes',
+                   'fechamento_dia', 'historico_precos'):
+        db.execute_sql(
+            'INSERT OR IGNORE INTO "cache_versoes" ("tabela", "versao") VALUES (?, 0)',
+            (tabela,)
+        )
+        for operacao in ('INSERT', 'UPDATE', 'DELETE'):
+            db.execute_sql(
+                f'CREATE TRIGGER IF NOT EXISTS "trg_cache_{tabela}_{operacao.lower()}" '
+                f'AFTER {operacao} ON "{tabela}" BEGIN '
+                f'UPDATE "cache_versoes" SET "versao" = "versao" + 1 '
+                f"WHERE \"tabela\" = '{tabela}'; END"
+            )
+
+
+# (versão, descrição, função) - sempre em ordem crescente de versão
+MIGRACOES: List[Tuple[int, str, Callable]] = [
+    (1, "Redesenho de índices por consulta", _redesenhar_indices),
+    (2, "Índice parcial das mudanças de sincronização pendentes", _indice_mudancas_pendentes),
+    (3, "Índice de compactação do outbox por chave", _indice_outbox_chave),
+    (4, "Contadores de escrita por tabela (cache de consultas)", _contadores_escrita),
+]
+
+
+def _criar_tabela_versao(db):
+    db.execute_sql(
+        'CREATE TABLE IF NOT EXISTS "schema_versao" ('
+        '"versao" INTEGER NOT NULL PRIMARY KEY, '
+        '"descricao" VARCHAR(200) NOT NULL, '
+        '"aplicada_em" DATETIME NOT NULL)'
+    )
+
+
+def versao_atual(db) -> int:
+    """Maior versão aplicada (0 em banco novo)"""
+    _criar_tabela_versao(db)
+    linha = db.execute_sql('SELECT MAX("versao") FROM "schema_versao"').fetchone()
+    return linha[0] or 0
+
+
+def pendentes(db) -> List[Tuple[int, str, Callable]]:
+    """Migrações ainda não aplicadas, em ordem"""
+    atual = versao_atual(db)
+    return [m for m in MIGRACOES if m[0] > atual]
+
+
+def aplicar_migracoes(db) -> int:
+    """
+    Aplica as migrações pendentes, cada uma em sua transação
+
+    Se uma falhar, sua transação é desfeita e as seguintes não rodam; as
+    anteriores continuam registradas.
+
+    Returns:
+        int: Quantidade de migrações aplicadas
+    """
+    aplicadas = 0
+
+    for versao, descricao, migracao in pendentes(db):
+        try:
+            with db.atomic():
+                migracao(db)
+                db.execute_sql(
+                    'INSERT INTO "schema_versao" ("versao", "descricao", "aplicada_em") '
+                    'VALUES (?, ?, ?)',
+                    (versao, descricao, datetime.now())
+                )
+        except Exception as e:
+            log_error(f"Erro na migração {versao} ({descricao}): {str(e)}", exc_info=True)
+            raise
+
+        log_info(f"Migração {versao} aplicada: {descricao}")
+        aplicadas += 1
+
+    return aplicadas
+
+
+if __name__ == '__main__':
+    import argparse
+    from src.database import init_db, get_db
+
+    parser = argparse.ArgumentParser(description="Migrações do esquema do banco")
+    parser.add_argument('--status', action='store_true',
+                        help="Só mostra a versão atual e as pendentes")
+    args = parser.parse_args()
+
+    if args.status:
+        banco = get_db()
+        print(f"Versão atual: {versao_atual(banco)}")
+        for versao, descricao, _ in pendentes(banco):
+            print(f"  pendente: {versao} - {descricao}")
+    else:
+        init_db()
+        print(f"Versão atual: {versao_atual(get_db())}")
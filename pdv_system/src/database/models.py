@@ -2,25 +2,40 @@
 Modelos de banco de dados usando Peewee ORM
 """
 from peewee import (
-    Model, CharField, DecimalField, IntegerField, 
-    DateTimeField, ForeignKeyField
+    Model, AutoField, CharField, DecimalField, IntegerField, 
+    DateTimeField, ForeignKeyField, TextField, NodeList, SQL
 )
 from datetime import datetime
-from src.database.connection import get_db
+from src.database.connection import db
 
-db = get_db()
+
+class AutoIncrementField(AutoField):
+    """
+    Chave ``INTEGER PRIMARY KEY AUTOINCREMENT``: o SQLite nunca reutiliza um
+    id, nem depois de apagar as linhas mais recentes (o mesmo campo do
+    playhouse.sqlite_ext, sem importar o módulo inteiro)
+    """
+    def ddl(self, ctx):
+        return NodeList((super().ddl(ctx), SQL('AUTOINCREMENT')))
 
 
 class BaseModel(Model):
-    """Modelo base para todas as tabelas"""
+    """
+    Modelo base para todas as tabelas
+
+    Os índices secundários das tabelas principais são criados e evoluídos pelas
+    migrações (src/database/migrations.py); aqui ficam apenas as restrições
+    UNIQUE. Declarar um índice aqui que uma migração removeu faria
+    create_tables() recriá-lo a cada inicialização.
+    """
     class Meta:
         database = db
 
 
 class Produto(BaseModel):
     """Modelo de Produtos - CRUD Completo"""
-    nome = CharField(max_length=200, unique=True, index=True)
-    codigo = CharField(max_length=50, unique=True, index=True)
+    nome = CharField(max_length=200, unique=True)
+    codigo = CharField(max_length=50, unique=True)
     preco_custo = DecimalField(max_digits=10, decimal_places=2, default=0.00)
     preco_venda = DecimalField(max_digits=10, decimal_places=2)
     estoque = IntegerField(default=0)
@@ -31,11 +46,6 @@ class Produto(BaseModel):
 
     class Meta:
         table_name = 'produtos'
-        indexes = (
-            (('codigo',), False),
-            (('nome',), False),
-            (('ativo',), False),
-        )
 
     def __str__(self):
         return f"{self.codigo} - {self.nome}"
@@ -50,7 +60,7 @@ class Produto(BaseModel):
 class Venda(BaseModel):
     """Modelo de Vendas"""
     numero = IntegerField(unique=True)  # ID da venda para rastreamento
-    data_hora = DateTimeField(default=datetime.now, index=True)
+    data_hora = DateTimeField(default=datetime.now)
     total = DecimalField(max_digits=10, decimal_places=2, default=0.00)
     desconto = DecimalField(max_digits=10, decimal_places=2, default=0.00)
     valor_pago = DecimalField(max_digits=10, decimal_places=2, default=0.00)
@@ -61,10 +71,6 @@ class Venda(BaseModel):
 
     class Meta:
         table_name = 'vendas'
-        indexes = (
-            (('data_hora',), False),
-            (('numero',), True),
-        )
 
     def __str__(self):
         return f"Venda #{self.numero} - {self.data_hora.strftime('%d/%m/%Y %H:%M')}"
@@ -72,7 +78,7 @@ class Venda(BaseModel):
 
 class ItemVenda(BaseModel):
     """Modelo de Itens de Venda (Carrinho)"""
-    venda = ForeignKeyField(Venda, backref='itens')
+    venda = ForeignKeyField(Venda, backref='itens', index=False)  # ver migração 1
     produto = ForeignKeyField(Produto, backref='itens_venda')
     quantidade = IntegerField()
     preco_unitario = DecimalField(max_digits=10, decimal_places=2)
@@ -80,10 +86,6 @@ class ItemVenda(BaseModel):
 
     class Meta:
         table_name = 'itens_venda'
-        indexes = (
-            (('venda',), False),
-            (('produto',), False),
-        )
 
     def __str__(self):
         return f"{self.produto.codigo} x {self.quantidade}"
@@ -107,18 +109,13 @@ class Transacao(BaseModel):
     categoria = CharField(max_length=20, choices=CATEGORIA_CHOICES)
     descricao = CharField(max_length=300)
     valor = DecimalField(max_digits=10, decimal_places=2)
-    data_transacao = DateTimeField(index=True)
+    data_transacao = DateTimeField()
     data_criacao = DateTimeField(default=datetime.now)
     venda = ForeignKeyField(Venda, null=True, backref='transacoes')
     observacoes = CharField(max_length=500, null=True)
 
     class Meta:
         table_name = 'transacoes'
-        indexes = (
-            (('data_transacao',), False),
-            (('tipo',), False),
-            (('categoria',), False),
-        )
 
     def __str__(self):
         return f"{self.tipo} - {self.categoria}: R$ {float(self.valor):.2f}"
@@ -126,7 +123,7 @@ class Transacao(BaseModel):
 
 class FechamentoDia(BaseModel):
     """Modelo de Fechamento Diário"""
-    data = DateTimeField(unique=True, index=True)
+    data = DateTimeField(unique=True)
     total_vendas = DecimalField(max_digits=10, decimal_places=2, default=0.00)
     total_despesas = DecimalField(max_digits=10, decimal_places=2, default=0.00)
     total_entradas = DecimalField(max_digits=10, decimal_places=2, default=0.00)
@@ -137,9 +134,171 @@ class FechamentoDia(BaseModel):
 
     class Meta:
         table_name = 'fechamento_dia'
+
+    def __str__(self):
+        return f"Fechamento {self.data.strftime('%d/%m/%Y')}"
+
+
+class HistoricoPreco(BaseModel):
+    """Modelo de Histórico de Preços (auditoria de reajustes)"""
+    produto = ForeignKeyField(Produto, backref='historico_precos')
+    preco_anterior = DecimalField(max_digits=10, decimal_places=2)
+    preco_novo = DecimalField(max_digits=10, decimal_places=2)
+    regra = CharField(max_length=300)  # Descrição da regra aplicada
+    lote = CharField(max_length=40)  # Identifica a execução do reajuste
+    criado_em = DateTimeField(default=datetime.now)
+
+    class Meta:
+        table_name = 'historico_precos'
         indexes = (
-            (('data',), True),
+            (('produto', 'criado_em'), False),
+            (('lote',), False),
         )
 
     def __str__(self):
-        return f"Fechamento {self.data.strftime('%d/%m/%Y')}"
+        return f"{self.produto_id}: {self.preco_anterior} -> {self.preco_novo}"
+
+
+class ArquivoMensal(BaseModel):
+    """Modelo de Arquivo Mensal (meses movidos para data/arquivo)"""
+    mes = CharField(max_length=7, unique=True)  # AAAA-MM
+    caminho = CharField(max_length=300)
+    quantidade_vendas = IntegerField(default=0)
+    quantidade_itens = IntegerField(default=0)
+    quantidade_transacoes = IntegerField(default=0)
+    arquivado_em = DateTimeField(default=datetime.now)
+
+    class Meta:
+        table_name = 'arquivos_mensais'
+
+    @property
+    def ano_mes(self):
+        ano, mes = self.mes.split('-')
+        return int(ano), int(mes)
+
+    def __str__(self):
+        return f"Arquivo {self.mes} ({self.quantidade_vendas} vendas)"
+
+
+class MudancaSync(BaseModel):
+    """Modelo do Registro Local de Mudanças a enviar ao nó central (src/sync)"""
+    tipo = CharField(max_length=20)  # venda, estoque
+    dados = TextField()  # JSON
+    criado_em = DateTimeField(default=datetime.now)
+    enviado_em = DateTimeField(null=True)  # índice parcial na migração 2
+
+    class Meta:
+        table_name = 'sync_mudancas'
+
+    def __str__(self):
+        return f"Mudança {self.id} ({self.tipo})"
+
+
+class EstadoSync(BaseModel):
+    """Modelo de Estado da Sincronização (versão do catálogo recebida etc.)"""
+    chave = CharField(max_length=50, primary_key=True)
+    valor = CharField(max_length=200)
+
+    class Meta:
+        table_name = 'sync_estado'
+
+
+class PosicaoDiario(BaseModel):
+    """Modelo da Posição Aplicada de um diário append-only (src/database/diario.py)"""
+    nome = CharField(max_length=50, primary_key=True)
+    posicao = IntegerField(default=0)  # bytes do arquivo já aplicados no banco
+    atualizado_em = DateTimeField(default=datetime.now)
+
+    class Meta:
+        table_name = 'posicoes_diario'
+
+
+class EventoOutbox(BaseModel):
+    """
+    Modelo de Evento do Outbox (feed de mudanças para integrações)
+
+    O id é o offset do evento: crescente e nunca reutilizado, mesmo depois da
+    compactação (src/models/outbox_repository.py).
+    """
+    id = AutoIncrementField()
+    tipo = CharField(max_length=40)  # venda.finalizada, transacao.registrada...
+    chave = CharField(max_length=60, null=True)  # índice (tipo, chave) na migração 3
+    dados = TextField()  # JSON
+    criado_em = DateTimeField(default=datetime.now)
+
+    class Meta:
+        table_name = 'outbox_eventos'
+
+    def __str__(self):
+        return f"Evento {self.id} ({self.tipo})"
+
+
+class ConsumidorOutbox(BaseModel):
+    """Modelo de Consumidor do Outbox (último offset confirmado)"""
+    nome = CharField(max_length=60, primary_key=True)
+    posicao = IntegerField(default=0)
+    atualizado_em = DateTimeField(default=datetime.now)
+
+    class Meta:
+        table_name = 'outbox_consumidores'
+
+
+class VersaoTabela(BaseModel):
+    """Modelo do Contador de Escritas por tabela (gatilhos da migração 4)"""
+    tabela = CharField(max_length=50, primary_key=True)
+    versao = IntegerField(default=0)
+
+    class Meta:
+        table_name = 'cache_versoes'
+
+
+class ReservaEstoque(BaseModel):
+    """Modelo de Reserva de Estoque (item de um carrinho aberto, até ``expira_em``)"""
+    venda = ForeignKeyField(Venda, backref='reservas', on_delete='CASCADE', index=False)
+    produto = ForeignKeyField(Produto, backref='reservas', on_delete='CASCADE', index=False)
+    quantidade = IntegerField()
+    expira_em = DateTimeField()
+
+    class Meta:
+        table_name = 'reservas_estoque'
+        indexes = (
+            (('venda', 'produto'), True),
+            # Soma das reservas ativas de um produto coberta pelo índice
+            (('produto', 'expira_em', 'quantidade'), False),
+        )
+
+
+class EntradaMercadoria(BaseModel):
+    """Modelo de Entrada de Mercadoria (recebimento de uma entrega de fornecedor)"""
+    documento = CharField(max_length=60)  # Nº da nota / romaneio
+    fornecedor = CharField(max_length=200, default='')
+    data_hora = DateTimeField(default=datetime.now)
+    quantidade_itens = IntegerField(default=0)  # Linhas (produtos distintos)
+    unidades = IntegerField(default=0)
+    total_custo = DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    transacao = ForeignKeyField(Transacao, null=True, backref='entradas', on_delete='SET NULL')
+    observacoes = CharField(max_length=500, null=True)
+
+    class Meta:
+        table_name = 'entradas_mercadoria'
+        indexes = (
+            # A mesma nota do mesmo fornecedor não entra duas vezes no estoque
+            (('fornecedor', 'documento'), True),
+        )
+
+    def __str__(self):
+        return f"Entrada {self.documento} - {self.fornecedor}"
+
+
+class ItemEntradaMercadoria(BaseModel):
+    """Modelo de Item de Entrada de Mercadoria"""
+    entrada = ForeignKeyField(EntradaMercadoria, backref='itens', on_delete='CASCADE', index=False)
+    produto = ForeignKeyField(Produto, backref='entradas')
+    quantidade = IntegerField()
+    preco_custo = DecimalField(max_digits=10, decimal_places=2, null=True)  # Novo custo, se informado
+
+    class Meta:
+        table_name = 'itens_entrada_mercadoria'
+        indexes = (
+            (('entrada', 'produto'), True),
+        )
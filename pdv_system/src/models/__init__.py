@@ -2,7 +2,10 @@
 Módulo de modelos e repositórios
 """
 from src.database.models import (
-    Produto, Venda, ItemVenda, Transacao, FechamentoDia
+    Produto, Venda, ItemVenda, Transacao, FechamentoDia, HistoricoPreco,
+    ArquivoMensal, MudancaSync, EstadoSync, PosicaoDiario, EventoOutbox,
+    ConsumidorOutbox, VersaoTabela, ReservaEstoque, EntradaMercadoria,
+    ItemEntradaMercadoria
 )
 
 __all__ = [
@@ -11,4 +14,15 @@ __all__ = [
     "ItemVenda",
     "Transacao",
     "FechamentoDia",
+    "HistoricoPreco",
+    "ArquivoMensal",
+    "MudancaSync",
+    "EstadoSync",
+    "PosicaoDiario",
+    "EventoOutbox",
+    "ConsumidorOutbox",
+    "VersaoTabela",
+    "ReservaEstoque",
+    "EntradaMercadoria",
+    "ItemEntradaMercadoria",
 ]
@@ -0,0 +1,340 @@
+"""
+Repositório de Arquivo - Meses fechados em arquivos SQLite anexados
+"""
+from src.database.models import Venda, ItemVenda, Transacao, ArquivoMensal
+from src.database.connection import get_db
+from src.database.arquivo import (
+    LIMITE_ANEXOS, anexados, anexado_para_escrita, caminho_arquivo,
+    colunas_tabela, esquema_arquivo, nome_mes
+)
+from calendar import monthrange
+from datetime import datetime, date
+from typing import Dict, List, Optional, Tuple
+
+
+class ArquivoRepository:
+    """Move meses fechados para arquivos mensais e consulta através deles"""
+
+    @staticmethod
+    def meses_arquivados(inicio: datetime, fim: datetime) -> List[Tuple[int, int]]:
+        """Meses arquivados que o intervalo alcança, em ordem"""
+        return [
+            a.ano_mes for a in
+            ArquivoMensal.select(ArquivoMensal.mes)
+            .where(
+                (ArquivoMensal.mes >= nome_mes(inicio.year, inicio.month)) &
+                (ArquivoMensal.mes <= nome_mes(fim.year, fim.month))
+            )
+            .order_by(ArquivoMensal.mes)
+        ]
+
+    @staticmethod
+    def consultar(modelo, coluna_data: str, inicio: datetime, fim: datetime,
+                  filtro_sql: str = '', parametros: tuple = (),
+                  ordenar_por: str = None, decrescente: bool = False,
+                  extras: List[str] = None, colunas: List[str] = None) -> list:
+        """
+        Consulta ``modelo`` no banco principal e nos arquivos dos meses do intervalo
+
+        As tabelas são unidas com UNION ALL (uma "view" montada por consulta,
+        já que o conjunto de arquivos anexados muda conforme o intervalo).
+
+        Args:
+            modelo: Venda, ItemVenda ou Transacao
+            coluna_data: Coluna que define o intervalo (ex.: 'data_hora')
+            filtro_sql: Condição extra sobre o alias ``t`` (ex.: 't."processada" = 1')
+            parametros: Parâmetros de ``filtro_sql``
+            ordenar_por: Coluna de ordenação (padrão: coluna_data)
+            extras: Colunas adicionais; ``{esquema}`` é trocado pelo esquema
+                    de cada parte (ex.: contagem de itens no mesmo arquivo)
+            colunas: Só estas colunas, devolvidas como tuplas do cursor (sem
+                     instanciar ``modelo``; ver src/models/leitura.py)
+
+        Returns:
+            list: Instâncias de ``modelo`` (com os extras como atributos) ou
+            tuplas, se ``colunas`` foi informado
+        """
+        tabela = modelo._meta.table_name
+        linhas = colunas is not None
+        if not linhas:
+            colunas = [f.column_name for f in modelo._meta.sorted_fields]
+        ordenar_por = ordenar_por or coluna_data
+        meses = ArquivoRepository.meses_arquivados(inicio, fim)
+
+        grupos = [meses[i:i + LIMITE_ANEXOS] for i in range(0, len(meses), LIMITE_ANEXOS)]
+        resultados = []
+
+        for indice, grupo in enumerate(grupos or [[]]):
+            with anexados(grupo) as esquemas:
+                if indice == 0:
+                    esquemas = ['main'] + esquemas
+
+                partes, valores = [], []
+                for esquema in esquemas:
+                    existentes = set(colunas_tabela(tabela, esquema))
+                    selecao = [
+                        f't."{c}"' if c in existentes else f'NULL AS "{c}"'
+                        for c in colunas
+                    ]
+                    selecao += [e.format(esquema=esquema) for e in (extras or [])]
+
+                    sql = (f'SELECT {", ".join(selecao)} FROM "{esquema}"."{tabela}" AS t '
+                           f'WHERE t."{coluna_data}" BETWEEN ? AND ?')
+                    if filtro_sql:
+                        sql += f' AND {filtro_sql}'
+                    partes.append(sql)
+                    valores += [str(inicio), str(fim), *parametros]
+
+                sql = (' UNION ALL '.join(partes) +
+                       f' ORDER BY "{ordenar_por}" {"DESC" if decrescente else "ASC"}')
+                if linhas:
+                    resultados.extend(get_db().execute_sql(sql, valores).fetchall())
+                else:
+                    resultados.extend(modelo.raw(sql, *valores))
+
+        if len(grupos) > 1:
+            if linhas:
+                posicao = colunas.index(ordenar_por)
+                resultados.sort(key=lambda r: r[posicao], reverse=decrescente)
+            else:
+                resultados.sort(key=lambda r: getattr(r, ordenar_por), reverse=decrescente)
+
+        return resultados
+
+    @staticmethod
+    def intervalo_mes(ano: int, mes: int) -> Tuple[datetime, datetime]:
+        """Primeiro e último instante do mês"""
+        ultimo_dia = monthrange(ano, mes)[1]
+        return (datetime.combine(date(ano, mes, 1), datetime.min.time()),
+                datetime.combine(date(ano, mes, ultimo_dia), datetime.max.time()))
+
+    @staticmethod
+    def meses_com_movimento() -> List[Tuple[int, int]]:
+        """Meses que ainda têm vendas finalizadas ou transações no banco principal"""
+        cursor = get_db().execute_sql(
+            "SELECT strftime('%Y-%m', data_hora) FROM vendas WHERE processada = 1 "
+            "UNION "
+            "SELECT strftime('%Y-%m', data_transacao) FROM transacoes "
+            "ORDER BY 1"
+        )
+        return [tuple(int(p) for p in linha[0].split('-')) for linha in cursor if linha[0]]
+
+    @staticmethod
+    def dias_sem_fechamento(ano: int, mes: int) -> List[date]:
+        """Dias do mês com movimento e sem FechamentoDia"""
+        inicio, fim = ArquivoRepository.intervalo_mes(ano, mes)
+        cursor = get_db().execute_sql(
+            "SELECT date(data_hora) AS dia FROM vendas "
+            "WHERE processada = 1 AND data_hora BETWEEN ? AND ? "
+            "UNION "
+            "SELECT date(data_transacao) FROM transacoes WHERE data_transacao BETWEEN ? AND ? "
+            "EXCEPT "
+            "SELECT date(data) FROM fechamento_dia WHERE data BETWEEN ? AND ? "
+            "ORDER BY 1",
+            (str(inicio), str(fim)) * 3
+        )
+        return [date.fromisoformat(linha[0]) for linha in cursor]
+
+    @staticmethod
+    def arquivar_mes(ano: int, mes: int) -> Dict:
+        """
+        Move as vendas finalizadas, itens e transações do mês para o arquivo
+
+        Feito em duas transações: a cópia (INSERT OR REPLACE, idempotente) e,
+        depois de conferidas as contagens, a remoção do banco principal. Em WAL
+        o SQLite não garante atomicidade entre bancos anexados; se o processo
+        cair entre as duas etapas, basta arquivar o mês de novo.
+
+        Vendas em andamento (processada = 0) ficam no banco principal, assim
+        como as que têm transação de outro mês ainda não arquivado.
+
+        Returns:
+            dict: {'mes', 'vendas', 'itens', 'transacoes'} movidos agora
+        """
+        inicio, fim = ArquivoRepository.intervalo_mes(ano, mes)
+        periodo = (str(inicio), str(fim))
+        db = get_db()
+
+        # Conjunto de vendas movidas, fixado uma vez e usado na cópia, na
+        # conferência e na remoção das três tabelas. Uma venda com transação
+        # de outro mês ainda no banco principal fica até essa transação ser
+        # arquivada: apagá-la antes violaria a chave estrangeira, e as
+        # consultas por período continuam a encontrá-la em ``main``.
+        selecao_vendas = (
+            'SELECT v.id FROM main.vendas AS v '
+            'WHERE v.processada = 1 AND v.data_hora BETWEEN ? AND ? '
+            'AND NOT EXISTS (SELECT 1 FROM main.transacoes AS t WHERE t.venda_id = v.id '
+            'AND t.data_transacao NOT BETWEEN ? AND ?)'
+        )
+        ids_vendas = 'SELECT id FROM temp.arquivo_vendas'
+
+        consultas = {
+            'vendas': (f'FROM main.vendas WHERE id IN ({ids_vendas})', ()),
+            'itens_venda': (f'FROM main.itens_venda WHERE venda_id IN ({ids_vendas})', ()),
+            'transacoes': ('FROM main.transacoes WHERE data_transacao BETWEEN ? AND ?', periodo),
+        }
+
+        ArquivoRepository._verificar_ids_posteriores(inicio, fim)
+
+        db.execute_sql('CREATE TEMP TABLE IF NOT EXISTS arquivo_vendas (id INTEGER PRIMARY KEY)')
+        try:
+            with anexado_para_escrita(ano, mes) as esquema:
+                copiados = {}
+                with db.atomic():
+                    db.execute_sql('DELETE FROM temp.arquivo_vendas')
+                    db.execute_sql(f'INSERT INTO temp.arquivo_vendas {selecao_vendas}',
+                                   periodo * 2)
+                    for tabela, (origem, valores) in consultas.items():
+                        colunas = ', '.join(f'"{c}"' for c in colunas_tabela(tabela))
+                        db.execute_sql(
+                            f'INSERT OR REPLACE INTO "{esquema}"."{tabela}" ({colunas}) '
+                            f'SELECT {colunas} {origem}',
+                            valores
+                        )
+                        copiados[tabela] = db.execute_sql(
+                            f'SELECT COUNT(*) {origem}', valores
+                        ).fetchone()[0]
+
+                for tabela, (origem, valores) in consultas.items():
+                    no_arquivo = db.execute_sql(
+                        f'SELECT COUNT(*) FROM "{esquema}"."{tabela}" '
+                        f'WHERE id IN (SELECT id {origem})',
+                        valores
+                    ).fetchone()[0]
+                    if no_arquivo != copiados[tabela]:
+                        raise ValueError(
+                            f"Cópia de {tabela} incompleta no arquivo {nome_mes(ano, mes)} "
+                            f"({no_arquivo} de {copiados[tabela]})"
+                        )
+
+                with db.atomic():
+                    # Ordem respeita as chaves estrangeiras para vendas
+                    for tabela in ('itens_venda', 'transacoes', 'vendas'):
+                        origem, valores = consultas[tabela]
+                        db.execute_sql(f'DELETE {origem}', valores)
+
+                    totais = {
+                        tabela: db.execute_sql(
+                            f'SELECT COUNT(*) FROM "{esquema}"."{tabela}"'
+                        ).fetchone()[0]
+                        for tabela in consultas
+                    }
+
+                    (ArquivoMensal
+                     .insert(
+                         mes=nome_mes(ano, mes),
+                         caminho=str(caminho_arquivo(ano, mes)),
+                         quantidade_vendas=totais['vendas'],
+                         quantidade_itens=totais['itens_venda'],
+                         quantidade_transacoes=totais['transacoes'],
+                         arquivado_em=datetime.now(),
+                     )
+                     .on_conflict(
+                         conflict_target=[ArquivoMensal.mes],
+                         preserve=[
+                             ArquivoMensal.caminho, ArquivoMensal.quantidade_vendas,
+                             ArquivoMensal.quantidade_itens,
+                             ArquivoMensal.quantidade_transacoes,
+                             ArquivoMensal.arquivado_em,
+                         ]
+                     )
+                     .execute())
+        finally:
+            db.execute_sql('DROP TABLE IF EXISTS temp.arquivo_vendas')
+
+        return {
+            'mes': nome_mes(ano, mes),
+            'vendas': copiados['vendas'],
+            'itens': copiados['itens_venda'],
+            'transacoes': copiados['transacoes'],
+        }
+
+    @staticmethod
+    def mes_da_venda(venda_id: int) -> Optional[Tuple[int, int]]:
+        """Mês arquivado que contém a venda (None se não está em nenhum arquivo)"""
+        meses = [a.ano_mes for a in
+                 ArquivoMensal.select(ArquivoMensal.mes).order_by(ArquivoMensal.mes.desc())]
+
+        for i in range(0, len(meses), LIMITE_ANEXOS):
+            with anexados(meses[i:i + LIMITE_ANEXOS]) as esquemas:
+                if not esquemas:
+                    continue
+                sql = ' UNION ALL '.join(
+                    f"SELECT '{esquema}' FROM \"{esquema}\".\"vendas\" WHERE id = ?"
+                    for esquema in esquemas
+                )
+                linha = get_db().execute_sql(
+                    f'SELECT * FROM ({sql}) LIMIT 1', (venda_id,) * len(esquemas)
+                ).fetchone()
+            if linha:
+                return next(m for m in meses[i:i + LIMITE_ANEXOS]
+                            if esquema_arquivo(*m) == linha[0])
+        return None
+
+    @staticmethod
+    def obter_venda_arquivada(venda_id: int):
+        """
+        Venda e itens (com o produto atual) de um arquivo mensal
+
+        Returns:
+            tuple: (Venda, [ItemVenda com ``codigo_produto``, ``nome_produto`` e
+            ``estoque_produto``]) ou None se a venda não está arquivada
+        """
+        mes = ArquivoRepository.mes_da_venda(venda_id)
+        if mes is None:
+            return None
+
+        with anexados([mes]) as esquemas:
+            esquema = esquemas[0]
+            venda = list(Venda.raw(f'SELECT * FROM "{esquema}"."vendas" WHERE id = ?', venda_id))
+            itens = list(ItemVenda.raw(
+                f'SELECT i.*, p.codigo AS codigo_produto, p.nome AS nome_produto, '
+                f'p.estoque AS estoque_produto '
+                f'FROM "{esquema}"."itens_venda" AS i '
+                f'JOIN main.produtos AS p ON p.id = i.produto_id '
+                f'WHERE i.venda_id = ? ORDER BY i.id',
+                venda_id
+            ))
+        return (venda[0], itens) if venda else None
+
+    @staticmethod
+    def _verificar_ids_posteriores(inicio: datetime, fim: datetime):
+        """
+        Garante que restam linhas mais novas no banco principal
+
+        Sem AUTOINCREMENT o SQLite reaproveita o maior id apagado; se o mês
+        arquivado contivesse as linhas mais recentes, ids (e números de venda)
+        se repetiriam entre o banco principal e o arquivo.
+        """
+        vendas_mes = Venda.select(Venda.id).where(
+            (Venda.processada == 1) & Venda.data_hora.between(inicio, fim)
+        )
+        maior_venda = vendas_mes.order_by(Venda.id.desc()).scalar()
+        maior_item = (ItemVenda.select(ItemVenda.id)
+                      .where(ItemVenda.venda.in_(vendas_mes))
+                      .order_by(ItemVenda.id.desc()).scalar())
+        maior_transacao = (Transacao.select(Transacao.id)
+                           .where(Transacao.data_transacao.between(inicio, fim))
+                           .order_by(Transacao.id.desc()).scalar())
+
+        vendas_finalizadas = Venda.select(Venda.id).where(Venda.processada == 1)
+        verificacoes = [
+            (maior_venda, vendas_finalizadas.where(Venda.id > (maior_venda or 0))),
+            (maior_item, ItemVenda.select().where(
+                (ItemVenda.id > (maior_item or 0)) &
+                ItemVenda.venda.in_(vendas_finalizadas)
+            )),
+            (maior_transacao, Transacao.select().where(Transacao.id > (maior_transacao or 0))),
+        ]
+
+        for maior, posteriores in verificacoes:
+            if maior is not None and not posteriores.exists():
+                raise ValueError(
+                    "O mês contém as vendas/transações mais recentes do banco; "
+                    "arquive-o depois que houver movimento posterior"
+                )
+
+    @staticmethod
+    def listar_arquivos() -> List[ArquivoMensal]:
+        """Lista os meses arquivados"""
+        return list(ArquivoMensal.select().order_by(ArquivoMensal.mes))
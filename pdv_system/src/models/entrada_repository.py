@@ -0,0 +1,191 @@
+"""
+Repositório de Entradas de Mercadoria - Recebimento de entregas em lote
+
+Uma entrega de fornecedor (cabeçalho + linhas) entra numa única transação,
+sem ``ajustar_estoque`` por produto:
+
+  - as linhas vão para a tabela temporária ``temp.entrada_linhas`` (códigos
+    repetidos são somados; o custo informado por último prevalece)
+  - itens, estoque e custo saem dela por junção com ``produtos``: um
+    INSERT ... SELECT dos itens e um único UPDATE de estoque e preço de custo
+  - os eventos do outbox também são INSERT ... SELECT; a despesa com o
+    fornecedor vai para ``transacoes`` quando a entrega tem custo
+
+O UPDATE usa subconsultas correlacionadas pela chave primária da tabela
+temporária (e não ``UPDATE ... FROM``, que exige SQLite 3.33).
+"""
+from src.database.models import EntradaMercadoria, ItemEntradaMercadoria, Produto
+from src.database.connection import get_db
+from src.models.financeiro_repository import TransacaoRepository
+from src.models.outbox_repository import OutboxRepository
+from src.sync.registro import registrar_ajuste_estoque, sync_ativo
+from peewee import IntegrityError, Table, chunked
+from decimal import Decimal
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Linha de entrega: (código, quantidade, novo preço de custo ou None)
+LinhaEntrada = Tuple[str, int, Optional[Decimal]]
+
+_LINHAS = Table('entrada_linhas', ('codigo', 'quantidade', 'preco_custo'), schema='temp')
+
+_JUNCAO = 'FROM "temp"."entrada_linhas" AS l JOIN "produtos" AS p ON p."codigo" = l."codigo"'
+
+
+class EntradaMercadoriaRepository:
+    """Registra entregas de fornecedor aplicando todas as linhas de uma vez"""
+
+    @staticmethod
+    def registrar(documento: str, linhas: List[LinhaEntrada], fornecedor: str = '',
+                  lancar_despesa: bool = True, observacoes: str = None,
+                  tamanho_insert: int = 500) -> EntradaMercadoria:
+        """
+        Registra a entrada, soma o estoque e atualiza o custo numa transação
+
+        Args:
+            lancar_despesa: Lança o custo total da entrega como despesa
+
+        Raises:
+            ValueError: Códigos não cadastrados ou nota já registrada
+        """
+        if not linhas:
+            raise ValueError("Entrada sem itens")
+
+        agora = datetime.now()
+        db = get_db()
+        with db.atomic('IMMEDIATE'):  # lê e depois grava
+            EntradaMercadoriaRepository._carregar_linhas(db, linhas, tamanho_insert)
+
+            faltando = [codigo for (codigo,) in db.execute_sql(
+                'SELECT l."codigo" FROM "temp"."entrada_linhas" AS l '
+                'LEFT JOIN "produtos" AS p ON p."codigo" = l."codigo" '
+                'WHERE p."id" IS NULL ORDER BY l."codigo"'
+            )]
+            if faltando:
+                exemplos = ', '.join(faltando[:10])
+                mais = f" e mais {len(faltando) - 10}" if len(faltando) > 10 else ''
+                raise ValueError(f"Produtos não cadastrados: {exemplos}{mais}")
+
+            # Custo pelo preço informado ou, sem ele, pelo custo atual do produto
+            itens, unidades, total = db.execute_sql(
+                'SELECT COUNT(*), SUM(l."quantidade"), '
+                'ROUND(SUM(l."quantidade" * COALESCE(l."preco_custo", p."preco_custo")), 2) '
+                + _JUNCAO
+            ).fetchone()
+            total = Decimal(str(total or 0)).quantize(Decimal('0.01'))
+
+            try:
+                entrada = EntradaMercadoria.create(
+                    documento=documento,
+                    fornecedor=fornecedor or '',
+                    data_hora=agora,
+                    quantidade_itens=itens,
+                    unidades=unidades,
+                    total_custo=total,
+                    observacoes=observacoes
+                )
+            except IntegrityError as exc:
+                raise ValueError(f"Entrada {documento} já registrada para este fornecedor") from exc
+
+            db.execute_sql(
+                'INSERT INTO "itens_entrada_mercadoria" '
+                '("entrada_id", "produto_id", "quantidade", "preco_custo") '
+                'SELECT ?, p."id", l."quantidade", l."preco_custo" ' + _JUNCAO +
+                ' ORDER BY p."id"',
+                (entrada.id,)
+            )
+
+            db.execute_sql(
+                'UPDATE "produtos" SET '
+                '"estoque" = "estoque" + (SELECT l."quantidade" FROM "temp"."entrada_linhas" AS l '
+                'WHERE l."codigo" = "produtos"."codigo"), '
+                '"preco_custo" = COALESCE((SELECT l."preco_custo" FROM "temp"."entrada_linhas" AS l '
+                'WHERE l."codigo" = "produtos"."codigo"), "preco_custo"), '
+                '"atualizado_em" = ? '
+                'WHERE "codigo" IN (SELECT "codigo" FROM "temp"."entrada_linhas")',
+                (agora,)
+            )
+
+            EntradaMercadoriaRepository._publicar(db, agora)
+
+            if lancar_despesa and total > 0:
+                descricao = f"Entrada de mercadoria {documento}"
+                if fornecedor:
+                    descricao += f" - {fornecedor}"
+                entrada.transacao = TransacaoRepository.registrar_transacao(
+                    'SAIDA', 'DESPESA', descricao[:300], total, agora,
+                    observacoes=observacoes
+                )
+                entrada.save()
+
+            db.execute_sql('DELETE FROM "temp"."entrada_linhas"')
+        return entrada
+
+    @staticmethod
+    def _carregar_linhas(db, linhas: List[LinhaEntrada], tamanho_insert: int) -> None:
+        """Cria/limpa a tabela temporária desta conexão e grava as linhas"""
+        db.execute_sql(
+            'CREATE TEMP TABLE IF NOT EXISTS "entrada_linhas" ('
+            '"codigo" TEXT PRIMARY KEY, "quantidade" INTEGER NOT NULL, "preco_custo" NUMERIC)'
+        )
+        db.execute_sql('DELETE FROM "temp"."entrada_linhas"')
+
+        cursor = db.cursor()
+        for lote in chunked(linhas, tamanho_insert):
+            cursor.executemany(
+                'INSERT INTO "temp"."entrada_linhas" ("codigo", "quantidade", "preco_custo") '
+                'VALUES (?, ?, ?) ON CONFLICT ("codigo") DO UPDATE SET '
+                '"quantidade" = "quantidade" + excluded."quantidade", '
+                '"preco_custo" = COALESCE(excluded."preco_custo", "preco_custo")',
+                [(codigo, quantidade, None if custo is None else str(custo))
+                 for codigo, quantidade, custo in lote]
+            )
+
+    @staticmethod
+    def _publicar(db, agora: datetime) -> None:
+        """Outbox (``estoque.ajustado`` e, com custo novo, ``produto.alterado``) e sincronização"""
+        db.execute_sql(
+            'INSERT INTO "outbox_eventos" ("tipo", "chave", "dados", "criado_em") '
+            "SELECT 'estoque.ajustado', p.\"codigo\", "
+            "json_object('codigo', p.\"codigo\", 'delta', l.\"quantidade\", 'estoque', p.\"estoque\"), ? "
+            + _JUNCAO + ' ORDER BY p."id"',
+            (agora,)
+        )
+        OutboxRepository.publicar_produtos(Produto.codigo.in_(
+            _LINHAS.select(_LINHAS.codigo).where(_LINHAS.preco_custo.is_null(False))
+        ))
+
+        if sync_ativo():
+            for codigo, nome, preco_venda, quantidade in db.execute_sql(
+                    'SELECT p."codigo", p."nome", p."preco_venda", l."quantidade" ' + _JUNCAO):
+                produto = Produto(codigo=codigo, nome=nome, preco_venda=preco_venda)
+                registrar_ajuste_estoque(produto, quantidade)
+
+    @staticmethod
+    def obter(entrada_id: int) -> EntradaMercadoria:
+        """Obtém uma entrada pelo ID"""
+        try:
+            return EntradaMercadoria.get_by_id(entrada_id)
+        except EntradaMercadoria.DoesNotExist as exc:
+            raise ValueError(f"Entrada ID {entrada_id} não encontrada") from exc
+
+    @staticmethod
+    def listar_itens(entrada_id: int) -> List[Dict]:
+        """Itens de uma entrada com código e nome do produto"""
+        return list(
+            ItemEntradaMercadoria
+            .select(Produto.codigo, Produto.nome, ItemEntradaMercadoria.quantidade,
+                    ItemEntradaMercadoria.preco_custo)
+            .join(Produto)
+            .where(ItemEntradaMercadoria.entrada == entrada_id)
+            .order_by(Produto.codigo)
+            .dicts()
+        )
+
+    @staticmethod
+    def listar(limite: int = 50) -> List[EntradaMercadoria]:
+        """Entradas mais recentes primeiro"""
+        return list(EntradaMercadoria
+                    .select()
+                    .order_by(EntradaMercadoria.data_hora.desc(), EntradaMercadoria.id.desc())
+                    .limit(limite))
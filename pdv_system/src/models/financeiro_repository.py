@@ -2,6 +2,12 @@
 Repositório Financeiro - Transações e Fechamento
 """
 from src.database.models import Transacao, FechamentoDia, Venda
+from src.database.cache import em_cache
+from src.database.connection import get_db
+from src.models.arquivo_repository import ArquivoRepository
+from src.models.leitura import ler
+from src.models.outbox_repository import OutboxRepository
+from peewee import Case, chunked, fn
 from decimal import Decimal
 from datetime import datetime, date
 from typing import Dict
@@ -31,15 +37,19 @@ class TransacaoRepository:
         if valor <= 0:
             raise ValueError("Valor deve ser maior que zero")
         
-        transacao = Transacao.create(
-            tipo=tipo,
-            categoria=categoria,
-            descricao=descricao,
-            valor=valor,
-            data_transacao=data_transacao,
-            venda_id=venda_id,
-            observacoes=observacoes
-        )
+        with get_db().atomic():
+            transacao = Transacao.create(
+                tipo=tipo,
+                categoria=categoria,
+                descricao=descricao,
+                valor=valor,
+                data_transacao=data_transacao,
+                venda_id=venda_id,
+                observacoes=observacoes
+            )
+            OutboxRepository.publicar('transacao.registrada',
+                                      OutboxRepository.dados_transacao(transacao),
+                                      chave=str(transacao.id))
         return transacao
 
     @staticmethod
@@ -55,30 +65,39 @@ class TransacaoRepository:
         )
 
     @staticmethod
-    def listar_transacoes_dia(data_dia: date = None) -> list:
-        """Lista todas as transações de um dia"""
+    def listar_transacoes_dia(data_dia: date = None, leitura: type = None) -> list:
+        """Lista todas as transações de um dia (como ``leitura``, se informado)"""
         if data_dia is None:
             data_dia = date.today()
         
         inicio = datetime.combine(data_dia, datetime.min.time())
         fim = datetime.combine(data_dia, datetime.max.time())
-        
-        return list(
-            Transacao.select()
-            .where(
-                (Transacao.data_transacao >= inicio) &
-                (Transacao.data_transacao <= fim)
-            )
-            .order_by(Transacao.data_transacao.desc())
-        )
+
+        return TransacaoRepository._listar_intervalo(inicio, fim, leitura)
 
     @staticmethod
-    def listar_transacoes_periodo(data_inicio: date, data_fim: date) -> list:
-        """Lista transações de um período"""
+    def listar_transacoes_periodo(data_inicio: date, data_fim: date,
+                                  leitura: type = None) -> list:
+        """Lista transações de um período (inclui meses arquivados)"""
         inicio = datetime.combine(data_inicio, datetime.min.time())
         fim = datetime.combine(data_fim, datetime.max.time())
-        
-        return list(
+
+        return TransacaoRepository._listar_intervalo(inicio, fim, leitura)
+
+    @staticmethod
+    def _listar_intervalo(inicio: datetime, fim: datetime, leitura: type = None) -> list:
+        """Transações do intervalo, mais recentes primeiro"""
+        if ArquivoRepository.meses_arquivados(inicio, fim):
+            if leitura:
+                return [leitura(*linha) for linha in ArquivoRepository.consultar(
+                    Transacao, 'data_transacao', inicio, fim, decrescente=True,
+                    colunas=leitura.nomes_colunas()
+                )]
+            return ArquivoRepository.consultar(
+                Transacao, 'data_transacao', inicio, fim, decrescente=True
+            )
+
+        query = (
             Transacao.select()
             .where(
                 (Transacao.data_transacao >= inicio) &
@@ -86,13 +105,18 @@ class TransacaoRepository:
             )
             .order_by(Transacao.data_transacao.desc())
         )
+        return ler(query, leitura) if leitura else list(query)
 
     @staticmethod
     def obter_resumo_dia(data_dia: date = None) -> Dict:
         """Obtém um resumo financeiro do dia"""
         if data_dia is None:
             data_dia = date.today()
-        
+        return TransacaoRepository._resumo_dia(data_dia)
+
+    @staticmethod
+    @em_cache('transacoes', 'vendas')
+    def _resumo_dia(data_dia: date) -> Dict:
         transacoes = TransacaoRepository.listar_transacoes_dia(data_dia)
         
         total_entradas = sum(
@@ -120,6 +144,7 @@ class TransacaoRepository:
         }
 
     @staticmethod
+    @em_cache('transacoes')
     def obter_resumo_periodo(data_inicio: date, data_fim: date) -> Dict:
         """Obtém um resumo financeiro de um período"""
         transacoes = TransacaoRepository.listar_transacoes_periodo(data_inicio, data_fim)
@@ -192,6 +217,74 @@ class FechamentoDiaRepository:
         
         return fechamento
 
+    @staticmethod
+    def criar_fechamentos_periodo(data_inicio: date, data_fim: date) -> Dict:
+        """
+        Fecha de uma vez os dias do período com movimento e sem fechamento
+
+        Uma agregação GROUP BY date() por tabela (vendas e transações) em vez
+        de três consultas por dia, e os fechamentos inseridos em lote numa
+        única transação. Dias já fechados ficam como estão. Meses arquivados
+        já estão fechados (condição para arquivar), então só o banco
+        principal é lido.
+
+        Returns:
+            dict: {'criados': [date], 'ja_fechados': [date], 'sem_movimento': int}
+        """
+        if data_fim < data_inicio:
+            raise ValueError("Data final anterior à inicial")
+
+        inicio = str(datetime.combine(data_inicio, datetime.min.time()))
+        fim = str(datetime.combine(data_fim, datetime.max.time()))
+        db = get_db()
+
+        with db.atomic('IMMEDIATE'):  # lê e depois grava os fechamentos
+            vendas = {
+                dia: total for dia, total in db.execute_sql(
+                    "SELECT date(data_hora), SUM(total - desconto) FROM vendas "
+                    "WHERE processada = 1 AND data_hora BETWEEN ? AND ? GROUP BY 1",
+                    (inicio, fim)
+                )
+            }
+            transacoes = {
+                dia: (entradas, saidas, quantidade)
+                for dia, entradas, saidas, quantidade in db.execute_sql(
+                    "SELECT date(data_transacao), "
+                    "SUM(CASE WHEN tipo = 'ENTRADA' THEN valor ELSE 0 END), "
+                    "SUM(CASE WHEN tipo = 'SAIDA' THEN valor ELSE 0 END), "
+                    "COUNT(*) FROM transacoes "
+                    "WHERE data_transacao BETWEEN ? AND ? GROUP BY 1",
+                    (inicio, fim)
+                )
+            }
+            fechados = {
+                dia for (dia,) in db.execute_sql(
+                    "SELECT date(data) FROM fechamento_dia WHERE data BETWEEN ? AND ?",
+                    (inicio, fim)
+                )
+            }
+
+            linhas = []
+            for dia in sorted((set(vendas) | set(transacoes)) - fechados):
+                entradas, saidas, quantidade = transacoes.get(dia, (0, 0, 0))
+                total_entradas, total_despesas = _decimal(entradas), _decimal(saidas)
+                linhas.append({
+                    'data': datetime.combine(date.fromisoformat(dia), datetime.min.time()),
+                    'total_vendas': _decimal(vendas.get(dia)),
+                    'total_despesas': total_despesas,
+                    'total_entradas': total_entradas,
+                    'saldo': total_entradas - total_despesas,
+                    'quantidade_transacoes': quantidade,
+                })
+            for lote in chunked(linhas, 100):
+                FechamentoDia.insert_many(lote).execute()
+
+        return {
+            'criados': [linha['data'].date() for linha in linhas],
+            'ja_fechados': sorted(date.fromisoformat(dia) for dia in fechados),
+            'sem_movimento': (data_fim - data_inicio).days + 1 - len(linhas) - len(fechados),
+        }
+
     @staticmethod
     def obter_fechamento(data_dia: date = None) -> FechamentoDia:
         """Obtém o fechamento de um dia"""
@@ -252,33 +345,45 @@ def get_resumo_dia(data: date = None) -> Dict:
     """
     if data is None:
         data = date.today()
-    
-    # Buscar todas as transações do dia
+    return _resumo_dia_dashboard(data)
+
+
+@em_cache('transacoes')
+def _resumo_dia_dashboard(data: date) -> Dict:
+    # Uma única agregação, coberta pelo índice (data_transacao, tipo, categoria, valor)
     inicio_dia = datetime.combine(data, datetime.min.time())
     fim_dia = datetime.combine(data, datetime.max.time())
     
-    transacoes = Transacao.select().where(
-        (Transacao.data_transacao >= inicio_dia) &
-        (Transacao.data_transacao <= fim_dia)
+    total_vendas, total_despesas, quantidade = (
+        Transacao
+        .select(
+            fn.SUM(Case(None, [(
+                (Transacao.tipo == 'ENTRADA') & (Transacao.categoria == 'VENDA'),
+                Transacao.valor
+            )], 0)),
+            fn.SUM(Case(None, [(Transacao.tipo == 'SAIDA', Transacao.valor)], 0)),
+            fn.COUNT(Transacao.id)
+        )
+        .where(
+            (Transacao.data_transacao >= inicio_dia) &
+            (Transacao.data_transacao <= fim_dia)
+        )
+        .tuples()
+        .get()
     )
     
-    # Calcular totais
-    total_vendas = Decimal('0.00')
-    total_despesas = Decimal('0.00')
-    
-    for transacao in transacoes:
-        if transacao.tipo == 'ENTRADA' and transacao.categoria == 'VENDA':
-            total_vendas += transacao.valor
-        elif transacao.tipo == 'SAIDA':
-            total_despesas += transacao.valor
-    
-    saldo_liquido = total_vendas - total_despesas
+    total_vendas = _decimal(total_vendas)
+    total_despesas = _decimal(total_despesas)
     
     return {
         'total_vendas': total_vendas,
         'total_despesas': total_despesas,
-        'saldo_liquido': saldo_liquido,
+        'saldo_liquido': total_vendas - total_despesas,
         'data': data,
-        'quantidade_transacoes': len(list(transacoes))
+        'quantidade_transacoes': quantidade
     }
 
+
+def _decimal(valor) -> Decimal:
+    """Soma do SQLite (float/int/None) para Decimal com 2 casas"""
+    return Decimal(str(valor or 0)).quantize(Decimal('0.01'))
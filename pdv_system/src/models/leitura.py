@@ -0,0 +1,291 @@
+"""
+Modelos de leitura para as listagens
+
+Objetos com ``__slots__`` montados direto das linhas do cursor do SQLite, só
+com as colunas usadas: não há instância do Peewee, nem conversão para
+Decimal/datetime por linha. Conversões (float, isoformat) e campos calculados
+(margem, total líquido) são feitos na leitura do atributo.
+
+Funcionam como o dicionário que os serviços devolviam (``produto['estoque']``,
+``.get()``, ``.keys()``, ``dict(produto)``); para JSON use ``como_dict()``.
+
+``VendaCompleta`` é diferente: a venda com os itens e os dados do produto de
+cada item, carregada de uma vez por ``carregar_venda`` (carrinho, cupom,
+finalização), com os tipos do modelo (Decimal, datetime) e imutável.
+"""
+from collections.abc import Mapping
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from src.database.connection import get_db
+from src.database.models import Produto, Venda, ItemVenda, Transacao
+
+
+def _iso(valor):
+    """Data/hora como gravada pelo Peewee ('AAAA-MM-DD HH:MM:SS[.ffffff]') em ISO 8601"""
+    return valor.replace(' ', 'T', 1) if valor is not None else None
+
+
+def _dec(valor) -> Decimal:
+    return Decimal(str(valor)) if valor is not None else Decimal('0')
+
+
+class Leitura(Mapping):
+    """Base: ``CHAVES`` são as chaves expostas; ``CAMPOS`` as colunas lidas"""
+
+    __slots__ = ()
+
+    MODELO = None
+    CAMPOS: Tuple[str, ...] = ()
+    CHAVES: Tuple[str, ...] = ()
+
+    @classmethod
+    def colunas(cls) -> list:
+        """Campos do Peewee para o SELECT"""
+        return [getattr(cls.MODELO, campo) for campo in cls.CAMPOS]
+
+    @classmethod
+    def nomes_colunas(cls) -> List[str]:
+        """Nomes das colunas no banco (consultas em SQL montado à mão)"""
+        return [cls.MODELO._meta.fields[campo].column_name for campo in cls.CAMPOS]
+
+    def __getitem__(self, chave):
+        if chave not in self.CHAVES:
+            raise KeyError(chave)
+        return getattr(self, chave)
+
+    def __iter__(self):
+        return iter(self.CHAVES)
+
+    def __len__(self):
+        return len(self.CHAVES)
+
+    def como_dict(self) -> Dict:
+        return {chave: getattr(self, chave) for chave in self.CHAVES}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.como_dict()!r})"
+
+
+class ProdutoLeitura(Leitura):
+    """Produto nas listagens (mesmas chaves de ProdutoService._serializar_produto)"""
+
+    __slots__ = ('id', 'nome', 'codigo', '_preco_custo', '_preco_venda', 'estoque',
+                 '_ativo', 'descricao', '_criado_em')
+
+    MODELO = Produto
+    CAMPOS = ('id', 'nome', 'codigo', 'preco_custo', 'preco_venda', 'estoque',
+              'ativo', 'descricao', 'criado_em')
+    CHAVES = ('id', 'nome', 'codigo', 'preco_custo', 'preco_venda', 'estoque',
+              'margem_lucro', 'ativo', 'descricao', 'criado_em')
+
+    def __init__(self, id, nome, codigo, preco_custo, preco_venda, estoque,
+                 ativo, descricao, criado_em):
+        self.id = id
+        self.nome = nome
+        self.codigo = codigo
+        self._preco_custo = preco_custo
+        self._preco_venda = preco_venda
+        self.estoque = estoque
+        self._ativo = ativo
+        self.descricao = descricao
+        self._criado_em = criado_em
+
+    @property
+    def preco_custo(self) -> float:
+        return float(self._preco_custo or 0)
+
+    @property
+    def preco_venda(self) -> float:
+        return float(self._preco_venda)
+
+    @property
+    def margem_lucro(self) -> float:
+        custo = _dec(self._preco_custo)
+        if custo == 0:
+            return 0.0
+        return float((_dec(self._preco_venda) - custo) / custo * 100)
+
+    @property
+    def ativo(self) -> bool:
+        return bool(self._ativo)
+
+    @property
+    def criado_em(self):
+        return _iso(self._criado_em)
+
+
+class VendaLeitura(Leitura):
+    """Venda nas listagens (mesmas chaves de VendaService._serializar_venda)"""
+
+    __slots__ = ('id', 'numero', '_data_hora', '_total', '_desconto', '_valor_pago',
+                 '_troco', 'forma_pagamento', '_processada', 'observacoes')
+
+    MODELO = Venda
+    CAMPOS = ('id', 'numero', 'data_hora', 'total', 'desconto', 'valor_pago',
+              'troco', 'forma_pagamento', 'processada', 'observacoes')
+    CHAVES = ('id', 'numero', 'data_hora', 'subtotal', 'desconto', 'total',
+              'valor_pago', 'troco', 'forma_pagamento', 'processada', 'observacoes')
+
+    def __init__(self, id, numero, data_hora, total, desconto, valor_pago, troco,
+                 forma_pagamento, processada, observacoes):
+        self.id = id
+        self.numero = numero
+        self._data_hora = data_hora
+        self._total = total
+        self._desconto = desconto
+        self._valor_pago = valor_pago
+        self._troco = troco
+        self.forma_pagamento = forma_pagamento
+        self._processada = processada
+        self.observacoes = observacoes
+
+    @property
+    def data_hora(self):
+        return _iso(self._data_hora)
+
+    @property
+    def subtotal(self) -> float:
+        return float(self._total or 0)
+
+    @property
+    def desconto(self) -> float:
+        return float(self._desconto or 0)
+
+    @property
+    def total(self) -> float:
+        return float(_dec(self._total) - _dec(self._desconto))
+
+    @property
+    def valor_pago(self) -> float:
+        return float(self._valor_pago or 0)
+
+    @property
+    def troco(self) -> float:
+        return float(self._troco or 0)
+
+    @property
+    def processada(self) -> bool:
+        return bool(self._processada)
+
+
+class TransacaoLeitura(Leitura):
+    """Transação nas listagens (mesmas chaves de FinanceiroService._serializar_transacao)"""
+
+    __slots__ = ('id', 'tipo', 'categoria', 'descricao', '_valor', '_data_transacao',
+                 'observacoes')
+
+    MODELO = Transacao
+    CAMPOS = ('id', 'tipo', 'categoria', 'descricao', 'valor', 'data_transacao',
+              'observacoes')
+    CHAVES = CAMPOS
+
+    def __init__(self, id, tipo, categoria, descricao, valor, data_transacao, observacoes):
+        self.id = id
+        self.tipo = tipo
+        self.categoria = categoria
+        self.descricao = descricao
+        self._valor = valor
+        self._data_transacao = data_transacao
+        self.observacoes = observacoes
+
+    @property
+    def valor(self) -> float:
+        return float(self._valor)
+
+    @property
+    def data_transacao(self):
+        return _iso(self._data_transacao)
+
+
+def ler(query, classe) -> list:
+    """
+    Executa ``query`` selecionando só as colunas de ``classe``
+
+    As linhas vêm do cursor do SQLite sem passar pelos conversores do Peewee.
+    """
+    cursor = get_db().execute(query.select(*classe.colunas()))
+    return [classe(*linha) for linha in cursor]
+
+
+class ItemVendaCompleto(NamedTuple):
+    """Item da venda com os dados do produto no momento da leitura"""
+    id: int
+    produto_id: int
+    codigo_produto: str
+    nome_produto: str
+    estoque_produto: int
+    quantidade: int
+    preco_unitario: Decimal
+    subtotal: Decimal
+
+
+class VendaCompleta(NamedTuple):
+    """Venda com todos os itens (retrato imutável)"""
+    id: int
+    numero: int
+    data_hora: datetime
+    total: Decimal
+    desconto: Decimal
+    valor_pago: Decimal
+    troco: Decimal
+    forma_pagamento: str
+    observacoes: Optional[str]
+    processada: int
+    itens: Tuple[ItemVendaCompleto, ...]
+
+    @property
+    def total_liquido(self) -> Decimal:
+        return self.total - self.desconto
+
+
+def carregar_venda(venda_id: int) -> Optional[VendaCompleta]:
+    """
+    Venda, itens e produtos em duas consultas (em vez de uma por item)
+
+    Vendas de meses arquivados são lidas do arquivo mensal (reimpressão de
+    cupom antigo).
+
+    Returns:
+        VendaCompleta ou None se a venda não existe
+    """
+    linha = (Venda
+             .select(Venda.id, Venda.numero, Venda.data_hora, Venda.total, Venda.desconto,
+                     Venda.valor_pago, Venda.troco, Venda.forma_pagamento,
+                     Venda.observacoes, Venda.processada)
+             .where(Venda.id == venda_id)
+             .tuples()
+             .first())
+    if linha is None:
+        return _carregar_venda_arquivada(venda_id)
+
+    itens = (ItemVenda
+             .select(ItemVenda.id, Produto.id, Produto.codigo, Produto.nome, Produto.estoque,
+                     ItemVenda.quantidade, ItemVenda.preco_unitario, ItemVenda.subtotal)
+             .join(Produto)
+             .where(ItemVenda.venda == venda_id)
+             .order_by(ItemVenda.id)
+             .tuples())
+    return VendaCompleta(*linha, tuple(ItemVendaCompleto(*item) for item in itens))
+
+
+def _carregar_venda_arquivada(venda_id: int) -> Optional[VendaCompleta]:
+    from src.models.arquivo_repository import ArquivoRepository
+
+    if get_db().in_transaction():
+        return None  # Arquivos não podem ser anexados dentro de uma transação
+    arquivada = ArquivoRepository.obter_venda_arquivada(venda_id)
+    if arquivada is None:
+        return None
+
+    venda, itens = arquivada
+    return VendaCompleta(
+        venda.id, venda.numero, venda.data_hora, venda.total, venda.desconto,
+        venda.valor_pago, venda.troco, venda.forma_pagamento, venda.observacoes,
+        venda.processada,
+        tuple(ItemVendaCompleto(item.id, item.produto_id, item.codigo_produto,
+                                item.nome_produto, item.estoque_produto, item.quantidade,
+                                item.preco_unitario, item.subtotal)
+              for item in itens),
+    )
@@ -0,0 +1,276 @@
+"""
+Repositório do Outbox - Feed de mudanças para integrações
+
+Os eventos são gravados dentro da mesma transação que altera os dados
+(``publicar`` não abre transação própria): se a venda ou o ajuste é desfeito,
+o evento some junto. Cada consumidor guarda o último offset (id) confirmado e
+lê apenas o que veio depois, pela chave primária - o custo é proporcional aos
+eventos novos, não ao tamanho das tabelas.
+
+Compactação:
+  - eventos confirmados por todos os consumidores e mais antigos que o prazo
+    de retenção são apagados
+  - eventos de estado (``TIPOS_ESTADO``) são compactados por chave: só o mais
+    recente de cada produto é mantido, já que ele carrega o estado completo
+"""
+from src.database.models import EventoOutbox, ConsumidorOutbox, Produto
+from src.database.connection import get_db
+from peewee import Value, chunked, fn
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+
+
+class OutboxRepository:
+    """Publica, lê, confirma e compacta eventos do outbox"""
+
+    # Eventos que carregam o estado completo da entidade (compactáveis por chave)
+    TIPOS_ESTADO = ('produto.alterado',)
+
+    @staticmethod
+    def publicar(tipo: str, dados: Dict, chave: str = None) -> int:
+        """
+        Grava um evento (chamar dentro da transação da mudança)
+
+        Returns:
+            int: Offset do evento
+        """
+        return EventoOutbox.insert(
+            tipo=tipo,
+            chave=chave,
+            dados=json.dumps(dados, separators=(',', ':'), default=str),
+            criado_em=datetime.now()
+        ).execute()
+
+    @staticmethod
+    def publicar_lote(eventos: Iterable[Tuple[str, Optional[str], Dict]],
+                      tamanho_insert: int = 200) -> int:
+        """Grava vários eventos (tipo, chave, dados); devolve quantos"""
+        agora = datetime.now()
+        registros = [
+            {
+                'tipo': tipo,
+                'chave': chave,
+                'dados': json.dumps(dados, separators=(',', ':'), default=str),
+                'criado_em': agora,
+            }
+            for tipo, chave, dados in eventos
+        ]
+        for lote in chunked(registros, tamanho_insert):
+            EventoOutbox.insert_many(lote).execute()
+        return len(registros)
+
+    @staticmethod
+    def publicar_produtos(condicao) -> int:
+        """
+        Publica ``produto.alterado`` para os produtos que atendem à condição
+
+        Um único INSERT ... SELECT (o JSON é montado pelo SQLite), para as
+        alterações em massa continuarem sem trazer os produtos para o Python.
+        """
+        dados = fn.json_object(
+            'id', Produto.id,
+            'codigo', Produto.codigo,
+            'nome', Produto.nome,
+            'preco_venda', fn.printf('%.2f', Produto.preco_venda),
+            'preco_custo', fn.printf('%.2f', Produto.preco_custo),
+            'estoque', Produto.estoque,
+            'ativo', Produto.ativo,
+        )
+        return EventoOutbox.insert_from(
+            Produto.select(
+                Value('produto.alterado'), Produto.codigo, dados, Value(datetime.now())
+            ).where(condicao).order_by(Produto.id),
+            [EventoOutbox.tipo, EventoOutbox.chave, EventoOutbox.dados, EventoOutbox.criado_em]
+        ).execute()
+
+    @staticmethod
+    def dados_produto(produto) -> Dict:
+        """Estado do produto publicado em ``produto.alterado``"""
+        return {
+            'id': produto.id,
+            'codigo': produto.codigo,
+            'nome': produto.nome,
+            'preco_venda': f"{produto.preco_venda:.2f}",
+            'preco_custo': f"{produto.preco_custo:.2f}",
+            'estoque': produto.estoque,
+            'ativo': produto.ativo,
+        }
+
+    @staticmethod
+    def dados_transacao(transacao) -> Dict:
+        """Dados publicados em ``transacao.registrada``"""
+        return {
+            'id': transacao.id,
+            'tipo': transacao.tipo,
+            'categoria': transacao.categoria,
+            'descricao': transacao.descricao,
+            'valor': f"{transacao.valor:.2f}",
+            'data_transacao': transacao.data_transacao.isoformat(),
+            'venda_id': transacao.venda_id,
+        }
+
+    @staticmethod
+    def ultimo_offset() -> int:
+        """Último offset já atribuído (vale mesmo com a tabela compactada)"""
+        linha = get_db().execute_sql(
+            "SELECT seq FROM sqlite_sequence WHERE name = ?", (EventoOutbox._meta.table_name,)
+        ).fetchone()
+        return linha[0] if linha else 0
+
+    @staticmethod
+    def ler_desde(posicao: int, limite: int = 100, tipos: List[str] = None) -> List[Dict]:
+        """
+        Eventos com offset maior que ``posicao``, em ordem
+
+        Returns:
+            list: [{'offset', 'tipo', 'chave', 'dados', 'criado_em'}]
+        """
+        query = (EventoOutbox
+                 .select(EventoOutbox.id, EventoOutbox.tipo, EventoOutbox.chave,
+                         EventoOutbox.dados, EventoOutbox.criado_em)
+                 .where(EventoOutbox.id > posicao))
+        if tipos:
+            query = query.where(EventoOutbox.tipo.in_(tipos))
+
+        return [
+            {
+                'offset': offset,
+                'tipo': tipo,
+                'chave': chave,
+                'dados': json.loads(dados),
+                'criado_em': criado_em.isoformat(),
+            }
+            for offset, tipo, chave, dados, criado_em in
+            query.order_by(EventoOutbox.id).limit(limite).tuples()
+        ]
+
+    @staticmethod
+    def registrar_consumidor(nome: str, desde_inicio: bool = True) -> int:
+        """
+        Cadastra um consumidor (sem efeito se já existe)
+
+        Args:
+            desde_inicio: Se False, o consumidor começa no evento mais recente
+                (não recebe o histórico)
+
+        Returns:
+            int: Posição do consumidor
+        """
+        posicao = 0 if desde_inicio else OutboxRepository.ultimo_offset()
+        (ConsumidorOutbox
+         .insert(nome=nome, posicao=posicao, atualizado_em=datetime.now())
+         .on_conflict_ignore()
+         .execute())
+        return OutboxRepository.posicao(nome)
+
+    @staticmethod
+    def remover_consumidor(nome: str) -> bool:
+        """Remove o consumidor (deixa de segurar a compactação)"""
+        return ConsumidorOutbox.delete().where(ConsumidorOutbox.nome == nome).execute() > 0
+
+    @staticmethod
+    def posicao(nome: str) -> int:
+        consumidor = ConsumidorOutbox.get_or_none(ConsumidorOutbox.nome == nome)
+        if consumidor is None:
+            raise ValueError(f"Consumidor '{nome}' não cadastrado")
+        return consumidor.posicao
+
+    @staticmethod
+    def ler(nome: str, limite: int = 100, tipos: List[str] = None) -> List[Dict]:
+        """Próximo lote de eventos ainda não confirmados pelo consumidor"""
+        return OutboxRepository.ler_desde(OutboxRepository.posicao(nome), limite, tipos)
+
+    @staticmethod
+    def confirmar(nome: str, posicao: int) -> int:
+        """
+        Confirma o processamento até o offset ``posicao`` (inclusive)
+
+        A posição nunca anda para trás: confirmar um offset antigo de novo não
+        tem efeito.
+
+        Returns:
+            int: Posição atual do consumidor
+        """
+        if posicao > OutboxRepository.ultimo_offset():
+            raise ValueError(f"Offset {posicao} ainda não existe")
+
+        atualizados = (ConsumidorOutbox
+                       .update(posicao=posicao, atualizado_em=datetime.now())
+                       .where((ConsumidorOutbox.nome == nome) &
+                              (ConsumidorOutbox.posicao < posicao))
+                       .execute())
+        if not atualizados:
+            return OutboxRepository.posicao(nome)
+        return posicao
+
+    @staticmethod
+    def compactar(manter_dias: int = 7, limite: int = 5000) -> Dict:
+        """
+        Apaga eventos já consumidos e versões antigas de eventos de estado
+
+        Cada chamada apaga no máximo ``limite`` linhas de cada tipo, numa
+        transação curta; chame de novo enquanto ``restante`` for True.
+
+        Returns:
+            dict: {'consumidos': int, 'substituidos': int, 'restante': bool}
+        """
+        db = get_db()
+        corte = datetime.now() - timedelta(days=manter_dias)
+        menor_posicao = ConsumidorOutbox.select(fn.MIN(ConsumidorOutbox.posicao)).scalar()
+        if menor_posicao is None:
+            # Sem consumidores: só o prazo de retenção vale
+            menor_posicao = OutboxRepository.ultimo_offset()
+
+        with db.atomic():
+            consumidos = (EventoOutbox
+                          .delete()
+                          .where(EventoOutbox.id.in_(
+                              EventoOutbox.select(EventoOutbox.id)
+                              .where((EventoOutbox.id <= menor_posicao) &
+                                     (EventoOutbox.criado_em < corte))
+                              .order_by(EventoOutbox.id)
+                              .limit(limite)))
+                          .execute())
+
+        Recente = EventoOutbox.alias('recente')
+        substituida = (Recente
+                       .select(Recente.id)
+                       .where((Recente.tipo == EventoOutbox.tipo) &
+                              (Recente.chave == EventoOutbox.chave) &
+                              (Recente.id > EventoOutbox.id)))
+        with db.atomic():
+            substituidos = (EventoOutbox
+                            .delete()
+                            .where(EventoOutbox.id.in_(
+                                EventoOutbox.select(EventoOutbox.id)
+                                .where(EventoOutbox.tipo.in_(OutboxRepository.TIPOS_ESTADO) &
+                                       EventoOutbox.chave.is_null(False) &
+                                       fn.EXISTS(substituida))
+                                .limit(limite)))
+                            .execute())
+
+        return {
+            'consumidos': consumidos,
+            'substituidos': substituidos,
+            'restante': consumidos >= limite or substituidos >= limite,
+        }
+
+    @staticmethod
+    def status() -> Dict:
+        """Offsets do outbox e atraso de cada consumidor"""
+        ultimo = OutboxRepository.ultimo_offset()
+        primeiro = EventoOutbox.select(fn.MIN(EventoOutbox.id)).scalar() or 0
+        return {
+            'primeiro_offset': primeiro,
+            'ultimo_offset': ultimo,
+            'consumidores': [
+                {
+                    'nome': c.nome,
+                    'posicao': c.posicao,
+                    'atraso': ultimo - c.posicao,
+                    'atualizado_em': c.atualizado_em.isoformat(),
+                }
+                for c in ConsumidorOutbox.select().order_by(ConsumidorOutbox.nome)
+            ],
+        }
@@ -2,32 +2,137 @@
 Repositório de Produtos - Camada de Acesso aos Dados
 """
 from src.database.models import Produto
+from src.database.connection import get_db
+from src.models.leitura import ler
+from src.models.outbox_repository import OutboxRepository
+from src.sync.registro import registrar_ajuste_estoque
+from peewee import chunked
 from decimal import Decimal
 from datetime import datetime
+from typing import Dict, List, Tuple
+import base64
+import json
 
 
 class ProdutoRepository:
     """Gerencia operações CRUD de Produtos"""
 
+    # Colunas aceitas como ordenação na listagem paginada
+    ORDENACOES = {
+        'nome': Produto.nome,
+        'codigo': Produto.codigo,
+        'preco_venda': Produto.preco_venda,
+        'estoque': Produto.estoque,
+    }
+
+    # Acima deste limite a contagem é interrompida e marcada como estimada
+    LIMITE_CONTAGEM = 10000
+
     @staticmethod
     def criar(nome: str, codigo: str, preco_venda: Decimal, 
               preco_custo: Decimal = Decimal('0.00'), estoque: int = 0,
               descricao: str = None) -> Produto:
         """Cria um novo produto"""
         try:
-            produto = Produto.create(
-                nome=nome,
-                codigo=codigo,
-                preco_venda=preco_venda,
-                preco_custo=preco_custo,
-                estoque=estoque,
-                descricao=descricao,
-                ativo=1
-            )
+            with get_db().atomic():
+                produto = Produto.create(
+                    nome=nome,
+                    codigo=codigo,
+                    preco_venda=preco_venda,
+                    preco_custo=preco_custo,
+                    estoque=estoque,
+                    descricao=descricao,
+                    ativo=1
+                )
+                ProdutoRepository._publicar(produto)
             return produto
         except Exception as e:
             raise ValueError(f"Erro ao criar produto: {str(e)}") from e
 
+    @staticmethod
+    def upsert_lote(linhas: List[Dict], atualizar_estoque: bool = False,
+                    tamanho_insert: int = 100) -> int:
+        """
+        Insere ou atualiza produtos em lote pelo código, numa única transação
+
+        Usa ``INSERT ... ON CONFLICT(codigo) DO UPDATE``: produtos novos são
+        criados e os existentes têm nome, preços e descrição substituídos e
+        voltam a ficar ativos. Cada lote também publica ``produto.alterado``
+        no outbox.
+
+        Args:
+            linhas: Dicionários com nome, codigo, preco_venda, preco_custo,
+                estoque e descricao já validados
+            atualizar_estoque: Se True, o estoque do arquivo sobrescreve o atual
+            tamanho_insert: Linhas por INSERT (mantém o nº de parâmetros abaixo
+                do limite do SQLite)
+
+        Returns:
+            int: Quantidade de linhas gravadas
+        """
+        if not linhas:
+            return 0
+
+        agora = datetime.now()
+        registros = [
+            {
+                'nome': linha['nome'],
+                'codigo': linha['codigo'],
+                'preco_venda': linha['preco_venda'],
+                'preco_custo': linha.get('preco_custo', Decimal('0.00')),
+                'estoque': linha.get('estoque', 0),
+                'descricao': linha.get('descricao'),
+                'ativo': 1,
+                'criado_em': agora,
+                'atualizado_em': agora,
+            }
+            for linha in linhas
+        ]
+
+        preservar = [
+            Produto.nome, Produto.preco_venda, Produto.preco_custo,
+            Produto.descricao, Produto.ativo, Produto.atualizado_em,
+        ]
+        if atualizar_estoque:
+            preservar.append(Produto.estoque)
+
+        with get_db().atomic():
+            for lote in chunked(registros, tamanho_insert):
+                (Produto
+                 .insert_many(lote)
+                 .on_conflict(conflict_target=[Produto.codigo], preserve=preservar)
+                 .execute())
+                OutboxRepository.publicar_produtos(
+                    Produto.codigo.in_([r['codigo'] for r in lote])
+                )
+
+        return len(registros)
+
+    @staticmethod
+    def mapear_existentes(codigos: List[str], nomes: List[str],
+                          tamanho_consulta: int = 400) -> Tuple[Dict, Dict]:
+        """
+        Obtém os produtos já cadastrados com algum dos códigos ou nomes
+
+        Returns:
+            tuple: ({codigo: nome}, {nome: codigo})
+        """
+        por_codigo, por_nome = {}, {}
+
+        for lote in chunked(list(codigos), tamanho_consulta):
+            for codigo, nome in (Produto.select(Produto.codigo, Produto.nome)
+                                 .where(Produto.codigo.in_(lote)).tuples()):
+                por_codigo[codigo] = nome
+                por_nome[nome] = codigo
+
+        for lote in chunked(list(nomes), tamanho_consulta):
+            for codigo, nome in (Produto.select(Produto.codigo, Produto.nome)
+                                 .where(Produto.nome.in_(lote)).tuples()):
+                por_codigo[codigo] = nome
+                por_nome[nome] = codigo
+
+        return por_codigo, por_nome
+
     @staticmethod
     def atualizar(produto_id: int, **kwargs) -> Produto:
         """Atualiza um produto existente"""
@@ -45,13 +150,22 @@ class ProdutoRepository:
                     setattr(produto, campo, valor)
             
             produto.atualizado_em = datetime.now()
-            produto.save()
+            with get_db().atomic():
+                produto.save()
+                ProdutoRepository._publicar(produto)
             return produto
         except Produto.DoesNotExist as exc:
             raise ValueError(f"Produto ID {produto_id} não encontrado") from exc
         except Exception as e:
             raise ValueError(f"Erro ao atualizar produto: {str(e)}") from e
 
+    @staticmethod
+    def _publicar(produto: Produto):
+        """Publica o estado do produto no outbox (dentro da transação)"""
+        OutboxRepository.publicar('produto.alterado',
+                                  OutboxRepository.dados_produto(produto),
+                                  chave=produto.codigo)
+
     @staticmethod
     def obter_por_id(produto_id: int) -> Produto:
         """Obtém um produto por ID"""
@@ -69,9 +183,10 @@ class ProdutoRepository:
             raise ValueError(f"Produto com código '{codigo}' não encontrado") from exc
 
     @staticmethod
-    def listar_ativos() -> list:
-        """Lista todos os produtos ativos"""
-        return list(Produto.select().where(Produto.ativo == 1).order_by(Produto.nome))
+    def listar_ativos(leitura: type = None) -> list:
+        """Lista todos os produtos ativos (como ``leitura``, se informado)"""
+        query = Produto.select().where(Produto.ativo == 1).order_by(Produto.nome)
+        return ler(query, leitura) if leitura else list(query)
 
     @staticmethod
     def listar_todos() -> list:
@@ -79,7 +194,147 @@ class ProdutoRepository:
         return list(Produto.select().order_by(Produto.nome))
 
     @staticmethod
-    def buscar(termo: str) -> list:
+    def listar_paginado(cursor: str = None, limite: int = 50,
+                        ordem: str = 'nome', decrescente: bool = False,
+                        anterior: bool = False, filtros: Dict = None,
+                        leitura: type = None) -> Tuple[List[Produto], bool]:
+        """
+        Lista produtos por paginação keyset (cursor sobre coluna de ordenação + id)
+
+        Ao contrário de OFFSET, o custo de cada página não depende da posição
+        no catálogo: o cursor vira uma condição ``(coluna, id) > (valor, id)``
+        resolvida pelo índice.
+
+        Args:
+            cursor: Cursor opaco devolvido pela página anterior (None = início)
+            limite: Quantidade de produtos por página
+            ordem: Coluna de ordenação (nome, codigo, preco_venda, estoque)
+            decrescente: Ordena do maior para o menor
+            anterior: Busca a página imediatamente antes do cursor
+            filtros: termo, ativo (padrão True; None = todos), estoque_maximo,
+                preco_min, preco_max
+            leitura: Modelo de leitura (src/models/leitura.py) no lugar de Produto
+
+        Returns:
+            tuple: (lista de Produto em ordem de exibição, existe mais
+            produtos na direção consultada)
+        """
+        if ordem not in ProdutoRepository.ORDENACOES:
+            raise ValueError(
+                f"Ordenação inválida. Use: {', '.join(ProdutoRepository.ORDENACOES)}"
+            )
+
+        coluna = ProdutoRepository.ORDENACOES[ordem]
+        query = ProdutoRepository._aplicar_filtros(Produto.select(), filtros or {})
+
+        # Página anterior = mesma consulta com o sentido invertido
+        crescente = decrescente == anterior
+
+        if cursor:
+            valor, ultimo_id = ProdutoRepository._decodificar_cursor(cursor, ordem)
+            if crescente:
+                query = query.where(
+                    (coluna > valor) | ((coluna == valor) & (Produto.id > ultimo_id))
+                )
+            else:
+                query = query.where(
+                    (coluna < valor) | ((coluna == valor) & (Produto.id < ultimo_id))
+                )
+
+        if crescente:
+            query = query.order_by(coluna.asc(), Produto.id.asc())
+        else:
+            query = query.order_by(coluna.desc(), Produto.id.desc())
+
+        # Um registro extra indica se existe página seguinte
+        query = query.limit(limite + 1)
+        produtos = ler(query, leitura) if leitura else list(query)
+        tem_mais = len(produtos) > limite
+        produtos = produtos[:limite]
+
+        if anterior:
+            produtos.reverse()
+
+        return produtos, tem_mais
+
+    @staticmethod
+    def contar_estimado(filtros: Dict = None, limite: int = None) -> Tuple[int, bool]:
+        """
+        Conta os produtos que atendem aos filtros, parando em ``limite``
+
+        Returns:
+            tuple: (quantidade, exata) - exata=False quando a contagem foi
+            interrompida no limite e o total real é maior
+        """
+        if limite is None:
+            limite = ProdutoRepository.LIMITE_CONTAGEM
+
+        query = ProdutoRepository._aplicar_filtros(
+            Produto.select(Produto.id), filtros or {}
+        )
+        quantidade = query.limit(limite + 1).count()
+
+        if quantidade > limite:
+            return limite, False
+        return quantidade, True
+
+    @staticmethod
+    def cursor_de(produto: Produto, ordem: str = 'nome') -> str:
+        """Gera o cursor opaco que aponta para depois de ``produto``"""
+        valor = getattr(produto, ordem)
+        if isinstance(valor, (Decimal, float)):
+            valor = str(valor)
+        dados = json.dumps([ordem, valor, produto.id]).encode('utf-8')
+        return base64.urlsafe_b64encode(dados).decode('ascii')
+
+    @staticmethod
+    def _decodificar_cursor(cursor: str, ordem: str) -> Tuple:
+        """Decodifica um cursor gerado por ``cursor_de``"""
+        try:
+            ordem_cursor, valor, produto_id = json.loads(
+                base64.urlsafe_b64decode(cursor.encode('ascii'))
+            )
+        except (ValueError, TypeError) as exc:
+            raise ValueError("Cursor de paginação inválido") from exc
+
+        if ordem_cursor != ordem:
+            raise ValueError("Cursor gerado para outra ordenação")
+
+        if ordem == 'preco_venda':
+            valor = Decimal(valor)
+        return valor, produto_id
+
+    @staticmethod
+    def _aplicar_filtros(query, filtros: Dict):
+        """Aplica os filtros da listagem paginada a uma query de Produto"""
+        ativo = filtros.get('ativo', True)
+        if ativo is not None:
+            query = query.where(Produto.ativo == int(bool(ativo)))
+
+        termo = filtros.get('termo')
+        if termo:
+            query = query.where(
+                (Produto.nome.contains(termo)) |
+                (Produto.codigo.contains(termo))
+            )
+
+        if filtros.get('estoque_maximo') is not None:
+            query = query.where(Produto.estoque <= filtros['estoque_maximo'])
+
+        if filtros.get('preco_min') is not None:
+            query = query.where(
+                Produto.preco_venda >= Decimal(str(filtros['preco_min']))
+            )
+
+        if filtros.get('preco_max') is not None:
+            query = query.where(
+                Produto.preco_venda <= Decimal(str(filtros['preco_max']))
+            )
+
+        return query
+
+    @staticmethod
+    def buscar(termo: str, leitura: type = None) -> list:
         """Busca produtos por nome ou código"""
         query = (Produto.select()
                  .where(
@@ -88,7 +343,7 @@ class ProdutoRepository:
                  )
                  .where(Produto.ativo == 1)
                  .order_by(Produto.nome))
-        return list(query)
+        return ler(query, leitura) if leitura else list(query)
 
     @staticmethod
     def deletar(produto_id: int) -> bool:
@@ -97,7 +352,9 @@ class ProdutoRepository:
             produto = Produto.get_by_id(produto_id)
             produto.ativo = 0
             produto.atualizado_em = datetime.now()
-            produto.save()
+            with get_db().atomic():
+                produto.save()
+                ProdutoRepository._publicar(produto)
             return True
         except Produto.DoesNotExist as exc:
             raise ValueError(f"Produto ID {produto_id} não encontrado") from exc
@@ -114,7 +371,14 @@ class ProdutoRepository:
             
             produto.estoque = novo_estoque
             produto.atualizado_em = datetime.now()
-            produto.save()
+            with get_db().atomic():
+                produto.save()
+                registrar_ajuste_estoque(produto, quantidade)
+                OutboxRepository.publicar('estoque.ajustado', {
+                    'codigo': produto.codigo,
+                    'delta': quantidade,
+                    'estoque': produto.estoque,
+                }, chave=produto.codigo)
             return produto
         except Produto.DoesNotExist as exc:
             raise ValueError(f"Produto ID {produto_id} não encontrado") from exc
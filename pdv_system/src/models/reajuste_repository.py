@@ -0,0 +1,195 @@
+"""
+Repositório de Reajuste de Preços - Atualização em massa por regra
+"""
+from src.database.models import Produto, HistoricoPreco
+from src.database.connection import get_db
+from src.models.outbox_repository import OutboxRepository
+from peewee import Case, Value, fn
+from decimal import Decimal
+from datetime import datetime
+from typing import Dict, List
+
+
+class ReajusteRepository:
+    """Aplica regras de reajuste de preço diretamente em SQL"""
+
+    @staticmethod
+    def expressao_novo_preco(regra: Dict):
+        """
+        Monta a expressão SQL do novo preço de venda para uma regra
+
+        Percentual: preco * (1 + valor/100); absoluto: preco + valor.
+        Com arredondamento '90' ou '99' o resultado sobe para o próximo
+        preço terminado em ,90 / ,99 (ex.: 12,34 -> 12,90; 12,95 -> 13,90).
+        """
+        preco = Produto.preco_venda
+        valor = float(regra['valor'])
+
+        if regra['tipo'] == 'percentual':
+            base = preco * (1 + valor / 100)
+        else:
+            base = preco + valor
+
+        if regra.get('arredondamento'):
+            # Em centavos inteiros: 10,00 +29% é 12.900000000000002 em ponto
+            # flutuante e a comparação com ,90 passaria para 13,90
+            alvo = int(regra['arredondamento'])
+            centavos = fn.ROUND(base * 100).cast('INTEGER')
+            reais = centavos / 100  # Divisão inteira no SQLite
+            base = Case(
+                None,
+                [((centavos - reais * 100) <= alvo, reais * 100 + alvo)],
+                (reais + 1) * 100 + alvo
+            ) / 100.0
+
+        return fn.ROUND(base, 2)
+
+    @staticmethod
+    def condicao_afetados(regra: Dict, novo_preco):
+        """Condição WHERE dos produtos que a regra altera (filtros + preço diferente)"""
+        condicao = (novo_preco > 0) & (novo_preco != Produto.preco_venda)
+
+        if regra.get('apenas_ativos', True):
+            condicao &= (Produto.ativo == 1)
+
+        if regra.get('prefixo_codigo'):
+            condicao &= Produto.codigo.startswith(regra['prefixo_codigo'])
+
+        if regra.get('padrao_nome'):
+            condicao &= (Produto.nome ** regra['padrao_nome'].replace('*', '%'))
+
+        if regra.get('custo_min') is not None:
+            condicao &= (Produto.preco_custo >= float(regra['custo_min']))
+
+        if regra.get('custo_max') is not None:
+            condicao &= (Produto.preco_custo <= float(regra['custo_max']))
+
+        if regra.get('margem_min') is not None or regra.get('margem_max') is not None:
+            margem = (Produto.preco_venda - Produto.preco_custo) * 100.0 / Produto.preco_custo
+            condicao &= (Produto.preco_custo > 0)
+
+            if regra.get('margem_min') is not None:
+                condicao &= (margem >= float(regra['margem_min']))
+            if regra.get('margem_max') is not None:
+                condicao &= (margem <= float(regra['margem_max']))
+
+        return condicao
+
+    @staticmethod
+    def previsualizar(regra: Dict, amostra: int = 20) -> Dict:
+        """
+        Calcula em SQL o efeito da regra sem alterar nada
+
+        Returns:
+            dict: {
+                'quantidade': int,
+                'total_atual': Decimal,
+                'total_novo': Decimal,
+                'menor_variacao': Decimal,
+                'maior_variacao': Decimal,
+                'amostra': [{'id', 'codigo', 'nome', 'preco_atual', 'preco_novo'}]
+            }
+        """
+        novo_preco = ReajusteRepository.expressao_novo_preco(regra)
+        condicao = ReajusteRepository.condicao_afetados(regra, novo_preco)
+
+        quantidade, total_atual, total_novo, menor, maior = (
+            Produto
+            .select(
+                fn.COUNT(Produto.id),
+                fn.SUM(Produto.preco_venda),
+                fn.SUM(novo_preco),
+                fn.MIN(novo_preco - Produto.preco_venda),
+                fn.MAX(novo_preco - Produto.preco_venda),
+            )
+            .where(condicao)
+            .tuples()
+            .get()
+        )
+
+        linhas = (
+            Produto
+            .select(Produto.id, Produto.codigo, Produto.nome,
+                    Produto.preco_venda, novo_preco)
+            .where(condicao)
+            .order_by(Produto.codigo)
+            .limit(amostra)
+            .tuples()
+        )
+
+        return {
+            'quantidade': quantidade,
+            'total_atual': ReajusteRepository._decimal(total_atual),
+            'total_novo': ReajusteRepository._decimal(total_novo),
+            'menor_variacao': ReajusteRepository._decimal(menor),
+            'maior_variacao': ReajusteRepository._decimal(maior),
+            'amostra': [
+                {
+                    'id': produto_id,
+                    'codigo': codigo,
+                    'nome': nome,
+                    'preco_atual': ReajusteRepository._decimal(atual),
+                    'preco_novo': ReajusteRepository._decimal(novo),
+                }
+                for produto_id, codigo, nome, atual, novo in linhas
+            ],
+        }
+
+    @staticmethod
+    def aplicar(regra: Dict, descricao: str, lote: str) -> int:
+        """
+        Aplica a regra numa transação: grava o histórico com um INSERT ... SELECT,
+        atualiza os preços com um único UPDATE e publica os produtos no outbox
+
+        Returns:
+            int: Quantidade de produtos reajustados
+        """
+        agora = datetime.now()
+        novo_preco = ReajusteRepository.expressao_novo_preco(regra)
+        condicao = ReajusteRepository.condicao_afetados(regra, novo_preco)
+
+        with get_db().atomic():
+            HistoricoPreco.insert_from(
+                Produto.select(
+                    Produto.id, Produto.preco_venda, novo_preco,
+                    Value(descricao[:300]), Value(lote), Value(agora)
+                ).where(condicao),
+                [
+                    HistoricoPreco.produto, HistoricoPreco.preco_anterior,
+                    HistoricoPreco.preco_novo, HistoricoPreco.regra,
+                    HistoricoPreco.lote, HistoricoPreco.criado_em,
+                ]
+            ).execute()
+
+            alterados = (Produto
+                         .update(preco_venda=novo_preco, atualizado_em=agora)
+                         .where(condicao)
+                         .execute())
+
+            # Os produtos desta regra são os que ganharam histórico agora
+            OutboxRepository.publicar_produtos(Produto.id.in_(
+                HistoricoPreco.select(HistoricoPreco.produto)
+                .where((HistoricoPreco.lote == lote) & (HistoricoPreco.criado_em == agora))
+            ))
+            return alterados
+
+    @staticmethod
+    def listar_historico(produto_id: int = None, lote: str = None,
+                         limite: int = 100) -> List[HistoricoPreco]:
+        """Lista o histórico de preços, mais recente primeiro"""
+        query = HistoricoPreco.select()
+
+        if produto_id is not None:
+            query = query.where(HistoricoPreco.produto == produto_id)
+        if lote is not None:
+            query = query.where(HistoricoPreco.lote == lote)
+
+        return list(query.order_by(HistoricoPreco.criado_em.desc(),
+                                   HistoricoPreco.id.desc()).limit(limite))
+
+    @staticmethod
+    def _decimal(valor) -> Decimal:
+        """Converte o resultado numérico do SQLite para Decimal com 2 casas"""
+        if valor is None:
+            return Decimal('0.00')
+        return Decimal(str(valor)).quantize(Decimal('0.01'))
@@ -0,0 +1,108 @@
+"""
+Repositório de Reservas de Estoque - Carrinhos abertos em vários terminais
+
+Cada item de um carrinho aberto reserva a sua quantidade do produto até
+``expira_em`` (RESERVA_TTL_SEGUNDOS, renovado a cada operação no carrinho).
+O disponível de um produto é ``estoque`` menos as reservas ativas dos outros
+carrinhos.
+
+  - reservar é um único INSERT ... SELECT condicional (upsert por venda e
+    produto): grava só se o disponível cobre a quantidade. A conferência e a
+    gravação acontecem no mesmo comando, sob a trava de escrita do SQLite por
+    microssegundos, então dois caixas nunca reservam as mesmas unidades
+  - reservas vencidas deixam de contar na hora (a condição filtra por
+    ``expira_em``); ``expirar`` só apaga as linhas, em lote (manutenção)
+  - na finalização a venda confere os itens contra o disponível
+    (``faltantes``), o estoque é baixado e as reservas da venda são apagadas
+    na mesma transação
+"""
+from src.database.connection import get_db
+from src.database.models import ReservaEstoque
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+# Reservas ativas de outros carrinhos para o produto ``p``
+_RESERVADO_POR_OUTROS = (
+    'COALESCE((SELECT SUM(r."quantidade") FROM "reservas_estoque" AS r '
+    'WHERE r."produto_id" = p."id" AND r."venda_id" <> ? AND r."expira_em" > ?), 0)'
+)
+
+
+class ReservaEstoqueRepository:
+    """Reserva, libera e expira estoque dos carrinhos abertos"""
+
+    @staticmethod
+    def validade(ttl: float = None) -> datetime:
+        """Momento em que uma reserva feita agora expira"""
+        if ttl is None:
+            from src.utils import config
+            ttl = config.RESERVA_TTL_SEGUNDOS
+        return datetime.now() + timedelta(seconds=ttl)
+
+    @staticmethod
+    def reservar(venda_id: int, produto_id: int, quantidade: int, ttl: float = None) -> bool:
+        """
+        Define a reserva do produto no carrinho em ``quantidade`` (valor total, não incremento)
+
+        Também renova a validade das demais reservas do carrinho.
+
+        Returns:
+            bool: False se o disponível não cobre a quantidade (nada é gravado)
+        """
+        agora = datetime.now()
+        expira_em = ReservaEstoqueRepository.validade(ttl)
+        db = get_db()
+        with db.atomic():
+            reservado = db.execute_sql(
+                'INSERT INTO "reservas_estoque" ("venda_id", "produto_id", "quantidade", "expira_em") '
+                'SELECT ?, p."id", ?, ? FROM "produtos" AS p '
+                f'WHERE p."id" = ? AND p."estoque" - {_RESERVADO_POR_OUTROS} >= ? '
+                'ON CONFLICT ("venda_id", "produto_id") DO UPDATE SET '
+                '"quantidade" = excluded."quantidade", "expira_em" = excluded."expira_em"',
+                (venda_id, quantidade, expira_em, produto_id, venda_id, agora, quantidade)
+            ).rowcount > 0
+            if reservado:
+                ReservaEstoque.update(expira_em=expira_em).where(
+                    ReservaEstoque.venda == venda_id
+                ).execute()
+        return reservado
+
+    @staticmethod
+    def disponivel(produto_id: int, venda_id: int = None) -> int:
+        """Estoque do produto menos as reservas ativas dos outros carrinhos"""
+        linha = get_db().execute_sql(
+            f'SELECT p."estoque" - {_RESERVADO_POR_OUTROS} FROM "produtos" AS p WHERE p."id" = ?',
+            (venda_id or 0, datetime.now(), produto_id)
+        ).fetchone()
+        return linha[0] if linha else 0
+
+    @staticmethod
+    def liberar(venda_id: int, produto_id: int = None) -> int:
+        """Libera a reserva de um produto do carrinho (ou de todos); retorna quantas saíram"""
+        condicao = ReservaEstoque.venda == venda_id
+        if produto_id is not None:
+            condicao &= ReservaEstoque.produto == produto_id
+        return ReservaEstoque.delete().where(condicao).execute()
+
+    @staticmethod
+    def faltantes(venda_id: int) -> List[Tuple[str, int, int]]:
+        """
+        Itens da venda que o disponível (sem contar a própria venda) não cobre
+
+        Returns:
+            list: [(código, quantidade, disponível)]
+        """
+        return list(get_db().execute_sql(
+            'SELECT p."codigo", i."quantidade", '
+            f'p."estoque" - {_RESERVADO_POR_OUTROS} AS disponivel '
+            'FROM "itens_venda" AS i JOIN "produtos" AS p ON p."id" = i."produto_id" '
+            'WHERE i."venda_id" = ? AND i."quantidade" > disponivel',
+            (venda_id, datetime.now(), venda_id)
+        ))
+
+    @staticmethod
+    def expirar(agora: datetime = None) -> int:
+        """Apaga em lote as reservas vencidas; retorna quantas"""
+        return ReservaEstoque.delete().where(
+            ReservaEstoque.expira_em <= (agora or datetime.now())
+        ).execute()
@@ -1,11 +1,19 @@
 """
 Repositório de Vendas - Camada de Acesso aos Dados
 """
-from src.database.models import Venda, ItemVenda, Produto, Transacao
+from src.database.models import Venda, ItemVenda, Produto, Transacao, PosicaoDiario
 from src.database.connection import get_db
+from src.models.arquivo_repository import ArquivoRepository
+from src.models.leitura import VendaCompleta, carregar_venda, ler
+from src.models.outbox_repository import OutboxRepository
+from src.models.reserva_repository import ReservaEstoqueRepository
+from src.sync.registro import registrar_venda
+from src.database.diario import diario_ativo, diario_vendas
 from src.utils.logger import log_info, log_error, log_debug, log_venda
+from peewee import fn
 from decimal import Decimal
 from datetime import datetime, date
+from typing import Tuple
 
 
 class VendaRepository:
@@ -46,20 +54,24 @@ class VendaRepository:
             if quantidade <= 0:
                 raise ValueError("Quantidade deve ser maior que zero")
             
-            if produto.estoque < quantidade:
-                log_error(
-                    f"Estoque insuficiente ao adicionar {produto.codigo}",
-                    estoque_disponivel=produto.estoque,
-                    quantidade_solicitada=quantidade
-                )
-                raise ValueError(f"Estoque insuficiente. Disponível: {produto.estoque}")
-            
             # Verificar se o item já existe no carrinho
             item_existente = ItemVenda.select().where(
                 (ItemVenda.venda == venda) &
                 (ItemVenda.produto == produto)
             ).first()
             
+            # Reservar a quantidade total do item (contra o estoque menos as
+            # reservas dos outros carrinhos)
+            no_carrinho = item_existente.quantidade if item_existente else 0
+            if not ReservaEstoqueRepository.reservar(venda_id, produto_id, no_carrinho + quantidade):
+                disponivel = ReservaEstoqueRepository.disponivel(produto_id, venda_id) - no_carrinho
+                log_error(
+                    f"Estoque insuficiente ao adicionar {produto.codigo}",
+                    estoque_disponivel=disponivel,
+                    quantidade_solicitada=quantidade
+                )
+                raise ValueError(f"Estoque insuficiente. Disponível: {max(disponivel, 0)}")
+            
             if item_existente:
                 # Atualizar quantidade
                 item_existente.quantidade += quantidade
@@ -95,6 +107,7 @@ class VendaRepository:
             item = ItemVenda.get_by_id(item_id)
             venda_id = item.venda_id
             item.delete_instance()
+            ReservaEstoqueRepository.liberar(venda_id, item.produto_id)
             VendaRepository._atualizar_total_venda(venda_id)
             return True
         except ItemVenda.DoesNotExist as exc:
@@ -109,11 +122,11 @@ class VendaRepository:
             
             item = ItemVenda.get_by_id(item_id)
             
-            # Validar estoque
-            if item.produto.estoque < nova_quantidade:
-                raise ValueError(
-                    f"Estoque insuficiente. Disponível: {item.produto.estoque}"
-                )
+            # Validar estoque (reservando a nova quantidade)
+            if not ReservaEstoqueRepository.reservar(item.venda_id, item.produto_id,
+                                                     nova_quantidade):
+                disponivel = ReservaEstoqueRepository.disponivel(item.produto_id, item.venda_id)
+                raise ValueError(f"Estoque insuficiente. Disponível: {max(disponivel, 0)}")
             
             item.quantidade = nova_quantidade
             item.subtotal = nova_quantidade * item.preco_unitario
@@ -162,56 +175,29 @@ class VendaRepository:
 
     @staticmethod
     def finalizar_venda(venda_id: int, valor_pago: Decimal) -> Venda:
-        """Finaliza a venda e calcula o troco com transação ACID"""
+        """
+        Finaliza a venda e calcula o troco com transação ACID
+
+        No modo diário (DIARIO_VENDAS) só grava o registro no diário de vendas
+        e retorna; o AplicadorDiario aplica a venda no banco em seguida.
+        """
+        if diario_ativo():
+            return VendaRepository._finalizar_no_diario(venda_id, valor_pago)
+
         db = get_db()
         
         try:
-            with db.atomic():  # Transação ACID - tudo ou nada
+            # IMMEDIATE: a trava de escrita vem antes das leituras; um BEGIN comum
+            # falharia na hora ('database is locked') ao passar de leitura para escrita
+            # se outra conexão gravou no meio
+            with db.atomic('IMMEDIATE'):  # Transação ACID - tudo ou nada
                 venda = Venda.get_by_id(venda_id)
-                
-                total_final = venda.total - venda.desconto
-                
-                if valor_pago < total_final:
-                    log_venda(venda.numero, "ERRO - VALOR INSUFICIENTE", 
-                             f"Valor: {float(valor_pago):.2f}, Total: {float(total_final):.2f}")
-                    raise ValueError(
-                        f"Valor pago insuficiente. Total: R$ {float(total_final):.2f}"
-                    )
-                
-                troco = valor_pago - total_final
-                
-                # 1. Atualizar venda
-                venda.valor_pago = valor_pago
-                venda.troco = troco
-                venda.processada = 1
-                venda.save()
-                log_debug(f"Venda #{venda.numero} marcada como processada")
-                
-                # 2. Registrar transação de venda
-                total_venda = venda.total - venda.desconto
-                Transacao.create(
-                    tipo='ENTRADA',
-                    categoria='VENDA',
-                    descricao=f'Venda #{venda.numero}',
-                    valor=total_venda,
-                    data_transacao=venda.data_hora,
-                    venda=venda
-                )
-                log_debug(f"Transação financeira registrada para venda #{venda.numero}")
-                
-                # 3. Descontar estoque
-                for item in venda.itens:
-                    quantidade_anterior = item.produto.estoque
-                    item.produto.estoque -= item.quantidade
-                    item.produto.save()
-                    log_debug(
-                        f"Estoque atualizado: {item.produto.codigo} "
-                        f"{quantidade_anterior} -> {item.produto.estoque}"
-                    )
-                
-                log_venda(venda.numero, "FINALIZADA", 
-                         f"Total: R$ {float(total_venda):.2f}, Troco: R$ {float(troco):.2f}")
-                return venda
+                # Relida sob a trava: um POST repetido não baixa o estoque de novo
+                if venda.processada == 1:
+                    raise ValueError(f"Venda #{venda.numero} já foi finalizada")
+                troco = VendaRepository._calcular_troco(venda, valor_pago)
+                VendaRepository._conferir_estoque(venda)
+                return VendaRepository.aplicar_finalizacao(venda, valor_pago, troco)
                 
         except Venda.DoesNotExist as exc:
             log_error(f"Venda ID {venda_id} não encontrada ao finalizar", exc_info=True)
@@ -220,24 +206,198 @@ class VendaRepository:
             log_error(f"Erro ao finalizar venda #{venda_id}: {str(e)}", exc_info=True)
             raise
 
+    @staticmethod
+    def _calcular_troco(venda: Venda, valor_pago: Decimal) -> Decimal:
+        """Confere o valor pago e retorna o troco"""
+        total_final = venda.total - venda.desconto
+        
+        if valor_pago < total_final:
+            log_venda(venda.numero, "ERRO - VALOR INSUFICIENTE", 
+                     f"Valor: {float(valor_pago):.2f}, Total: {float(total_final):.2f}")
+            raise ValueError(
+                f"Valor pago insuficiente. Total: R$ {float(total_final):.2f}"
+            )
+        
+        return valor_pago - total_final
+
+    @staticmethod
+    def _conferir_estoque(venda: Venda):
+        """
+        Confere os itens contra o disponível antes de baixar o estoque
+
+        A reserva do carrinho pode ter vencido e as unidades terem ido para
+        outro caixa; nesse caso a venda não é finalizada.
+        """
+        faltantes = ReservaEstoqueRepository.faltantes(venda.id)
+        if faltantes:
+            detalhes = ", ".join(
+                f"{codigo} (pedido {quantidade}, disponível {max(disponivel, 0)})"
+                for codigo, quantidade, disponivel in faltantes
+            )
+            log_venda(venda.numero, "ERRO - ESTOQUE INSUFICIENTE", detalhes)
+            raise ValueError(f"Estoque insuficiente: {detalhes}")
+
+    @staticmethod
+    def aplicar_finalizacao(venda: Venda, valor_pago: Decimal, troco: Decimal) -> Venda:
+        """Grava a finalização da venda (chamar dentro de uma transação)"""
+        # 1. Atualizar venda
+        venda.valor_pago = valor_pago
+        venda.troco = troco
+        venda.processada = 1
+        venda.save()
+        log_debug(f"Venda #{venda.numero} marcada como processada")
+        
+        # 2. Registrar transação de venda
+        total_venda = venda.total - venda.desconto
+        transacao = Transacao.create(
+            tipo='ENTRADA',
+            categoria='VENDA',
+            descricao=f'Venda #{venda.numero}',
+            valor=total_venda,
+            data_transacao=venda.data_hora,
+            venda=venda
+        )
+        log_debug(f"Transação financeira registrada para venda #{venda.numero}")
+        
+        # 3. Descontar estoque (um UPDATE para todos os itens) e reler os
+        #    itens já com o estoque final
+        vendidos = (ItemVenda
+                    .select(fn.SUM(ItemVenda.quantidade))
+                    .where((ItemVenda.venda == venda.id) &
+                           (ItemVenda.produto == Produto.id)))
+        (Produto
+         .update(estoque=Produto.estoque - vendidos)
+         .where(Produto.id.in_(
+             ItemVenda.select(ItemVenda.produto).where(ItemVenda.venda == venda.id)))
+         .execute())
+        # As reservas do carrinho viram a baixa acima
+        ReservaEstoqueRepository.liberar(venda.id)
+        itens = carregar_venda(venda.id).itens
+        # Um produto pode estar em mais de uma linha: o log usa o total vendido dele
+        baixas = {}
+        for item in itens:
+            vendido, estoque = baixas.get(item.codigo_produto, (0, item.estoque_produto))
+            baixas[item.codigo_produto] = (vendido + item.quantidade, estoque)
+        for codigo, (vendido, estoque) in baixas.items():
+            log_debug(f"Estoque atualizado: {codigo} {estoque + vendido} -> {estoque}")
+        
+        # 4. Registrar para o nó central (só grava local, sem rede)
+        registrar_venda(venda, itens)
+        
+        # 5. Publicar no outbox para as integrações
+        OutboxRepository.publicar('venda.finalizada', {
+            'id': venda.id,
+            'numero': venda.numero,
+            'data_hora': venda.data_hora.isoformat(),
+            'total': f"{venda.total:.2f}",
+            'desconto': f"{venda.desconto:.2f}",
+            'forma_pagamento': venda.forma_pagamento,
+            'valor_pago': f"{valor_pago:.2f}",
+            'troco': f"{troco:.2f}",
+            'itens': [
+                {
+                    'codigo': item.codigo_produto,
+                    'quantidade': item.quantidade,
+                    'preco_unitario': f"{item.preco_unitario:.2f}",
+                    'estoque': item.estoque_produto,
+                }
+                for item in itens
+            ],
+        }, chave=venda.numero)
+        OutboxRepository.publicar('transacao.registrada',
+                                  OutboxRepository.dados_transacao(transacao),
+                                  chave=str(transacao.id))
+        
+        log_venda(venda.numero, "FINALIZADA", 
+                 f"Total: R$ {float(total_venda):.2f}, Troco: R$ {float(troco):.2f}")
+        return venda
+
+    @staticmethod
+    def conferir_finalizacao_diario(venda_id: int, valor_pago: Decimal) -> Tuple[Venda, Decimal]:
+        """
+        Conferências da finalização em modo diário, sem gravar nada
+
+        Returns:
+            tuple: (venda, troco)
+        """
+        try:
+            venda = Venda.get_by_id(venda_id)
+        except Venda.DoesNotExist as exc:
+            raise ValueError(f"Venda ID {venda_id} não encontrada") from exc
+
+        if venda.processada == 1 or VendaRepository._pendente_no_diario(venda.id):
+            raise ValueError(f"Venda #{venda.numero} já foi finalizada")
+
+        troco = VendaRepository._calcular_troco(venda, valor_pago)
+        # As reservas seguram o estoque até o AplicadorDiario aplicar a venda
+        VendaRepository._conferir_estoque(venda)
+        return venda, troco
+
+    @staticmethod
+    def _finalizar_no_diario(venda_id: int, valor_pago: Decimal) -> Venda:
+        """
+        Finalização em modo diário: valida, grava no diário (com fsync) e retorna
+
+        A venda devolvida já vem marcada como processada, mas só é gravada no
+        banco quando o AplicadorDiario processar o registro.
+        """
+        venda, troco = VendaRepository.conferir_finalizacao_diario(venda_id, valor_pago)
+        diario_vendas().anexar({
+            'venda': venda.id,
+            'valor_pago': str(valor_pago),
+            'em': datetime.now().isoformat(),
+        })
+
+        venda.valor_pago = valor_pago
+        venda.troco = troco
+        venda.processada = 1
+        log_venda(venda.numero, "FINALIZADA (DIÁRIO)",
+                 f"Total: R$ {float(venda.total - venda.desconto):.2f}, "
+                 f"Troco: R$ {float(troco):.2f}")
+        return venda
+
     @staticmethod
     def obter_venda(venda_id: int) -> Venda:
-        """Obtém uma venda específica"""
+        """Obtém uma venda específica (do arquivo mensal, se o mês foi arquivado)"""
         try:
             return Venda.get_by_id(venda_id)
         except Venda.DoesNotExist as exc:
-            raise ValueError(f"Venda ID {venda_id} não encontrada") from exc
+            arquivada = (None if get_db().in_transaction()
+                         else ArquivoRepository.obter_venda_arquivada(venda_id))
+            if arquivada is None:
+                raise ValueError(f"Venda ID {venda_id} não encontrada") from exc
+            return arquivada[0]
+
+    @staticmethod
+    def obter_venda_completa(venda_id: int) -> VendaCompleta:
+        """Venda com os itens e os produtos, carregada de uma vez"""
+        venda = carregar_venda(venda_id)
+        if venda is None:
+            raise ValueError(f"Venda ID {venda_id} não encontrada")
+        return venda
 
     @staticmethod
-    def listar_vendas_dia(data_dia: date = None) -> list:
-        """Lista todas as vendas de um dia específico"""
+    def listar_vendas_dia(data_dia: date = None, leitura: type = None) -> list:
+        """Lista todas as vendas de um dia específico (como ``leitura``, se informado)"""
         if data_dia is None:
             data_dia = date.today()
         
         inicio = datetime.combine(data_dia, datetime.min.time())
         fim = datetime.combine(data_dia, datetime.max.time())
+
+        if ArquivoRepository.meses_arquivados(inicio, fim):
+            if leitura:
+                return [leitura(*linha) for linha in ArquivoRepository.consultar(
+                    Venda, 'data_hora', inicio, fim,
+                    filtro_sql='t."processada" = 1', decrescente=True,
+                    colunas=leitura.nomes_colunas()
+                )]
+            return ArquivoRepository.consultar(
+                Venda, 'data_hora', inicio, fim,
+                filtro_sql='t."processada" = 1', decrescente=True
+            )
         
-        return list(
+        query = (
             Venda.select()
             .where(
                 (Venda.data_hora >= inicio) &
@@ -246,6 +406,7 @@ class VendaRepository:
             )
             .order_by(Venda.data_hora.desc())
         )
+        return ler(query, leitura) if leitura else list(query)
 
     @staticmethod
     def total_vendas_dia(data_dia: date = None) -> Decimal:
@@ -256,17 +417,26 @@ class VendaRepository:
         )
         return Decimal(str(total))
 
+    @staticmethod
+    def _pendente_no_diario(venda_id: int) -> bool:
+        """True se a venda foi finalizada no diário e ainda não chegou ao banco"""
+        diario = diario_vendas()
+        posicao = PosicaoDiario.get_or_none(PosicaoDiario.nome == 'vendas')
+        desde = posicao.posicao if posicao and posicao.posicao <= diario.tamanho() else 0
+        return any(dados.get('venda') == venda_id for _inicio, _fim, dados in diario.ler(desde))
+
     @staticmethod
     def cancelar_venda(venda_id: int) -> bool:
         """Cancela uma venda não processada"""
         try:
             venda = Venda.get_by_id(venda_id)
             
-            if venda.processada == 1:
+            if venda.processada == 1 or VendaRepository._pendente_no_diario(venda.id):
                 log_error(f"Tentativa de cancelar venda já processada: #{venda.numero}")
                 raise ValueError("Não é possível cancelar uma venda finalizada")
             
-            # Remover itens do carrinho
+            # Remover itens do carrinho e liberar as reservas
+            ReservaEstoqueRepository.liberar(venda.id)
             ItemVenda.delete().where(ItemVenda.venda == venda).execute()
             venda.delete_instance()
             log_venda(venda.numero, "CANCELADA", "Venda removida do sistema")
@@ -1,14 +1,34 @@
 """
 Módulo de serviços
+
+As exportações são carregadas sob demanda, para que usar um serviço não
+importe os demais (RelatorioService puxa o ReportLab).
 """
-from src.services.produto_service import ProdutoService
-from src.services.venda_service import VendaService
-from src.services.financeiro_service import FinanceiroService
-from src.services.relatorio_service import RelatorioService
-
-__all__ = [
-    "ProdutoService",
-    "VendaService",
-    "FinanceiroService",
-    "RelatorioService",
-]
+import importlib
+
+_EXPORTACOES = {
+    "ProdutoService": "src.services.produto_service",
+    "VendaService": "src.services.venda_service",
+    "FinanceiroService": "src.services.financeiro_service",
+    "RelatorioService": "src.services.relatorio_service",
+    "RelatorioLoteService": "src.services.relatorio_lote_service",
+    "ImportacaoService": "src.services.importacao_service",
+    "EntradaMercadoriaService": "src.services.entrada_service",
+    "ReajusteService": "src.services.reajuste_service",
+    "ArquivoService": "src.services.arquivo_service",
+    "AplicadorDiario": "src.services.diario_service",
+    "OutboxService": "src.services.outbox_service",
+    "ProdutoServiceAsync": "src.services.assincrono",
+    "VendaServiceAsync": "src.services.assincrono",
+    "FinanceiroServiceAsync": "src.services.assincrono",
+}
+
+__all__ = list(_EXPORTACOES)
+
+
+def __getattr__(nome):
+    if nome in _EXPORTACOES:
+        valor = getattr(importlib.import_module(_EXPORTACOES[nome]), nome)
+        globals()[nome] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
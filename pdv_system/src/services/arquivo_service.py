@@ -0,0 +1,116 @@
+"""
+Serviço de Arquivo - Move meses fechados para arquivos mensais
+
+Um mês pode ser arquivado quando já terminou e todos os dias com movimento
+têm FechamentoDia. Depois de arquivado, as consultas por período
+(listar_vendas_dia, listar_transacoes_periodo, relatórios) e por id
+(obter_venda, reimpressão de cupom) leem o arquivo automaticamente.
+"""
+from src.models.arquivo_repository import ArquivoRepository
+from src.database.arquivo import nome_mes
+from src.utils.logger import log_info, log_error
+from datetime import date
+from typing import Dict, List
+
+
+class ArquivoService:
+    """Serviço de arquivamento mensal"""
+
+    def __init__(self):
+        self.repo = ArquivoRepository()
+
+    def verificar_mes(self, ano: int, mes: int) -> List[str]:
+        """
+        Motivos pelos quais o mês ainda não pode ser arquivado
+
+        Returns:
+            list: Vazia se o mês pode ser arquivado
+        """
+        hoje = date.today()
+        if (ano, mes) >= (hoje.year, hoje.month):
+            return [f"O mês {nome_mes(ano, mes)} ainda não terminou"]
+
+        pendentes = self.repo.dias_sem_fechamento(ano, mes)
+        return [f"Dia {d.strftime('%d/%m/%Y')} sem fechamento" for d in pendentes]
+
+    def arquivar_mes(self, ano: int, mes: int) -> Dict:
+        """Arquiva um mês fechado"""
+        motivos = self.verificar_mes(ano, mes)
+        if motivos:
+            raise ValueError(
+                f"Erro ao arquivar {nome_mes(ano, mes)}: {'; '.join(motivos)}"
+            )
+
+        try:
+            resultado = self.repo.arquivar_mes(ano, mes)
+        except Exception as e:
+            log_error(f"Erro ao arquivar {nome_mes(ano, mes)}: {str(e)}", exc_info=True)
+            raise ValueError(f"Erro ao arquivar {nome_mes(ano, mes)}: {str(e)}") from e
+
+        log_info(
+            f"Mês {resultado['mes']} arquivado: {resultado['vendas']} venda(s), "
+            f"{resultado['itens']} item(ns), {resultado['transacoes']} transação(ões)"
+        )
+        return resultado
+
+    def arquivar_meses_fechados(self) -> Dict:
+        """
+        Arquiva todos os meses elegíveis do banco principal
+
+        Returns:
+            dict: {'arquivados': [resultado], 'ignorados': {mes: [motivos]}}
+        """
+        arquivados, ignorados = [], {}
+
+        for ano, mes in self.repo.meses_com_movimento():
+            motivos = self.verificar_mes(ano, mes)
+            if motivos:
+                ignorados[nome_mes(ano, mes)] = motivos
+                continue
+            try:
+                arquivados.append(self.arquivar_mes(ano, mes))
+            except ValueError as e:
+                ignorados[nome_mes(ano, mes)] = [str(e)]
+
+        return {'arquivados': arquivados, 'ignorados': ignorados}
+
+    def listar_arquivos(self) -> List[Dict]:
+        """Lista os meses arquivados"""
+        return [
+            {
+                'mes': a.mes,
+                'caminho': a.caminho,
+                'quantidade_vendas': a.quantidade_vendas,
+                'quantidade_itens': a.quantidade_itens,
+                'quantidade_transacoes': a.quantidade_transacoes,
+                'arquivado_em': a.arquivado_em.isoformat(),
+            }
+            for a in self.repo.listar_arquivos()
+        ]
+
+
+if __name__ == '__main__':
+    import argparse
+    from src.bootstrap import inicializar
+
+    parser = argparse.ArgumentParser(description="Arquiva meses fechados")
+    parser.add_argument('--mes', help="Mês a arquivar (AAAA-MM); padrão: todos os elegíveis")
+    parser.add_argument('--listar', action='store_true', help="Só lista os arquivos")
+    args = parser.parse_args()
+
+    inicializar()
+    servico = ArquivoService()
+
+    if args.listar:
+        for arquivo in servico.listar_arquivos():
+            print(f"{arquivo['mes']}: {arquivo['quantidade_vendas']} vendas, "
+                  f"{arquivo['quantidade_transacoes']} transações - {arquivo['caminho']}")
+    elif args.mes:
+        ano, mes = (int(p) for p in args.mes.split('-'))
+        print(servico.arquivar_mes(ano, mes))
+    else:
+        resultado = servico.arquivar_meses_fechados()
+        for item in resultado['arquivados']:
+            print(f"✓ {item['mes']}: {item['vendas']} vendas, {item['transacoes']} transações")
+        for mes, motivos in resultado['ignorados'].items():
+            print(f"- {mes}: {'; '.join(motivos)}")
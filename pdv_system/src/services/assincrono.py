@@ -0,0 +1,117 @@
+"""
+Fachada assíncrona dos serviços, para a interface Flet
+
+Os métodos têm os mesmos nomes curtos usados pela interface e delegam ao
+serviço síncrono pelo ``ExecutorBanco``: leituras no pool de leitura,
+gravações na thread de escrita. O loop de eventos do Flet nunca bloqueia no
+SQLite.
+
+Uso:
+    produtos = ProdutoServiceAsync()
+    encontrados = await produtos.buscar("arroz")
+
+    vendas = VendaServiceAsync()
+    venda = await vendas.finalizar(venda_id, valor_pago)
+
+Erros: os mesmos ``ValueError`` dos serviços, mais ``TimeoutError`` quando o
+banco está ocupado (ver ``src.database.executor``).
+"""
+from datetime import date
+from typing import Dict, List, Tuple
+
+from src.database.executor import ExecutorBanco, executor_banco
+from src.models.leitura import ProdutoLeitura, TransacaoLeitura, VendaLeitura
+from src.services.financeiro_service import FinanceiroService
+from src.services.produto_service import ProdutoService
+from src.services.venda_service import VendaService
+
+
+class ProdutoServiceAsync:
+    """Consultas de produtos sem bloquear a interface"""
+
+    def __init__(self, servico: ProdutoService = None, executor: ExecutorBanco = None):
+        self.servico = servico or ProdutoService()
+        self.executor = executor or executor_banco()
+
+    async def buscar(self, termo: str) -> List[ProdutoLeitura]:
+        return await self.executor.ler(self.servico.buscar_produtos, termo)
+
+    async def obter_por_codigo(self, codigo: str) -> Dict:
+        return await self.executor.ler(self.servico.obter_produto_por_codigo, codigo)
+
+    async def listar(self) -> List[ProdutoLeitura]:
+        return await self.executor.ler(self.servico.listar_produtos)
+
+    async def listar_paginado(self, **kwargs) -> Dict:
+        """Ver ``ProdutoService.listar_produtos_paginado``"""
+        return await self.executor.ler(self.servico.listar_produtos_paginado, **kwargs)
+
+
+class VendaServiceAsync:
+    """Operações de venda sem bloquear a interface"""
+
+    def __init__(self, servico: VendaService = None, executor: ExecutorBanco = None):
+        self.servico = servico or VendaService()
+        self.executor = executor or executor_banco()
+
+    async def iniciar(self, forma_pagamento: str, observacoes: str = None) -> Dict:
+        return await self.executor.escrever(self.servico.iniciar_venda,
+                                            forma_pagamento, observacoes)
+
+    async def adicionar_item(self, venda_id: int, codigo: str, quantidade: int) -> Dict:
+        return await self.executor.escrever(self.servico.adicionar_item_carrinho,
+                                            venda_id, codigo, quantidade)
+
+    async def reservar(self, venda_id: int, produto_id: int, quantidade: int) -> Dict:
+        return await self.executor.escrever(self.servico.reservar_item,
+                                            venda_id, produto_id, quantidade)
+
+    async def liberar(self, venda_id: int, produto_id: int) -> bool:
+        return await self.executor.escrever(self.servico.liberar_item, venda_id, produto_id)
+
+    async def remover_item(self, item_id: int) -> bool:
+        return await self.executor.escrever(self.servico.remover_item_carrinho, item_id)
+
+    async def atualizar_quantidade(self, item_id: int, quantidade: int) -> Dict:
+        return await self.executor.escrever(self.servico.atualizar_quantidade_item,
+                                            item_id, quantidade)
+
+    async def aplicar_desconto(self, venda_id: int, desconto: float) -> Dict:
+        return await self.executor.escrever(self.servico.aplicar_desconto, venda_id, desconto)
+
+    async def finalizar(self, venda_id: int, valor_pago: float) -> Dict:
+        return await self.executor.escrever(self.servico.finalizar_venda, venda_id, valor_pago)
+
+    async def finalizar_carrinho(self, venda_id: int, itens: List[Tuple[str, int]],
+                                 desconto: float, valor_pago: float) -> Dict:
+        """Itens, desconto e finalização numa só gravação (ver ``VendaService``)"""
+        return await self.executor.escrever(self.servico.finalizar_carrinho,
+                                            venda_id, itens, desconto, valor_pago)
+
+    async def cancelar(self, venda_id: int) -> bool:
+        return await self.executor.escrever(self.servico.cancelar_venda, venda_id)
+
+    async def carrinho(self, venda_id: int) -> Dict:
+        return await self.executor.ler(self.servico.obter_carrinho, venda_id)
+
+    async def listar_dia(self, data_dia: date = None) -> List[VendaLeitura]:
+        return await self.executor.ler(self.servico.listar_vendas_dia, data_dia)
+
+
+class FinanceiroServiceAsync:
+    """Consultas e lançamentos financeiros sem bloquear a interface"""
+
+    def __init__(self, servico: FinanceiroService = None, executor: ExecutorBanco = None):
+        self.servico = servico or FinanceiroService()
+        self.executor = executor or executor_banco()
+
+    async def resumo_dia(self, data_dia: date = None) -> Dict:
+        return await self.executor.ler(self.servico.obter_resumo_dia, data_dia)
+
+    async def registrar_despesa(self, descricao: str, valor: float,
+                                observacoes: str = None) -> Dict:
+        return await self.executor.escrever(self.servico.registrar_despesa,
+                                            descricao, valor, observacoes)
+
+    async def listar_transacoes_dia(self, data_dia: date = None) -> List[TransacaoLeitura]:
+        return await self.executor.ler(self.servico.listar_transacoes_dia, data_dia)
@@ -0,0 +1,383 @@
+"""
+Serviço de Backup - Cópia online do banco com a API de backup do SQLite
+
+Copiar ``loja.db`` com o sistema aberto não é seguro em WAL (o arquivo -wal
+tem páginas ainda não gravadas no banco). ``sqlite3.Connection.backup`` copia
+uma página consistente do banco em passos de ``paginas_por_passo`` páginas,
+liberando o banco entre os passos (``pausa`` segundos), então o caixa nunca
+fica bloqueado por muito tempo.
+
+Se outra conexão gravar no banco durante a cópia, o SQLite recomeça o backup;
+após ``max_reinicios`` recomeços o backup é abortado e pode ser tentado de novo
+num momento mais calmo.
+
+Os arquivos mensais (``data/arquivo/loja_AAAA_MM.db``, única cópia das vendas
+antigas) vão para ``<destino>/arquivo/`` a cada backup em que mudaram desde o
+último (tamanho e data de modificação anotados em ``manifesto.json``). Não
+entram na rotação: cada mês tem sempre a cópia mais recente.
+
+Uso:
+    python -m src.services.backup_service [backup|listar|verificar ARQ|restaurar ARQ]
+"""
+from src.database.arquivo import TABELAS_ARQUIVADAS
+from src.database.cache import cache_consultas
+from src.database.connection import DB_PATH, BASE_DIR
+from src.utils.logger import log_info, log_error, log_warning
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+import gzip
+import json
+import shutil
+import sqlite3
+import threading
+
+BACKUP_DIR = BASE_DIR / "backups"
+
+# Tabelas que um backup precisa ter para ser restaurado
+TABELAS_OBRIGATORIAS = ['produtos', 'vendas', 'itens_venda', 'transacoes', 'fechamento_dia']
+
+
+class BackupAbortado(Exception):
+    """Backup interrompido por excesso de recomeços"""
+
+
+class BackupService:
+    """Serviço de backup e restauração do banco de dados"""
+
+    PREFIXO = "loja_"
+
+    def __init__(self, destino: Path = None, paginas_por_passo: int = 64,
+                 pausa: float = 0.005, manter: int = 7, compactar: bool = True,
+                 max_reinicios: int = 20, banco: Path = None, arquivos: Path = None):
+        self.destino = Path(destino) if destino else BACKUP_DIR
+        self.paginas_por_passo = paginas_por_passo
+        self.pausa = pausa
+        self.manter = manter
+        self.compactar = compactar
+        self.max_reinicios = max_reinicios
+        self.banco = Path(banco) if banco else DB_PATH
+        # Arquivos mensais ficam ao lado do banco (ver src.database.arquivo)
+        self.arquivos = Path(arquivos) if arquivos else self.banco.parent / "arquivo"
+
+    def executar_backup(self) -> Dict:
+        """
+        Faz o backup, confere a integridade, compacta e aplica a rotação
+
+        Returns:
+            dict: {'arquivo', 'tamanho', 'paginas', 'reinicios', 'segundos',
+                   'removidos', 'arquivos_mensais' (copiados agora)}
+        """
+        self.destino.mkdir(parents=True, exist_ok=True)
+        carimbo = datetime.now().strftime('%Y%m%d_%H%M%S')
+        temporario = self.destino / f"{self.PREFIXO}{carimbo}.db.parcial"
+        inicio = datetime.now()
+
+        try:
+            estatisticas = self._copiar(temporario)
+
+            problema = self._verificar_integridade(temporario)
+            if problema:
+                raise ValueError(f"Backup com falha de integridade: {problema}")
+
+            final = self._gravar(temporario, self.destino / f"{self.PREFIXO}{carimbo}.db")
+            arquivos_mensais = self._copiar_arquivos_mensais()
+        except BackupAbortado as e:
+            log_warning(f"Backup abortado: {str(e)}")
+            raise ValueError(f"Erro ao fazer backup: {str(e)}") from e
+        except Exception as e:
+            log_error(f"Erro ao fazer backup: {str(e)}", exc_info=True)
+            raise ValueError(f"Erro ao fazer backup: {str(e)}") from e
+        finally:
+            if temporario.exists():
+                temporario.unlink()
+
+        removidos = self.rotacionar()
+        resultado = {
+            'arquivo': str(final),
+            'tamanho': final.stat().st_size,
+            'paginas': estatisticas['paginas'],
+            'reinicios': estatisticas['reinicios'],
+            'segundos': round((datetime.now() - inicio).total_seconds(), 2),
+            'removidos': removidos,
+            'arquivos_mensais': arquivos_mensais,
+        }
+        log_info(
+            f"Backup concluído: {final.name} ({resultado['tamanho']} bytes, "
+            f"{resultado['segundos']}s, {resultado['reinicios']} recomeço(s), "
+            f"{len(arquivos_mensais)} arquivo(s) mensal(is))"
+        )
+        return resultado
+
+    def _gravar(self, temporario: Path, final: Path) -> Path:
+        """Move a cópia conferida para ``final`` (compactando em ``final``.gz)"""
+        if self.compactar:
+            final = final.with_name(final.name + '.gz')
+            with open(temporario, 'rb') as origem, gzip.open(final, 'wb', compresslevel=6) as saida:
+                shutil.copyfileobj(origem, saida, 1024 * 1024)
+            temporario.unlink()
+        else:
+            temporario.replace(final)
+        return final
+
+    def _copiar_arquivos_mensais(self) -> List[str]:
+        """Copia os arquivos mensais novos ou alterados desde o último backup"""
+        if not self.arquivos.exists():
+            return []
+
+        destino = self.destino / "arquivo"
+        caminho_manifesto = destino / "manifesto.json"
+        manifesto = (json.loads(caminho_manifesto.read_text(encoding='utf-8'))
+                     if caminho_manifesto.exists() else {})
+
+        copiados = []
+        for origem in sorted(self.arquivos.glob(f"{self.PREFIXO}*.db")):
+            situacao = origem.stat()
+            assinatura = [situacao.st_size, situacao.st_mtime_ns]
+            anterior = manifesto.get(origem.name)
+            if anterior and anterior['assinatura'] == assinatura and Path(anterior['copia']).exists():
+                continue
+
+            destino.mkdir(parents=True, exist_ok=True)
+            temporario = destino / f"{origem.name}.parcial"
+            try:
+                self._copiar(temporario, origem)
+                problema = self._verificar_integridade(temporario, TABELAS_ARQUIVADAS)
+                if problema:
+                    raise ValueError(f"Cópia de {origem.name} com falha de integridade: {problema}")
+                final = self._gravar(temporario, destino / origem.name)
+            finally:
+                if temporario.exists():
+                    temporario.unlink()
+
+            manifesto[origem.name] = {'assinatura': assinatura, 'copia': str(final)}
+            caminho_manifesto.write_text(json.dumps(manifesto, indent=2), encoding='utf-8')
+            copiados.append(str(final))
+        return copiados
+
+    def _copiar(self, destino: Path, origem_banco: Path = None) -> Dict:
+        """Copia o banco (ou ``origem_banco``) em passos pequenos com a API de backup"""
+        estatisticas = {'paginas': 0, 'reinicios': 0}
+        restantes_antes = None
+
+        def progresso(_status, restantes, total):
+            nonlocal restantes_antes
+            # As páginas restantes só aumentam quando o SQLite recomeça a cópia
+            if restantes_antes is not None and restantes > restantes_antes:
+                estatisticas['reinicios'] += 1
+                if estatisticas['reinicios'] > self.max_reinicios:
+                    raise BackupAbortado(
+                        f"banco alterado durante a cópia {estatisticas['reinicios']} vezes"
+                    )
+            restantes_antes = restantes
+            estatisticas['paginas'] = total
+
+        origem = sqlite3.connect(f"file:{origem_banco or self.banco}?mode=ro", uri=True)
+        saida = sqlite3.connect(str(destino))
+        try:
+            origem.backup(saida, pages=self.paginas_por_passo,
+                          progress=progresso, sleep=self.pausa)
+        finally:
+            saida.close()
+            origem.close()
+
+        return estatisticas
+
+    @staticmethod
+    def _verificar_integridade(caminho: Path, tabelas_esperadas: List[str] = None) -> str:
+        """
+        Roda integrity_check e confere as tabelas obrigatórias (ou ``tabelas_esperadas``)
+
+        Returns:
+            str: Descrição do problema, ou '' se o banco está íntegro
+        """
+        conexao = sqlite3.connect(f"file:{caminho}?mode=ro", uri=True)
+        try:
+            resultado = [linha[0] for linha in conexao.execute("PRAGMA integrity_check")]
+            if resultado != ['ok']:
+                return '; '.join(resultado[:5])
+
+            tabelas = {
+                linha[0] for linha in
+                conexao.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+            faltando = [t for t in (tabelas_esperadas or TABELAS_OBRIGATORIAS) if t not in tabelas]
+            if faltando:
+                return f"tabelas ausentes: {', '.join(faltando)}"
+            return ''
+        except sqlite3.DatabaseError as e:
+            return str(e)
+        finally:
+            conexao.close()
+
+    def rotacionar(self) -> List[str]:
+        """Remove os backups mais antigos, mantendo os ``manter`` mais recentes"""
+        if self.manter <= 0:
+            return []
+
+        removidos = []
+        for arquivo in self.listar_backups()[self.manter:]:
+            Path(arquivo['arquivo']).unlink()
+            removidos.append(arquivo['arquivo'])
+        return removidos
+
+    def listar_backups(self) -> List[Dict]:
+        """Lista os backups, mais recente primeiro"""
+        if not self.destino.exists():
+            return []
+
+        arquivos = [
+            a for a in self.destino.glob(f"{self.PREFIXO}*")
+            if a.name.endswith('.db') or a.name.endswith('.db.gz')
+        ]
+        return [
+            {
+                'arquivo': str(a),
+                'tamanho': a.stat().st_size,
+                'criado_em': datetime.fromtimestamp(a.stat().st_mtime).isoformat(),
+                'compactado': a.suffix == '.gz',
+            }
+            for a in sorted(arquivos, key=lambda a: a.name, reverse=True)
+        ]
+
+    def verificar(self, arquivo: Path) -> str:
+        """Confere um backup (descompactando se preciso); '' se estiver íntegro"""
+        arquivo = Path(arquivo)
+        temporario = self._descompactar(arquivo)
+        try:
+            return self._verificar_integridade(temporario)
+        finally:
+            if temporario != arquivo:
+                temporario.unlink()
+
+    def restaurar(self, arquivo: Path) -> Dict:
+        """
+        Restaura um backup sobre o banco atual
+
+        O backup é conferido antes; o banco atual é salvo como
+        ``pre_restauracao_*.db`` e então sobrescrito com a API de backup (que
+        trata corretamente o arquivo WAL). Feche o sistema antes de restaurar.
+
+        Returns:
+            dict: {'restaurado': str, 'copia_anterior': str}
+        """
+        arquivo = Path(arquivo)
+        if not arquivo.exists():
+            raise ValueError(f"Backup não encontrado: {arquivo}")
+
+        temporario = self._descompactar(arquivo)
+        try:
+            problema = self._verificar_integridade(temporario)
+            if problema:
+                raise ValueError(f"Backup inválido, restauração cancelada: {problema}")
+
+            copia_anterior = None
+            if self.banco.exists():
+                self.destino.mkdir(parents=True, exist_ok=True)
+                copia_anterior = self.destino / (
+                    f"pre_restauracao_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+                )
+                self._copiar(copia_anterior)
+
+            origem = sqlite3.connect(f"file:{temporario}?mode=ro", uri=True)
+            saida = sqlite3.connect(str(self.banco))
+            try:
+                origem.backup(saida)
+            finally:
+                saida.close()
+                origem.close()
+        finally:
+            if temporario != arquivo:
+                temporario.unlink()
+
+        # As versões do cache de consultas voltaram junto com o banco restaurado
+        cache_consultas.invalidar()
+        log_info(f"Banco restaurado a partir de {arquivo.name}")
+        return {
+            'restaurado': str(arquivo),
+            'copia_anterior': str(copia_anterior) if copia_anterior else None,
+        }
+
+    def _descompactar(self, arquivo: Path) -> Path:
+        """Descompacta um .gz para um arquivo temporário ao lado dele"""
+        if arquivo.suffix != '.gz':
+            return arquivo
+
+        temporario = arquivo.with_name(arquivo.name[:-3] + '.verificacao')
+        with gzip.open(arquivo, 'rb') as origem, open(temporario, 'wb') as saida:
+            shutil.copyfileobj(origem, saida, 1024 * 1024)
+        return temporario
+
+
+class AgendadorBackup:
+    """Executa backups periódicos numa thread em segundo plano"""
+
+    def __init__(self, intervalo_horas: float, servico: BackupService = None):
+        self.intervalo = intervalo_horas * 3600
+        self.servico = servico or BackupService()
+        self.ultimo_resultado = None
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        """Inicia a thread (o primeiro backup acontece após um intervalo)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="backup", daemon=True)
+        self._thread.start()
+        log_info(f"Backup automático a cada {self.intervalo / 3600:g}h")
+
+    def parar(self, timeout: float = 5):
+        """Sinaliza a thread para parar e aguarda"""
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.ultimo_resultado = self.servico.executar_backup()
+            except ValueError:
+                # Já registrado no log; tenta de novo no próximo intervalo
+                pass
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backup online do banco de dados")
+    parser.add_argument('comando', nargs='?', default='backup',
+                        choices=['backup', 'listar', 'verificar', 'restaurar', 'agendar'])
+    parser.add_argument('arquivo', nargs='?', help="Backup para verificar/restaurar")
+    parser.add_argument('--destino', help="Diretório dos backups")
+    parser.add_argument('--manter', type=int, default=7)
+    parser.add_argument('--paginas', type=int, default=64, help="Páginas por passo")
+    parser.add_argument('--sem-compactar', action='store_true')
+    parser.add_argument('--intervalo-horas', type=float, default=4, help="Para 'agendar'")
+    args = parser.parse_args()
+
+    servico = BackupService(destino=args.destino, paginas_por_passo=args.paginas,
+                            manter=args.manter, compactar=not args.sem_compactar)
+
+    if args.comando == 'backup':
+        print(servico.executar_backup())
+    elif args.comando == 'listar':
+        for backup in servico.listar_backups():
+            print(f"{backup['criado_em']}  {backup['tamanho']:>12}  {backup['arquivo']}")
+    elif args.comando in ('verificar', 'restaurar'):
+        if not args.arquivo:
+            parser.error(f"informe o arquivo para '{args.comando}'")
+        if args.comando == 'verificar':
+            problema = servico.verificar(args.arquivo)
+            print(f"❌ {problema}" if problema else "✅ Backup íntegro")
+        else:
+            print(servico.restaurar(args.arquivo))
+    else:
+        agendador = AgendadorBackup(args.intervalo_horas, servico)
+        servico.executar_backup()
+        agendador.iniciar()
+        try:
+            agendador._thread.join()
+        except KeyboardInterrupt:
+            agendador.parar()
@@ -0,0 +1,222 @@
+"""
+Serviço do Diário de Vendas - Aplica no banco as vendas finalizadas pelo diário
+
+Os registros são aplicados em lotes: uma transação por lote, com um savepoint
+por venda. Se uma venda falha, as anteriores do lote são confirmadas e a
+aplicação para nela: a posição não passa do registro com erro, que é tentado
+de novo no próximo ciclo (o diário não é zerado enquanto ele não entrar). A
+posição aplicada é gravada na mesma transação, então cada registro é aplicado
+uma única vez; além disso uma venda já processada é ignorada, o que torna
+seguro reaplicar o diário.
+
+O evento ``venda.finalizada`` das vendas do diário é publicado aqui, depois do
+commit do lote, para o dashboard somar a venda junto com o banco.
+
+Com tudo aplicado o diário é zerado, mas só depois que a posição 0 foi
+gravada e levada ao disco; uma queda entre as duas coisas faz o diário ser
+reaplicado inteiro, o que é seguro pelo motivo acima.
+
+Na inicialização, ``recuperar()`` corta um registro incompleto no fim do
+arquivo e aplica o que ficou pendente antes de o caixa abrir.
+
+Uso:
+    python -m src.services.diario_service [--status]
+"""
+from src.database.connection import get_db
+from src.database.diario import Diario, diario_vendas
+from src.database.models import Venda, PosicaoDiario
+from src.models.venda_repository import VendaRepository
+from src.utils.eventos import barramento
+from src.utils.logger import log_info, log_error, log_warning
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional
+import threading
+
+
+class AplicadorDiario:
+    """Aplica os registros do diário de vendas no SQLite"""
+
+    NOME = 'vendas'
+
+    def __init__(self, diario: Diario = None, tamanho_lote: int = 50,
+                 intervalo_segundos: float = 0.25):
+        self.diario = diario or diario_vendas()
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo_segundos
+        self._posicao = None
+        self._parar = threading.Event()
+        self._thread = None
+
+    def posicao(self) -> int:
+        """Bytes do diário já aplicados"""
+        if self._posicao is None:
+            registro = PosicaoDiario.get_or_none(PosicaoDiario.nome == self.NOME)
+            self._posicao = registro.posicao if registro else 0
+        return self._posicao
+
+    def _gravar_posicao(self, posicao: int):
+        (PosicaoDiario
+         .insert(nome=self.NOME, posicao=posicao, atualizado_em=datetime.now())
+         .on_conflict(conflict_target=[PosicaoDiario.nome],
+                      preserve=[PosicaoDiario.posicao, PosicaoDiario.atualizado_em])
+         .execute())
+
+    def pendente(self) -> bool:
+        return self.diario.tamanho() != self.posicao()
+
+    def aplicar_pendentes(self) -> Dict:
+        """
+        Aplica tudo o que está no diário depois da posição gravada
+
+        Returns:
+            dict: {'aplicados', 'ignorados', 'posicao'}
+        """
+        resultado = {'aplicados': 0, 'ignorados': 0}
+
+        if self.posicao() > self.diario.tamanho():
+            # Arquivo trocado ou apagado por fora: relê desde o começo
+            self._posicao = 0
+
+        lote, completo = [], True
+        for _inicio, fim, dados in self.diario.ler(self.posicao()):
+            lote.append((fim, dados))
+            if len(lote) >= self.tamanho_lote:
+                completo = self._aplicar_lote(lote, resultado)
+                lote = []
+                if not completo:
+                    break
+        if lote and completo:
+            self._aplicar_lote(lote, resultado)
+
+        if self.posicao() and self.diario.esvaziar_se(self.posicao(), self._zerar_posicao):
+            self._posicao = 0
+
+        resultado['posicao'] = self.posicao()
+        return resultado
+
+    def _zerar_posicao(self) -> bool:
+        """
+        Grava a posição 0 no disco antes de o diário ser zerado
+
+        Em WAL com synchronous=NORMAL o commit não faz fsync; o checkpoint
+        FULL copia o WAL para o banco e sincroniza os dois. Se o checkpoint não
+        completa (leitor segurando um snapshot antigo), a posição volta ao
+        valor anterior e o diário fica para o próximo ciclo.
+        """
+        self._gravar_posicao(0)
+        ocupado, quadros, copiados = get_db().execute_sql(
+            "PRAGMA wal_checkpoint(FULL)"
+        ).fetchone()
+        if ocupado or quadros != copiados:
+            self._gravar_posicao(self._posicao)
+            return False
+        return True
+
+    def _aplicar_lote(self, lote: list, resultado: Dict) -> bool:
+        """
+        Aplica um lote até o fim ou até o primeiro registro com erro
+
+        Returns:
+            bool: False se parou num registro com erro (fica para o próximo ciclo)
+        """
+        db = get_db()
+        aplicadas = []
+        ignorados = 0
+        aplicado_ate = None
+
+        with db.atomic('IMMEDIATE'):
+            for fim, dados in lote:
+                try:
+                    with db.atomic():  # savepoint por venda
+                        venda = self.aplicar_registro(dados)
+                except Exception as e:
+                    log_error(f"Registro do diário não aplicado, tentando no próximo ciclo "
+                              f"({dados}): {str(e)}", exc_info=True)
+                    break
+                if venda is not None:
+                    aplicadas.append(venda)
+                else:
+                    ignorados += 1
+                aplicado_ate = fim
+            if aplicado_ate is not None:
+                self._gravar_posicao(aplicado_ate)
+
+        if aplicado_ate is not None:
+            self._posicao = aplicado_ate
+        resultado['aplicados'] += len(aplicadas)
+        resultado['ignorados'] += ignorados
+
+        for venda in aplicadas:
+            barramento.publicar('venda.finalizada', valor=venda.total - venda.desconto,
+                                data_hora=venda.data_hora)
+
+        return aplicado_ate == lote[-1][0]
+
+    @staticmethod
+    def aplicar_registro(dados: Dict) -> Optional[Venda]:
+        """Aplica um registro; None se a venda não existe ou já foi processada"""
+        venda = Venda.get_or_none(Venda.id == dados['venda'])
+        if venda is None:
+            log_warning(f"Diário: venda ID {dados['venda']} não encontrada")
+            return None
+        if venda.processada == 1:
+            return None
+
+        valor_pago = Decimal(dados['valor_pago'])
+        troco = valor_pago - (venda.total - venda.desconto)
+        return VendaRepository.aplicar_finalizacao(venda, valor_pago, troco)
+
+    def recuperar(self) -> Dict:
+        """Corta um registro incompleto e aplica os pendentes (inicialização)"""
+        descartados = self.diario.reparar(min(self.posicao(), self.diario.tamanho()))
+        if descartados:
+            log_warning(f"Diário de vendas: {descartados} byte(s) incompletos descartados")
+
+        resultado = self.aplicar_pendentes()
+        if resultado['aplicados'] or resultado['ignorados']:
+            log_info(
+                f"Diário de vendas recuperado: {resultado['aplicados']} venda(s) aplicadas, "
+                f"{resultado['ignorados']} ignorada(s)"
+            )
+        return resultado
+
+    def iniciar(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="diario", daemon=True)
+        self._thread.start()
+        log_info("Aplicador do diário de vendas iniciado")
+
+    def parar(self, timeout: float = 5):
+        """Para a thread e aplica o que restou"""
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self.aplicar_pendentes()
+        self.diario.fechar()
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                if self.pendente():
+                    self.aplicar_pendentes()
+            except Exception as e:
+                log_error(f"Erro ao aplicar o diário de vendas: {str(e)}", exc_info=True)
+
+
+if __name__ == '__main__':
+    import argparse
+    from src.bootstrap import inicializar
+
+    parser = argparse.ArgumentParser(description="Diário de vendas")
+    parser.add_argument('--status', action='store_true', help="Só mostra a posição")
+    args = parser.parse_args()
+
+    inicializar()
+    aplicador = AplicadorDiario()
+    if not args.status:
+        print(aplicador.recuperar())
+    print(f"Diário: {aplicador.diario.caminho} ({aplicador.diario.tamanho()} bytes), "
+          f"aplicado até {aplicador.posicao()}")
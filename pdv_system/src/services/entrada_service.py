@@ -0,0 +1,198 @@
+"""
+Serviço de Entrada de Mercadoria - Recebimento de entregas de fornecedor
+
+Uma entrega (manual ou arquivo CSV/XLSX da nota) é aplicada inteira numa
+transação pelo EntradaMercadoriaRepository: ou todas as linhas entram no
+estoque, ou nenhuma. Colunas do arquivo: ``codigo``, ``quantidade`` e,
+opcionalmente, ``preco_custo`` (novo custo do produto).
+
+Uso pela linha de comando:
+    python -m src.services.entrada_service entrega.csv --documento NF-1234
+        [--fornecedor "Distribuidora X"] [--sem-despesa]
+"""
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Tuple
+import sys
+
+from src.models.entrada_repository import EntradaMercadoriaRepository, LinhaEntrada
+from src.services.importacao_service import ImportacaoService
+from src.utils.logger import log_info, log_error
+from src.utils.eventos import barramento
+from src.utils.validadores import ValidadorUtil
+
+
+class _LeitorEntrega(ImportacaoService):
+    """Leitura de CSV/XLSX da importação de catálogo, com as colunas da entrega"""
+    COLUNAS_OBRIGATORIAS = ['codigo', 'quantidade']
+
+
+class EntradaMercadoriaService:
+    """Serviço de recebimento de mercadorias"""
+
+    def __init__(self):
+        self.entrada_repo = EntradaMercadoriaRepository()
+
+    def registrar_entrada(self, documento: str, itens: List[Dict], fornecedor: str = '',
+                          lancar_despesa: bool = True, observacoes: str = None) -> Dict:
+        """
+        Registra uma entrega
+
+        Args:
+            itens: [{'codigo', 'quantidade', 'preco_custo' (opcional)}]
+            lancar_despesa: Lança o custo total da entrega como despesa
+        """
+        try:
+            documento = (documento or '').strip()
+            if not documento:
+                raise ValueError("Informe o número do documento")
+
+            linhas = []
+            for numero, item in enumerate(itens, start=1):
+                linha, motivo = self._converter_linha(item)
+                if motivo:
+                    raise ValueError(f"Item {numero}: {motivo}")
+                linhas.append(linha)
+
+            return self._registrar(documento, linhas, fornecedor, lancar_despesa, observacoes)
+        except Exception as e:
+            raise ValueError(f"Erro ao registrar entrada: {str(e)}") from e
+
+    def importar_arquivo(self, caminho: str, documento: str = None, fornecedor: str = '',
+                         lancar_despesa: bool = True, observacoes: str = None) -> Dict:
+        """
+        Registra a entrega de um arquivo CSV/XLSX (documento padrão: nome do arquivo)
+
+        Qualquer linha inválida impede a entrada inteira; o erro lista as
+        primeiras linhas rejeitadas.
+        """
+        try:
+            caminho = Path(caminho)
+            if not caminho.exists():
+                raise ValueError(f"Arquivo não encontrado: {caminho}")
+
+            leitor = _LeitorEntrega()
+            linhas, rejeitadas = [], []
+            for numero, item in enumerate(leitor.ler_arquivo(caminho), start=2):
+                linha, motivo = self._converter_linha(item)
+                if motivo:
+                    rejeitadas.append(f"linha {numero}: {motivo}")
+                else:
+                    linhas.append(linha)
+
+            if rejeitadas:
+                mais = f" (e mais {len(rejeitadas) - 10})" if len(rejeitadas) > 10 else ''
+                raise ValueError("; ".join(rejeitadas[:10]) + mais)
+
+            return self._registrar(documento or caminho.stem, linhas, fornecedor,
+                                   lancar_despesa, observacoes)
+        except Exception as e:
+            log_error(f"Erro ao importar entrega {caminho}: {str(e)}")
+            raise ValueError(f"Erro ao importar entrega: {str(e)}") from e
+
+    def obter_entrada(self, entrada_id: int) -> Dict:
+        """Obtém uma entrada com os itens"""
+        try:
+            entrada = self.entrada_repo.obter(entrada_id)
+            dados = self._serializar_entrada(entrada)
+            dados['itens'] = [
+                {
+                    'codigo': item['codigo'],
+                    'nome': item['nome'],
+                    'quantidade': item['quantidade'],
+                    'preco_custo': None if item['preco_custo'] is None else float(item['preco_custo']),
+                }
+                for item in self.entrada_repo.listar_itens(entrada_id)
+            ]
+            return dados
+        except Exception as e:
+            raise ValueError(f"Erro ao obter entrada: {str(e)}") from e
+
+    def listar_entradas(self, limite: int = 50) -> List[Dict]:
+        """Lista as entradas mais recentes"""
+        try:
+            return [self._serializar_entrada(e) for e in self.entrada_repo.listar(limite)]
+        except Exception as e:
+            raise ValueError(f"Erro ao listar entradas: {str(e)}") from e
+
+    def _registrar(self, documento: str, linhas: List[LinhaEntrada], fornecedor: str,
+                   lancar_despesa: bool, observacoes: str) -> Dict:
+        entrada = self.entrada_repo.registrar(documento, linhas, fornecedor,
+                                              lancar_despesa, observacoes)
+        log_info(f"Entrada {entrada.documento} registrada: {entrada.quantidade_itens} produto(s), "
+                 f"{entrada.unidades} unidade(s), custo R$ {entrada.total_custo:.2f}")
+        if entrada.transacao_id:
+            barramento.publicar('despesa.registrada', valor=entrada.total_custo,
+                                data_hora=entrada.data_hora)
+        return self._serializar_entrada(entrada)
+
+    @staticmethod
+    def _converter_linha(item: Dict) -> Tuple[LinhaEntrada, str]:
+        """Converte e valida uma linha: ((código, quantidade, custo), motivo da rejeição)"""
+        codigo = str(item.get('codigo') or '').strip()
+        quantidade = ImportacaoService._converter_inteiro(item.get('quantidade', ''))
+        custo = item.get('preco_custo')
+        if custo in (None, ''):
+            custo = None
+        else:
+            # Decimal também passa pelo conversor: Decimal('NaN') não pode chegar à comparação
+            custo = ImportacaoService._converter_decimal(
+                format(custo, 'f') if isinstance(custo, Decimal) else custo
+            )
+            if custo is None:
+                return None, "Preço de custo inválido"
+
+        if not ValidadorUtil.validar_codigo_produto(codigo):
+            return None, "Código inválido"
+        if quantidade is None or quantidade <= 0:
+            return None, "Quantidade inválida"
+        if custo is not None and custo < 0:
+            return None, "Preço de custo inválido"
+        return (codigo, quantidade, custo), None
+
+    @staticmethod
+    def _serializar_entrada(entrada) -> Dict:
+        """Converte uma entrada em dicionário"""
+        return {
+            'id': entrada.id,
+            'documento': entrada.documento,
+            'fornecedor': entrada.fornecedor,
+            'data_hora': entrada.data_hora.isoformat(),
+            'quantidade_itens': entrada.quantidade_itens,
+            'unidades': entrada.unidades,
+            'total_custo': float(entrada.total_custo),
+            'transacao_id': entrada.transacao_id,
+            'observacoes': entrada.observacoes,
+        }
+
+
+if __name__ == '__main__':
+    import argparse
+    from src.database import init_db
+
+    parser = argparse.ArgumentParser(description="Registra uma entrega de fornecedor (CSV/XLSX)")
+    parser.add_argument('arquivo', help="Arquivo .csv ou .xlsx (codigo;quantidade[;preco_custo])")
+    parser.add_argument('--documento', default=None,
+                        help="Nº da nota (padrão: nome do arquivo)")
+    parser.add_argument('--fornecedor', default='')
+    parser.add_argument('--sem-despesa', action='store_true',
+                        help="Não lança o custo da entrega como despesa")
+    args = parser.parse_args()
+
+    init_db()
+
+    try:
+        resultado = EntradaMercadoriaService().importar_arquivo(
+            args.arquivo,
+            documento=args.documento,
+            fornecedor=args.fornecedor,
+            lancar_despesa=not args.sem_despesa,
+        )
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+
+    print(f"✅ Entrada {resultado['documento']}: {resultado['quantidade_itens']} produto(s), "
+          f"{resultado['unidades']} unidade(s), custo R$ {resultado['total_custo']:.2f}")
+    if resultado['transacao_id']:
+        print(f"   Despesa lançada (transação #{resultado['transacao_id']})")
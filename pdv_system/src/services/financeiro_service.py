@@ -4,6 +4,9 @@ Serviço Financeiro - Lógica de Negócio
 from src.models.financeiro_repository import (
     TransacaoRepository, FechamentoDiaRepository
 )
+from src.models.leitura import TransacaoLeitura
+from src.utils.eventos import barramento
+from src.utils.logger import log_info
 from decimal import Decimal
 from typing import Dict, List
 from datetime import date
@@ -25,6 +28,8 @@ class FinanceiroService:
                 Decimal(str(valor)),
                 observacoes
             )
+            barramento.publicar('despesa.registrada', valor=transacao.valor,
+                                data_hora=transacao.data_transacao)
             return self._serializar_transacao(transacao)
         except Exception as e:
             raise ValueError(f"Erro ao registrar despesa: {str(e)}") from e
@@ -61,23 +66,22 @@ class FinanceiroService:
         except Exception as e:
             raise ValueError(f"Erro ao obter resumo: {str(e)}") from e
 
-    def listar_transacoes_dia(self, data_dia: date = None) -> List[Dict]:
+    def listar_transacoes_dia(self, data_dia: date = None) -> List[TransacaoLeitura]:
         """Lista transações do dia"""
         try:
-            transacoes = self.transacao_repo.listar_transacoes_dia(data_dia)
-            return [self._serializar_transacao(t) for t in transacoes]
+            return self.transacao_repo.listar_transacoes_dia(data_dia, leitura=TransacaoLeitura)
         except Exception as e:
             raise ValueError(f"Erro ao listar transações: {str(e)}") from e
 
     def listar_transacoes_periodo(self, data_inicio: date,
-                                 data_fim: date) -> List[Dict]:
+                                 data_fim: date) -> List[TransacaoLeitura]:
         """Lista transações de um período"""
         try:
-            transacoes = self.transacao_repo.listar_transacoes_periodo(
+            return self.transacao_repo.listar_transacoes_periodo(
                 data_inicio,
-                data_fim
+                data_fim,
+                leitura=TransacaoLeitura
             )
-            return [self._serializar_transacao(t) for t in transacoes]
         except Exception as e:
             raise ValueError(f"Erro ao listar transações: {str(e)}") from e
 
@@ -89,6 +93,27 @@ class FinanceiroService:
         except Exception as e:
             raise ValueError(f"Erro ao criar fechamento: {str(e)}") from e
 
+    def criar_fechamentos_periodo(self, data_inicio: date, data_fim: date) -> Dict:
+        """
+        Fecha todos os dias do período que têm movimento e ainda não foram fechados
+
+        Returns:
+            dict: {'criados': [data ISO], 'ja_fechados': [data ISO], 'sem_movimento': int}
+        """
+        try:
+            resultado = self.fechamento_repo.criar_fechamentos_periodo(data_inicio, data_fim)
+            log_info(
+                f"Fechamentos de {data_inicio} a {data_fim}: {len(resultado['criados'])} "
+                f"criado(s), {len(resultado['ja_fechados'])} já existente(s)"
+            )
+            return {
+                'criados': [d.isoformat() for d in resultado['criados']],
+                'ja_fechados': [d.isoformat() for d in resultado['ja_fechados']],
+                'sem_movimento': resultado['sem_movimento'],
+            }
+        except Exception as e:
+            raise ValueError(f"Erro ao criar fechamentos: {str(e)}") from e
+
     def obter_fechamento(self, data_dia: date = None) -> Dict:
         """Obtém o fechamento de um dia"""
         try:
@@ -0,0 +1,446 @@
+"""
+Serviço de Importação de Catálogo - Carga em massa de produtos (CSV/XLSX)
+
+Fluxo:
+  1. Lê todas as linhas do arquivo
+  2. Valida tudo numa única passada (ValidadorUtil), separando rejeitados
+  3. Grava os válidos em lotes transacionais com upsert pelo código
+  4. Após cada lote confirmado, salva um arquivo de progresso que permite
+     retomar a importação do ponto em que parou
+
+Uso pela linha de comando:
+    python -m src.services.importacao_service catalogo.csv [--lote 1000]
+        [--atualizar-estoque] [--retomar]
+"""
+import csv
+import json
+import os
+import sys
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from peewee import DatabaseError, IntegrityError
+
+from src.models.produto_repository import ProdutoRepository
+from src.utils.formatadores import FormataçãoUtil
+from src.utils.logger import log_info, log_error, log_warning
+from src.utils.validadores import ValidadorUtil
+
+
+class ImportacaoService:
+    """Serviço de importação em massa do catálogo de produtos"""
+
+    COLUNAS = ['codigo', 'nome', 'preco_venda', 'preco_custo', 'estoque', 'descricao']
+    COLUNAS_OBRIGATORIAS = ['codigo', 'nome', 'preco_venda']
+    TAMANHO_LOTE = 1000
+
+    def __init__(self):
+        self.repo = ProdutoRepository()
+
+    def importar_arquivo(self, caminho: str, tamanho_lote: int = None,
+                         atualizar_estoque: bool = False,
+                         retomar: bool = False) -> Dict:
+        """
+        Importa um catálogo CSV ou XLSX
+
+        Args:
+            caminho: Caminho do arquivo (.csv ou .xlsx)
+            tamanho_lote: Linhas por transação (padrão: 1000)
+            atualizar_estoque: Se True, o estoque do arquivo sobrescreve o atual
+            retomar: Continua uma importação interrompida do mesmo arquivo
+
+        Returns:
+            dict: {
+                'total_linhas': int,
+                'novos': int,
+                'atualizados': int,
+                'rejeitados': [{'linha': int, 'codigo': str, 'motivo': str}],
+                'lotes': int,
+                'retomado_da_linha': int  # nº no arquivo (0 = desde o início)
+            }
+        """
+        caminho = Path(caminho)
+        if not caminho.exists():
+            raise ValueError(f"Arquivo não encontrado: {caminho}")
+
+        tamanho_lote = tamanho_lote or self.TAMANHO_LOTE
+        linhas = self.ler_arquivo(caminho)
+
+        progresso = self._carregar_progresso(caminho) if retomar else None
+        inicio = progresso['linhas_processadas'] if progresso else 0
+
+        relatorio = {
+            'total_linhas': len(linhas),
+            'novos': progresso['novos'] if progresso else 0,
+            'atualizados': progresso['atualizados'] if progresso else 0,
+            'rejeitados': progresso['rejeitados'] if progresso else [],
+            'lotes': 0,
+            'retomado_da_linha': self._linha_no_arquivo(linhas, inicio) if inicio else 0,
+        }
+
+        validas, rejeitadas = self.validar_linhas(linhas[inicio:])
+        relatorio['rejeitados'].extend(rejeitadas)
+
+        processadas = inicio
+        for lote in self._dividir_lotes(validas, tamanho_lote):
+            try:
+                novos, atualizados, rejeitados_lote = self._gravar_lote(
+                    lote, atualizar_estoque
+                )
+            except DatabaseError as e:
+                self._salvar_progresso(caminho, linhas, processadas, relatorio)
+                numero = self._linha_no_arquivo(linhas, processadas)
+                log_error(f"Importação interrompida na linha {numero}: {str(e)}",
+                          exc_info=True)
+                raise ValueError(
+                    f"Erro ao gravar lote (linha {numero}): {str(e)}. "
+                    "Use retomar=True para continuar deste ponto."
+                ) from e
+
+            relatorio['novos'] += novos
+            relatorio['atualizados'] += atualizados
+            relatorio['rejeitados'].extend(rejeitados_lote)
+            relatorio['lotes'] += 1
+
+            processadas = lote[-1]['_indice'] + 1
+            self._salvar_progresso(caminho, linhas, processadas, relatorio)
+
+        self._remover_progresso(caminho)
+        relatorio['rejeitados'].sort(key=lambda r: r['linha'])
+
+        log_info(
+            f"Importação de {caminho.name} concluída: {relatorio['novos']} novos, "
+            f"{relatorio['atualizados']} atualizados, "
+            f"{len(relatorio['rejeitados'])} rejeitados"
+        )
+        return relatorio
+
+    def ler_arquivo(self, caminho: Path) -> List[Dict]:
+        """
+        Lê um CSV ou XLSX e devolve as linhas com colunas normalizadas
+
+        Cada linha leva ``_linha`` (nº no arquivo, contando as linhas em
+        branco descartadas) e ``_indice`` (posição na lista devolvida).
+        """
+        sufixo = caminho.suffix.lower()
+
+        if sufixo == '.csv':
+            linhas = self._ler_csv(caminho)
+        elif sufixo in ('.xlsx', '.xlsm'):
+            linhas = self._ler_xlsx(caminho)
+        else:
+            raise ValueError("Formato não suportado. Use .csv ou .xlsx")
+
+        for indice, linha in enumerate(linhas):
+            linha['_indice'] = indice
+        return linhas
+
+    def validar_linhas(self, linhas: List[Dict],
+                       primeira_linha: int = 2) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Valida todas as linhas numa única passada, antes de qualquer gravação
+
+        Além das regras de ValidadorUtil, rejeita códigos e nomes repetidos
+        dentro do próprio arquivo (mantém a primeira ocorrência).
+
+        Args:
+            linhas: Linhas lidas por ``ler_arquivo``
+            primeira_linha: Nº (no arquivo) da primeira linha recebida, para
+                linhas sem ``_linha``
+
+        Returns:
+            tuple: (linhas válidas convertidas, rejeitados)
+        """
+        validas, rejeitadas = [], []
+        codigos_vistos, nomes_vistos = set(), set()
+
+        for deslocamento, linha in enumerate(linhas):
+            numero = linha.get('_linha', primeira_linha + deslocamento)
+            codigo = (linha.get('codigo') or '').strip()
+            nome = (linha.get('nome') or '').strip()
+
+            motivo = None
+            preco_venda = self._converter_decimal(linha.get('preco_venda'))
+            preco_custo = self._converter_decimal(linha.get('preco_custo') or '0')
+            estoque = self._converter_inteiro(linha.get('estoque') or '0')
+
+            if not ValidadorUtil.validar_codigo_produto(codigo):
+                motivo = "Código inválido"
+            elif not ValidadorUtil.validar_nome_produto(nome):
+                motivo = "Nome inválido (3 a 200 caracteres)"
+            elif preco_venda is None or not ValidadorUtil.validar_preco(preco_venda):
+                motivo = "Preço de venda inválido"
+            elif preco_custo is None or preco_custo < 0:
+                motivo = "Preço de custo inválido"
+            elif estoque is None or not ValidadorUtil.validar_quantidade(estoque):
+                motivo = "Estoque inválido"
+            elif codigo in codigos_vistos:
+                motivo = "Código repetido no arquivo"
+            elif nome in nomes_vistos:
+                motivo = "Nome repetido no arquivo"
+
+            if motivo:
+                rejeitadas.append({'linha': numero, 'codigo': codigo, 'motivo': motivo})
+                continue
+
+            codigos_vistos.add(codigo)
+            nomes_vistos.add(nome)
+            descricao = (linha.get('descricao') or '').strip() or None
+
+            validas.append({
+                '_indice': linha['_indice'],
+                '_linha': numero,
+                'codigo': codigo,
+                'nome': nome,
+                'preco_venda': preco_venda,
+                'preco_custo': preco_custo,
+                'estoque': estoque,
+                'descricao': descricao[:500] if descricao else None,
+            })
+
+        return validas, rejeitadas
+
+    def _gravar_lote(self, lote: List[Dict],
+                     atualizar_estoque: bool) -> Tuple[int, int, List[Dict]]:
+        """
+        Grava um lote validado numa transação
+
+        Rejeita antes as linhas cujo nome já pertence a outro código no banco.
+        Se ainda assim o lote falhar por integridade, regrava linha a linha
+        para isolar as rejeitadas.
+
+        Returns:
+            tuple: (novos, atualizados, rejeitados)
+        """
+        por_codigo, por_nome = self.repo.mapear_existentes(
+            [l['codigo'] for l in lote],
+            [l['nome'] for l in lote]
+        )
+
+        gravar, rejeitados = [], []
+        for linha in lote:
+            dono_nome = por_nome.get(linha['nome'])
+            if dono_nome is not None and dono_nome != linha['codigo']:
+                rejeitados.append({
+                    'linha': linha['_linha'],
+                    'codigo': linha['codigo'],
+                    'motivo': f"Nome já cadastrado para o código {dono_nome}",
+                })
+            else:
+                gravar.append(linha)
+
+        try:
+            self.repo.upsert_lote(gravar, atualizar_estoque)
+            gravadas = gravar
+        except IntegrityError:
+            log_warning("Lote rejeitado por integridade; gravando linha a linha")
+            gravadas = []
+            for linha in gravar:
+                try:
+                    self.repo.upsert_lote([linha], atualizar_estoque)
+                    gravadas.append(linha)
+                except IntegrityError as e:
+                    rejeitados.append({
+                        'linha': linha['_linha'],
+                        'codigo': linha['codigo'],
+                        'motivo': f"Violação de integridade: {str(e)}",
+                    })
+
+        atualizados = sum(1 for l in gravadas if l['codigo'] in por_codigo)
+        return len(gravadas) - atualizados, atualizados, rejeitados
+
+    @staticmethod
+    def _dividir_lotes(linhas: List[Dict], tamanho: int):
+        """Divide a lista de linhas em lotes de ``tamanho``"""
+        for i in range(0, len(linhas), tamanho):
+            yield linhas[i:i + tamanho]
+
+    @staticmethod
+    def _normalizar_coluna(nome: str) -> str:
+        """Normaliza o cabeçalho: minúsculas, sem acentos, '_' no lugar de espaços"""
+        nome = FormataçãoUtil.remover_acentos(str(nome or '')).strip().lower()
+        return nome.replace(' ', '_')
+
+    def _ler_csv(self, caminho: Path) -> List[Dict]:
+        """Lê um CSV detectando o delimitador (; , ou tab)"""
+        with open(caminho, newline='', encoding='utf-8-sig') as arquivo:
+            amostra = arquivo.read(4096)
+            arquivo.seek(0)
+            try:
+                dialeto = csv.Sniffer().sniff(amostra, delimiters=';,\t')
+            except csv.Error:
+                dialeto = csv.excel
+
+            leitor = csv.reader(arquivo, dialeto)
+            cabecalho = [self._normalizar_coluna(c) for c in next(leitor, [])]
+            self._verificar_cabecalho(cabecalho)
+
+            linhas = []
+            for valores in leitor:
+                if any(valores):
+                    linha = dict(zip(cabecalho, valores))
+                    linha['_linha'] = leitor.line_num
+                    linhas.append(linha)
+            return linhas
+
+    def _ler_xlsx(self, caminho: Path) -> List[Dict]:
+        """Lê a primeira planilha de um XLSX (requer openpyxl)"""
+        try:
+            from openpyxl import load_workbook
+        except ImportError as exc:
+            raise ValueError(
+                "Importação de XLSX requer o pacote openpyxl (pip install openpyxl)"
+            ) from exc
+
+        planilha = load_workbook(caminho, read_only=True, data_only=True).active
+        valores = planilha.iter_rows(values_only=True)
+
+        cabecalho = [self._normalizar_coluna(c) for c in next(valores, ())]
+        self._verificar_cabecalho(cabecalho)
+
+        linhas = []
+        for numero, valores_linha in enumerate(valores, start=2):
+            if any(v is not None for v in valores_linha):
+                linha = {coluna: ('' if v is None else str(v))
+                         for coluna, v in zip(cabecalho, valores_linha)}
+                linha['_linha'] = numero
+                linhas.append(linha)
+        return linhas
+
+    def _verificar_cabecalho(self, cabecalho: List[str]) -> None:
+        """Garante que as colunas obrigatórias estão presentes"""
+        faltando = [c for c in self.COLUNAS_OBRIGATORIAS if c not in cabecalho]
+        if faltando:
+            raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(faltando)}")
+
+    @staticmethod
+    def _converter_decimal(valor) -> Decimal:
+        """Converte '1.234,56' / '1234.56' em Decimal (None se inválido ou não finito)"""
+        texto = str(valor or '').strip().replace('R$', '').strip()
+        if ',' in texto:
+            texto = texto.replace('.', '').replace(',', '.')
+
+        if not ValidadorUtil.validar_moeda(texto):
+            return None
+        try:
+            numero = Decimal(texto)
+            if not numero.is_finite():
+                return None  # 'nan'/'inf' passam por float() mas não são preços
+            return numero.quantize(Decimal('0.01'))
+        except InvalidOperation:
+            return None
+
+    @staticmethod
+    def _converter_inteiro(valor) -> int:
+        """Converte o estoque em inteiro (None se inválido)"""
+        texto = str(valor).strip()
+        if texto.endswith('.0'):
+            texto = texto[:-2]
+        if not ValidadorUtil.validar_inteiro(texto):
+            return None
+        return int(texto)
+
+    @staticmethod
+    def _linha_no_arquivo(linhas: List[Dict], indice: int) -> int:
+        """Nº no arquivo da linha na posição ``indice`` (após a última, se não houver)"""
+        if indice < len(linhas):
+            return linhas[indice]['_linha']
+        return linhas[-1]['_linha'] + 1 if linhas else 2
+
+    @staticmethod
+    def _caminho_progresso(caminho: Path) -> Path:
+        return caminho.with_name(caminho.name + '.progresso.json')
+
+    @staticmethod
+    def _assinatura(caminho: Path) -> str:
+        """Identifica a versão do arquivo (tamanho + data de modificação)"""
+        info = caminho.stat()
+        return f"{info.st_size}-{int(info.st_mtime)}"
+
+    def _carregar_progresso(self, caminho: Path) -> Dict:
+        """Carrega o progresso salvo, se for do mesmo arquivo"""
+        arquivo_progresso = self._caminho_progresso(caminho)
+        if not arquivo_progresso.exists():
+            return None
+
+        progresso = json.loads(arquivo_progresso.read_text(encoding='utf-8'))
+        if progresso.get('assinatura') != self._assinatura(caminho):
+            log_warning(f"Arquivo {caminho.name} mudou desde a última importação; reiniciando")
+            return None
+        return progresso
+
+    def _salvar_progresso(self, caminho: Path, linhas: List[Dict],
+                          linhas_processadas: int, relatorio: Dict) -> None:
+        """Registra até onde a importação foi confirmada no banco"""
+        proxima = self._linha_no_arquivo(linhas, linhas_processadas)
+        progresso = {
+            'assinatura': self._assinatura(caminho),
+            'linhas_processadas': linhas_processadas,
+            'novos': relatorio['novos'],
+            'atualizados': relatorio['atualizados'],
+            'rejeitados': [
+                r for r in relatorio['rejeitados'] if r['linha'] < proxima
+            ],
+        }
+        arquivo_temp = self._caminho_progresso(caminho).with_suffix('.tmp')
+        arquivo_temp.write_text(json.dumps(progresso, ensure_ascii=False), encoding='utf-8')
+        os.replace(arquivo_temp, self._caminho_progresso(caminho))
+
+    def _remover_progresso(self, caminho: Path) -> None:
+        arquivo_progresso = self._caminho_progresso(caminho)
+        if arquivo_progresso.exists():
+            arquivo_progresso.unlink()
+
+
+def salvar_rejeitados(relatorio: Dict, caminho: str) -> None:
+    """Grava as linhas rejeitadas num CSV (linha;codigo;motivo)"""
+    with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=['linha', 'codigo', 'motivo'],
+                                  delimiter=';')
+        escritor.writeheader()
+        escritor.writerows(relatorio['rejeitados'])
+
+
+if __name__ == '__main__':
+    # Uso: python -m src.services.importacao_service <arquivo> [--lote N]
+    #      [--atualizar-estoque] [--retomar]
+    import argparse
+    from src.database import init_db
+
+    parser = argparse.ArgumentParser(description="Importa catálogo de produtos (CSV/XLSX)")
+    parser.add_argument('arquivo', help="Arquivo .csv ou .xlsx")
+    parser.add_argument('--lote', type=int, default=ImportacaoService.TAMANHO_LOTE,
+                        help="Linhas por transação")
+    parser.add_argument('--atualizar-estoque', action='store_true',
+                        help="Sobrescreve o estoque dos produtos existentes")
+    parser.add_argument('--retomar', action='store_true',
+                        help="Continua uma importação interrompida")
+    args = parser.parse_args()
+
+    init_db()
+
+    try:
+        resultado = ImportacaoService().importar_arquivo(
+            args.arquivo,
+            tamanho_lote=args.lote,
+            atualizar_estoque=args.atualizar_estoque,
+            retomar=args.retomar,
+        )
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+
+    print("\n" + "=" * 60)
+    print(f"Linhas no arquivo: {resultado['total_linhas']}")
+    if resultado['retomado_da_linha']:
+        print(f"Retomado a partir da linha: {resultado['retomado_da_linha']}")
+    print(f"✅ Novos:        {resultado['novos']}")
+    print(f"🔄 Atualizados:  {resultado['atualizados']}")
+    print(f"❌ Rejeitados:   {len(resultado['rejeitados'])}")
+    print("=" * 60)
+
+    if resultado['rejeitados']:
+        caminho_rejeitados = args.arquivo + '.rejeitados.csv'
+        salvar_rejeitados(resultado, caminho_rejeitados)
+        print(f"\nLinhas rejeitadas salvas em: {caminho_rejeitados}")
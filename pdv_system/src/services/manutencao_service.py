@@ -0,0 +1,299 @@
+"""
+Serviço de Manutenção - Tarefas do banco executadas com o caixa ocioso
+
+Tarefas (cada uma com sua periodicidade):
+  - checkpoint: ``wal_checkpoint(TRUNCATE)``, devolve o WAL ao tamanho zero
+  - otimizar:   ``PRAGMA optimize`` com ``analysis_limit`` (estatísticas baratas)
+  - outbox:     apaga eventos do outbox já consumidos e fora da retenção
+                (OUTBOX_MANTER_DIAS), em blocos de linhas
+  - reservas:   apaga as reservas de estoque vencidas (carrinhos abandonados)
+  - analisar:   ``ANALYZE`` completo, uma tabela por fatia
+  - vacuo:      ``incremental_vacuum`` em blocos de páginas (só com
+                auto_vacuum=INCREMENTAL; ver ``ativar_vacuo_incremental``)
+
+As tarefas rodam numa conexão própria, em fatias de no máximo
+``fatia_segundos``; antes de cada fatia o agendador confere se o caixa ainda
+está ocioso (src.utils.atividade), e tarefas interrompidas continuam no
+próximo ciclo.
+
+Uso:
+    python -m src.services.manutencao_service [--status] [--executar]
+                                              [--ativar-vacuo-incremental]
+"""
+from src.database.connection import DB_PATH
+from src.utils.atividade import segundos_ocioso
+from src.utils.logger import log_info, log_error, log_debug
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+import sqlite3
+import threading
+import time
+
+
+class ManutencaoService:
+    """Executa as tarefas de manutenção em fatias de tempo"""
+
+    # (tarefa, intervalo mínimo entre execuções completas em segundos)
+    TAREFAS = [
+        ('checkpoint', 5 * 60),
+        ('reservas', 5 * 60),
+        ('otimizar', 60 * 60),
+        ('outbox', 60 * 60),
+        ('vacuo', 60 * 60),
+        ('analisar', 24 * 60 * 60),
+    ]
+
+    PAGINAS_POR_VACUO = 256
+    EVENTOS_POR_COMPACTACAO = 2000
+    LIMITE_ANALISE = 400  # linhas examinadas por índice no PRAGMA optimize
+
+    def __init__(self, banco: Path = None, fatia_segundos: float = 0.5):
+        self.banco = Path(banco) if banco else DB_PATH
+        self.fatia = fatia_segundos
+        self.ultimas = {nome: None for nome, _ in self.TAREFAS}
+        self._conexao = None
+        self._tabelas_pendentes = None
+
+    def conexao(self) -> sqlite3.Connection:
+        """Conexão própria da manutenção (criada na thread que a usa)"""
+        if self._conexao is None:
+            self._conexao = sqlite3.connect(str(self.banco), timeout=0.2,
+                                            isolation_level=None)
+        return self._conexao
+
+    def fechar(self):
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
+
+    def pendentes(self) -> list:
+        """Tarefas cujo intervalo já passou, na ordem de prioridade"""
+        agora = time.time()
+        return [
+            nome for nome, intervalo in self.TAREFAS
+            if self.ultimas[nome] is None
+            or agora - self.ultimas[nome]['concluida_em'] >= intervalo
+        ]
+
+    def executar_ciclo(self, continuar: Callable[[], bool] = lambda: True) -> Dict:
+        """
+        Executa as tarefas pendentes enquanto ``continuar()`` for verdadeiro
+
+        Returns:
+            dict: {tarefa: detalhe} das fatias executadas neste ciclo
+        """
+        executadas = {}
+
+        for nome in self.pendentes():
+            concluida = False
+            while not concluida:
+                if not continuar():
+                    return executadas
+
+                inicio = time.monotonic()
+                try:
+                    concluida, detalhe = getattr(self, f'_tarefa_{nome}')(inicio + self.fatia)
+                except sqlite3.Error as e:
+                    log_error(f"Erro na manutenção ({nome}): {str(e)}")
+                    concluida, detalhe = True, f"erro: {e}"
+
+                duracao_ms = round((time.monotonic() - inicio) * 1000, 1)
+                executadas[nome] = detalhe
+                log_debug(f"Manutenção {nome}: {detalhe} ({duracao_ms} ms)")
+
+                if concluida:
+                    self.ultimas[nome] = {
+                        'concluida_em': time.time(),
+                        'quando': datetime.now().isoformat(timespec='seconds'),
+                        'duracao_ms': duracao_ms,
+                        'resultado': detalhe,
+                    }
+
+        return executadas
+
+    def _tarefa_checkpoint(self, prazo: float) -> Tuple[bool, str]:
+        ocupado, paginas_wal, copiadas = self.conexao().execute(
+            "PRAGMA wal_checkpoint(TRUNCATE)"
+        ).fetchone()
+        if ocupado:
+            # Há leitores ou escritores ativos: conta como feito, tenta no próximo ciclo
+            return True, f"parcial ({copiadas}/{paginas_wal} páginas, banco ocupado)"
+        return True, f"{copiadas} página(s) copiadas, WAL truncado"
+
+    def _tarefa_otimizar(self, prazo: float) -> Tuple[bool, str]:
+        conexao = self.conexao()
+        conexao.execute(f"PRAGMA analysis_limit = {self.LIMITE_ANALISE}")
+        conexao.execute("PRAGMA optimize")
+        return True, "ok"
+
+    def _tarefa_analisar(self, prazo: float) -> Tuple[bool, str]:
+        conexao = self.conexao()
+        if self._tabelas_pendentes is None:
+            self._tabelas_pendentes = [
+                linha[0] for linha in conexao.execute(
+                    "SELECT name FROM sqlite_master "
+                    "WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+                )
+            ]
+
+        conexao.execute("PRAGMA analysis_limit = 0")
+        analisadas = 0
+        while self._tabelas_pendentes and time.monotonic() < prazo:
+            tabela = self._tabelas_pendentes.pop(0)
+            conexao.execute(f'ANALYZE "{tabela}"')
+            analisadas += 1
+
+        if self._tabelas_pendentes:
+            return False, f"{analisadas} tabela(s), {len(self._tabelas_pendentes)} restante(s)"
+        self._tabelas_pendentes = None
+        return True, f"{analisadas} tabela(s) analisadas"
+
+    def _tarefa_outbox(self, prazo: float) -> Tuple[bool, str]:
+        from src.utils import config
+
+        conexao = self.conexao()
+        corte = (datetime.now() - timedelta(days=config.OUTBOX_MANTER_DIAS)).isoformat(' ')
+        # Sem consumidores cadastrados só a retenção vale
+        limite_id = conexao.execute(
+            "SELECT coalesce((SELECT min(posicao) FROM outbox_consumidores), "
+            "(SELECT max(id) FROM outbox_eventos), 0)"
+        ).fetchone()[0]
+
+        apagados = 0
+        while time.monotonic() < prazo:
+            removidos = conexao.execute(
+                "DELETE FROM outbox_eventos WHERE id IN ("
+                "SELECT id FROM outbox_eventos WHERE id <= ? AND criado_em < ? "
+                "ORDER BY id LIMIT ?)",
+                (limite_id, corte, self.EVENTOS_POR_COMPACTACAO)
+            ).rowcount
+            apagados += removidos
+            if removidos < self.EVENTOS_POR_COMPACTACAO:
+                return True, f"{apagados} evento(s) consumidos apagados"
+
+        return False, f"{apagados} evento(s) apagados, ainda há eventos a apagar"
+
+    def _tarefa_reservas(self, prazo: float) -> Tuple[bool, str]:
+        # Vencidas já não contam no disponível; aqui só saem da tabela
+        apagadas = self.conexao().execute(
+            "DELETE FROM reservas_estoque WHERE expira_em <= ?",
+            (datetime.now().isoformat(' '),)
+        ).rowcount
+        return True, f"{apagadas} reserva(s) vencida(s) apagadas"
+
+    def _tarefa_vacuo(self, prazo: float) -> Tuple[bool, str]:
+        conexao = self.conexao()
+        if conexao.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            return True, "auto_vacuum não é INCREMENTAL, ignorado"
+
+        inicial = livres = conexao.execute("PRAGMA freelist_count").fetchone()[0]
+        while livres and time.monotonic() < prazo:
+            # execute() dá um único passo no pragma (libera uma página);
+            # executescript() roda o comando até o fim
+            conexao.executescript(f"PRAGMA incremental_vacuum({self.PAGINAS_POR_VACUO})")
+            livres = conexao.execute("PRAGMA freelist_count").fetchone()[0]
+
+        liberadas = inicial - livres
+        if not livres:
+            return True, f"{liberadas} página(s) devolvidas ao sistema"
+
+        return False, f"{liberadas} página(s) devolvidas, ainda há páginas livres"
+
+    def estatisticas(self) -> Dict:
+        """Tamanho do banco e do WAL e a última execução de cada tarefa"""
+        wal = self.banco.with_name(self.banco.name + '-wal')
+        conexao = sqlite3.connect(f"file:{self.banco}?mode=ro", uri=True)
+        try:
+            paginas = conexao.execute("PRAGMA page_count").fetchone()[0]
+            livres = conexao.execute("PRAGMA freelist_count").fetchone()[0]
+            tamanho_pagina = conexao.execute("PRAGMA page_size").fetchone()[0]
+            auto_vacuum = conexao.execute("PRAGMA auto_vacuum").fetchone()[0]
+        finally:
+            conexao.close()
+
+        return {
+            'tamanho_banco': paginas * tamanho_pagina,
+            'tamanho_wal': wal.stat().st_size if wal.exists() else 0,
+            'paginas_livres': livres,
+            'auto_vacuum': {0: 'NONE', 1: 'FULL', 2: 'INCREMENTAL'}[auto_vacuum],
+            'ocioso_segundos': round(segundos_ocioso(), 1),
+            'tarefas': {
+                nome: ({k: v for k, v in ultima.items() if k != 'concluida_em'}
+                       if ultima else None)
+                for nome, ultima in self.ultimas.items()
+            },
+        }
+
+    def ativar_vacuo_incremental(self):
+        """
+        Converte o banco para auto_vacuum=INCREMENTAL
+
+        Exige um VACUUM completo (reescreve o arquivo inteiro); rode com o
+        sistema fechado.
+        """
+        conexao = self.conexao()
+        conexao.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conexao.execute("VACUUM")
+        log_info("Banco convertido para auto_vacuum=INCREMENTAL")
+
+
+class AgendadorManutencao:
+    """Roda a manutenção numa thread quando o caixa fica ocioso"""
+
+    def __init__(self, ociosidade_segundos: float = 60, verificacao_segundos: float = 5,
+                 servico: ManutencaoService = None):
+        self.ociosidade = ociosidade_segundos
+        self.verificacao = verificacao_segundos
+        self.servico = servico or ManutencaoService()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def ocioso(self) -> bool:
+        return segundos_ocioso() >= self.ociosidade and not self._parar.is_set()
+
+    def iniciar(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="manutencao", daemon=True)
+        self._thread.start()
+        log_info(f"Manutenção do banco após {self.ociosidade:g}s de caixa ocioso")
+
+    def parar(self, timeout: float = 5):
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def estatisticas(self) -> Dict:
+        return self.servico.estatisticas()
+
+    def _executar(self):
+        try:
+            while not self._parar.wait(self.verificacao):
+                if self.ocioso() and self.servico.pendentes():
+                    self.servico.executar_ciclo(self.ocioso)
+        finally:
+            self.servico.fechar()
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Manutenção do banco de dados")
+    parser.add_argument('--status', action='store_true', help="Mostra tamanhos e estado")
+    parser.add_argument('--executar', action='store_true',
+                        help="Executa todas as tarefas agora, até o fim")
+    parser.add_argument('--ativar-vacuo-incremental', action='store_true',
+                        help="Converte o banco (VACUUM completo; sistema fechado)")
+    args = parser.parse_args()
+
+    servico = ManutencaoService(fatia_segundos=5)
+    if args.ativar_vacuo_incremental:
+        servico.ativar_vacuo_incremental()
+    if args.executar:
+        print(json.dumps(servico.executar_ciclo(), indent=2, ensure_ascii=False))
+    if args.status or not (args.executar or args.ativar_vacuo_incremental):
+        print(json.dumps(servico.estatisticas(), indent=2, ensure_ascii=False))
+    servico.fechar()
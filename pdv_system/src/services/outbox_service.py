@@ -0,0 +1,174 @@
+"""
+Serviço do Outbox - Consumo do feed de mudanças pelas integrações
+
+Tipos de evento publicados:
+  - venda.finalizada      (chave: número da venda; itens com o estoque final)
+  - transacao.registrada  (chave: id da transação)
+  - estoque.ajustado      (chave: código do produto; delta e estoque final)
+  - produto.alterado      (chave: código do produto; estado completo)
+
+Um consumidor lê em lotes a partir do seu último offset confirmado e confirma
+depois de processar; se cair no meio, relê o lote (entrega ao menos uma vez).
+O DespachanteOutbox faz esse ciclo numa thread, entregando cada lote a uma
+função; ``ExportadorJsonl`` é o consumidor local pronto (OUTBOX_ARQUIVO).
+
+Uso:
+    python -m src.services.outbox_service --status
+    python -m src.services.outbox_service --ler NOME [--confirmar]
+    python -m src.services.outbox_service --exportar ARQUIVO [--consumidor NOME]
+    python -m src.services.outbox_service --compactar [--manter-dias N]
+"""
+from src.models.outbox_repository import OutboxRepository
+from src.utils.logger import log_info, log_error
+from pathlib import Path
+from typing import Callable, Dict, List
+import json
+import os
+import threading
+
+
+class OutboxService:
+    """API de consumo do outbox"""
+
+    def __init__(self):
+        self.repo = OutboxRepository()
+
+    def registrar_consumidor(self, nome: str, desde_inicio: bool = True) -> int:
+        try:
+            return self.repo.registrar_consumidor(nome, desde_inicio)
+        except Exception as e:
+            raise ValueError(f"Erro ao registrar consumidor: {str(e)}") from e
+
+    def ler(self, consumidor: str, limite: int = 100, tipos: List[str] = None) -> List[Dict]:
+        try:
+            return self.repo.ler(consumidor, limite, tipos)
+        except Exception as e:
+            raise ValueError(f"Erro ao ler o outbox: {str(e)}") from e
+
+    def confirmar(self, consumidor: str, offset: int) -> int:
+        try:
+            return self.repo.confirmar(consumidor, offset)
+        except Exception as e:
+            raise ValueError(f"Erro ao confirmar eventos: {str(e)}") from e
+
+    def compactar(self, manter_dias: int = 7) -> Dict:
+        """Compacta até não restar nada a apagar"""
+        total = {'consumidos': 0, 'substituidos': 0}
+        try:
+            while True:
+                resultado = self.repo.compactar(manter_dias)
+                total['consumidos'] += resultado['consumidos']
+                total['substituidos'] += resultado['substituidos']
+                if not resultado['restante']:
+                    return total
+        except Exception as e:
+            raise ValueError(f"Erro ao compactar o outbox: {str(e)}") from e
+
+    def status(self) -> Dict:
+        return self.repo.status()
+
+
+class ExportadorJsonl:
+    """Consumidor que acrescenta os eventos a um arquivo JSONL (um por linha)"""
+
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+
+    def __call__(self, eventos: List[Dict]):
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.caminho, 'a', encoding='utf-8') as arquivo:
+            for evento in eventos:
+                arquivo.write(json.dumps(evento, ensure_ascii=False) + '\n')
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+
+
+class DespachanteOutbox:
+    """Entrega os eventos novos a uma função, em lotes, numa thread"""
+
+    def __init__(self, consumidor: str, tratador: Callable[[List[Dict]], None],
+                 tamanho_lote: int = 200, intervalo_segundos: float = 1.0,
+                 tipos: List[str] = None):
+        self.consumidor = consumidor
+        self.tratador = tratador
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo_segundos
+        self.tipos = tipos
+        self._parar = threading.Event()
+        self._thread = None
+
+    def despachar(self) -> int:
+        """
+        Entrega tudo o que está pendente; devolve quantos eventos
+
+        Um lote só é confirmado depois que o tratador retorna sem erro.
+        """
+        OutboxRepository.registrar_consumidor(self.consumidor)
+        entregues = 0
+        while not self._parar.is_set():
+            eventos = OutboxRepository.ler(self.consumidor, self.tamanho_lote, self.tipos)
+            if not eventos:
+                return entregues
+            self.tratador(eventos)
+            OutboxRepository.confirmar(self.consumidor, eventos[-1]['offset'])
+            entregues += len(eventos)
+        return entregues
+
+    def iniciar(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name=f"outbox-{self.consumidor}",
+                                        daemon=True)
+        self._thread.start()
+        log_info(f"Despachante do outbox iniciado (consumidor '{self.consumidor}')")
+
+    def parar(self, timeout: float = 5):
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _executar(self):
+        while True:
+            try:
+                self.despachar()
+            except Exception as e:
+                # O lote não foi confirmado: é entregue de novo no próximo ciclo
+                log_error(f"Erro no consumidor '{self.consumidor}' do outbox: {str(e)}",
+                          exc_info=True)
+            if self._parar.wait(self.intervalo):
+                return
+
+
+if __name__ == '__main__':
+    import argparse
+    from src.bootstrap import inicializar
+
+    parser = argparse.ArgumentParser(description="Outbox (feed de mudanças)")
+    parser.add_argument('--status', action='store_true')
+    parser.add_argument('--ler', metavar='CONSUMIDOR', help="Mostra o próximo lote")
+    parser.add_argument('--limite', type=int, default=20)
+    parser.add_argument('--confirmar', action='store_true', help="Confirma o lote lido")
+    parser.add_argument('--exportar', metavar='ARQUIVO', help="Exporta os pendentes em JSONL")
+    parser.add_argument('--consumidor', default='arquivo')
+    parser.add_argument('--compactar', action='store_true')
+    parser.add_argument('--manter-dias', type=int, default=7)
+    args = parser.parse_args()
+
+    inicializar()
+    service = OutboxService()
+
+    if args.ler:
+        service.registrar_consumidor(args.ler)
+        eventos = service.ler(args.ler, args.limite)
+        for evento in eventos:
+            print(json.dumps(evento, ensure_ascii=False))
+        if args.confirmar and eventos:
+            print(f"Confirmado até {service.confirmar(args.ler, eventos[-1]['offset'])}")
+    if args.exportar:
+        entregues = DespachanteOutbox(args.consumidor, ExportadorJsonl(args.exportar)).despachar()
+        print(f"{entregues} evento(s) exportados para {args.exportar}")
+    if args.compactar:
+        print(service.compactar(args.manter_dias))
+    if args.status or not (args.ler or args.exportar or args.compactar):
+        print(json.dumps(service.status(), indent=2, ensure_ascii=False))
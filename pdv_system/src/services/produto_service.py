@@ -2,6 +2,8 @@
 Serviço de Produtos - Lógica de Negócio
 """
 from src.models.produto_repository import ProdutoRepository
+from src.models.leitura import ProdutoLeitura
+from src.database.cache import em_cache
 from src.database.models import Produto
 from src.utils.logger import log_info, log_error, log_debug
 from decimal import Decimal
@@ -55,6 +57,7 @@ class ProdutoService:
         except ValueError as e:
             raise ValueError(f"Erro ao obter produto: {str(e)}") from e
 
+    @em_cache('produtos')
     def obter_produto_por_codigo(self, codigo: str) -> Dict:
         """Obtém um produto por código"""
         try:
@@ -63,15 +66,73 @@ class ProdutoService:
         except ValueError as e:
             raise ValueError(f"Erro ao obter produto: {str(e)}") from e
 
-    def listar_produtos(self) -> List[Dict]:
+    @em_cache('produtos')
+    def listar_produtos(self) -> List[ProdutoLeitura]:
         """Lista todos os produtos ativos"""
-        produtos = self.repo.listar_ativos()
-        return [self._serializar_produto(p) for p in produtos]
+        return self.repo.listar_ativos(leitura=ProdutoLeitura)
 
-    def buscar_produtos(self, termo: str) -> List[Dict]:
+    @em_cache('produtos')
+    def listar_produtos_paginado(self, cursor: str = None, limite: int = 50,
+                                 ordem: str = 'nome', decrescente: bool = False,
+                                 anterior: bool = False, filtros: Dict = None,
+                                 contar: bool = False) -> Dict:
+        """
+        Lista uma página de produtos (paginação por cursor)
+
+        Args:
+            cursor: Cursor devolvido pela chamada anterior (None = primeira página)
+            limite: Produtos por página
+            ordem: Coluna de ordenação (nome, codigo, preco_venda, estoque)
+            decrescente: Ordem decrescente
+            anterior: Busca a página antes de ``cursor`` em vez da seguinte
+            filtros: Ver ``ProdutoRepository.listar_paginado``
+            contar: Inclui o total (estimado) de produtos - use só na 1ª página
+
+        Returns:
+            dict: {
+                'itens': list[ProdutoLeitura],  # Mapping com as chaves do produto
+                'cursor_inicio': str | None,  # para buscar a página anterior
+                'cursor_fim': str | None,     # para buscar a próxima página
+                'tem_mais': bool,             # há produtos na direção consultada
+                'total': int | None,
+                'total_exato': bool | None
+            }
+        """
+        try:
+            produtos, tem_mais = self.repo.listar_paginado(
+                cursor=cursor,
+                limite=limite,
+                ordem=ordem,
+                decrescente=decrescente,
+                anterior=anterior,
+                filtros=filtros,
+                leitura=ProdutoLeitura
+            )
+
+            pagina = {
+                'itens': produtos,
+                'cursor_inicio': None,
+                'cursor_fim': None,
+                'tem_mais': tem_mais,
+                'total': None,
+                'total_exato': None,
+            }
+
+            if produtos:
+                pagina['cursor_inicio'] = self.repo.cursor_de(produtos[0], ordem)
+                pagina['cursor_fim'] = self.repo.cursor_de(produtos[-1], ordem)
+
+            if contar:
+                pagina['total'], pagina['total_exato'] = self.repo.contar_estimado(filtros)
+
+            return pagina
+        except ValueError as e:
+            raise ValueError(f"Erro ao listar produtos: {str(e)}") from e
+
+    @em_cache('produtos')
+    def buscar_produtos(self, termo: str) -> List[ProdutoLeitura]:
         """Busca produtos por termo"""
-        produtos = self.repo.buscar(termo)
-        return [self._serializar_produto(p) for p in produtos]
+        return self.repo.buscar(termo, leitura=ProdutoLeitura)
 
     def deletar_produto(self, produto_id: int) -> bool:
         """Deleta um produto"""
@@ -91,6 +152,7 @@ class ProdutoService:
             log_error(f"Erro ao ajustar estoque do produto {produto_id}: {str(e)}", exc_info=True)
             raise ValueError(f"Erro ao ajustar estoque: {str(e)}") from e
 
+    @em_cache('produtos')
     def obter_valor_total_estoque(self) -> float:
         """Obtém o valor total em estoque"""
         valor = self.repo.obter_valor_estoque()
@@ -0,0 +1,165 @@
+"""
+Serviço de Reajuste de Preços - Lógica de Negócio
+
+Uma regra é um dicionário:
+    {
+        'tipo': 'percentual' | 'absoluto',
+        'valor': 8.5,                  # % ou R$ (negativo reduz)
+        'arredondamento': '90' | '99' | None,
+        'prefixo_codigo': 'BEB',       # filtros opcionais
+        'padrao_nome': 'Refri*',
+        'margem_min': 0, 'margem_max': 30,
+        'custo_min': 1.0, 'custo_max': 50.0,
+        'apenas_ativos': True,
+    }
+"""
+from src.models.reajuste_repository import ReajusteRepository
+from src.utils.logger import log_info, log_error
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List
+import uuid
+
+
+class ReajusteService:
+    """Serviço de reajuste de preços em massa"""
+
+    TIPOS = ['percentual', 'absoluto']
+    ARREDONDAMENTOS = [None, '90', '99']
+    FILTROS_NUMERICOS = ['margem_min', 'margem_max', 'custo_min', 'custo_max']
+
+    def __init__(self):
+        self.repo = ReajusteRepository()
+
+    def previsualizar(self, regra: Dict, amostra: int = 20) -> Dict:
+        """Mostra quantos produtos a regra altera e como, sem gravar nada"""
+        try:
+            regra = self.validar_regra(regra)
+            previa = self.repo.previsualizar(regra, amostra)
+
+            return {
+                'regra': self.descrever_regra(regra),
+                'quantidade': previa['quantidade'],
+                'total_atual': float(previa['total_atual']),
+                'total_novo': float(previa['total_novo']),
+                'menor_variacao': float(previa['menor_variacao']),
+                'maior_variacao': float(previa['maior_variacao']),
+                'amostra': [
+                    {
+                        'id': p['id'],
+                        'codigo': p['codigo'],
+                        'nome': p['nome'],
+                        'preco_atual': float(p['preco_atual']),
+                        'preco_novo': float(p['preco_novo']),
+                    }
+                    for p in previa['amostra']
+                ],
+            }
+        except ValueError as e:
+            raise ValueError(f"Erro ao pré-visualizar reajuste: {str(e)}") from e
+
+    def aplicar(self, regras: List[Dict]) -> Dict:
+        """
+        Aplica uma ou mais regras, em ordem (cada uma é um UPDATE em sua transação)
+
+        Returns:
+            dict: {'lote': str, 'regras': [{'regra': str, 'produtos': int}],
+                   'total_produtos': int}
+        """
+        if isinstance(regras, dict):
+            regras = [regras]
+
+        try:
+            validadas = [self.validar_regra(r) for r in regras]
+        except ValueError as e:
+            raise ValueError(f"Erro ao aplicar reajuste: {str(e)}") from e
+
+        lote = uuid.uuid4().hex
+        resultado = {'lote': lote, 'regras': [], 'total_produtos': 0}
+
+        for regra in validadas:
+            descricao = self.descrever_regra(regra)
+            try:
+                alterados = self.repo.aplicar(regra, descricao, lote)
+            except Exception as e:
+                log_error(f"Erro ao aplicar reajuste '{descricao}': {str(e)}", exc_info=True)
+                raise ValueError(f"Erro ao aplicar reajuste '{descricao}': {str(e)}") from e
+
+            log_info(f"Reajuste aplicado ({descricao}): {alterados} produto(s) - lote {lote}")
+            resultado['regras'].append({'regra': descricao, 'produtos': alterados})
+            resultado['total_produtos'] += alterados
+
+        return resultado
+
+    def listar_historico(self, produto_id: int = None, lote: str = None,
+                         limite: int = 100) -> List[Dict]:
+        """Lista o histórico de preços"""
+        historico = self.repo.listar_historico(produto_id, lote, limite)
+        return [
+            {
+                'id': h.id,
+                'produto_id': h.produto_id,
+                'preco_anterior': float(h.preco_anterior),
+                'preco_novo': float(h.preco_novo),
+                'regra': h.regra,
+                'lote': h.lote,
+                'criado_em': h.criado_em.isoformat(),
+            }
+            for h in historico
+        ]
+
+    def validar_regra(self, regra: Dict) -> Dict:
+        """Valida e normaliza uma regra de reajuste"""
+        regra = dict(regra)
+
+        if regra.get('tipo') not in self.TIPOS:
+            raise ValueError(f"Tipo inválido. Use: {', '.join(self.TIPOS)}")
+
+        try:
+            regra['valor'] = Decimal(str(regra.get('valor')))
+        except InvalidOperation as exc:
+            raise ValueError("Valor do reajuste inválido") from exc
+        if not regra['valor'].is_finite():
+            raise ValueError("Valor do reajuste inválido")
+
+        if regra['valor'] == 0:
+            raise ValueError("Valor do reajuste deve ser diferente de zero")
+
+        if regra['tipo'] == 'percentual' and regra['valor'] <= -100:
+            raise ValueError("Reajuste percentual deve ser maior que -100%")
+
+        arredondamento = regra.get('arredondamento')
+        regra['arredondamento'] = str(arredondamento) if arredondamento else None
+        if regra['arredondamento'] not in self.ARREDONDAMENTOS:
+            raise ValueError("Arredondamento inválido. Use '90', '99' ou None")
+
+        for campo in self.FILTROS_NUMERICOS:
+            if regra.get(campo) is not None:
+                try:
+                    regra[campo] = Decimal(str(regra[campo]))
+                except InvalidOperation as exc:
+                    raise ValueError(f"Filtro {campo} inválido") from exc
+                if not regra[campo].is_finite():
+                    raise ValueError(f"Filtro {campo} inválido")
+
+        return regra
+
+    @staticmethod
+    def descrever_regra(regra: Dict) -> str:
+        """Texto curto da regra, gravado no histórico de preços"""
+        if regra['tipo'] == 'percentual':
+            partes = [f"{regra['valor']:+}%"]
+        else:
+            partes = [f"R$ {regra['valor']:+}"]
+
+        if regra.get('arredondamento'):
+            partes.append(f"arred. ,{regra['arredondamento']}")
+        if regra.get('prefixo_codigo'):
+            partes.append(f"código {regra['prefixo_codigo']}*")
+        if regra.get('padrao_nome'):
+            partes.append(f"nome '{regra['padrao_nome']}'")
+        if regra.get('margem_min') is not None or regra.get('margem_max') is not None:
+            partes.append(f"margem {regra.get('margem_min', '')}..{regra.get('margem_max', '')}%")
+        if regra.get('custo_min') is not None or regra.get('custo_max') is not None:
+            partes.append(f"custo {regra.get('custo_min', '')}..{regra.get('custo_max', '')}")
+
+        return ", ".join(partes)
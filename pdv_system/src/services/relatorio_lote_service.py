@@ -0,0 +1,201 @@
+"""
+Relatórios em lote - PDFs de um período gerados em paralelo
+
+O ReportLab ocupa um núcleo por PDF; no fechamento do mês (um relatório por
+dia, mais os cupons para auditoria) o lote é dividido entre processos
+(``ProcessPoolExecutor``), um por núcleo por padrão (RELATORIO_PROCESSOS).
+
+  - cada processo abre a sua conexão só de leitura (``usar_somente_leitura``)
+    e não disputa a trava de escrita com o caixa
+  - os processos são iniciados com ``spawn``: não herdam conexões nem threads
+    do processo que chamou (servidor da API, interface)
+  - os PDFs voltam para o processo principal e são gravados num ZIP, na
+    ordem do lote, com ``progresso(feitos, total, nome)`` a cada PDF
+  - um PDF que falha não derruba o lote: a falha vai para ``erros.txt`` no ZIP
+  - se o pool não sobe (ambiente sem ``fork``/``spawn``, limite de processos)
+    ou quebra no meio, os PDFs que faltam são gerados no próprio processo
+
+Cupons só existem para meses não arquivados (os itens das vendas arquivadas
+ficam nos arquivos mensais).
+
+Uso:
+    python -m src.services.relatorio_lote_service --inicio 2024-05-01 --fim 2024-05-31 \\
+        [--cupons] [--processos N] [--saida relatorios_maio.zip]
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+import multiprocessing
+import os
+import time
+import zipfile
+
+from src.database import connection
+from src.database.models import Venda
+from src.utils.logger import log_info, log_error, log_warning
+
+# (nome do arquivo no ZIP, tipo, chave)
+Tarefa = Tuple[str, str, object]
+
+
+def _iniciar_processo(caminho_banco: str):
+    """Conexão só de leitura do processo auxiliar"""
+    from src.database.connection import usar_somente_leitura
+    usar_somente_leitura(Path(caminho_banco)).connect(reuse_if_open=True)
+
+
+def _gerar(tarefa: Tarefa, nome_loja: str, largura_cupom: int) -> Tuple[str, bytes, str]:
+    """Gera um PDF no processo auxiliar: (nome, conteúdo, erro)"""
+    from src.services.relatorio_service import RelatorioService
+
+    nome, tipo, chave = tarefa
+    try:
+        if tipo == 'dia':
+            pdf = RelatorioService.gerar_relatorio_dia(chave, nome_loja)
+        else:
+            pdf = RelatorioService.gerar_cupom_venda(chave, nome_loja, largura_cupom)
+        return nome, pdf.getvalue(), None
+    except Exception as e:
+        return nome, None, str(e)
+
+
+class RelatorioLoteService:
+    """Geração de relatórios diários e cupons de um período em paralelo"""
+
+    def __init__(self, processos: int = None, nome_loja: str = None,
+                 largura_cupom: int = None, banco: Path = None):
+        from src.utils import config
+
+        self.processos = processos or config.RELATORIO_PROCESSOS or os.cpu_count() or 1
+        self.nome_loja = nome_loja or config.STORE_NAME
+        self.largura_cupom = largura_cupom or config.RECEIPT_WIDTH
+        self.banco = Path(banco) if banco else connection.DB_PATH
+
+    @staticmethod
+    def listar_tarefas(data_inicio: date, data_fim: date, cupons: bool = False) -> List[Tarefa]:
+        """Um relatório por dia do período e, se pedido, um cupom por venda finalizada"""
+        if data_fim < data_inicio:
+            raise ValueError("Data final anterior à inicial")
+
+        tarefas = []
+        dia = data_inicio
+        while dia <= data_fim:
+            tarefas.append((f"relatorios/relatorio_{dia.isoformat()}.pdf", 'dia', dia))
+            dia += timedelta(days=1)
+
+        if cupons:
+            vendas = (Venda
+                      .select(Venda.id, Venda.numero, Venda.data_hora)
+                      .where((Venda.processada == 1) &
+                             (Venda.data_hora >= datetime.combine(data_inicio, datetime.min.time())) &
+                             (Venda.data_hora <= datetime.combine(data_fim, datetime.max.time())))
+                      .order_by(Venda.numero)
+                      .tuples())
+            tarefas.extend(
+                (f"cupons/{data_hora.date().isoformat()}/cupom_{numero}.pdf", 'cupom', venda_id)
+                for venda_id, numero, data_hora in vendas
+            )
+        return tarefas
+
+    def gerar_zip(self, data_inicio: date, data_fim: date, cupons: bool = False,
+                  destino=None, progresso: Callable[[int, int, str], None] = None) -> Dict:
+        """
+        Gera os PDFs do período e grava num ZIP
+
+        Args:
+            destino: Caminho ou arquivo aberto (padrão: BytesIO, devolvido em 'zip')
+            progresso: Chamada a cada PDF pronto com (feitos, total, nome)
+
+        Returns:
+            dict: {'zip', 'arquivos', 'erros', 'processos', 'segundos'}
+        """
+        inicio = time.perf_counter()
+        tarefas = self.listar_tarefas(data_inicio, data_fim, cupons)
+        destino = destino if destino is not None else BytesIO()
+        processos = max(1, min(self.processos, len(tarefas)))
+        prontos: Dict[str, bytes] = {}
+        erros: Dict[str, str] = {}
+
+        def registrar(nome: str, conteudo: bytes, erro: str):
+            if erro:
+                erros[nome] = erro
+            else:
+                prontos[nome] = conteudo
+            if progresso:
+                progresso(len(prontos) + len(erros), len(tarefas), nome)
+
+        try:
+            try:
+                with ProcessPoolExecutor(processos,
+                                         mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=_iniciar_processo,
+                                         initargs=(str(self.banco),)) as pool:
+                    futuros = [pool.submit(_gerar, tarefa, self.nome_loja, self.largura_cupom)
+                               for tarefa in tarefas]
+                    for futuro in as_completed(futuros):
+                        registrar(*futuro.result())
+            except (OSError, NotImplementedError, BrokenProcessPool) as e:
+                log_warning(f"Pool de processos indisponível ({e}); "
+                            f"gerando os relatórios no próprio processo")
+                processos = 1
+                for tarefa in tarefas:
+                    if tarefa[0] not in prontos and tarefa[0] not in erros:
+                        registrar(*_gerar(tarefa, self.nome_loja, self.largura_cupom))
+
+            # ZIP na ordem do lote, independente da ordem de conclusão
+            with zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as arquivo_zip:
+                for nome, _tipo, _chave in tarefas:
+                    if nome in prontos:
+                        arquivo_zip.writestr(nome, prontos[nome])
+                if erros:
+                    arquivo_zip.writestr('erros.txt', ''.join(
+                        f"{nome}: {erro}\n" for nome, erro in sorted(erros.items())
+                    ))
+        except Exception as e:
+            log_error(f"Erro nos relatórios em lote: {str(e)}", exc_info=True)
+            raise ValueError(f"Erro ao gerar relatórios em lote: {str(e)}") from e
+
+        segundos = round(time.perf_counter() - inicio, 2)
+        log_info(f"Relatórios em lote {data_inicio} a {data_fim}: {len(prontos)} PDF(s), "
+                 f"{len(erros)} erro(s), {processos} processo(s), {segundos}s")
+        if isinstance(destino, BytesIO):
+            destino.seek(0)
+        return {
+            'zip': destino,
+            'arquivos': len(prontos),
+            'erros': erros,
+            'processos': processos,
+            'segundos': segundos,
+        }
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Relatórios diários e cupons de um período em ZIP")
+    parser.add_argument('--inicio', required=True, type=date.fromisoformat)
+    parser.add_argument('--fim', required=True, type=date.fromisoformat)
+    parser.add_argument('--cupons', action='store_true', help="Inclui um cupom por venda")
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--saida', type=Path, default=None,
+                        help="Arquivo ZIP (padrão: relatorios_INICIO_FIM.zip)")
+    args = parser.parse_args()
+
+    saida = args.saida or Path(f"relatorios_{args.inicio}_{args.fim}.zip")
+
+    def mostrar_progresso(feitos, total, nome):
+        sys.stdout.write(f"\r{feitos}/{total} {nome[:60]:<60}")
+        sys.stdout.flush()
+
+    with open(saida, 'wb') as arquivo:
+        resultado = RelatorioLoteService(args.processos).gerar_zip(
+            args.inicio, args.fim, args.cupons, arquivo, mostrar_progresso
+        )
+    print(f"\n{resultado['arquivos']} PDF(s) em {saida} ({resultado['processos']} processo(s), "
+          f"{resultado['segundos']}s)")
+    for nome, erro in resultado['erros'].items():
+        print(f"  erro em {nome}: {erro}")
@@ -7,7 +7,10 @@ from reportlab.lib.units import cm, mm
 from reportlab.pdfgen import canvas
 from datetime import datetime, date
 from decimal import Decimal
-from src.database.models import Venda
+from peewee import fn
+from src.database.models import Venda, ItemVenda
+from src.models.arquivo_repository import ArquivoRepository
+from src.models.venda_repository import VendaRepository
 
 
 class RelatorioService:
@@ -31,7 +34,7 @@ class RelatorioService:
             BytesIO com conteúdo do PDF
         """
         try:
-            venda = Venda.get_by_id(venda_id)
+            venda = VendaRepository.obter_venda_completa(venda_id)
             
             # Dimensões do papel
             if largura_mm == 80:
@@ -91,7 +94,7 @@ class RelatorioService:
             
             for item in venda.itens:
                 # Descrição do produto
-                desc = f"{item.produto.codigo} - {item.produto.nome}"
+                desc = f"{item.codigo_produto} - {item.nome_produto}"
                 desc_truncado = desc[:30] if len(desc) > 30 else desc
                 c.drawString(0.3 * cm, y, desc_truncado)
                 y -= 0.25 * cm
@@ -176,11 +179,27 @@ class RelatorioService:
             inicio = datetime.combine(data_dia, datetime.min.time())
             fim = datetime.combine(data_dia, datetime.max.time())
             
-            vendas = Venda.select().where(
-                (Venda.processada == 1) &
-                (Venda.data_hora >= inicio) &
-                (Venda.data_hora <= fim)
-            ).order_by(Venda.numero)
+            if ArquivoRepository.meses_arquivados(inicio, fim):
+                vendas = ArquivoRepository.consultar(
+                    Venda, 'data_hora', inicio, fim,
+                    filtro_sql='t."processada" = 1',
+                    ordenar_por='numero',
+                    extras=['(SELECT COUNT(*) FROM "{esquema}"."itens_venda" AS i '
+                            'WHERE i."venda_id" = t."id") AS qtd_itens']
+                )
+            else:
+                qtd_itens = (ItemVenda
+                             .select(fn.COUNT(ItemVenda.id))
+                             .where(ItemVenda.venda == Venda.id))
+                vendas = list(
+                    Venda.select(Venda, qtd_itens.alias('qtd_itens'))
+                    .where(
+                        (Venda.processada == 1) &
+                        (Venda.data_hora >= inicio) &
+                        (Venda.data_hora <= fim)
+                    )
+                    .order_by(Venda.numero)
+                )
             
             # Criar PDF
             buffer = BytesIO()
@@ -218,7 +237,7 @@ class RelatorioService:
             for venda in vendas:
                 numero_str = f"#{venda.numero}"
                 hora_str = venda.data_hora.strftime("%H:%M")
-                qtd_itens = len(list(venda.itens))
+                qtd_itens = venda.qtd_itens
                 
                 c.drawString(1 * cm, y, numero_str)
                 c.drawString(3 * cm, y, hora_str)
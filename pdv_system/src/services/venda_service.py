@@ -3,10 +3,16 @@ Serviço de Vendas - Lógica de Negócio
 """
 from src.models.venda_repository import VendaRepository
 from src.models.produto_repository import ProdutoRepository
+from src.models.reserva_repository import ReservaEstoqueRepository
+from src.models.leitura import ItemVendaCompleto, VendaLeitura
+from src.database.connection import get_db
+from src.database.diario import diario_ativo
 from src.database.models import Venda, ItemVenda
 from src.utils.logger import log_info, log_error, log_venda
+from src.utils.atividade import registrar_atividade
+from src.utils.eventos import barramento
 from decimal import Decimal
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from datetime import date
 
 
@@ -20,6 +26,7 @@ class VendaService:
     def iniciar_venda(self, forma_pagamento: str, observacoes: str = None) -> Dict:
         """Inicia uma nova venda"""
         try:
+            registrar_atividade()
             venda = self.venda_repo.criar_venda(forma_pagamento, observacoes)
             return self._serializar_venda(venda)
         except Exception as e:
@@ -29,6 +36,7 @@ class VendaService:
                                quantidade: int) -> Dict:
         """Adiciona um item ao carrinho"""
         try:
+            registrar_atividade()
             # Buscar produto por código
             produto = self.produto_repo.obter_por_codigo(codigo_produto)
             
@@ -41,6 +49,7 @@ class VendaService:
     def remover_item_carrinho(self, item_id: int) -> bool:
         """Remove um item do carrinho"""
         try:
+            registrar_atividade()
             return self.venda_repo.remover_item(item_id)
         except Exception as e:
             raise ValueError(f"Erro ao remover item: {str(e)}") from e
@@ -48,25 +57,55 @@ class VendaService:
     def atualizar_quantidade_item(self, item_id: int, nova_quantidade: int) -> Dict:
         """Atualiza a quantidade de um item"""
         try:
+            registrar_atividade()
             item = self.venda_repo.atualizar_quantidade_item(item_id, nova_quantidade)
             return self._serializar_item(item)
         except Exception as e:
             raise ValueError(f"Erro ao atualizar quantidade: {str(e)}") from e
 
+    def reservar_item(self, venda_id: int, produto_id: int, quantidade: int) -> Dict:
+        """
+        Reserva ``quantidade`` (total) de um produto para o carrinho, sem gravar o item
+
+        Para interfaces que montam o carrinho localmente e só gravam os itens
+        na finalização: garante as unidades desde a leitura do código.
+
+        Returns:
+            dict: {'produto_id', 'quantidade', 'reservado', 'disponivel'}
+        """
+        try:
+            registrar_atividade()
+            reservado = ReservaEstoqueRepository.reservar(venda_id, produto_id, quantidade)
+            return {
+                'produto_id': produto_id,
+                'quantidade': quantidade,
+                'reservado': reservado,
+                'disponivel': max(ReservaEstoqueRepository.disponivel(produto_id, venda_id), 0),
+            }
+        except Exception as e:
+            raise ValueError(f"Erro ao reservar estoque: {str(e)}") from e
+
+    def liberar_item(self, venda_id: int, produto_id: int) -> bool:
+        """Libera a reserva de um produto do carrinho"""
+        try:
+            registrar_atividade()
+            return ReservaEstoqueRepository.liberar(venda_id, produto_id) > 0
+        except Exception as e:
+            raise ValueError(f"Erro ao liberar reserva: {str(e)}") from e
+
     def obter_carrinho(self, venda_id: int) -> Dict:
         """Obtém os itens do carrinho de uma venda"""
         try:
-            venda = self.venda_repo.obter_venda(venda_id)
-            itens = self.venda_repo.obter_itens_carrinho(venda_id)
+            venda = self.venda_repo.obter_venda_completa(venda_id)
             
             return {
                 'venda_id': venda.id,
                 'numero': venda.numero,
                 'forma_pagamento': venda.forma_pagamento,
-                'itens': [self._serializar_item(item) for item in itens],
+                'itens': [self._serializar_item_completo(item) for item in venda.itens],
                 'subtotal': float(venda.total),
                 'desconto': float(venda.desconto),
-                'total': float(venda.total - venda.desconto),
+                'total': float(venda.total_liquido),
             }
         except Exception as e:
             raise ValueError(f"Erro ao obter carrinho: {str(e)}") from e
@@ -74,6 +113,7 @@ class VendaService:
     def aplicar_desconto(self, venda_id: int, desconto: float) -> Dict:
         """Aplica um desconto à venda"""
         try:
+            registrar_atividade()
             venda = self.venda_repo.aplicar_desconto(
                 venda_id,
                 Decimal(str(desconto))
@@ -85,19 +125,68 @@ class VendaService:
     def finalizar_venda(self, venda_id: int, valor_pago: float) -> Dict:
         """Finaliza a venda"""
         try:
+            registrar_atividade()
             venda = self.venda_repo.finalizar_venda(
                 venda_id,
                 Decimal(str(valor_pago))
             )
-            log_info(f"Venda #{venda.numero} finalizada com sucesso pelo serviço")
-            return self._serializar_venda(venda)
+            return self._venda_finalizada(venda)
+        except Exception as e:
+            log_error(f"Erro ao finalizar venda #{venda_id}: {str(e)}", exc_info=True)
+            raise ValueError(f"Erro ao finalizar venda: {str(e)}") from e
+
+    def finalizar_carrinho(self, venda_id: int, itens: List[Tuple[str, int]],
+                           desconto: float, valor_pago: float) -> Dict:
+        """
+        Grava os itens (código, quantidade), o desconto e finaliza, tudo ou nada
+
+        Se a finalização falhar (ex.: valor insuficiente), os itens não ficam
+        na venda e a operação pode ser repetida.
+
+        No modo diário o registro no diário (com fsync) é gravado depois do
+        commit dos itens: ele não pode descrever itens que ainda podem ser
+        desfeitos, nem segurar a trava de escrita durante o fsync. As
+        conferências da finalização rodam antes do commit; só uma falha ao
+        gravar o próprio diário deixa os itens no carrinho, ainda aberto.
+        """
+        try:
+            registrar_atividade()
+            valor_pago = Decimal(str(valor_pago))
+            if not diario_ativo():
+                with get_db().atomic('IMMEDIATE'):
+                    self._gravar_carrinho(venda_id, itens, desconto)
+                    venda = self.venda_repo.finalizar_venda(venda_id, valor_pago)
+            else:
+                with get_db().atomic('IMMEDIATE'):
+                    self._gravar_carrinho(venda_id, itens, desconto)
+                    self.venda_repo.conferir_finalizacao_diario(venda_id, valor_pago)
+                venda = self.venda_repo.finalizar_venda(venda_id, valor_pago)
+            return self._venda_finalizada(venda)
         except Exception as e:
             log_error(f"Erro ao finalizar venda #{venda_id}: {str(e)}", exc_info=True)
             raise ValueError(f"Erro ao finalizar venda: {str(e)}") from e
 
+    def _gravar_carrinho(self, venda_id: int, itens: List[Tuple[str, int]], desconto: float):
+        """Adiciona os itens e aplica o desconto (chamar dentro de uma transação)"""
+        for codigo, quantidade in itens:
+            produto = self.produto_repo.obter_por_codigo(codigo)
+            self.venda_repo.adicionar_item(venda_id, produto.id, quantidade)
+        if desconto > 0:
+            self.venda_repo.aplicar_desconto(venda_id, Decimal(str(desconto)))
+
+    def _venda_finalizada(self, venda: Venda) -> Dict:
+        """Avisa a finalização (já gravada) e devolve a venda serializada"""
+        log_info(f"Venda #{venda.numero} finalizada com sucesso pelo serviço")
+        if not diario_ativo():
+            # No modo diário quem avisa é o AplicadorDiario, quando a venda chega ao banco
+            barramento.publicar('venda.finalizada', valor=venda.total - venda.desconto,
+                                data_hora=venda.data_hora)
+        return self._serializar_venda(venda)
+
     def cancelar_venda(self, venda_id: int) -> bool:
         """Cancela uma venda"""
         try:
+            registrar_atividade()
             resultado = self.venda_repo.cancelar_venda(venda_id)
             log_info(f"Venda #{venda_id} cancelada com sucesso")
             return resultado
@@ -105,11 +194,10 @@ class VendaService:
             log_error(f"Erro ao cancelar venda #{venda_id}: {str(e)}", exc_info=True)
             raise ValueError(f"Erro ao cancelar venda: {str(e)}") from e
 
-    def listar_vendas_dia(self, data_dia: date = None) -> List[Dict]:
+    def listar_vendas_dia(self, data_dia: date = None) -> List[VendaLeitura]:
         """Lista vendas do dia"""
         try:
-            vendas = self.venda_repo.listar_vendas_dia(data_dia)
-            return [self._serializar_venda(v) for v in vendas]
+            return self.venda_repo.listar_vendas_dia(data_dia, leitura=VendaLeitura)
         except Exception as e:
             raise ValueError(f"Erro ao listar vendas: {str(e)}") from e
 
@@ -143,10 +231,23 @@ class VendaService:
         """Converte um item de venda em dicionário"""
         return {
             'id': item.id,
-            'produto_id': item.produto.id,
+            'produto_id': item.produto_id,
             'codigo_produto': item.produto.codigo,
             'nome_produto': item.produto.nome,
             'quantidade': item.quantidade,
             'preco_unitario': float(item.preco_unitario),
             'subtotal': float(item.subtotal),
         }
+
+    @staticmethod
+    def _serializar_item_completo(item: ItemVendaCompleto) -> Dict:
+        """Converte um item de VendaCompleta em dicionário"""
+        return {
+            'id': item.id,
+            'produto_id': item.produto_id,
+            'codigo_produto': item.codigo_produto,
+            'nome_produto': item.nome_produto,
+            'quantidade': item.quantidade,
+            'preco_unitario': float(item.preco_unitario),
+            'subtotal': float(item.subtotal),
+        }
@@ -0,0 +1,10 @@
+"""
+Sincronização entre terminais e o nó central da loja
+
+- registro:   grava as mudanças locais (vendas, ajustes de estoque) na mesma
+              transação da operação, sem tocar a rede
+- cliente:    envia as mudanças em lotes e recebe o catálogo por versão
+- no_central: serviço HTTP que consolida o estoque e versiona o catálogo
+
+Ativada quando SYNC_URL está definido no .env.
+"""
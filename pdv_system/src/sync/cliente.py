@@ -0,0 +1,268 @@
+"""
+Cliente de sincronização do terminal
+
+``sincronizar()`` faz, nesta ordem:
+  1. envia as mudanças pendentes (sync_mudancas) em lotes; o nó central
+     devolve os ids aceitos, que são marcados como enviados
+  2. busca o catálogo alterado desde a última versão recebida e grava no
+     ``produtos`` local; o estoque local passa a ser o estoque central menos
+     as baixas locais que ainda não chegaram ao central
+
+Sem conexão, ``sincronizar()`` apenas devolve ``online=False``: as vendas
+continuam sendo gravadas só no disco local e vão no próximo ciclo. Todas as
+requisições levam ``Authorization: Bearer <SYNC_TOKEN>``.
+
+Um produto do central cujo nome ou código colide com outro produto local é
+pulado (com aviso no log) sem interromper o resto do catálogo.
+"""
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+import json
+import socket
+import threading
+
+from peewee import IntegrityError, chunked
+
+from src.database.connection import get_db
+from src.database.models import MudancaSync, EstadoSync, Produto
+from src.utils.logger import log_info, log_warning, log_error
+
+
+class ClienteSync:
+    """Envia mudanças e recebe o catálogo do nó central"""
+
+    def __init__(self, url: str, terminal: str, token: str = '', tamanho_lote: int = 200,
+                 timeout: float = 3.0):
+        self.url = url.rstrip('/')
+        self.terminal = terminal
+        self.token = token
+        self.tamanho_lote = tamanho_lote
+        self.timeout = timeout
+        self.ultimo_resultado = None
+
+    def _requisitar(self, caminho: str, corpo: Dict = None) -> Dict:
+        dados = json.dumps(corpo).encode('utf-8') if corpo is not None else None
+        requisicao = Request(
+            f"{self.url}{caminho}", data=dados,
+            headers={'Content-Type': 'application/json',
+                     'Authorization': f"Bearer {self.token}"},
+            method='POST' if dados is not None else 'GET'
+        )
+        with urlopen(requisicao, timeout=self.timeout) as resposta:
+            return json.loads(resposta.read())
+
+    def sincronizar(self) -> Dict:
+        """
+        Envia as pendências e recebe o catálogo
+
+        Returns:
+            dict: {'online', 'enviadas', 'recebidos', 'versao', 'pendentes'}
+        """
+        resultado = {'online': True, 'enviadas': 0, 'recebidos': 0}
+        try:
+            resultado['enviadas'] = self.enviar_pendentes()
+            resultado['recebidos'] = self.receber_catalogo()
+        except HTTPError as e:
+            resultado['online'] = False
+            if e.code == 401:
+                log_error(f"Nó central recusou o token deste terminal ({self.url}); confira SYNC_TOKEN")
+            else:
+                log_warning(f"Nó central respondeu {e.code} ({self.url}): {e.reason}")
+        except (URLError, socket.timeout, ConnectionError) as e:
+            resultado['online'] = False
+            log_warning(f"Nó central indisponível ({self.url}): {e}")
+
+        resultado['versao'] = self.versao_catalogo()
+        resultado['pendentes'] = MudancaSync.select().where(
+            MudancaSync.enviado_em.is_null()
+        ).count()
+        self.ultimo_resultado = resultado
+        return resultado
+
+    def enviar_pendentes(self) -> int:
+        """Envia as mudanças não enviadas, em lotes; devolve quantas foram aceitas"""
+        enviadas = 0
+        while True:
+            lote = list(
+                MudancaSync.select()
+                .where(MudancaSync.enviado_em.is_null())
+                .order_by(MudancaSync.id)
+                .limit(self.tamanho_lote)
+            )
+            if not lote:
+                return enviadas
+
+            resposta = self._requisitar('/sync/mudancas', {
+                'terminal': self.terminal,
+                'mudancas': [
+                    {'id': m.id, 'tipo': m.tipo, 'dados': json.loads(m.dados)}
+                    for m in lote
+                ],
+            })
+
+            aceitas = resposta.get('aceitas', [])
+            if aceitas:
+                (MudancaSync
+                 .update(enviado_em=datetime.now())
+                 .where(MudancaSync.id.in_(aceitas))
+                 .execute())
+            enviadas += len(aceitas)
+
+            if len(aceitas) < len(lote):
+                log_error(f"Nó central aceitou {len(aceitas)} de {len(lote)} mudanças")
+                return enviadas
+
+    def receber_catalogo(self) -> int:
+        """Aplica localmente os produtos alterados no central; devolve quantos"""
+        recebidos = 0
+        while True:
+            desde = self.versao_catalogo()
+            resposta = self._requisitar(
+                f'/sync/catalogo?desde={desde}&limite={self.tamanho_lote}'
+            )
+            if resposta['produtos']:
+                recebidos += self._aplicar_catalogo(resposta['produtos'], resposta['versao'])
+            if not resposta['tem_mais']:
+                return recebidos
+
+    def _aplicar_catalogo(self, produtos: list, versao: int) -> int:
+        """
+        Grava os produtos do central e a nova versão numa transação
+
+        Cada lote vai num savepoint; se algum produto colidir (nome ou código
+        já usado por outro produto local), o lote é refeito linha a linha e só
+        os produtos em conflito ficam de fora. Devolve quantos foram gravados.
+        """
+        agora = datetime.now()
+        db = get_db()
+        ignorados = 0
+
+        with db.atomic():
+            pendentes = self.baixas_pendentes()
+            registros = [
+                {
+                    'codigo': p['codigo'],
+                    'nome': p['nome'],
+                    'preco_venda': Decimal(str(p['preco_venda'])),
+                    'preco_custo': Decimal(str(p['preco_custo'])),
+                    'estoque': int(p['estoque']) + pendentes.get(p['codigo'], 0),
+                    'ativo': int(p['ativo']),
+                    'criado_em': agora,
+                    'atualizado_em': agora,
+                }
+                for p in produtos
+            ]
+            for lote in chunked(registros, 100):
+                try:
+                    with db.atomic():
+                        self._gravar_produtos(lote)
+                except IntegrityError:
+                    for registro in lote:
+                        try:
+                            with db.atomic():
+                                self._gravar_produtos([registro])
+                        except IntegrityError as e:
+                            ignorados += 1
+                            log_warning(
+                                f"Produto {registro['codigo']} ({registro['nome']}) do nó central "
+                                f"ignorado: conflito com um produto local ({e})"
+                            )
+
+            (EstadoSync
+             .insert(chave='versao_catalogo', valor=str(versao))
+             .on_conflict(conflict_target=[EstadoSync.chave], preserve=[EstadoSync.valor])
+             .execute())
+
+        return len(produtos) - ignorados
+
+    @staticmethod
+    def _gravar_produtos(registros: list):
+        (Produto
+         .insert_many(registros)
+         .on_conflict(
+             conflict_target=[Produto.codigo],
+             preserve=[Produto.nome, Produto.preco_venda, Produto.preco_custo,
+                       Produto.estoque, Produto.ativo, Produto.atualizado_em]
+         )
+         .execute())
+
+    @staticmethod
+    def baixas_pendentes() -> Dict[str, int]:
+        """Delta de estoque, por código, das mudanças ainda não enviadas"""
+        deltas = defaultdict(int)
+        for mudanca in MudancaSync.select().where(MudancaSync.enviado_em.is_null()):
+            dados = json.loads(mudanca.dados)
+            if mudanca.tipo == 'venda':
+                for item in dados['itens']:
+                    deltas[item['codigo']] -= int(item['quantidade'])
+            elif mudanca.tipo == 'estoque':
+                deltas[dados['codigo']] += int(dados['delta'])
+        return deltas
+
+    @staticmethod
+    def versao_catalogo() -> int:
+        estado = EstadoSync.get_or_none(EstadoSync.chave == 'versao_catalogo')
+        return int(estado.valor) if estado else 0
+
+
+class AgendadorSync:
+    """Sincroniza periodicamente numa thread em segundo plano"""
+
+    def __init__(self, cliente: ClienteSync, intervalo_segundos: float = 30):
+        self.cliente = cliente
+        self.intervalo = intervalo_segundos
+        self._parar = threading.Event()
+        self._agora = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="sync", daemon=True)
+        self._thread.start()
+        log_info(f"Sincronização com {self.cliente.url} a cada {self.intervalo:g}s")
+
+    def sincronizar_agora(self):
+        """Antecipa o próximo ciclo (ex.: botão na interface)"""
+        self._agora.set()
+
+    def parar(self, timeout: float = 5):
+        self._parar.set()
+        self._agora.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _executar(self):
+        while not self._parar.is_set():
+            try:
+                self.cliente.sincronizar()
+            except Exception as e:
+                log_error(f"Erro na sincronização: {str(e)}", exc_info=True)
+            self._agora.wait(self.intervalo)
+            self._agora.clear()
+
+
+if __name__ == '__main__':
+    import argparse
+    from src.bootstrap import inicializar
+    from src.utils import config
+
+    parser = argparse.ArgumentParser(description="Sincroniza este terminal com o nó central")
+    parser.add_argument('--url', default=None, help="Padrão: SYNC_URL do .env")
+    parser.add_argument('--terminal', default=None, help="Padrão: SYNC_TERMINAL do .env")
+    parser.add_argument('--token', default=None, help="Padrão: SYNC_TOKEN do .env")
+    args = parser.parse_args()
+
+    inicializar()
+    url = args.url or config.SYNC_URL
+    if not url:
+        parser.error("informe --url ou defina SYNC_URL")
+
+    cliente = ClienteSync(url, args.terminal or config.SYNC_TERMINAL,
+                          args.token or config.SYNC_TOKEN)
+    print(cliente.sincronizar())
@@ -0,0 +1,345 @@
+"""
+Nó central da loja
+
+Serviço HTTP/JSON pequeno (http.server) com seu próprio banco SQLite
+(``data/central.db``), separado do ``loja.db`` dos terminais.
+
+Endpoints:
+    POST /sync/mudancas   {'terminal', 'mudancas': [{'id', 'tipo', 'dados'}]}
+                          -> {'aceitas': [id, ...]}
+        Aplica vendas e ajustes como deltas de estoque. Cada (terminal, id) é
+        aplicado uma única vez, então reenviar um lote é seguro.
+    GET  /sync/catalogo?desde=V&limite=N
+                          -> {'produtos': [...], 'versao': V2, 'tem_mais': bool}
+        Produtos alterados depois da versão V, em ordem de versão.
+    POST /sync/catalogo   {'produtos': [{'codigo', 'nome', 'preco_venda', ...}]}
+        Publica cadastro/preços (retaguarda). ``estoque`` opcional sobrescreve
+        a contagem.
+    GET  /sync/status
+
+Cada produto alterado recebe uma versão nova (contador único), o que permite
+aos terminais buscar só o que mudou.
+
+Toda requisição precisa do cabeçalho ``Authorization: Bearer <token>`` com o
+segredo compartilhado (``--token`` aqui, ``SYNC_TOKEN`` nos terminais); sem
+ele a resposta é 401. O servidor escuta só em 127.0.0.1, a menos que
+``--host`` diga outra coisa.
+
+Uso:
+    python -m src.sync.no_central --token SEGREDO [--host 127.0.0.1] [--porta 8765]
+                                  [--banco data/central.db]
+                                  [--importar-catalogo data/loja.db]
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+from datetime import datetime
+import hmac
+import json
+import sqlite3
+import threading
+
+from src.database.connection import DATA_DIR
+from src.utils.logger import log_info, log_error, log_warning
+
+ESQUEMA = [
+    'CREATE TABLE IF NOT EXISTS produtos ('
+    ' codigo TEXT PRIMARY KEY, nome TEXT NOT NULL, preco_venda TEXT NOT NULL,'
+    ' preco_custo TEXT NOT NULL DEFAULT \'0.00\', estoque INTEGER NOT NULL DEFAULT 0,'
+    ' ativo INTEGER NOT NULL DEFAULT 1, versao INTEGER NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS idx_produtos_versao ON produtos (versao)',
+    'CREATE TABLE IF NOT EXISTS mudancas_recebidas ('
+    ' terminal TEXT NOT NULL, mudanca_id INTEGER NOT NULL, tipo TEXT NOT NULL,'
+    ' dados TEXT NOT NULL, recebida_em TEXT NOT NULL,'
+    ' PRIMARY KEY (terminal, mudanca_id))',
+    'CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT NOT NULL)',
+]
+
+
+class NoCentral:
+    """Estado do nó central (estoque consolidado e catálogo versionado)"""
+
+    LIMITE_PADRAO = 500
+
+    def __init__(self, banco: Path = None):
+        self.banco = Path(banco) if banco else DATA_DIR / "central.db"
+        self._local = threading.local()
+        self._escrita = threading.Lock()
+
+        conexao = self._conexao()
+        for comando in ESQUEMA:
+            conexao.execute(comando)
+        linha = conexao.execute("SELECT valor FROM meta WHERE chave = 'versao'").fetchone()
+        self.versao = int(linha[0]) if linha else 0
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Uma conexão por thread do servidor"""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            self.banco.parent.mkdir(parents=True, exist_ok=True)
+            conexao = sqlite3.connect(str(self.banco), isolation_level=None, timeout=5)
+            conexao.execute("PRAGMA journal_mode = wal")
+            conexao.execute("PRAGMA synchronous = 1")
+            self._local.conexao = conexao
+        return conexao
+
+    def _proxima_versao(self) -> int:
+        self.versao += 1
+        return self.versao
+
+    def _gravar_versao(self, conexao):
+        conexao.execute(
+            "INSERT INTO meta (chave, valor) VALUES ('versao', ?) "
+            "ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor",
+            (str(self.versao),)
+        )
+
+    def _aplicar_delta(self, conexao, codigo: str, delta: int, nome: str, preco: str):
+        atualizado = conexao.execute(
+            "UPDATE produtos SET estoque = estoque + ?, versao = ? WHERE codigo = ?",
+            (delta, self._proxima_versao(), codigo)
+        ).rowcount
+        if not atualizado:
+            # Produto cadastrado só no terminal: passa a existir no central
+            conexao.execute(
+                "INSERT INTO produtos (codigo, nome, preco_venda, estoque, versao) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (codigo, nome or codigo, preco or '0.00', delta, self.versao)
+            )
+
+    def receber_mudancas(self, terminal: str, mudancas: List[Dict]) -> List[int]:
+        """Aplica as mudanças de um terminal numa transação; devolve os ids aceitos"""
+        aceitas = []
+
+        with self._escrita:
+            conexao = self._conexao()
+            versao_inicial = self.versao
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                for mudanca in mudancas:
+                    nova = conexao.execute(
+                        "INSERT OR IGNORE INTO mudancas_recebidas "
+                        "(terminal, mudanca_id, tipo, dados, recebida_em) VALUES (?, ?, ?, ?, ?)",
+                        (terminal, mudanca['id'], mudanca['tipo'],
+                         json.dumps(mudanca['dados']), datetime.now().isoformat())
+                    ).rowcount
+                    aceitas.append(mudanca['id'])
+                    if not nova:
+                        continue  # já aplicada num envio anterior
+
+                    dados = mudanca['dados']
+                    if mudanca['tipo'] == 'venda':
+                        for item in dados['itens']:
+                            self._aplicar_delta(conexao, item['codigo'], -int(item['quantidade']),
+                                                item.get('nome'), item.get('preco_unitario'))
+                    elif mudanca['tipo'] == 'estoque':
+                        self._aplicar_delta(conexao, dados['codigo'], int(dados['delta']),
+                                            dados.get('nome'), dados.get('preco_venda'))
+                    else:
+                        log_warning(f"Tipo de mudança desconhecido de {terminal}: {mudanca['tipo']}")
+
+                self._gravar_versao(conexao)
+                conexao.execute("COMMIT")
+            except Exception:
+                conexao.execute("ROLLBACK")
+                self.versao = versao_inicial
+                raise
+
+        return aceitas
+
+    def publicar_catalogo(self, produtos: List[Dict]) -> int:
+        """Insere/atualiza produtos (cadastro e preços); devolve a versão final"""
+        with self._escrita:
+            conexao = self._conexao()
+            versao_inicial = self.versao
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                for produto in produtos:
+                    conexao.execute(
+                        "INSERT INTO produtos "
+                        "(codigo, nome, preco_venda, preco_custo, estoque, ativo, versao) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(codigo) DO UPDATE SET "
+                        " nome = excluded.nome, preco_venda = excluded.preco_venda,"
+                        " preco_custo = excluded.preco_custo, ativo = excluded.ativo,"
+                        " versao = excluded.versao"
+                        + (", estoque = excluded.estoque" if 'estoque' in produto else ""),
+                        (produto['codigo'], produto['nome'], str(produto['preco_venda']),
+                         str(produto.get('preco_custo', '0.00')), int(produto.get('estoque', 0)),
+                         int(produto.get('ativo', 1)), self._proxima_versao())
+                    )
+                self._gravar_versao(conexao)
+                conexao.execute("COMMIT")
+            except Exception:
+                conexao.execute("ROLLBACK")
+                self.versao = versao_inicial
+                raise
+        return self.versao
+
+    def catalogo_desde(self, desde: int, limite: int = None) -> Dict:
+        """Produtos alterados depois da versão ``desde``"""
+        limite = min(limite or self.LIMITE_PADRAO, self.LIMITE_PADRAO)
+        linhas = self._conexao().execute(
+            "SELECT codigo, nome, preco_venda, preco_custo, estoque, ativo, versao "
+            "FROM produtos WHERE versao > ? ORDER BY versao LIMIT ?",
+            (desde, limite + 1)
+        ).fetchall()
+
+        tem_mais = len(linhas) > limite
+        linhas = linhas[:limite]
+        colunas = ['codigo', 'nome', 'preco_venda', 'preco_custo', 'estoque', 'ativo', 'versao']
+        return {
+            'produtos': [dict(zip(colunas, linha)) for linha in linhas],
+            'versao': linhas[-1][6] if linhas else desde,
+            'tem_mais': tem_mais,
+        }
+
+    def status(self) -> Dict:
+        conexao = self._conexao()
+        return {
+            'versao': self.versao,
+            'produtos': conexao.execute("SELECT COUNT(*) FROM produtos").fetchone()[0],
+            'mudancas_recebidas': conexao.execute(
+                "SELECT COUNT(*) FROM mudancas_recebidas").fetchone()[0],
+        }
+
+    def importar_catalogo(self, loja_db: Path) -> int:
+        """Carrega o catálogo inicial a partir do loja.db de um terminal"""
+        origem = sqlite3.connect(f"file:{loja_db}?mode=ro", uri=True)
+        try:
+            produtos = [
+                {'codigo': c, 'nome': n, 'preco_venda': pv, 'preco_custo': pc,
+                 'estoque': e, 'ativo': a}
+                for c, n, pv, pc, e, a in origem.execute(
+                    "SELECT codigo, nome, preco_venda, preco_custo, estoque, ativo FROM produtos"
+                )
+            ]
+        finally:
+            origem.close()
+        self.publicar_catalogo(produtos)
+        return len(produtos)
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    """Traduz as requisições HTTP para o NoCentral do servidor"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, formato, *args):
+        pass  # o acesso não vai para o stderr
+
+    def _responder(self, status: int, corpo: Dict):
+        dados = json.dumps(corpo).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _ler_json(self) -> Dict:
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(tamanho) or b'{}')
+
+    def _autorizado(self) -> bool:
+        """Confere o token; responde 401 (descartando o corpo) quando não bate"""
+        cabecalho = self.headers.get('Authorization') or ''
+        recebido = cabecalho[len('Bearer '):] if cabecalho.startswith('Bearer ') else ''
+        if hmac.compare_digest(recebido.encode('utf-8'), self.server.token.encode('utf-8')):
+            return True
+
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        log_warning(f"Requisição sem token válido de {self.client_address[0]}: {self.path}")
+        self._responder(401, {'erro': 'não autorizado'})
+        return False
+
+    def do_GET(self):
+        if not self._autorizado():
+            return
+        url = urlparse(self.path)
+        no = self.server.no
+        try:
+            if url.path == '/sync/catalogo':
+                parametros = parse_qs(url.query)
+                self._responder(200, no.catalogo_desde(
+                    int(parametros.get('desde', ['0'])[0]),
+                    int(parametros.get('limite', ['0'])[0]) or None
+                ))
+            elif url.path == '/sync/status':
+                self._responder(200, no.status())
+            else:
+                self._responder(404, {'erro': 'não encontrado'})
+        except (ValueError, KeyError) as e:
+            self._responder(400, {'erro': str(e)})
+
+    def do_POST(self):
+        if not self._autorizado():
+            return
+        url = urlparse(self.path)
+        no = self.server.no
+        try:
+            corpo = self._ler_json()
+            if url.path == '/sync/mudancas':
+                self._responder(200, {
+                    'aceitas': no.receber_mudancas(corpo['terminal'], corpo['mudancas'])
+                })
+            elif url.path == '/sync/catalogo':
+                self._responder(200, {'versao': no.publicar_catalogo(corpo['produtos'])})
+            else:
+                self._responder(404, {'erro': 'não encontrado'})
+        except (ValueError, KeyError) as e:
+            self._responder(400, {'erro': str(e)})
+        except sqlite3.Error as e:
+            log_error(f"Erro no nó central: {str(e)}", exc_info=True)
+            self._responder(500, {'erro': str(e)})
+
+
+def criar_servidor(host: str = '127.0.0.1', porta: int = 8765,
+                   banco: Path = None, token: str = '') -> ThreadingHTTPServer:
+    """Cria o servidor HTTP do nó central (porta 0 escolhe uma livre)"""
+    if not token:
+        raise ValueError("O nó central exige um token compartilhado (--token ou SYNC_TOKEN)")
+
+    servidor = ThreadingHTTPServer((host, porta), _Manipulador)
+    servidor.daemon_threads = True
+    servidor.token = token
+    servidor.no = NoCentral(banco)
+    return servidor
+
+
+def iniciar_em_thread(host: str = '127.0.0.1', porta: int = 0,
+                      banco: Path = None, token: str = '') -> ThreadingHTTPServer:
+    """Sobe o nó central numa thread do próprio processo (testes, demonstração)"""
+    servidor = criar_servidor(host, porta, banco, token)
+    threading.Thread(target=servidor.serve_forever, name="no-central", daemon=True).start()
+    return servidor
+
+
+if __name__ == '__main__':
+    import argparse
+    from src.utils import config
+
+    parser = argparse.ArgumentParser(description="Nó central de sincronização")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="Padrão: só esta máquina; use o IP da rede da loja para os terminais")
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--token', default=None, help="Segredo compartilhado (padrão: SYNC_TOKEN do .env)")
+    parser.add_argument('--banco', help="Banco do nó central (padrão: data/central.db)")
+    parser.add_argument('--importar-catalogo', help="loja.db de onde copiar os produtos")
+    args = parser.parse_args()
+
+    token = args.token or config.SYNC_TOKEN
+    if not token:
+        parser.error("informe --token ou defina SYNC_TOKEN")
+
+    servidor = criar_servidor(args.host, args.porta, args.banco, token)
+    if args.importar_catalogo:
+        total = servidor.no.importar_catalogo(Path(args.importar_catalogo))
+        print(f"✓ {total} produto(s) importados")
+
+    log_info(f"Nó central em http://{args.host}:{args.porta} (banco {servidor.no.banco})")
+    print(f"Nó central em http://{args.host}:{args.porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.shutdown()
@@ -0,0 +1,64 @@
+"""
+Registro local de mudanças para sincronização
+
+Chamado dentro das transações de venda e ajuste de estoque: grava a mudança
+em ``sync_mudancas`` no mesmo commit, sem rede. O envio é feito depois, em
+segundo plano, pelo ClienteSync.
+"""
+import json
+from typing import Dict, List
+
+from src.database.models import MudancaSync
+
+_ativo = None
+
+
+def sync_ativo() -> bool:
+    """True se há um nó central configurado (SYNC_URL)"""
+    global _ativo
+    if _ativo is None:
+        from src.utils import config
+        _ativo = bool(config.SYNC_URL)
+    return _ativo
+
+
+def definir_ativo(ativo: bool) -> None:
+    """Força a sincronização ligada/desligada (ex.: linha de comando)"""
+    global _ativo
+    _ativo = ativo
+
+
+def registrar_mudanca(tipo: str, dados: Dict) -> None:
+    """Grava uma mudança pendente (sem efeito se a sincronização está desligada)"""
+    if sync_ativo():
+        MudancaSync.create(tipo=tipo, dados=json.dumps(dados, default=str))
+
+
+def registrar_venda(venda, itens: List) -> None:
+    """Registra uma venda finalizada com as baixas de estoque dos itens (ItemVendaCompleto)"""
+    registrar_mudanca('venda', {
+        'numero': venda.numero,
+        'data_hora': venda.data_hora.isoformat(),
+        'total': str(venda.total),
+        'desconto': str(venda.desconto),
+        'forma_pagamento': venda.forma_pagamento,
+        'itens': [
+            {
+                'codigo': item.codigo_produto,
+                'nome': item.nome_produto,
+                'quantidade': item.quantidade,
+                'preco_unitario': str(item.preco_unitario),
+            }
+            for item in itens
+        ],
+    })
+
+
+def registrar_ajuste_estoque(produto, quantidade: int) -> None:
+    """Registra um ajuste manual de estoque (delta)"""
+    registrar_mudanca('estoque', {
+        'codigo': produto.codigo,
+        'nome': produto.nome,
+        'preco_venda': str(produto.preco_venda),
+        'delta': quantidade,
+    })
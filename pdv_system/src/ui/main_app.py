@@ -3,7 +3,6 @@ Aplicação principal com Flet
 """
 import flet as ft
 from src.ui.styles import AppTheme
-from src.ui.pdv_view import PDVView
 
 
 def main():
@@ -16,10 +15,13 @@ def main():
         page.theme_mode = ft.ThemeMode.DARK
         page.bgcolor = AppTheme.BACKGROUND
         
+        from src.ui.telas import RegistroTelas
+        telas = RegistroTelas(page)
+
+        # Cancela a atualização dos cards quando a tela inicial sai
+        ouvinte_painel = {'cancelar': None, 'ouvir': None}
+
         def route_change(_route):
-            # Limpar e adicionar nova view
-            page.clean()
-            
             # Log para debug
             try:
                 from src.utils.logger import log_info
@@ -27,16 +29,8 @@ def main():
             except Exception:
                 pass
             
-            if page.route == "/":
-                page.add(home_view())
-            elif page.route == "/produtos":
-                page.add(produtos_view())
-            elif page.route == "/vendas":
-                page.add(vendas_view())
-            elif page.route == "/financeiro":
-                page.add(financeiro_view())
-            elif page.route == "/relatorios":
-                page.add(relatorios_view())
+            # Telas já montadas só voltam a ficar visíveis
+            telas.exibir(page.route)
             # Forçar atualização da página para garantir renderização
             try:
                 page.update()
@@ -56,6 +50,60 @@ def main():
                 ),
             )
 
+        def criar_card(titulo: str, valor: str, cor: str):
+            """Card do dashboard; devolve o card e o texto do valor"""
+            texto = ft.Text(valor, size=AppTheme.FONT_XLARGE, weight="bold", color=cor)
+            card = ft.Container(
+                content=ft.Column(
+                    controls=[
+                        ft.Text(titulo, size=AppTheme.FONT_NORMAL, color=AppTheme.TEXT_SECONDARY),
+                        texto,
+                    ],
+                    spacing=5,
+                ),
+                bgcolor=AppTheme.SURFACE,
+                padding=AppTheme.PADDING_MEDIUM,
+                border_radius=AppTheme.BORDER_RADIUS_NORMAL,
+                width=240,
+            )
+            return card, texto
+
+        def cards_dashboard():
+            """Totais do dia, mantidos em memória pelo painel (sem consulta ao banco)"""
+            from src.utils.dashboard import painel_dia
+
+            painel = painel_dia()
+            dados = painel.dados()
+            card_vendas, texto_vendas = criar_card("💰 Vendas do dia", dados['total_vendas'], AppTheme.SUCCESS)
+            card_despesas, texto_despesas = criar_card("💸 Despesas", dados['total_despesas'], AppTheme.ERROR)
+            card_saldo, texto_saldo = criar_card("📊 Saldo", dados['saldo_liquido'], AppTheme.INFO)
+
+            def preencher(novos: dict):
+                texto_vendas.value = novos['total_vendas']
+                texto_despesas.value = novos['total_despesas']
+                texto_saldo.value = novos['saldo_liquido']
+
+            def atualizar(novos: dict):
+                preencher(novos)
+                try:
+                    page.update()
+                except Exception:
+                    pass
+
+            def ouvir():
+                # Ao voltar para a tela inicial: só os textos dos cards mudam
+                preencher(painel.dados())
+                ouvinte_painel['cancelar'] = painel.ouvir(atualizar)
+
+            ouvinte_painel['ouvir'] = ouvir
+            ouvinte_painel['cancelar'] = painel.ouvir(atualizar)
+            return ft.Row(controls=[card_vendas, card_despesas, card_saldo], spacing=15, wrap=True)
+
+        def parar_cards():
+            if ouvinte_painel['cancelar']:
+                ouvinte_painel['cancelar']()
+                ouvinte_painel['cancelar'] = None
+
         def home_view():
             """Página inicial do PDV"""
             return ft.Container(
@@ -77,6 +125,8 @@ def main():
                         ft.Container(height=10),
                         ft.Text("Bem-vindo ao Sistema de PDV", size=28, weight="bold"),
                         ft.Container(height=10),
+                        cards_dashboard(),
+                        ft.Container(height=10),
                         ft.Text("Selecione uma opção no menu:", size=14, color=AppTheme.TEXT_SECONDARY),
                         ft.Container(height=30),
                         create_menu_button("📦 Produtos", "/produtos"),
@@ -85,43 +135,21 @@ def main():
                         create_menu_button("📊 Relatórios", "/relatorios"),
                     ],
                     spacing=10,
-                    padding=20,
                 ),
+                padding=20,
                 bgcolor=AppTheme.BACKGROUND,
                 expand=True,
             )
 
         def produtos_view():
             """Página de gerenciamento de produtos"""
-            return ft.Container(
-                content=ft.Column(
-                    controls=[
-                        ft.AppBar(
-                            title=ft.Text("Produtos"),
-                            bgcolor=AppTheme.PRIMARY,
-                        ),
-                        ft.Container(
-                            content=ft.Text("Módulo de Produtos (em desenvolvimento)", size=16),
-                            padding=20,
-                        ),
-                        ft.ElevatedButton(
-                            "← Voltar",
-                            on_click=lambda _: page.go("/"),
-                            style=ft.ButtonStyle(
-                                bgcolor={ft.MaterialState.DEFAULT: "#1f77d2"},
-                            ),
-                        ),
-                    ],
-                    padding=20,
-                ),
-                bgcolor=AppTheme.BACKGROUND,
-                expand=True,
-            )
+            from src.ui.produtos_view import ProdutosView
+            return ProdutosView(page)
 
         def vendas_view():
             """Página de vendas/PDV com interface completa"""
-            pdv = PDVView(page)
-            return pdv.criar_interface()
+            from src.ui.pdv_view import PDVView
+            return PDVView(page)
 
         def financeiro_view():
             """Página financeira"""
@@ -144,8 +172,8 @@ def main():
                             ),
                         ),
                     ],
-                    padding=20,
                 ),
+                padding=20,
                 bgcolor=AppTheme.BACKGROUND,
                 expand=True,
             )
@@ -171,13 +199,33 @@ def main():
                             ),
                         ),
                     ],
-                    padding=20,
                 ),
+                padding=20,
                 bgcolor=AppTheme.BACKGROUND,
                 expand=True,
             )
 
+        def teclado(e: ft.KeyboardEvent):
+            # Atalho oculto: Ctrl+Shift+P liga/desliga o perfilamento (suporte em campo)
+            if e.ctrl and e.shift and e.key.upper() == "P":
+                from src.utils import perfilador
+                ativo = not perfilador.perfilamento_ativo()
+                perfilador.definir_ativo(ativo)
+                page.open(ft.SnackBar(ft.Text(
+                    "Perfilamento ligado" if ativo else "Perfilamento desligado"
+                )))
+
         # Configurar rotas
+        telas.registrar("/", home_view,
+                        ao_exibir=lambda: ouvinte_painel['ouvir'](),
+                        ao_ocultar=parar_cards,
+                        ao_descartar=parar_cards)
+        telas.registrar("/produtos", produtos_view)
+        telas.registrar("/vendas", vendas_view)
+        telas.registrar("/financeiro", financeiro_view)
+        telas.registrar("/relatorios", relatorios_view)
+
+        page.on_keyboard_event = teclado
         page.on_route_change = route_change
         page.go("/")
     
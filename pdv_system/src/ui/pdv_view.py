@@ -5,9 +5,8 @@ Layout: Esquerda (70%) - Carrinho | Direita (30%) - Busca + Total + Botões
 import flet as ft
 from decimal import Decimal
 from src.ui.styles import AppTheme
-from src.services.venda_service import VendaService
-from src.services.produto_service import ProdutoService
-from src.services.financeiro_service import FinanceiroService
+from src.services.assincrono import VendaServiceAsync, ProdutoServiceAsync
+from src.utils.perfilador import perfilado
 
 
 class PDVView:
@@ -15,9 +14,9 @@ class PDVView:
     
     def __init__(self, page: ft.Page):
         self.page = page
-        self.venda_service = VendaService()
-        self.produto_service = ProdutoService()
-        self.financeiro_service = FinanceiroService()
+        # Fachadas assíncronas: o banco roda no executor, fora do loop da interface
+        self.vendas = VendaServiceAsync()
+        self.produtos = ProdutoServiceAsync()
         
         # Estado da venda atual
         self.venda_id = None
@@ -37,13 +36,6 @@ class PDVView:
     def criar_interface(self) -> ft.Container:
         """Cria a interface principal do PDV"""
         
-        # Criar venda nova
-        venda_response = self.venda_service.iniciar_venda(
-            forma_pagamento="Dinheiro",
-            observacoes="PDV"
-        )
-        self.venda_id = venda_response['id']
-        
         # ═══════════════════════════════════════════════════════════
         # LADO ESQUERDO: CARRINHO (70%)
         # ═══════════════════════════════════════════════════════════
@@ -102,7 +94,7 @@ class PDVView:
             max_lines=1,
             border_color=AppTheme.PRIMARY,
             focused_border_color=AppTheme.ACCENT,
-            on_submit=lambda e: self._buscar_e_adicionar_produto(e.control.value),
+            on_submit=self._ao_buscar,
             width=300,
         )
         
@@ -140,6 +132,7 @@ class PDVView:
             width=300,
             height=56,
             on_click=self._finalizar_venda,
+            disabled=True,  # Até a venda ser aberta
         )
         
         btn_cancelar = ft.ElevatedButton(
@@ -256,6 +249,9 @@ class PDVView:
                 ]
             )
         
+        # Criar venda nova sem bloquear a montagem da tela
+        self.page.run_task(self._nova_venda)
+        
         return ft.Container(
             content=ft.Column(
                 controls=[
@@ -275,14 +271,56 @@ class PDVView:
             bgcolor=AppTheme.BACKGROUND,
         )
     
-    def _buscar_e_adicionar_produto(self, codigo_ou_nome: str) -> None:
+    def ao_exibir(self) -> None:
+        """De volta ao caixa (registro de telas): carrinho e venda continuam os mesmos"""
+        if self.venda_id is None:
+            self.page.run_task(self._nova_venda)
+        self.campo_busca.focus()
+    
+    def pode_descartar(self) -> bool:
+        """A tela só sai da memória com o carrinho vazio"""
+        return not self.itens_carrinho
+    
+    def ao_descartar(self) -> None:
+        """Cancela a venda aberta (sem itens) da tela descartada"""
+        if self.venda_id is not None:
+            self.page.run_task(self._cancelar_venda_aberta, self.venda_id)
+            self.venda_id = None
+    
+    async def _cancelar_venda_aberta(self, venda_id: int) -> None:
+        try:
+            await self.vendas.cancelar(venda_id)
+        except (OSError, ValueError, RuntimeError, TimeoutError):
+            pass  # Fica aberta, como antes do registro de telas
+    
+    @perfilado('pdv.nova_venda')
+    async def _nova_venda(self) -> None:
+        """Abre a venda que receberá os itens e libera o botão de finalizar"""
+        self.venda_id = None
+        self.btn_finalizar.disabled = True
+        try:
+            venda_response = await self.vendas.iniciar(
+                forma_pagamento="Dinheiro",
+                observacoes="PDV"
+            )
+            self.venda_id = venda_response['id']
+            self.btn_finalizar.disabled = False
+        except (ValueError, TimeoutError) as e:
+            self._mostrar_mensagem(f"Erro ao iniciar venda: {str(e)}", AppTheme.ERROR)
+        self.page.update()
+    
+    @perfilado('pdv.buscar')
+    async def _ao_buscar(self, e) -> None:
+        await self._buscar_e_adicionar_produto(e.control.value)
+    
+    async def _buscar_e_adicionar_produto(self, codigo_ou_nome: str) -> None:
         """Busca produto e adiciona ao carrinho"""
         if not codigo_ou_nome.strip():
             return
         
         try:
             # Tentar buscar por código primeiro
-            produtos = self.produto_service.buscar_produtos(codigo_ou_nome)
+            produtos = await self.produtos.buscar(codigo_ou_nome)
             
             if not produtos:
                 self._mostrar_mensagem(f"❌ Produto '{codigo_ou_nome}' não encontrado!", AppTheme.ERROR)
@@ -293,27 +331,25 @@ class PDVView:
             
             produto = produtos[0]  # Pegar o primeiro resultado
             
-            # Verificar estoque
-            if produto['estoque'] <= 0:
-                self._mostrar_mensagem(f"❌ Produto '{produto['nome']}' sem estoque!", AppTheme.ERROR)
-                self.campo_busca.value = ""
-                self.campo_busca.focus()
-                self.page.update()
-                return
-            
             # Adicionar ao carrinho (incrementar quantidade se já existe)
             produto_id = produto['id']
+            quantidade_atual = (
+                self.itens_carrinho[produto_id]['quantidade']
+                if produto_id in self.itens_carrinho else 0
+            )
             
-            if produto_id in self.itens_carrinho:
-                # Incrementar quantidade
-                quantidade_atual = self.itens_carrinho[produto_id]['quantidade']
-                quantidade_maxima = produto['estoque']
-                
-                if quantidade_atual < quantidade_maxima:
-                    self.itens_carrinho[produto_id]['quantidade'] += 1
-                    self._mostrar_mensagem(f"✓ Quantidade aumentada: {self.itens_carrinho[produto_id]['quantidade']}", AppTheme.SUCCESS)
+            # Reservar a unidade: o estoque fica garantido contra os outros caixas
+            reserva = await self.vendas.reservar(self.venda_id, produto_id, quantidade_atual + 1)
+            
+            if not reserva['reservado']:
+                if quantidade_atual:
+                    self._mostrar_mensagem(f"⚠️ Estoque máximo atingido ({reserva['disponivel']})", AppTheme.WARNING)
                 else:
-                    self._mostrar_mensagem(f"⚠️ Estoque máximo atingido ({quantidade_maxima})", AppTheme.WARNING)
+                    self._mostrar_mensagem(f"❌ Produto '{produto['nome']}' sem estoque!", AppTheme.ERROR)
+            elif quantidade_atual:
+                # Incrementar quantidade
+                self.itens_carrinho[produto_id]['quantidade'] += 1
+                self._mostrar_mensagem(f"✓ Quantidade aumentada: {self.itens_carrinho[produto_id]['quantidade']}", AppTheme.SUCCESS)
             else:
                 # Adicionar novo item
                 self.itens_carrinho[produto_id] = {
@@ -330,7 +366,7 @@ class PDVView:
             self.campo_busca.focus()
             self.page.update()
             
-        except (ValueError, OSError, AttributeError, KeyError) as e:
+        except (ValueError, OSError, AttributeError, KeyError, TimeoutError) as e:
             self._mostrar_mensagem(f"Erro ao adicionar: {str(e)}", AppTheme.ERROR)
             self.page.update()
     
@@ -364,7 +400,8 @@ class PDVView:
                             height=35,
                             text_style=ft.TextStyle(size=11),
                             border_radius=4,
-                            on_change=lambda e, pid=produto_id: self._atualizar_quantidade(pid, e),
+                            on_change=lambda e, pid=produto_id: self.page.run_task(
+                                self._atualizar_quantidade, pid, e),
                         ),
                         ft.Text(
                             f"R$ {preco:.2f}",
@@ -380,7 +417,8 @@ class PDVView:
                         ft.IconButton(
                             icon=ft.icons.CLOSE,
                             icon_size=16,
-                            on_click=lambda e, pid=produto_id: self._remover_item(pid),
+                            on_click=lambda e, pid=produto_id: self.page.run_task(
+                                self._remover_item, pid),
                             width=40,
                         ),
                     ],
@@ -397,30 +435,37 @@ class PDVView:
         self.total = subtotal - self.desconto
         self._atualizar_totais(subtotal)
     
-    def _atualizar_quantidade(self, produto_id: int, event) -> None:
+    @perfilado('pdv.quantidade')
+    async def _atualizar_quantidade(self, produto_id: int, event) -> None:
         """Atualiza quantidade de um item"""
         try:
             nova_quantidade = int(event.control.value)
             
             if nova_quantidade <= 0:
-                self._remover_item(produto_id)
-            else:
-                estoque = self.itens_carrinho[produto_id]['produto']['estoque']
-                if nova_quantidade <= estoque:
+                await self._remover_item(produto_id)
+            elif produto_id in self.itens_carrinho:
+                reserva = await self.vendas.reservar(self.venda_id, produto_id, nova_quantidade)
+                if reserva['reservado']:
                     self.itens_carrinho[produto_id]['quantidade'] = nova_quantidade
                     self._atualizar_carrinho()
                 else:
                     event.control.value = str(self.itens_carrinho[produto_id]['quantidade'])
-                    self._mostrar_mensagem(f"⚠️ Estoque insuficiente (máx: {estoque})", AppTheme.WARNING)
+                    self._mostrar_mensagem(f"⚠️ Estoque insuficiente (máx: {reserva['disponivel']})", AppTheme.WARNING)
                     self.page.update()
         except ValueError:
             pass
+        except TimeoutError as e:
+            self._mostrar_mensagem(f"Erro ao atualizar quantidade: {str(e)}", AppTheme.ERROR)
     
-    def _remover_item(self, produto_id: int) -> None:
+    @perfilado('pdv.remover_item')
+    async def _remover_item(self, produto_id: int) -> None:
         """Remove item do carrinho"""
         if produto_id in self.itens_carrinho:
-            nome = self.itens_carrinho[produto_id]['produto']['nome']
-            del self.itens_carrinho[produto_id]
+            nome = self.itens_carrinho.pop(produto_id)['produto']['nome']
+            try:
+                await self.vendas.liberar(self.venda_id, produto_id)
+            except (ValueError, TimeoutError):
+                pass  # A reserva expira sozinha
             self._mostrar_mensagem(f"✓ {nome} removido do carrinho", AppTheme.SUCCESS)
             self._atualizar_carrinho()
     
@@ -435,6 +480,7 @@ class PDVView:
             on_click=lambda e, v=valor: self._aplicar_desconto_atalho(v),
         )
     
+    @perfilado('pdv.desconto')
     def _aplicar_desconto_atalho(self, valor: int) -> None:
         """Aplica desconto via atalho"""
         if valor > 0:
@@ -459,7 +505,8 @@ class PDVView:
         self.label_total.value = f"R$ {self.total:.2f}"
         self.page.update()
     
-    def _finalizar_venda(self, _event) -> None:
+    @perfilado('pdv.finalizar')
+    async def _finalizar_venda(self, _event) -> None:
         """Finaliza a venda e salva no banco"""
         if not self.itens_carrinho:
             self._mostrar_mensagem("⚠️ Carrinho vazio! Adicione produtos antes de finalizar.", AppTheme.WARNING)
@@ -471,24 +518,16 @@ class PDVView:
             self.btn_finalizar.disabled = True
             self.page.update()
             
-            # Adicionar itens à venda via serviço
-            for _produto_id, item in self.itens_carrinho.items():
-                produto = item['produto']
-                quantidade = item['quantidade']
-                
-                self.venda_service.adicionar_item_carrinho(
-                    self.venda_id,
-                    produto['codigo'],
-                    quantidade
-                )
-            
-            # Aplicar desconto se houver
-            if self.desconto > 0:
-                self.venda_service.aplicar_desconto(self.venda_id, float(self.desconto))
-            
-            # Finalizar venda
-            venda_finalizada = self.venda_service.finalizar_venda(
+            # Itens, desconto e finalização numa só gravação: se falhar,
+            # nada fica na venda e dá para tentar de novo
+            itens = [
+                (item['produto']['codigo'], item['quantidade'])
+                for item in self.itens_carrinho.values()
+            ]
+            venda_finalizada = await self.vendas.finalizar_carrinho(
                 self.venda_id,
+                itens,
+                float(self.desconto),
                 float(self.total)
             )
             
@@ -505,26 +544,21 @@ class PDVView:
             self.itens_carrinho.clear()
             self.desconto = Decimal('0.00')
             
-            # Iniciar nova venda
-            venda_response = self.venda_service.iniciar_venda(
-                forma_pagamento="Dinheiro",
-                observacoes="PDV"
-            )
-            self.venda_id = venda_response['id']
-            
             # Atualizar UI
             self._atualizar_carrinho()
             self.campo_busca.value = ""
             self.campo_busca.focus()
             
-        except (ValueError, OSError, RuntimeError, KeyError) as e:
+            # Iniciar nova venda (libera o botão)
+            await self._nova_venda()
+            
+        except (ValueError, OSError, RuntimeError, KeyError, TimeoutError) as e:
             self._mostrar_mensagem(f"Erro ao finalizar venda: {str(e)}", AppTheme.ERROR)
-        
-        finally:
             self.btn_finalizar.disabled = False
             self.page.update()
     
-    def _cancelar_venda(self, _event) -> None:
+    @perfilado('pdv.cancelar')
+    async def _cancelar_venda(self, _event) -> None:
         """Cancela a venda atual"""
         if not self.itens_carrinho:
             return
@@ -535,15 +569,11 @@ class PDVView:
         
         # Iniciar nova venda
         try:
-            self.venda_service.cancelar_venda(self.venda_id)
-        except (OSError, ValueError, RuntimeError):
+            await self.vendas.cancelar(self.venda_id)
+        except (OSError, ValueError, RuntimeError, TimeoutError):
             pass  # Ignorar se falhar
         
-        venda_response = self.venda_service.iniciar_venda(
-            forma_pagamento="Dinheiro",
-            observacoes="PDV"
-        )
-        self.venda_id = venda_response['id']
+        await self._nova_venda()
         
         # Atualizar UI
         self._atualizar_carrinho()
@@ -0,0 +1,329 @@
+"""
+Visualização de Produtos em Flet
+Lista virtualizada com paginação por cursor: carrega páginas conforme a rolagem
+e mantém apenas uma janela limitada de linhas em memória
+
+As consultas rodam no executor do banco (``ProdutoServiceAsync``); mudar o
+filtro ou a ordem cancela a carga ainda em andamento.
+"""
+import asyncio
+
+import flet as ft
+from src.ui.styles import AppTheme
+from src.services.assincrono import ProdutoServiceAsync
+from src.utils.formatadores import FormataçãoUtil
+
+
+class ProdutosView:
+    """Visualização do catálogo de produtos com Flet"""
+
+    TAMANHO_PAGINA = 50
+    ALTURA_LINHA = 44
+    MAX_LINHAS = 500  # Janela de linhas mantida em memória
+    MARGEM_ROLAGEM = 300  # Pixels antes da borda que disparam nova página
+
+    ORDENACOES = [
+        ('nome', 'Nome'),
+        ('codigo', 'Código'),
+        ('preco_venda', 'Preço'),
+        ('estoque', 'Estoque'),
+    ]
+
+    def __init__(self, page: ft.Page):
+        self.page = page
+        self.produtos = ProdutoServiceAsync()
+
+        # Estado da listagem
+        self.ordem = 'nome'
+        self.decrescente = False
+        self.filtros = {}
+        self.paginas = []  # [{'inicio': cursor, 'fim': cursor, 'n': int}]
+        self.tem_mais_antes = False
+        self.tem_mais_depois = False
+        self.carregando = False
+        self._geracao = 0  # Incrementada a cada carga agendada
+        self._tarefa = None  # Carga em andamento (asyncio.Task)
+        self._posicao = 0.0  # Deslocamento atual da rolagem (pixels)
+
+        # Componentes da UI
+        self.campo_filtro = None
+        self.dropdown_ordem = None
+        self.botao_direcao = None
+        self.lista_produtos = None
+        self.label_total = None
+
+    def criar_interface(self) -> ft.Container:
+        """Cria a interface da listagem de produtos"""
+
+        self.campo_filtro = ft.TextField(
+            label="🔍 Filtrar por código ou nome",
+            border_color=AppTheme.PRIMARY,
+            focused_border_color=AppTheme.ACCENT,
+            on_submit=lambda e: self._aplicar_filtro(e.control.value),
+            expand=True,
+        )
+
+        self.dropdown_ordem = ft.Dropdown(
+            label="Ordenar por",
+            value=self.ordem,
+            options=[ft.dropdown.Option(chave, texto) for chave, texto in self.ORDENACOES],
+            on_change=lambda e: self._alterar_ordem(e.control.value),
+            width=180,
+        )
+
+        self.botao_direcao = ft.IconButton(
+            icon=ft.icons.ARROW_UPWARD,
+            tooltip="Crescente",
+            on_click=lambda _: self._alternar_direcao(),
+        )
+
+        self.label_total = ft.Text("", size=12, color=AppTheme.TEXT_SECONDARY)
+
+        # item_extent fixo permite ao Flutter renderizar apenas as linhas visíveis
+        self.lista_produtos = ft.ListView(
+            expand=True,
+            spacing=0,
+            padding=0,
+            item_extent=self.ALTURA_LINHA,
+            on_scroll_interval=100,
+            on_scroll=self._ao_rolar,
+        )
+
+        cabecalho = ft.Container(
+            content=ft.Row(
+                controls=[
+                    ft.Text("CÓDIGO", size=12, weight="bold", width=120),
+                    ft.Text("NOME", size=12, weight="bold", expand=True),
+                    ft.Text("PREÇO", size=12, weight="bold", width=100),
+                    ft.Text("ESTOQUE", size=12, weight="bold", width=80),
+                ],
+                spacing=5,
+            ),
+            padding=10,
+            bgcolor=AppTheme.SURFACE,
+            border_radius=4,
+        )
+
+        self._agendar(self._recarregar)
+
+        return ft.Container(
+            content=ft.Column(
+                controls=[
+                    ft.AppBar(
+                        title=ft.Text("📦 Produtos", size=20, weight="bold"),
+                        bgcolor=AppTheme.PRIMARY,
+                    ),
+                    ft.Row(
+                        controls=[self.campo_filtro, self.dropdown_ordem, self.botao_direcao],
+                        spacing=10,
+                    ),
+                    self.label_total,
+                    cabecalho,
+                    self.lista_produtos,
+                    ft.ElevatedButton(
+                        "← Voltar",
+                        on_click=lambda _: self.page.go("/"),
+                        style=ft.ButtonStyle(
+                            bgcolor={ft.MaterialState.DEFAULT: "#1f77d2"},
+                        ),
+                    ),
+                ],
+                expand=True,
+                spacing=5,
+            ),
+            padding=10,
+            bgcolor=AppTheme.BACKGROUND,
+            expand=True,
+        )
+
+    def ao_exibir(self) -> None:
+        """De volta à tela (registro de telas): recarrega a listagem (estoque e preços)"""
+        self._agendar(self._recarregar)
+
+    def ao_ocultar(self) -> None:
+        """Cancela a carga em andamento ao sair da tela"""
+        self._geracao += 1
+        if self._tarefa is not None:
+            self._tarefa.get_loop().call_soon_threadsafe(self._tarefa.cancel)
+        self.carregando = False
+
+    def _aplicar_filtro(self, termo: str) -> None:
+        """Aplica o filtro de texto e recarrega a listagem"""
+        termo = termo.strip()
+        self.filtros = {'termo': termo} if termo else {}
+        self._agendar(self._recarregar)
+
+    def _alterar_ordem(self, ordem: str) -> None:
+        """Altera a ordenação e recarrega a listagem"""
+        self.ordem = ordem
+        self._agendar(self._recarregar)
+
+    def _alternar_direcao(self) -> None:
+        """Inverte a ordenação (crescente/decrescente) e recarrega a listagem"""
+        self.decrescente = not self.decrescente
+        self.botao_direcao.icon = ft.icons.ARROW_DOWNWARD if self.decrescente else ft.icons.ARROW_UPWARD
+        self.botao_direcao.tooltip = "Decrescente" if self.decrescente else "Crescente"
+        self._agendar(self._recarregar)
+
+    def _agendar(self, carregar) -> None:
+        """Agenda uma carga no loop da página, cancelando a anterior"""
+        self._geracao += 1
+        if self._tarefa is not None:
+            self._tarefa.get_loop().call_soon_threadsafe(self._tarefa.cancel)
+        self.carregando = True
+        self.page.run_task(self._executar_carga, carregar, self._geracao)
+
+    async def _executar_carga(self, carregar, geracao: int) -> None:
+        if geracao != self._geracao:
+            return  # Substituída antes de começar
+        self._tarefa = asyncio.current_task()
+        try:
+            await carregar()
+            self.page.update()
+        except asyncio.CancelledError:
+            pass  # Substituída por outra carga; a consulta já foi interrompida
+        finally:
+            if geracao == self._geracao:
+                self._tarefa = None
+                self.carregando = False
+
+    async def _recarregar(self) -> None:
+        """Descarta a janela atual e carrega a primeira página"""
+        self.lista_produtos.controls.clear()
+        self.paginas.clear()
+        self.tem_mais_antes = False
+        self.tem_mais_depois = False
+        self._posicao = 0.0
+
+        pagina = await self._buscar_pagina(cursor=None, contar=True)
+        if pagina is None:
+            return
+
+        if pagina['total'] is not None:
+            sufixo = "" if pagina['total_exato'] else "+"
+            self.label_total.value = (
+                f"{FormataçãoUtil.formatar_quantidade(pagina['total'])}{sufixo} produto(s)"
+            )
+
+        self._anexar_pagina(pagina)
+
+    def _ao_rolar(self, event: ft.OnScrollEvent) -> None:
+        """Carrega a página seguinte/anterior quando a rolagem chega perto da borda"""
+        self._posicao = event.pixels
+        if self.carregando or not self.paginas:
+            return
+
+        if self.tem_mais_depois and event.pixels >= event.max_scroll_extent - self.MARGEM_ROLAGEM:
+            self._agendar(self._carregar_proxima)
+        elif self.tem_mais_antes and event.pixels <= event.min_scroll_extent + self.MARGEM_ROLAGEM:
+            self._agendar(self._carregar_anterior)
+
+    async def _carregar_proxima(self) -> None:
+        """Busca a página após a última carregada"""
+        pagina = await self._buscar_pagina(cursor=self.paginas[-1]['fim'])
+        if pagina is None:
+            return
+
+        self._anexar_pagina(pagina)
+
+        # Limitar a janela descartando as páginas do topo
+        removidas = 0
+        while self._linhas_carregadas() > self.MAX_LINHAS and len(self.paginas) > 1:
+            descartada = self.paginas.pop(0)
+            del self.lista_produtos.controls[:descartada['n']]
+            removidas += descartada['n']
+            self.tem_mais_antes = True
+
+        if removidas:
+            # As linhas visíveis subiram: voltar a rolagem na mesma medida
+            self._rolar_para(self._posicao - removidas * self.ALTURA_LINHA)
+
+    async def _carregar_anterior(self) -> None:
+        """Busca a página antes da primeira carregada"""
+        pagina = await self._buscar_pagina(cursor=self.paginas[0]['inicio'], anterior=True)
+        if pagina is None:
+            return
+
+        self.tem_mais_antes = pagina['tem_mais']
+        if not pagina['itens']:
+            return
+
+        linhas = [self._criar_linha(p) for p in pagina['itens']]
+        self.lista_produtos.controls[0:0] = linhas
+        self.paginas.insert(0, {
+            'inicio': pagina['cursor_inicio'],
+            'fim': pagina['cursor_fim'],
+            'n': len(linhas),
+        })
+
+        # Limitar a janela descartando as páginas do fim
+        while self._linhas_carregadas() > self.MAX_LINHAS and len(self.paginas) > 1:
+            descartada = self.paginas.pop()
+            del self.lista_produtos.controls[-descartada['n']:]
+            self.tem_mais_depois = True
+
+        # Manter visíveis as mesmas linhas após inserir acima delas
+        self._rolar_para(self._posicao + len(linhas) * self.ALTURA_LINHA)
+
+    def _rolar_para(self, posicao: float) -> None:
+        """Envia as linhas alteradas e rola sem animação para ``posicao``"""
+        self._posicao = max(posicao, 0.0)
+        self.page.update()
+        self.lista_produtos.scroll_to(offset=self._posicao, duration=0)
+
+    def _anexar_pagina(self, pagina: dict) -> None:
+        """Adiciona uma página ao fim da janela"""
+        self.tem_mais_depois = pagina['tem_mais']
+        if not pagina['itens']:
+            return
+
+        linhas = [self._criar_linha(p) for p in pagina['itens']]
+        self.lista_produtos.controls.extend(linhas)
+        self.paginas.append({
+            'inicio': pagina['cursor_inicio'],
+            'fim': pagina['cursor_fim'],
+            'n': len(linhas),
+        })
+
+    async def _buscar_pagina(self, cursor: str = None, anterior: bool = False,
+                             contar: bool = False) -> dict:
+        """Consulta uma página no serviço, exibindo erros na tela"""
+        try:
+            return await self.produtos.listar_paginado(
+                cursor=cursor,
+                limite=self.TAMANHO_PAGINA,
+                ordem=self.ordem,
+                decrescente=self.decrescente,
+                anterior=anterior,
+                filtros=self.filtros,
+                contar=contar,
+            )
+        except (ValueError, TimeoutError) as e:
+            self.label_total.value = f"Erro ao carregar produtos: {str(e)}"
+            return None
+
+    def _linhas_carregadas(self) -> int:
+        """Quantidade de linhas atualmente na janela"""
+        return sum(p['n'] for p in self.paginas)
+
+    def _criar_linha(self, produto: dict) -> ft.Container:
+        """Cria a linha de um produto"""
+        cor_estoque = AppTheme.ERROR if produto['estoque'] <= 0 else AppTheme.TEXT_PRIMARY
+
+        return ft.Container(
+            content=ft.Row(
+                controls=[
+                    ft.Text(produto['codigo'], size=12, width=120,
+                            overflow=ft.TextOverflow.ELLIPSIS),
+                    ft.Text(produto['nome'], size=12, expand=True,
+                            overflow=ft.TextOverflow.ELLIPSIS),
+                    ft.Text(FormataçãoUtil.formatar_moeda(produto['preco_venda']),
+                            size=12, width=100),
+                    ft.Text(str(produto['estoque']), size=12, width=80, color=cor_estoque),
+                ],
+                spacing=5,
+                vertical_alignment=ft.CrossAxisAlignment.CENTER,
+            ),
+            height=self.ALTURA_LINHA,
+            padding=ft.padding.symmetric(horizontal=10),
+        )
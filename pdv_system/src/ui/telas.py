@@ -0,0 +1,148 @@
+"""
+Registro das telas da aplicação Flet
+
+Cada rota monta sua tela uma única vez: o controle fica na página e a
+navegação só alterna ``visible`` (o cliente recebe duas propriedades, não a
+árvore inteira). A tela de vendas mantém o carrinho e a venda aberta ao ir e
+voltar da tela inicial.
+
+Ganchos opcionais da visão (objeto com ``criar_interface``) ou passados em
+``registrar``:
+
+  - ``ao_exibir()``: ao voltar para uma tela já montada - atualiza só as
+    partes ligadas a dados (cards, listagem)
+  - ``ao_ocultar()``: ao sair da tela (cancelar ouvintes e cargas)
+  - ``pode_descartar()``: False impede o descarte (ex.: carrinho com itens)
+  - ``ao_descartar()``: antes de a tela sair da memória
+
+Telas ocultas além de TELAS_EM_MEMORIA são descartadas, a menos usada
+primeiro, e montadas de novo na próxima visita.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict
+
+import flet as ft
+
+from src.utils.logger import log_info, log_warning
+
+
+class _Tela:
+    """Tela montada: a visão (se houver), o controle na página e os ganchos"""
+
+    def __init__(self, visao, controle: ft.Control, ganchos: Dict[str, Callable]):
+        self.visao = visao
+        self.controle = controle
+        self.ganchos = ganchos
+
+    def gancho(self, nome: str):
+        return self.ganchos.get(nome) or getattr(self.visao, nome, None)
+
+
+class RegistroTelas:
+    """Monta cada rota uma vez e alterna a tela visível"""
+
+    def __init__(self, page: ft.Page, maximo_ocultas: int = None):
+        self.page = page
+        self._maximo_ocultas = maximo_ocultas
+        self._fabricas: Dict[str, tuple] = {}
+        self._telas: 'OrderedDict[str, _Tela]' = OrderedDict()  # Menos usada primeiro
+        self.rota_atual = None
+
+    @property
+    def maximo_ocultas(self) -> int:
+        if self._maximo_ocultas is None:
+            from src.utils import config
+            self._maximo_ocultas = config.TELAS_EM_MEMORIA
+        return self._maximo_ocultas
+
+    def registrar(self, rota: str, criar: Callable, **ganchos: Callable) -> None:
+        """
+        Registra a fábrica da rota
+
+        Args:
+            criar: Devolve a visão (com ``criar_interface``) ou o controle
+            ganchos: ``ao_exibir``/``ao_ocultar``/... para telas sem classe própria
+        """
+        self._fabricas[rota] = (criar, ganchos)
+
+    def exibir(self, rota: str) -> bool:
+        """
+        Torna ``rota`` a tela visível, montando-a se necessário
+
+        Returns:
+            bool: False se a rota não está registrada (nenhuma tela fica visível)
+        """
+        if rota == self.rota_atual and rota in self._telas:
+            return True
+
+        anterior = self._telas.get(self.rota_atual)
+        if anterior is not None:
+            anterior.controle.visible = False
+            self._chamar(anterior, 'ao_ocultar')
+        self.rota_atual = rota
+
+        if rota not in self._fabricas:
+            return False
+
+        tela = self._telas.get(rota)
+        if tela is None:
+            tela = self._montar(rota)
+        else:
+            self._telas.move_to_end(rota)
+            tela.controle.visible = True
+            self._chamar(tela, 'ao_exibir')
+
+        self._descartar_excedentes()
+        return True
+
+    def descartar(self, rota: str) -> bool:
+        """Tira a tela oculta da memória (montada de novo na próxima visita)"""
+        tela = self._telas.get(rota)
+        if tela is None or rota == self.rota_atual:
+            return False
+        pode = tela.gancho('pode_descartar')
+        if pode is not None and not pode():
+            return False
+
+        self._chamar(tela, 'ao_descartar')
+        del self._telas[rota]
+        if tela.controle in self.page.controls:
+            self.page.controls.remove(tela.controle)
+        log_info(f"Tela {rota} descartada")
+        return True
+
+    def montadas(self) -> list:
+        """Rotas com tela em memória, da menos usada para a mais recente"""
+        return list(self._telas)
+
+    def _montar(self, rota: str) -> _Tela:
+        criar, ganchos = self._fabricas[rota]
+        visao = criar()
+        if hasattr(visao, 'criar_interface'):
+            controle = visao.criar_interface()
+        else:
+            visao, controle = None, visao
+
+        tela = _Tela(visao, controle, ganchos)
+        self._telas[rota] = tela
+        self.page.controls.append(controle)
+        return tela
+
+    def _descartar_excedentes(self) -> None:
+        ocultas = [rota for rota in self._telas if rota != self.rota_atual]
+        excedentes = len(ocultas) - self.maximo_ocultas
+        for rota in ocultas:
+            if excedentes <= 0:
+                break
+            if self.descartar(rota):
+                excedentes -= 1
+
+    @staticmethod
+    def _chamar(tela: _Tela, nome: str) -> None:
+        gancho = tela.gancho(nome)
+        if gancho is None:
+            return
+        try:
+            gancho()
+        except Exception as e:
+            log_warning(f"Erro em {nome} da tela: {e}")
@@ -1,8 +1,24 @@
 """
 Módulo de utilidades
+
+As exportações são carregadas sob demanda: importar ``src.utils.logger`` não
+deve puxar o ReportLab (via printer) para a inicialização da aplicação.
 """
-from src.utils.formatadores import FormataçãoUtil
-from src.utils.validadores import ValidadorUtil
-from src.utils.printer import gerar_cupom, GeradorCupom
+import importlib
+
+_EXPORTACOES = {
+    "FormataçãoUtil": "src.utils.formatadores",
+    "ValidadorUtil": "src.utils.validadores",
+    "gerar_cupom": "src.utils.printer",
+    "GeradorCupom": "src.utils.printer",
+}
+
+__all__ = list(_EXPORTACOES)
+
 
-__all__ = ["FormataçãoUtil", "ValidadorUtil", "gerar_cupom", "GeradorCupom"]
+def __getattr__(nome):
+    if nome in _EXPORTACOES:
+        valor = getattr(importlib.import_module(_EXPORTACOES[nome]), nome)
+        globals()[nome] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
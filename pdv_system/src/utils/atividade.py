@@ -0,0 +1,21 @@
+"""
+Marcador de atividade do caixa
+
+As operações de venda chamam ``registrar_atividade()``; tarefas em segundo
+plano (manutenção do banco) consultam ``segundos_ocioso()`` para só rodar
+quando o caixa está parado.
+"""
+import time
+
+_ultima_atividade = time.monotonic()
+
+
+def registrar_atividade() -> None:
+    """Marca que o caixa acabou de ser usado"""
+    global _ultima_atividade
+    _ultima_atividade = time.monotonic()
+
+
+def segundos_ocioso() -> float:
+    """Segundos desde a última operação de venda"""
+    return time.monotonic() - _ultima_atividade
@@ -1,32 +1,120 @@
 """
 Configurações da aplicação
+
+As configurações lidas do ambiente (.env) são resolvidas no primeiro acesso:
+o python-dotenv só é importado quando alguém precisa de STORE_NAME,
+DATABASE_PATH etc., e não ao carregar o tema da interface.
 """
 import os
 from pathlib import Path
-from dotenv import load_dotenv
-
-# Carregar variáveis de ambiente
-load_dotenv()
 
 # Diretórios
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DATA_DIR = BASE_DIR / "data"
 SRC_DIR = BASE_DIR / "src"
 
-# Banco de dados
-DATABASE_PATH = os.getenv("DATABASE_PATH", str(DATA_DIR / "loja.db"))
+_env_carregado = False
+
+
+def carregar_env() -> None:
+    """Carrega o arquivo .env uma única vez"""
+    global _env_carregado
+    if not _env_carregado:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_carregado = True
+
+
+def _ler_configuracoes_env() -> dict:
+    """Lê as configurações que dependem de variáveis de ambiente"""
+    import platform
+
+    carregar_env()
+    return {
+        # Banco de dados
+        'DATABASE_PATH': os.getenv("DATABASE_PATH", str(DATA_DIR / "loja.db")),
+        # Loja
+        'STORE_NAME': os.getenv("STORE_NAME", "Minha Loja"),
+        # Impressão
+        'RECEIPT_WIDTH': int(os.getenv("RECEIPT_WIDTH", "58")),  # 58mm ou 80mm
+        # Fuso horário
+        'TIMEZONE': os.getenv("TIMEZONE", "UTC-3"),
+        # Debug
+        'DEBUG': os.getenv("DEBUG", "False").lower() == "true",
+        # Backup automático (0 desativa)
+        'BACKUP_INTERVALO_HORAS': float(os.getenv("BACKUP_INTERVALO_HORAS", "0")),
+        'BACKUP_MANTER': int(os.getenv("BACKUP_MANTER", "7")),
+        'BACKUP_DIR': os.getenv("BACKUP_DIR", str(BASE_DIR / "backups")),
+        # Manutenção do banco com o caixa ocioso (0 desativa)
+        'MANUTENCAO_OCIOSIDADE_SEGUNDOS': float(os.getenv("MANUTENCAO_OCIOSIDADE_SEGUNDOS", "60")),
+        # Sincronização com o nó central (vazio desativa)
+        'SYNC_URL': os.getenv("SYNC_URL", ""),
+        'SYNC_TOKEN': os.getenv("SYNC_TOKEN", ""),
+        'SYNC_TERMINAL': os.getenv("SYNC_TERMINAL", platform.node() or "terminal"),
+        'SYNC_INTERVALO_SEGUNDOS': float(os.getenv("SYNC_INTERVALO_SEGUNDOS", "30")),
+        # Finalização de vendas pelo diário append-only
+        'DIARIO_VENDAS': os.getenv("DIARIO_VENDAS", "False").lower() == "true",
+        # Outbox: exportação contínua para arquivo JSONL (vazio desativa) e retenção
+        'OUTBOX_ARQUIVO': os.getenv("OUTBOX_ARQUIVO", ""),
+        'OUTBOX_MANTER_DIAS': int(os.getenv("OUTBOX_MANTER_DIAS", "7")),
+        # Cache de consultas dos serviços (entradas; 0 desativa)
+        'CACHE_CONSULTAS_TAMANHO': int(os.getenv("CACHE_CONSULTAS_TAMANHO", "256")),
+        # Conferência dos totais do dashboard com o banco
+        'DASHBOARD_RECONCILIAR_SEGUNDOS': float(os.getenv("DASHBOARD_RECONCILIAR_SEGUNDOS", "300")),
+        # API HTTP/JSON (python -m src.api.servidor)
+        'API_HOST': os.getenv("API_HOST", "127.0.0.1"),
+        'API_PORTA': int(os.getenv("API_PORTA", "8080")),
+        'API_WORKERS': int(os.getenv("API_WORKERS", "8")),
+        # Executor do banco da interface: threads de leitura, fila por pista e timeout
+        'DB_LEITORES': int(os.getenv("DB_LEITORES", "4")),
+        'DB_FILA_MAXIMA': int(os.getenv("DB_FILA_MAXIMA", "32")),
+        'DB_TIMEOUT_SEGUNDOS': float(os.getenv("DB_TIMEOUT_SEGUNDOS", "10")),
+        # Validade das reservas de estoque dos carrinhos abertos
+        'RESERVA_TTL_SEGUNDOS': float(os.getenv("RESERVA_TTL_SEGUNDOS", "900")),
+        # Processos dos relatórios em lote (0 = um por núcleo)
+        'RELATORIO_PROCESSOS': int(os.getenv("RELATORIO_PROCESSOS", "0")),
+        # Consultas SQL por operação (API e interface) e aviso de N+1 no log
+        'CONSULTAS_INSTRUMENTADAS': os.getenv("CONSULTAS_INSTRUMENTADAS", "False").lower() == "true",
+        'CONSULTAS_LIMITE_REPETICAO': int(os.getenv("CONSULTAS_LIMITE_REPETICAO", "5")),
+        # Log de consultas lentas com o plano de execução (0 desativa)
+        'CONSULTAS_LENTAS_MS': float(os.getenv("CONSULTAS_LENTAS_MS", "0")),
+        'CONSULTAS_LENTAS_ARQUIVO': os.getenv("CONSULTAS_LENTAS_ARQUIVO",
+                                              str(BASE_DIR / "logs" / "consultas_lentas.jsonl")),
+        # Perfilamento das ações da interface e dos serviços (cProfile/tracemalloc)
+        'PERFIL_ATIVO': os.getenv("PERFIL_ATIVO", "False").lower() == "true",
+        'PERFIL_MEMORIA': os.getenv("PERFIL_MEMORIA", "False").lower() == "true",
+        'PERFIL_DIR': os.getenv("PERFIL_DIR", str(BASE_DIR / "logs" / "profiles")),
+        'PERFIL_MANTER_DIAS': int(os.getenv("PERFIL_MANTER_DIAS", "7")),
+        # Telas ocultas mantidas montadas pela interface (as menos usadas saem antes)
+        'TELAS_EM_MEMORIA': int(os.getenv("TELAS_EM_MEMORIA", "4")),
+    }
+
 
-# Loja
-STORE_NAME = os.getenv("STORE_NAME", "Minha Loja")
+_CONFIGURACOES_ENV = (
+    'DATABASE_PATH', 'STORE_NAME', 'RECEIPT_WIDTH', 'TIMEZONE', 'DEBUG',
+    'BACKUP_INTERVALO_HORAS', 'BACKUP_MANTER', 'BACKUP_DIR',
+    'MANUTENCAO_OCIOSIDADE_SEGUNDOS',
+    'SYNC_URL', 'SYNC_TOKEN', 'SYNC_TERMINAL', 'SYNC_INTERVALO_SEGUNDOS',
+    'DIARIO_VENDAS',
+    'OUTBOX_ARQUIVO', 'OUTBOX_MANTER_DIAS',
+    'CACHE_CONSULTAS_TAMANHO',
+    'DASHBOARD_RECONCILIAR_SEGUNDOS',
+    'API_HOST', 'API_PORTA', 'API_WORKERS',
+    'DB_LEITORES', 'DB_FILA_MAXIMA', 'DB_TIMEOUT_SEGUNDOS',
+    'RELATORIO_PROCESSOS', 'RESERVA_TTL_SEGUNDOS',
+    'CONSULTAS_INSTRUMENTADAS', 'CONSULTAS_LIMITE_REPETICAO',
+    'CONSULTAS_LENTAS_MS', 'CONSULTAS_LENTAS_ARQUIVO',
+    'PERFIL_ATIVO', 'PERFIL_MEMORIA', 'PERFIL_DIR', 'PERFIL_MANTER_DIAS',
+    'TELAS_EM_MEMORIA',
+)
 
-# Impressão
-RECEIPT_WIDTH = int(os.getenv("RECEIPT_WIDTH", "58"))  # 58mm ou 80mm
 
-# Fuso horário
-TIMEZONE = os.getenv("TIMEZONE", "UTC-3")
+def __getattr__(nome):
+    if nome in _CONFIGURACOES_ENV:
+        globals().update(_ler_configuracoes_env())
+        return globals()[nome]
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
-# Debug
-DEBUG = os.getenv("DEBUG", "False").lower() == "true"
 
 # Cores do tema escuro (Flet)
 COLORS = {
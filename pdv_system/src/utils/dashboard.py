@@ -1,11 +1,27 @@
 """
 Dashboard - Resumo Financeiro para Tela Inicial
 Exibe 3 Cards com totais do dia
+
+``PainelDia`` mantém os totais em memória: carrega uma vez com a agregação do
+dia, soma as vendas e despesas pelo barramento de eventos e, a cada
+``intervalo_segundos``, confere com o banco (corrige vendas de outros
+terminais ou eventos perdidos). Mostrar a tela inicial não consulta o banco.
+
+Cada evento recebido avança uma versão; a reconciliação anota a versão antes
+de consultar e só troca os totais se ela não mudou (senão o resultado pode ou
+não conter o evento e é descartado). Vendas do diário chegam pelo evento que o
+AplicadorDiario publica ao gravá-las; cancelar só remove carrinhos abertos,
+que nunca entraram nos totais.
 """
 
-from datetime import date
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Dict
+import threading
 from src.models.financeiro_repository import get_resumo_dia
+from src.utils.eventos import barramento
 from src.utils.formatadores import FormataçãoUtil
+from src.utils.logger import log_info, log_warning, log_error
 
 
 def obter_dados_dashboard(data: date = None) -> dict:
@@ -25,8 +41,10 @@ def obter_dados_dashboard(data: date = None) -> dict:
             'data': '2026-02-06'
         }
     """
-    resumo = get_resumo_dia(data)
-    
+    return _formatar(get_resumo_dia(data))
+
+
+def _formatar(resumo: Dict) -> dict:
     return {
         'total_vendas': FormataçãoUtil.formatar_moeda(float(resumo['total_vendas'])),
         'total_despesas': FormataçãoUtil.formatar_moeda(float(resumo['total_despesas'])),
@@ -36,6 +54,167 @@ def obter_dados_dashboard(data: date = None) -> dict:
     }
 
 
+class PainelDia:
+    """Totais do dia em memória, atualizados por eventos e reconciliados com o banco"""
+
+    TENTATIVAS = 3
+
+    def __init__(self, intervalo_segundos: float = 300):
+        self.intervalo = intervalo_segundos
+        self._trava = threading.RLock()
+        self._resumo = None
+        self._versao = 0
+        self._ouvintes = []
+        self._assinaturas = []
+        self._parar = threading.Event()
+        self._thread = None
+        self.ultima_reconciliacao = None
+        self.divergencias = 0
+
+    def conectar(self):
+        """Assina os eventos de venda e despesa (uma vez)"""
+        if not self._assinaturas:
+            self._assinaturas = [
+                barramento.assinar('venda.finalizada', self._aplicar_venda),
+                barramento.assinar('despesa.registrada', self._aplicar_despesa),
+            ]
+
+    def desconectar(self):
+        while self._assinaturas:
+            self._assinaturas.pop()()
+
+    def resumo(self) -> Dict:
+        """Totais atuais (Decimal); consulta o banco só na primeira vez ou na virada do dia"""
+        self.conectar()
+        with self._trava:
+            if self._resumo is None or self._resumo['data'] != date.today():
+                self.reconciliar()
+            return dict(self._resumo)
+
+    def dados(self) -> dict:
+        """Totais formatados como ``obter_dados_dashboard``"""
+        return _formatar(self.resumo())
+
+    def reconciliar(self) -> bool:
+        """
+        Recalcula os totais com a agregação do banco
+
+        Se chegar um evento durante a consulta, tenta de novo; depois de
+        ``TENTATIVAS`` mantém os totais em memória (ou, sem totais do dia
+        ainda, fica com a última consulta).
+
+        Returns:
+            bool: True se os totais em memória estavam diferentes
+        """
+        for tentativa in range(1, self.TENTATIVAS + 1):
+            with self._trava:
+                versao = self._versao
+            resumo = get_resumo_dia(date.today())
+            with self._trava:
+                anterior = self._resumo
+                carregado = anterior is not None and anterior['data'] == resumo['data']
+                if self._versao != versao and (carregado or tentativa < self.TENTATIVAS):
+                    continue
+                self._resumo = dict(resumo)
+                self.ultima_reconciliacao = datetime.now()
+                break
+        else:
+            log_info("Dashboard: reconciliação descartada (eventos durante a consulta)")
+            return False
+
+        divergiu = anterior is not None and anterior['data'] == resumo['data'] and any(
+            anterior[campo] != resumo[campo]
+            for campo in ('total_vendas', 'total_despesas', 'quantidade_transacoes')
+        )
+        if divergiu:
+            self.divergencias += 1
+            log_warning(
+                f"Dashboard reconciliado: vendas {anterior['total_vendas']} -> "
+                f"{resumo['total_vendas']}, despesas {anterior['total_despesas']} -> "
+                f"{resumo['total_despesas']}"
+            )
+        if divergiu or anterior is None or anterior['data'] != resumo['data']:
+            self._notificar()
+        return divergiu
+
+    def _aplicar_venda(self, evento: Dict):
+        self._aplicar(evento, 'total_vendas')
+
+    def _aplicar_despesa(self, evento: Dict):
+        self._aplicar(evento, 'total_despesas')
+
+    def _aplicar(self, evento: Dict, campo: str):
+        with self._trava:
+            self._versao += 1
+            if self._resumo is None or evento['data_hora'].date() != self._resumo['data']:
+                # Ainda não carregado ou de outro dia: a próxima leitura/reconciliação acerta
+                return
+            self._resumo[campo] += Decimal(evento['valor'])
+            self._resumo['saldo_liquido'] = (
+                self._resumo['total_vendas'] - self._resumo['total_despesas']
+            )
+            self._resumo['quantidade_transacoes'] += 1
+        self._notificar()
+
+    def ouvir(self, funcao: Callable[[dict], None]) -> Callable[[], None]:
+        """
+        Chama ``funcao(dados)`` a cada mudança dos totais (ex.: cards da tela inicial)
+
+        Returns:
+            Função que cancela
+        """
+        self._ouvintes.append(funcao)
+
+        def cancelar():
+            if funcao in self._ouvintes:
+                self._ouvintes.remove(funcao)
+        return cancelar
+
+    def _notificar(self):
+        with self._trava:
+            dados = _formatar(self._resumo)
+        for funcao in list(self._ouvintes):
+            try:
+                funcao(dados)
+            except Exception as e:
+                log_error(f"Erro ao atualizar o dashboard: {str(e)}", exc_info=True)
+
+    def iniciar(self):
+        """Assina os eventos e inicia a reconciliação periódica"""
+        self.conectar()
+        if self._thread and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="painel", daemon=True)
+        self._thread.start()
+        log_info(f"Dashboard: reconciliação com o banco a cada {self.intervalo:g}s")
+
+    def parar(self, timeout: float = 5):
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self.desconectar()
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.reconciliar()
+            except Exception as e:
+                log_error(f"Erro ao reconciliar o dashboard: {str(e)}", exc_info=True)
+
+
+_painel = None
+
+
+def painel_dia() -> PainelDia:
+    """Instância única do painel usada pela interface"""
+    global _painel
+    if _painel is None:
+        from src.utils import config
+        _painel = PainelDia(config.DASHBOARD_RECONCILIAR_SEGUNDOS)
+    return _painel
+
+
 if __name__ == '__main__':
     # Teste do dashboard
     from src.database.connection import init_db
@@ -0,0 +1,56 @@
+"""
+Barramento de eventos em memória (dentro do processo)
+
+Os serviços publicam depois que a operação foi gravada; quem assina (ex.: os
+cards do dashboard) é chamado na mesma thread, em ordem de assinatura. Um
+assinante com erro é registrado no log e não impede os demais nem a operação.
+
+Eventos publicados:
+  - venda.finalizada    (valor: total líquido, data_hora; no modo diário, quando
+                         o AplicadorDiario grava a venda no banco)
+  - despesa.registrada  (valor, data_hora)
+
+Para outros processos e integrações, use o outbox (src/services/outbox_service.py).
+"""
+from typing import Callable, Dict, List
+import threading
+
+from src.utils.logger import log_error
+
+
+class BarramentoEventos:
+    """Publica eventos para as funções assinantes"""
+
+    def __init__(self):
+        self._assinantes: Dict[str, List[Callable]] = {}
+        self._trava = threading.Lock()
+
+    def assinar(self, tipo: str, funcao: Callable[[Dict], None]) -> Callable[[], None]:
+        """
+        Assina um tipo de evento
+
+        Returns:
+            Função que cancela a assinatura
+        """
+        with self._trava:
+            self._assinantes.setdefault(tipo, []).append(funcao)
+
+        def cancelar():
+            with self._trava:
+                if funcao in self._assinantes.get(tipo, []):
+                    self._assinantes[tipo].remove(funcao)
+        return cancelar
+
+    def publicar(self, tipo: str, **dados) -> None:
+        with self._trava:
+            assinantes = list(self._assinantes.get(tipo, ()))
+
+        for funcao in assinantes:
+            try:
+                funcao({'tipo': tipo, **dados})
+            except Exception as e:
+                log_error(f"Erro no assinante do evento {tipo}: {str(e)}", exc_info=True)
+
+
+# Instância usada pelos serviços e pela interface
+barramento = BarramentoEventos()
@@ -1,6 +1,9 @@
 """
 Sistema de Logging Estruturado para PDV
 Registra todas as operações em arquivo e console
+
+O logger é criado no primeiro uso (ou em ``configurar_logger``, chamado pelo
+bootstrap), e os arquivos de log só são abertos na primeira gravação.
 """
 import logging
 import sys
@@ -45,7 +48,8 @@ class PDVLogger:
             self.log_dir / "pdv_system.log",
             maxBytes=10_000_000,  # 10MB
             backupCount=5,
-            encoding='utf-8'
+            encoding='utf-8',
+            delay=True
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
@@ -56,7 +60,8 @@ class PDVLogger:
             self.log_dir / "pdv_errors.log",
             maxBytes=5_000_000,  # 5MB
             backupCount=3,
-            encoding='utf-8'
+            encoding='utf-8',
+            delay=True
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(formatter)
@@ -118,33 +123,41 @@ class PDVLogger:
             self.logger.debug(f"[PERF] {operacao} levou {tempo_ms:.2f}ms")
 
 
-# Instância global do logger
-_logger = PDVLogger()
+# Instância global do logger (criada sob demanda)
+_logger = None
+
+
+def configurar_logger() -> PDVLogger:
+    """Cria (uma única vez) e retorna o logger global"""
+    global _logger
+    if _logger is None:
+        _logger = PDVLogger()
+    return _logger
 
 def get_logger(name: str = None):
     """Função helper para obter logger"""
-    return _logger.get_logger(name)
+    return configurar_logger().get_logger(name)
 
 def log_info(msg: str, **kwargs):
     """Helper para log de info"""
-    _logger.log_info(msg, **kwargs)
+    configurar_logger().log_info(msg, **kwargs)
 
 def log_error(msg: str, exc_info=False, **kwargs):
     """Helper para log de erro"""
-    _logger.log_error(msg, exc_info=exc_info, **kwargs)
+    configurar_logger().log_error(msg, exc_info=exc_info, **kwargs)
 
 def log_warning(msg: str, **kwargs):
     """Helper para log de warning"""
-    _logger.log_warning(msg, **kwargs)
+    configurar_logger().log_warning(msg, **kwargs)
 
 def log_debug(msg: str, **kwargs):
     """Helper para log de debug"""
-    _logger.log_debug(msg, **kwargs)
+    configurar_logger().log_debug(msg, **kwargs)
 
 def log_venda(numero: int, acao: str, detalhes: str = ""):
     """Helper para logs de venda"""
-    _logger.log_venda(numero, acao, detalhes)
+    configurar_logger().log_venda(numero, acao, detalhes)
 
 def log_bd(operacao: str, tabela: str, detalhes: str = ""):
     """Helper para logs de banco de dados"""
-    _logger.log_operacao_banco(operacao, tabela, detalhes)
+    configurar_logger().log_operacao_banco(operacao, tabela, detalhes)
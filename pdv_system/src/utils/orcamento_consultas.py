@@ -0,0 +1,144 @@
+"""
+Verificação do orçamento de consultas das chamadas quentes
+
+Monta um banco temporário (produtos, vendas com vários itens) e executa as
+chamadas de serviço do caixa e dos relatórios dentro de
+``orcamento_consultas`` (src.database.instrumentacao). Falha se alguma
+passar do número de consultas ou repetir um mesmo formato de comando - o
+sinal de um N+1 voltando (ex.: ``item.produto`` por item na finalização).
+
+As vendas têm ``ITENS_POR_VENDA`` itens de propósito: as chamadas que não
+dependem da quantidade de itens continuam dentro do orçamento; as que
+consultam por item estouram o limite de repetições.
+
+Os mesmos orçamentos valem nos testes (tests/test_orcamento_consultas.py).
+
+Uso:
+    python -m src.utils.orcamento_consultas [--verbose]
+
+Retorna código de saída 1 quando algum orçamento é estourado (para uso em CI).
+"""
+from pathlib import Path
+from typing import Callable, List, Tuple
+import sys
+import tempfile
+
+ITENS_POR_VENDA = 10
+
+# (nome, máximo de consultas, máximo de repetições de um formato)
+# O máximo de consultas tem folga sobre a contagem atual (uma consulta a mais
+# numa mudança legítima não quebra a verificação); um N+1 nas vendas soma
+# ITENS_POR_VENDA consultas e estoura o máximo e as repetições.
+ORCAMENTOS = {
+    'produto.obter_por_codigo': (2, 1),
+    'produto.buscar': (2, 1),
+    'venda.iniciar': (3, 1),
+    'venda.adicionar_item': (14, 2),
+    'venda.carrinho': (3, 1),
+    'venda.finalizar': (14, 2),
+    'financeiro.resumo_dia': (4, 1),
+    'relatorio.dia': (3, 1),
+    'entrada.registrar': (20, 2),
+}
+
+
+def _preparar_banco(diretorio: Path) -> None:
+    """Aponta o banco para ``diretorio`` e cria produtos para as vendas"""
+    from src.database import connection
+    from src.database.diario import definir_ativo as definir_diario
+    from src.sync.registro import definir_ativo as definir_sync
+
+    connection.DATA_DIR = diretorio
+    connection.DB_PATH = diretorio / "orcamento.db"
+    definir_diario(False)
+    definir_sync(False)
+
+    from src.database.connection import init_db
+    from src.database.models import Produto
+    from decimal import Decimal
+
+    init_db()
+    Produto.insert_many([
+        {'nome': f"Produto {i:03d}", 'codigo': f"P{i:03d}",
+         'preco_venda': Decimal('10.00'), 'preco_custo': Decimal('6.00'), 'estoque': 1000}
+        for i in range(100)
+    ]).execute()
+
+
+def _chamadas() -> List[Tuple[str, Callable]]:
+    """Chamadas na ordem (as de venda dependem das anteriores); nome None não é medido"""
+    from src.services.entrada_service import EntradaMercadoriaService
+    from src.services.financeiro_service import FinanceiroService
+    from src.services.produto_service import ProdutoService
+    from src.services.relatorio_service import RelatorioService
+    from src.services.venda_service import VendaService
+
+    produtos, vendas, financeiro = ProdutoService(), VendaService(), FinanceiroService()
+    venda = {}
+
+    def encher_carrinho():
+        for i in range(1, ITENS_POR_VENDA):
+            vendas.adicionar_item_carrinho(venda['id'], f"P{i:03d}", 1)
+
+    return [
+        ('produto.obter_por_codigo', lambda: produtos.obter_produto_por_codigo('P050')),
+        ('produto.buscar', lambda: produtos.buscar_produtos('Produto 01')),
+        ('venda.iniciar', lambda: venda.update(vendas.iniciar_venda('DINHEIRO'))),
+        (None, encher_carrinho),
+        ('venda.adicionar_item', lambda: vendas.adicionar_item_carrinho(venda['id'], 'P099', 2)),
+        ('venda.carrinho', lambda: vendas.obter_carrinho(venda['id'])),
+        ('venda.finalizar', lambda: vendas.finalizar_venda(venda['id'], 1000)),
+        ('financeiro.resumo_dia', financeiro.obter_resumo_dia),
+        ('relatorio.dia', RelatorioService.gerar_relatorio_dia),
+        ('entrada.registrar', lambda: EntradaMercadoriaService().registrar_entrada(
+            'NF-ORCAMENTO', [{'codigo': f"P{i:03d}", 'quantidade': 5} for i in range(20)]
+        )),
+    ]
+
+
+def verificar(verbose: bool = False) -> Tuple[bool, List[str]]:
+    """
+    Executa as chamadas quentes num banco temporário e confere os orçamentos
+
+    Returns:
+        tuple: (dentro do orçamento, linhas do relatório)
+    """
+    from src.database.instrumentacao import OrcamentoConsultasExcedido, orcamento_consultas
+
+    ok, relatorio = True, []
+    with tempfile.TemporaryDirectory() as diretorio:
+        _preparar_banco(Path(diretorio))
+        for nome, chamada in _chamadas():
+            if nome is None:
+                chamada()
+                continue
+            maximo, repeticoes = ORCAMENTOS[nome]
+            try:
+                with orcamento_consultas(maximo, repeticoes=repeticoes, nome=nome) as medicao:
+                    chamada()
+                relatorio.append(f"✅ {nome}: {medicao.consultas}/{maximo} consulta(s), "
+                                 f"{medicao.linhas} linha(s)")
+                if verbose:
+                    relatorio += medicao.resumo().splitlines()[1:]
+            except OrcamentoConsultasExcedido as e:
+                ok = False
+                relatorio += [f"❌ {linha}" if i == 0 else linha
+                              for i, linha in enumerate(str(e).splitlines())]
+
+        from src.database.connection import get_db
+        get_db().close()
+
+    return ok, relatorio
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Confere o orçamento de consultas das chamadas quentes")
+    parser.add_argument('--verbose', action='store_true', help="Mostra os comandos de cada chamada")
+    args = parser.parse_args()
+
+    ok, linhas = verificar(args.verbose)
+    print("\n".join(linhas))
+    print("✅ Dentro do orçamento" if ok else "❌ Orçamento de consultas estourado")
+    sys.exit(0 if ok else 1)
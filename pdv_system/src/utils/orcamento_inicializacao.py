@@ -0,0 +1,188 @@
+"""
+Verificação do orçamento de tempo de inicialização
+
+Mede com ``python -X importtime`` o custo de importar o caminho de
+inicialização (bootstrap + tela principal) e, num processo novo, o tempo de
+``inicializar()`` (logger, banco e migrações) sobre um banco já existente.
+Falha se:
+  - o tempo acumulado de importação passar do orçamento
+  - algum módulo pesado que deveria ser carregado sob demanda (ReportLab,
+    python-dotenv, serviços de relatório/impressão) aparecer na inicialização
+  - ``inicializar()`` passar do orçamento
+
+Verificado também por tests/test_orcamento_inicializacao.py (os limites de
+tempo só com ``PDV_TESTAR_TEMPOS=1``).
+
+Uso:
+    python -m src.utils.orcamento_inicializacao [--limite-ms 550]
+        [--limite-inicializar-ms 250] [--rodadas 3]
+
+Retorna código de saída 1 quando o orçamento é estourado (para uso em CI).
+"""
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Módulos importados antes da janela do PDV abrir
+CAMINHO_INICIALIZACAO = "import src.bootstrap, src.ui.main_app"
+
+# Módulos que só podem ser carregados quando a funcionalidade é usada
+MODULOS_PROIBIDOS = [
+    "reportlab",
+    "dotenv",
+    "src.services.relatorio_service",
+    "src.utils.printer",
+    "src.ui.pdv_view",
+    "src.ui.produtos_view",
+]
+
+LIMITE_PADRAO_MS = int(os.getenv("PDV_ORCAMENTO_INICIALIZACAO_MS", "550"))
+LIMITE_INICIALIZAR_MS = int(os.getenv("PDV_ORCAMENTO_INICIALIZAR_MS", "250"))
+
+# Executado num processo novo: importa o banco e o bootstrap e chama
+# inicializar() com os dados e os logs em ``diretorio``
+_CODIGO_INICIALIZAR = """
+import time
+inicio = time.perf_counter()
+from pathlib import Path
+from src.database import connection
+from src.utils.logger import configurar_logger
+connection.DATA_DIR = Path({diretorio!r})
+connection.DB_PATH = connection.DATA_DIR / "loja.db"
+for handler in configurar_logger().logger.handlers:
+    if hasattr(handler, "baseFilename"):
+        handler.baseFilename = str(connection.DATA_DIR / Path(handler.baseFilename).name)
+from src.bootstrap import inicializar
+ok = inicializar()
+print("INICIALIZAR_MS", (time.perf_counter() - inicio) * 1000, ok)
+"""
+
+_LINHA_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+
+def medir_importacao(codigo: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Executa ``codigo`` num processo novo com -X importtime
+
+    Returns:
+        dict: {modulo: (tempo acumulado em µs, profundidade)}
+    """
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=str(BASE_DIR),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modulos = {}
+    for linha in resultado.stderr.splitlines():
+        casamento = _LINHA_IMPORTTIME.match(linha)
+        if casamento:
+            _proprio, acumulado, recuo, modulo = casamento.groups()
+            modulos[modulo] = (int(acumulado), (len(recuo) - 1) // 2)
+    return modulos
+
+
+def medir_inicializar(diretorio: Path) -> float:
+    """Tempo (ms) de importar o bootstrap e executar ``inicializar()`` num processo novo"""
+    resultado = subprocess.run(
+        [sys.executable, "-c", _CODIGO_INICIALIZAR.format(diretorio=str(diretorio))],
+        cwd=str(BASE_DIR),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for linha in resultado.stdout.splitlines():
+        if linha.startswith("INICIALIZAR_MS"):
+            _rotulo, tempo, ok = linha.split()
+            if ok != "True":
+                raise RuntimeError(f"inicializar() falhou:\n{resultado.stdout}{resultado.stderr}")
+            return float(tempo)
+    raise RuntimeError(f"Medição de inicializar() sem resultado:\n{resultado.stderr}")
+
+
+def verificar_inicializar(limite_ms: int = LIMITE_INICIALIZAR_MS,
+                          rodadas: int = 3) -> Tuple[bool, List[str]]:
+    """
+    Mede ``inicializar()`` sobre um banco já criado (a abertura normal do caixa)
+
+    A primeira execução cria o banco e só entra no relatório; vale o menor
+    tempo das ``rodadas`` seguintes.
+
+    Returns:
+        tuple: (dentro do orçamento, linhas do relatório)
+    """
+    with tempfile.TemporaryDirectory() as diretorio:
+        criacao = medir_inicializar(Path(diretorio))
+        tempo_ms = min(medir_inicializar(Path(diretorio)) for _ in range(rodadas))
+
+    relatorio = [f"inicializar(): {tempo_ms:.1f} ms (limite {limite_ms} ms; "
+                 f"criando o banco: {criacao:.1f} ms)"]
+    return tempo_ms <= limite_ms, relatorio
+
+
+def verificar(limite_ms: int = LIMITE_PADRAO_MS, rodadas: int = 3) -> Tuple[bool, List[str]]:
+    """
+    Mede o caminho de inicialização e confere o orçamento
+
+    A medição é repetida ``rodadas`` vezes e vale o menor tempo (menos ruído).
+    Módulos já carregados pelo próprio interpretador (``-c pass``) não contam.
+
+    Returns:
+        tuple: (dentro do orçamento, linhas do relatório)
+    """
+    base = set(medir_importacao("pass"))
+
+    tempos, medicao = [], {}
+    for _ in range(rodadas):
+        medicao = medir_importacao(CAMINHO_INICIALIZACAO)
+        total = sum(
+            acumulado for modulo, (acumulado, profundidade) in medicao.items()
+            if profundidade == 0 and modulo not in base
+        )
+        tempos.append(total / 1000)
+
+    tempo_ms = min(tempos)
+    proibidos = [
+        m for m in MODULOS_PROIBIDOS
+        if any(nome == m or nome.startswith(m + ".") for nome in medicao)
+    ]
+
+    maiores = sorted(
+        ((acumulado, modulo) for modulo, (acumulado, profundidade) in medicao.items()
+         if profundidade <= 1 and modulo not in base),
+        reverse=True
+    )[:10]
+
+    relatorio = [f"Importação da inicialização: {tempo_ms:.1f} ms (limite {limite_ms} ms)"]
+    relatorio += [f"  {acumulado / 1000:8.1f} ms  {modulo}" for acumulado, modulo in maiores]
+    if proibidos:
+        relatorio.append(f"Módulos carregados indevidamente: {', '.join(proibidos)}")
+
+    return tempo_ms <= limite_ms and not proibidos, relatorio
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Confere o orçamento de inicialização")
+    parser.add_argument('--limite-ms', type=int, default=LIMITE_PADRAO_MS)
+    parser.add_argument('--limite-inicializar-ms', type=int, default=LIMITE_INICIALIZAR_MS)
+    parser.add_argument('--rodadas', type=int, default=3)
+    args = parser.parse_args()
+
+    ok_importacao, linhas = verificar(args.limite_ms, args.rodadas)
+    ok_inicializar, linhas_inicializar = verificar_inicializar(args.limite_inicializar_ms,
+                                                               args.rodadas)
+    linhas += linhas_inicializar
+    ok = ok_importacao and ok_inicializar
+    print("\n".join(linhas))
+    print("✅ Dentro do orçamento" if ok else "❌ Orçamento de inicialização estourado")
+    sys.exit(0 if ok else 1)
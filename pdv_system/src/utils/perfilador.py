@@ -0,0 +1,326 @@
+"""
+Perfilador sob demanda das ações da interface e das chamadas de serviço
+
+Para investigar lentidão na loja sem depurador: com o modo ligado
+(PERFIL_ATIVO=true ou Ctrl+Shift+P na janela do PDV), cada ação do PDVView
+e cada chamada de serviço (executor do banco, API) roda sob ``cProfile`` e
+grava um ``.prof`` em ``PERFIL_DIR/AAAA-MM-DD/``. Com PERFIL_MEMORIA=true
+também compara snapshots do ``tracemalloc`` antes e depois da ação e grava
+as maiores alocações num ``.mem.json`` ao lado.
+
+  - o cProfile é por thread: uma ação que começa enquanto outra já está
+    sendo perfilada na mesma thread entra no perfil da primeira. No Python
+    3.12+ só um perfil fica ativo por processo; a ação que começa enquanto
+    outra thread está sendo perfilada roda sem perfil
+  - uma ação assíncrona é perfilada do início ao fim, incluindo o que o
+    loop de eventos executar enquanto ela aguarda o banco
+  - rotação: diretórios de dias com mais de PERFIL_MANTER_DIAS são apagados
+    ao começar um novo dia; cada dia aceita até ``MAXIMO_POR_DIA`` perfis
+
+Desligado, ``perfilar`` só confere uma flag.
+
+Uso (relatório das funções mais quentes de um dia de vendas):
+    python -m src.utils.perfilador [--dia AAAA-MM-DD] [--acao pdv.] [--top 30]
+        [--ordenar tottime|cumtime] [--saida dia.prof]
+"""
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+import functools
+import inspect
+import itertools
+import json
+import re
+import shutil
+import threading
+
+from src.utils.logger import log_info, log_warning
+
+MAXIMO_POR_DIA = 5000
+ALOCACOES_POR_RELATORIO = 25
+
+_ativo = None
+_memoria = None
+_local = threading.local()
+_trava = threading.Lock()
+_sequencia = itertools.count()
+_dia_atual = None
+_gravados_no_dia = 0
+
+
+def perfilamento_ativo() -> bool:
+    """True se as ações estão sendo perfiladas (PERFIL_ATIVO)"""
+    global _ativo
+    if _ativo is None:
+        from src.utils import config
+        _ativo = config.PERFIL_ATIVO
+    return _ativo
+
+
+def definir_ativo(ativo: bool, memoria: bool = None) -> None:
+    """Liga/desliga o perfilamento (atalho oculto da interface, linha de comando)"""
+    global _ativo, _memoria
+    _ativo = ativo
+    if memoria is not None:
+        _memoria = memoria
+    log_info(f"Perfilamento {'ligado' if ativo else 'desligado'}")
+
+
+def _memoria_ativa() -> bool:
+    global _memoria
+    if _memoria is None:
+        from src.utils import config
+        _memoria = config.PERFIL_MEMORIA
+    return _memoria
+
+
+def _diretorio_base() -> Path:
+    from src.utils import config
+    return Path(config.PERFIL_DIR)
+
+
+def _nome_arquivo(acao: str) -> Path:
+    """Caminho do próximo perfil do dia (sem extensão); None se o dia já está cheio"""
+    global _dia_atual, _gravados_no_dia
+    agora = datetime.now()
+    with _trava:
+        if _dia_atual != agora.date():
+            _dia_atual = agora.date()
+            _gravados_no_dia = 0
+            _rotacionar(_diretorio_base(), _dia_atual)
+        if _gravados_no_dia >= MAXIMO_POR_DIA:
+            if _gravados_no_dia == MAXIMO_POR_DIA:
+                log_warning(f"Perfilamento: limite de {MAXIMO_POR_DIA} perfis no dia atingido")
+                _gravados_no_dia += 1
+            return None
+        _gravados_no_dia += 1
+        numero = next(_sequencia)
+
+    diretorio = _diretorio_base() / agora.date().isoformat()
+    diretorio.mkdir(parents=True, exist_ok=True)
+    seguro = re.sub(r'[^\w.-]+', '_', acao)[:80]
+    return diretorio / f"{agora:%H%M%S_%f}_{numero}_{seguro}"
+
+
+def _rotacionar(base: Path, hoje: date) -> None:
+    """Apaga os diretórios de dias fora da retenção"""
+    from src.utils import config
+    limite = hoje - timedelta(days=config.PERFIL_MANTER_DIAS)
+    if not base.exists():
+        return
+    for diretorio in base.iterdir():
+        try:
+            dia = date.fromisoformat(diretorio.name)
+        except ValueError:
+            continue
+        if dia < limite:
+            shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def _alocacoes(antes, depois) -> List[Dict]:
+    """Maiores crescimentos de memória por linha entre dois snapshots"""
+    import tracemalloc
+
+    filtros = [tracemalloc.Filter(False, tracemalloc.__file__),
+               tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+               tracemalloc.Filter(False, '*/cProfile.py'),
+               tracemalloc.Filter(False, '*/pstats.py')]
+    diferencas = depois.filter_traces(filtros).compare_to(antes.filter_traces(filtros), 'lineno')
+    return [
+        {
+            'local': f"{d.traceback[0].filename}:{d.traceback[0].lineno}",
+            'kib': round(d.size_diff / 1024, 1),
+            'blocos': d.count_diff,
+            'kib_total': round(d.size / 1024, 1),
+        }
+        for d in diferencas[:ALOCACOES_POR_RELATORIO] if d.size_diff > 0
+    ]
+
+
+def _ligar_perfil():
+    """cProfile ligado; None se outro perfilador já está ativo"""
+    import cProfile
+    perfil = cProfile.Profile()
+    try:
+        perfil.enable()
+    except ValueError:
+        # Python 3.12+: o cProfile usa sys.monitoring, um perfilador por
+        # processo; a ação que começa com outra sendo perfilada (outra thread)
+        # roda sem perfil
+        return None
+    return perfil
+
+
+@contextmanager
+def perfilar(acao: str):
+    """Perfila o bloco como ``acao`` se o modo está ligado (e a thread livre)"""
+    if not perfilamento_ativo() or getattr(_local, 'ocupado', False):
+        yield
+        return
+
+    antes = None
+    if _memoria_ativa():
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        antes = tracemalloc.take_snapshot()
+
+    perfil = depois = None
+    inicio = datetime.now()
+    try:
+        _local.ocupado = True
+        perfil = _ligar_perfil()
+        yield
+    finally:
+        if perfil is not None and antes is not None:
+            # Antes de desligar e gravar o perfil: as alocações do cProfile
+            # não entram no relatório da ação
+            import tracemalloc
+            depois = tracemalloc.take_snapshot()
+        if perfil is not None:
+            perfil.disable()
+        _local.ocupado = False
+        if perfil is not None:
+            _gravar(acao, inicio, perfil, antes, depois)
+
+
+def _gravar(acao: str, inicio: datetime, perfil, antes, depois) -> None:
+    """Grava o ``.prof`` (e o ``.mem.json``) da ação"""
+    try:
+        caminho = _nome_arquivo(acao)
+        if caminho is None:
+            return
+        perfil.dump_stats(str(caminho.with_name(caminho.name + '.prof')))
+        if depois is not None:
+            relatorio = {
+                'acao': acao,
+                'inicio': inicio.isoformat(),
+                'alocacoes': _alocacoes(antes, depois),
+            }
+            caminho.with_name(caminho.name + '.mem.json').write_text(
+                json.dumps(relatorio, ensure_ascii=False), encoding='utf-8'
+            )
+    except OSError as e:
+        log_warning(f"Perfilamento: não foi possível gravar o perfil de {acao}: {e}")
+
+
+def perfilado(acao: str):
+    """Decorador de ``perfilar`` para funções e corrotinas (handlers do Flet)"""
+    def decorar(funcao):
+        if inspect.iscoroutinefunction(funcao):
+            @functools.wraps(funcao)
+            async def envolvida(*args, **kwargs):
+                with perfilar(acao):
+                    return await funcao(*args, **kwargs)
+        else:
+            @functools.wraps(funcao)
+            def envolvida(*args, **kwargs):
+                with perfilar(acao):
+                    return funcao(*args, **kwargs)
+        return envolvida
+    return decorar
+
+
+def _acao_do_arquivo(caminho: Path) -> str:
+    """Nome da ação a partir de HHMMSS_ffffff_N_acao.prof (ou .mem.json)"""
+    nome = caminho.name.split('_', 3)[-1]
+    for extensao in ('.prof', '.mem.json'):
+        if nome.endswith(extensao):
+            return nome[:-len(extensao)]
+    return nome
+
+
+def consolidar(dia: date, prefixo: str = '', base: Path = None):
+    """
+    Junta os perfis de um dia
+
+    Returns:
+        tuple: (pstats.Stats ou None, {ação: {'vezes', 'segundos'}},
+                [alocações somadas por local], arquivos ilegíveis)
+    """
+    import pstats
+
+    diretorio = (base or _diretorio_base()) / dia.isoformat()
+    arquivos = sorted(diretorio.glob('*.prof')) if diretorio.exists() else []
+
+    geral, acoes, ilegiveis = None, {}, 0
+    for arquivo in arquivos:
+        acao = _acao_do_arquivo(arquivo)
+        if not acao.startswith(prefixo):
+            continue
+        try:
+            estatisticas = pstats.Stats(str(arquivo))
+        except (OSError, EOFError, TypeError, ValueError):
+            ilegiveis += 1
+            continue
+        resumo = acoes.setdefault(acao, {'vezes': 0, 'segundos': 0.0})
+        resumo['vezes'] += 1
+        resumo['segundos'] += estatisticas.total_tt
+        if geral is None:
+            geral = estatisticas
+        else:
+            geral.add(estatisticas)
+
+    alocacoes: Dict[str, Dict] = {}
+    for arquivo in (sorted(diretorio.glob('*.mem.json')) if diretorio.exists() else []):
+        if not _acao_do_arquivo(arquivo).startswith(prefixo):
+            continue
+        try:
+            relatorio = json.loads(arquivo.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            ilegiveis += 1
+            continue
+        for item in relatorio['alocacoes']:
+            soma = alocacoes.setdefault(item['local'], {'local': item['local'], 'kib': 0.0,
+                                                        'blocos': 0, 'acoes': 0})
+            soma['kib'] += item['kib']
+            soma['blocos'] += item['blocos']
+            soma['acoes'] += 1
+
+    return (geral, acoes,
+            sorted(alocacoes.values(), key=lambda a: a['kib'], reverse=True), ilegiveis)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Funções mais quentes dos perfis de um dia")
+    parser.add_argument('--dia', type=date.fromisoformat, default=date.today())
+    parser.add_argument('--acao', default='', help="Só ações com este prefixo (ex.: pdv.)")
+    parser.add_argument('--top', type=int, default=30)
+    parser.add_argument('--ordenar', choices=('tottime', 'cumtime'), default='tottime')
+    parser.add_argument('--diretorio', type=Path, default=None, help="Padrão: PERFIL_DIR")
+    parser.add_argument('--saida', type=Path, default=None,
+                        help="Grava o perfil consolidado (.prof) para snakeviz/pstats")
+    args = parser.parse_args()
+
+    geral, acoes, alocacoes, ilegiveis = consolidar(args.dia, args.acao, args.diretorio)
+    if geral is None:
+        print(f"Nenhum perfil em {args.dia}")
+        raise SystemExit(1)
+
+    print(f"Perfis de {args.dia}: {sum(a['vezes'] for a in acoes.values())} ação(ões), "
+          f"{len(acoes)} tipo(s)" + (f", {ilegiveis} arquivo(s) ilegível(is)" if ilegiveis else ''))
+    print(f"\n{'AÇÃO':<45} {'VEZES':>7} {'TOTAL s':>10} {'MÉDIA ms':>10}")
+    for acao, resumo in sorted(acoes.items(), key=lambda a: a[1]['segundos'], reverse=True):
+        print(f"{acao[:45]:<45} {resumo['vezes']:>7} {resumo['segundos']:>10.3f} "
+              f"{resumo['segundos'] / resumo['vezes'] * 1000:>10.2f}")
+
+    indice = 2 if args.ordenar == 'tottime' else 3
+    funcoes = sorted(geral.stats.items(), key=lambda f: f[1][indice], reverse=True)[:args.top]
+    print(f"\nFUNÇÕES MAIS QUENTES (por {args.ordenar})")
+    print(f"{'CHAMADAS':>10} {'PRÓPRIO s':>10} {'ACUM. s':>10}  FUNÇÃO")
+    for (arquivo, linha, nome), (_primitivas, chamadas, proprio, acumulado, _origens) in funcoes:
+        local = f"{Path(arquivo).name}:{linha}" if linha else arquivo
+        print(f"{chamadas:>10} {proprio:>10.4f} {acumulado:>10.4f}  {nome} ({local})")
+
+    if alocacoes:
+        print("\nMAIORES ALOCAÇÕES (soma do crescimento por ação)")
+        for item in alocacoes[:args.top]:
+            print(f"{item['kib']:>10.1f} KiB {item['blocos']:>8} blocos {item['acoes']:>6} ação(ões)  "
+                  f"{item['local']}")
+
+    if args.saida:
+        geral.dump_stats(str(args.saida))
+        print(f"\nPerfil consolidado gravado em {args.saida}")
@@ -17,7 +17,7 @@ from reportlab.platypus import Paragraph, Table, TableStyle, SimpleDocTemplate,
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 
-from src.database.models import Venda, ItemVenda
+from src.models.leitura import carregar_venda
 from src.utils.config import STORE_NAME, RECEIPT_WIDTH
 from src.utils.formatadores import FormataçãoUtil
 
@@ -39,20 +39,18 @@ class GeradorCupom:
     
     def _obter_venda(self, venda_id):
         """
-        Obtém venda e itens do banco de dados
+        Obtém venda e itens do banco de dados (com os produtos, de uma vez)
         
         Args:
             venda_id (int): ID da venda
             
         Returns:
-            tuple: (Venda, list[ItemVenda]) ou None se não encontrada
+            tuple: (VendaCompleta, tuple[ItemVendaCompleto])
         """
-        try:
-            venda = Venda.get(Venda.id == venda_id)
-            itens = ItemVenda.select().where(ItemVenda.venda == venda)
-            return venda, list(itens)
-        except Venda.DoesNotExist as e:
-            raise ValueError(f"Venda #{venda_id} não encontrada no banco de dados") from e
+        venda = carregar_venda(venda_id)
+        if venda is None:
+            raise ValueError(f"Venda #{venda_id} não encontrada no banco de dados")
+        return venda, venda.itens
     
     def _criar_estilo_titulo(self):
         """Cria estilo para título"""
@@ -124,8 +122,8 @@ class GeradorCupom:
         Cria PDF usando ReportLab Platypus
         
         Args:
-            venda (Venda): Objeto da venda
-            itens (list): Lista de ItemVenda
+            venda (VendaCompleta): Venda carregada por _obter_venda
+            itens (tuple): Itens da venda (ItemVendaCompleto)
             caminho_saida (str): Caminho para salvar
         """
         # Configurar tamanho da página (58mm de largura)
@@ -176,7 +174,7 @@ class GeradorCupom:
         dados_tabela = [["Descrição", "Qtd", "Preço", "Total"]]
         
         for item in itens:
-            produto_nome = item.produto.nome[:20]  # Limitar a 20 caracteres
+            produto_nome = item.nome_produto[:20]  # Limitar a 20 caracteres
             qtd = str(item.quantidade)
             preco = FormataçãoUtil.formatar_moeda(float(item.preco_unitario))
             total = FormataçãoUtil.formatar_moeda(float(item.subtotal))
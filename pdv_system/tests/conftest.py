@@ -0,0 +1,102 @@
+"""
+Configuração dos testes: ``src`` importável e um banco temporário por teste
+
+Rodar a partir de pdv_system/:
+    python -m pytest -q
+"""
+from decimal import Decimal
+from pathlib import Path
+import sys
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+
+@pytest.fixture(autouse=True)
+def logs(tmp_path, monkeypatch):
+    """Arquivos de log em ``tmp_path`` (não altera pdv_system/logs)"""
+    from logging.handlers import RotatingFileHandler
+    from src.utils import logger
+
+    pdv_logger = logger.configurar_logger()
+    arquivos = [h for h in pdv_logger.logger.handlers if isinstance(h, RotatingFileHandler)]
+
+    monkeypatch.setattr(pdv_logger, 'log_dir', tmp_path)
+    for handler in arquivos:
+        handler.close()
+        monkeypatch.setattr(handler, 'baseFilename',
+                            str(tmp_path / Path(handler.baseFilename).name))
+    yield tmp_path
+
+    for handler in arquivos:
+        handler.close()
+
+
+@pytest.fixture
+def dados(tmp_path, monkeypatch):
+    """Banco, arquivo mensal e diário em ``tmp_path``, sem criar o banco"""
+    from src.database import arquivo, connection, diario
+    from src.database.cache import cache_consultas
+    from src.sync import registro
+
+    monkeypatch.setattr(connection, 'DATA_DIR', tmp_path)
+    monkeypatch.setattr(connection, 'DB_PATH', tmp_path / 'loja.db')
+    monkeypatch.setattr(connection, '_db_instance', None)
+    monkeypatch.setattr(arquivo, 'ARQUIVO_DIR', tmp_path / 'arquivo')
+    monkeypatch.setattr(diario, 'DATA_DIR', tmp_path)
+    monkeypatch.setattr(diario, '_diario_vendas', None)
+    monkeypatch.setattr(diario, '_ativo', False)
+    monkeypatch.setattr(registro, '_ativo', False)
+    cache_consultas.invalidar()
+
+    yield tmp_path
+
+    connection.get_db().close()
+    cache_consultas.invalidar()
+
+
+@pytest.fixture
+def banco(dados):
+    """Banco SQLite novo em ``tmp_path`` (diário de vendas e sync desligados)"""
+    from src.database import connection
+
+    connection.init_db()
+    return connection.get_db()
+
+
+@pytest.fixture
+def produtos(banco):
+    """Cria ``quantidade`` produtos P000.. (preço 10,00, custo 6,00)"""
+    from src.database.models import Produto
+
+    def criar(quantidade: int = 10, estoque: int = 100, preco: str = '10.00'):
+        Produto.insert_many([
+            {'nome': f"Produto {i:03d}", 'codigo': f"P{i:03d}",
+             'preco_venda': Decimal(preco), 'preco_custo': Decimal('6.00'), 'estoque': estoque}
+            for i in range(quantidade)
+        ]).execute()
+        return [f"P{i:03d}" for i in range(quantidade)]
+    return criar
+
+
+@pytest.fixture
+def criar_venda(produtos):
+    """Venda finalizada de P000 x2 (R$ 20,00) com a transação de entrada"""
+    from src.database.models import ItemVenda, Produto, Transacao, Venda
+
+    produtos(1)
+    produto = Produto.get(Produto.codigo == 'P000')
+
+    def criar(numero: int, data_hora, data_transacao=None):
+        venda = Venda.create(numero=numero, data_hora=data_hora, total=Decimal('20.00'),
+                             valor_pago=Decimal('20.00'), forma_pagamento='Dinheiro')
+        ItemVenda.create(venda=venda, produto=produto, quantidade=2,
+                         preco_unitario=Decimal('10.00'), subtotal=Decimal('20.00'))
+        Transacao.create(tipo='ENTRADA', categoria='VENDA', descricao=f"Venda #{numero}",
+                         valor=Decimal('20.00'), data_transacao=data_transacao or data_hora,
+                         venda=venda)
+        return venda
+    return criar
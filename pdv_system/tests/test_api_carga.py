@@ -0,0 +1,94 @@
+"""API: checkout concorrente com estoque escasso, banco ocupado e finalização repetida"""
+from datetime import datetime
+from http.client import HTTPConnection
+import json
+import threading
+
+from peewee import OperationalError
+import pytest
+
+from src.api import carga
+from src.api.servidor import iniciar_em_thread
+from src.database.connection import get_db
+from src.database.models import EventoOutbox, Produto, Transacao
+
+
+@pytest.fixture
+def api(banco):
+    servidor = iniciar_em_thread(workers=8)
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_checkout_com_estoque_escasso_nao_trava_o_banco(api, produtos, caplog):
+    produtos(5, estoque=10)
+    parar = threading.Event()
+
+    def outro_terminal():
+        # Escritor fora da trava da API (a interface do caixa, outro processo)
+        while not parar.is_set():
+            with get_db().atomic():
+                Produto.update(atualizado_em=datetime.now()).where(Produto.codigo == 'P000').execute()
+        get_db().close()
+
+    escritor = threading.Thread(target=outro_terminal)
+    escritor.start()
+    try:
+        host, porta = api.server_address[:2]
+        resultado = carga.executar(f"http://{host}:{porta}", 'checkout', clientes=4,
+                                   duracao=2, itens=3, aquecimento=0)
+    finally:
+        parar.set()
+        escritor.join()
+
+    # O estoque acaba no meio do teste: os erros esperados são só os 400 de estoque
+    assert resultado['operacoes'] > 0
+    assert api.api.metricas._rotas['POST /api/vendas/{venda_id}/finalizar']['erros'] == 0
+    assert not [r for r in caplog.records if 'database is locked' in r.getMessage()]
+    assert Produto.select().where(Produto.estoque < 0).count() == 0
+
+
+def test_banco_ocupado_responde_503(api):
+    def ocupado(parametros, consulta, corpo):
+        try:
+            raise OperationalError("database is locked")
+        except OperationalError as e:
+            raise ValueError(f"Erro ao registrar despesa: {e}") from e
+    api.api._rotas = [rota if rota[2] != '/api/despesas' else rota[:3] + (ocupado, True)
+                      for rota in api.api._rotas]
+
+    host, porta = api.server_address[:2]
+    conexao = HTTPConnection(host, porta, timeout=5)
+    conexao.request('POST', '/api/despesas', body=json.dumps({'descricao': 'x', 'valor': 1}),
+                    headers={'Content-Type': 'application/json'})
+    resposta = conexao.getresponse()
+    assert resposta.status == 503
+    assert json.loads(resposta.read()) == {'erro': 'database is locked'}
+    conexao.close()
+
+
+def _post(api, caminho: str, corpo: dict):
+    host, porta = api.server_address[:2]
+    conexao = HTTPConnection(host, porta, timeout=5)
+    conexao.request('POST', caminho, body=json.dumps(corpo),
+                    headers={'Content-Type': 'application/json'})
+    resposta = conexao.getresponse()
+    resultado = resposta.status, json.loads(resposta.read())
+    conexao.close()
+    return resultado
+
+
+def test_finalizar_de_novo_responde_409_sem_baixar_o_estoque(api, produtos):
+    produtos(1, estoque=10)
+    _status, venda = _post(api, '/api/vendas', {'forma_pagamento': 'Dinheiro'})
+    _post(api, f"/api/vendas/{venda['id']}/itens", {'codigo': 'P000', 'quantidade': 3})
+
+    primeira = _post(api, f"/api/vendas/{venda['id']}/finalizar", {'valor_pago': 50})
+    segunda = _post(api, f"/api/vendas/{venda['id']}/finalizar", {'valor_pago': 50})
+
+    assert primeira[0] == 200
+    assert segunda[0] == 409 and 'já foi finalizada' in segunda[1]['erro']
+    assert Produto.get(Produto.codigo == 'P000').estoque == 7
+    assert Transacao.select().where(Transacao.venda == venda['id']).count() == 1
+    assert EventoOutbox.select().where(EventoOutbox.tipo == 'venda.finalizada').count() == 1
@@ -0,0 +1,44 @@
+"""Arquivo mensal: vendas arquivadas continuam acessíveis por id"""
+from datetime import datetime
+from decimal import Decimal
+
+from src.database.models import ItemVenda, Venda
+from src.models.arquivo_repository import ArquivoRepository
+from src.models.leitura import carregar_venda
+from src.models.venda_repository import VendaRepository
+
+
+def test_venda_arquivada_continua_acessivel(criar_venda):
+    antiga = criar_venda(1, datetime(2024, 1, 10, 15, 0))
+    criar_venda(2, datetime(2024, 3, 5, 9, 0))
+
+    assert ArquivoRepository.arquivar_mes(2024, 1)['vendas'] == 1
+    assert not Venda.select().where(Venda.id == antiga.id).exists()
+
+    completa = carregar_venda(antiga.id)
+    assert completa.numero == 1
+    assert completa.total == Decimal('20.00')
+    assert completa.data_hora == datetime(2024, 1, 10, 15, 0)
+    assert [(i.codigo_produto, i.quantidade, i.subtotal) for i in completa.itens] == [
+        ('P000', 2, Decimal('20.00'))
+    ]
+    assert VendaRepository.obter_venda(antiga.id).numero == 1
+    assert carregar_venda(9999) is None
+
+
+def test_venda_com_transacao_de_outro_mes_fica_no_banco_principal(criar_venda):
+    virada = criar_venda(1, datetime(2024, 1, 31, 23, 59), datetime(2024, 2, 1, 0, 1))
+    criar_venda(2, datetime(2024, 1, 15, 10, 0))
+    criar_venda(3, datetime(2024, 3, 5, 9, 0))
+
+    movidos = ArquivoRepository.arquivar_mes(2024, 1)
+
+    assert movidos == {'mes': '2024-01', 'vendas': 1, 'itens': 1, 'transacoes': 1}
+    assert Venda.select().where(Venda.id == virada.id).exists()
+    assert ItemVenda.select().where(ItemVenda.venda == virada.id).count() == 1
+
+    # Arquivada a transação de fevereiro, a venda sai na próxima passada de janeiro
+    ArquivoRepository.arquivar_mes(2024, 2)
+    assert ArquivoRepository.arquivar_mes(2024, 1)['vendas'] == 1
+    assert not Venda.select().where(Venda.id == virada.id).exists()
+    assert carregar_venda(virada.id).numero == 1
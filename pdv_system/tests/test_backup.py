@@ -0,0 +1,45 @@
+"""Backup: banco principal e arquivos mensais"""
+from datetime import datetime
+import gzip
+import sqlite3
+
+from src.database import connection
+from src.models.arquivo_repository import ArquivoRepository
+from src.services.backup_service import BackupService
+
+
+def _vendas_no_backup(caminho, tmp_path) -> int:
+    descompactado = tmp_path / 'conferencia.db'
+    with gzip.open(caminho, 'rb') as origem:
+        descompactado.write_bytes(origem.read())
+    conexao = sqlite3.connect(str(descompactado))
+    try:
+        return conexao.execute("SELECT COUNT(*) FROM vendas").fetchone()[0]
+    finally:
+        conexao.close()
+
+
+def test_backup_inclui_arquivos_mensais_alterados(criar_venda, tmp_path):
+    criar_venda(1, datetime(2024, 1, 10, 15, 0))
+    criar_venda(2, datetime(2024, 1, 31, 23, 59), datetime(2024, 2, 1, 0, 1))
+    criar_venda(3, datetime(2024, 3, 5, 9, 0))
+    ArquivoRepository.arquivar_mes(2024, 1)
+
+    servico = BackupService(destino=tmp_path / 'backups', banco=connection.DB_PATH)
+
+    primeiro = servico.executar_backup()
+    assert [p.rsplit('/', 1)[-1] for p in primeiro['arquivos_mensais']] == ['loja_2024_01.db.gz']
+    assert _vendas_no_backup(primeiro['arquivos_mensais'][0], tmp_path) == 1
+
+    # Sem mudança no arquivo do mês, nada é copiado de novo
+    assert servico.executar_backup()['arquivos_mensais'] == []
+
+    # A venda da virada do mês entra no arquivo de janeiro depois de fevereiro
+    ArquivoRepository.arquivar_mes(2024, 2)
+    ArquivoRepository.arquivar_mes(2024, 1)
+    terceiro = servico.executar_backup()
+    assert sorted(p.rsplit('/', 1)[-1] for p in terceiro['arquivos_mensais']) == [
+        'loja_2024_01.db.gz', 'loja_2024_02.db.gz'
+    ]
+    assert _vendas_no_backup(tmp_path / 'backups' / 'arquivo' / 'loja_2024_01.db.gz',
+                             tmp_path) == 2
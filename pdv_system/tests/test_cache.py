@@ -0,0 +1,86 @@
+"""Cache de consultas: invalidação, transações, LRU e resultados copiados"""
+import sqlite3
+
+import pytest
+
+from src.database import connection
+from src.database.cache import CacheConsultas, cache_consultas
+from src.models.produto_repository import ProdutoRepository
+from src.services.produto_service import ProdutoService
+
+
+@pytest.fixture
+def servico(produtos):
+    produtos(3, estoque=10)
+    cache_consultas.zerar_metricas()
+    return ProdutoService()
+
+
+def test_leitura_repetida_vem_do_cache(servico):
+    servico.obter_produto_por_codigo('P000')
+    servico.obter_produto_por_codigo('P000')
+
+    metricas = cache_consultas.metricas()
+    assert (metricas['falhas'], metricas['acertos']) == (1, 1)
+
+
+def test_escrita_na_mesma_conexao_invalida(servico):
+    produto = servico.obter_produto_por_codigo('P000')
+    ProdutoRepository.ajustar_estoque(produto['id'], -3)
+
+    assert servico.obter_produto_por_codigo('P000')['estoque'] == 7
+    assert cache_consultas.metricas()['invalidadas'] == 1
+
+
+def test_commit_de_outra_conexao_invalida(servico):
+    assert servico.obter_produto_por_codigo('P000')['estoque'] == 10
+
+    outra = sqlite3.connect(str(connection.DB_PATH))
+    with outra:
+        outra.execute("UPDATE produtos SET estoque = 4 WHERE codigo = 'P000'")
+    outra.close()
+
+    assert servico.obter_produto_por_codigo('P000')['estoque'] == 4
+
+
+def test_dentro_de_transacao_o_cache_e_ignorado(servico):
+    servico.obter_produto_por_codigo('P000')
+
+    with connection.get_db().atomic() as transacao:
+        connection.get_db().execute_sql("UPDATE produtos SET estoque = 1 WHERE codigo = 'P000'")
+        assert servico.obter_produto_por_codigo('P000')['estoque'] == 1
+        transacao.rollback()
+
+    assert cache_consultas.metricas()['ignoradas'] == 1
+    assert servico.obter_produto_por_codigo('P000')['estoque'] == 10
+
+
+def test_descarta_a_entrada_menos_usada(banco):
+    cache = CacheConsultas(capacidade=2)
+    chamadas = []
+
+    def consulta(chave):
+        return cache.obter(chave, ['produtos'], lambda: chamadas.append(chave) or chave)
+
+    consulta('a')
+    consulta('b')
+    consulta('a')       # 'a' passa a ser a mais recente
+    consulta('c')       # descarta 'b'
+    consulta('a')
+    consulta('b')
+
+    assert chamadas == ['a', 'b', 'c', 'b']
+    assert cache.metricas()['descartadas'] == 2
+
+
+def test_alterar_o_resultado_nao_afeta_o_cache(servico):
+    produto = servico.obter_produto_por_codigo('P000')
+    produto['estoque'] = 999
+    pagina = servico.listar_produtos_paginado(limite=2)
+    pagina['itens'].clear()
+    pagina['tem_mais'] = False
+
+    assert servico.obter_produto_por_codigo('P000')['estoque'] == 10
+    pagina = servico.listar_produtos_paginado(limite=2)
+    assert len(pagina['itens']) == 2 and pagina['tem_mais'] is True
+    assert cache_consultas.metricas()['acertos'] == 2
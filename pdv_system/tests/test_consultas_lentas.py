@@ -0,0 +1,72 @@
+"""Log de consultas lentas: só o que passa do limite, com SQL, duração e plano"""
+import time
+
+import pytest
+
+from src.database import connection, consultas_lentas
+from src.database.connection import BancoObservado
+
+LIMITE_MS = 20
+
+
+@pytest.fixture
+def log_lento(produtos, tmp_path):
+    """Log instalado e ``dormir(ms)`` no SQL para forçar a duração"""
+    produtos(3)
+    connection.get_db().connection().create_function(
+        'dormir', 1, lambda ms: time.sleep(ms / 1000) or ms
+    )
+    log = consultas_lentas.instalar(LIMITE_MS, tmp_path / 'consultas_lentas.jsonl')
+    yield log
+    consultas_lentas.desinstalar()
+
+
+def _entradas(log):
+    return consultas_lentas.ler_log(log.arquivo)
+
+
+def test_consulta_acima_do_limite_e_registrada(log_lento):
+    sql = 'SELECT "codigo", dormir(?) FROM "produtos" WHERE "nome" LIKE ?'
+    linhas = connection.get_db().execute_sql(sql, (LIMITE_MS, '%Produto%')).fetchall()
+
+    assert len(linhas) == 3
+    [entrada] = _entradas(log_lento)
+    assert entrada['sql'] == sql
+    # Três linhas de LIMITE_MS cada: a leitura das linhas entra na duração
+    assert entrada['ms'] >= 3 * LIMITE_MS
+    assert entrada['linhas'] == 3
+    assert entrada['parametros'] == [LIMITE_MS, '%<texto 7>%']
+    assert entrada['varreduras'] == ['produtos']
+    assert any(detalhe.startswith('SCAN') for detalhe in entrada['plano'])
+
+
+def test_escrita_lenta_registra_as_linhas_alteradas(log_lento):
+    connection.get_db().execute_sql(
+        'UPDATE "produtos" SET "estoque" = "estoque" + dormir(?) - ? WHERE "codigo" = ?',
+        (LIMITE_MS, LIMITE_MS, 'P001')
+    )
+
+    [entrada] = _entradas(log_lento)
+    assert entrada['sql'].startswith('UPDATE')
+    assert entrada['ms'] >= LIMITE_MS and entrada['linhas'] == 1
+    assert entrada['parametros'] == [LIMITE_MS, LIMITE_MS, '<texto 4>']
+
+
+def test_consultas_rapidas_nao_sao_registradas(log_lento):
+    db = connection.get_db()
+    db.execute_sql('SELECT dormir(0), "codigo" FROM "produtos"').fetchall()
+    db.execute_sql('UPDATE "produtos" SET "estoque" = "estoque" WHERE "id" = ?', (1,))
+    cursor = db.execute_sql('SELECT "codigo" FROM "produtos" WHERE "id" = ?', (1,))
+    cursor.fetchone()
+    cursor.close()
+
+    assert _entradas(log_lento) == []
+
+
+def test_desinstalar_remove_o_observador(log_lento):
+    consultas_lentas.desinstalar()
+
+    connection.get_db().execute_sql('SELECT dormir(?)', (LIMITE_MS,)).fetchall()
+
+    assert log_lento.observar not in BancoObservado.observadores
+    assert _entradas(log_lento) == []
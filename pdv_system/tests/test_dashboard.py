@@ -0,0 +1,79 @@
+"""Dashboard: totais por eventos, reconciliação e vendas do diário"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from src.database import diario
+from src.services.diario_service import AplicadorDiario
+from src.services.financeiro_service import FinanceiroService
+from src.services.venda_service import VendaService
+from src.utils import dashboard
+from src.utils.dashboard import PainelDia
+from src.utils.eventos import barramento
+
+
+@pytest.fixture
+def painel(banco):
+    painel = PainelDia()
+    painel.conectar()
+    yield painel
+    painel.desconectar()
+
+
+def _vender(quantidade: int = 2) -> dict:
+    vendas = VendaService()
+    venda = vendas.iniciar_venda('Dinheiro')
+    vendas.adicionar_item_carrinho(venda['id'], 'P000', quantidade)
+    return vendas.finalizar_venda(venda['id'], 100)
+
+
+def test_evento_durante_a_consulta_nao_se_perde(painel, monkeypatch):
+    assert painel.resumo()['total_despesas'] == Decimal('0')
+    consulta = dashboard.get_resumo_dia
+    consultas = []
+
+    def consulta_com_despesa(data):
+        resumo = consulta(data)
+        consultas.append(resumo)
+        if len(consultas) == 1:
+            # Despesa gravada e avisada depois de a consulta ler o banco
+            FinanceiroService().registrar_despesa("Frete", 15)
+        return resumo
+    monkeypatch.setattr(dashboard, 'get_resumo_dia', consulta_com_despesa)
+
+    assert painel.reconciliar() is False
+    assert len(consultas) == 2
+    assert painel.resumo()['total_despesas'] == Decimal('15.00')
+    assert painel.divergencias == 0
+
+
+def test_reconciliacao_sempre_atrasada_e_descartada(painel, monkeypatch):
+    painel.resumo()
+    consulta = dashboard.get_resumo_dia
+
+    def consulta_com_evento(data):
+        resumo = consulta(data)
+        barramento.publicar('venda.finalizada', valor=Decimal('5.00'), data_hora=datetime.now())
+        return resumo
+    monkeypatch.setattr(dashboard, 'get_resumo_dia', consulta_com_evento)
+
+    assert painel.reconciliar() is False
+    assert painel.resumo()['total_vendas'] == Decimal('5.00') * PainelDia.TENTATIVAS
+
+
+def test_venda_do_diario_entra_no_painel_ao_ser_aplicada(painel, produtos, monkeypatch):
+    produtos(1)
+    monkeypatch.setattr(diario, '_ativo', True)
+    painel.resumo()
+
+    _vender()
+    assert painel.resumo()['total_vendas'] == Decimal('0')
+    # Reconciliar antes do aplicador não cria divergência
+    assert painel.reconciliar() is False
+
+    AplicadorDiario(diario.diario_vendas()).aplicar_pendentes()
+    diario.diario_vendas().fechar()
+    assert painel.resumo()['total_vendas'] == Decimal('20.00')
+    assert painel.reconciliar() is False
+    assert painel.divergencias == 0
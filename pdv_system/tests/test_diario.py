@@ -0,0 +1,153 @@
+"""Diário de vendas: cancelamento, queda antes de aplicar e reaplicação"""
+from decimal import Decimal
+
+import pytest
+
+from src.database import diario
+from src.database.models import PosicaoDiario, Produto, Transacao, Venda
+from src.models.venda_repository import VendaRepository
+from src.services.diario_service import AplicadorDiario
+
+
+@pytest.fixture
+def modo_diario(banco, produtos, monkeypatch):
+    monkeypatch.setattr(diario, '_ativo', True)
+    produtos(2, estoque=10)
+    yield diario.diario_vendas()
+    diario.diario_vendas().fechar()
+
+
+def _vender(codigo: str = 'P000', quantidade: int = 2) -> Venda:
+    venda = VendaRepository.criar_venda('Dinheiro')
+    produto = Produto.get(Produto.codigo == codigo)
+    VendaRepository.adicionar_item(venda.id, produto.id, quantidade)
+    return VendaRepository.finalizar_venda(venda.id, Decimal('100.00'))
+
+
+def test_venda_no_diario_nao_pode_ser_cancelada(modo_diario):
+    venda = _vender()
+    assert Venda.get_by_id(venda.id).processada == 0
+
+    with pytest.raises(ValueError):
+        VendaRepository.cancelar_venda(venda.id)
+
+    AplicadorDiario(modo_diario).aplicar_pendentes()
+    assert Venda.get_by_id(venda.id).processada == 1
+    assert Produto.get(Produto.codigo == 'P000').estoque == 8
+
+
+def test_queda_antes_de_aplicar_reaplica_na_inicializacao(modo_diario):
+    vendas = [_vender('P000'), _vender('P001', 3)]
+    # Registro pela metade no fim do arquivo (queda durante a gravação)
+    with open(modo_diario.caminho, 'ab') as arquivo:
+        arquivo.write(b'\x40\x00\x00\x00\x01\x02')
+    modo_diario.fechar()
+
+    resultado = AplicadorDiario(diario.Diario(modo_diario.caminho)).recuperar()
+
+    assert resultado == {'aplicados': 2, 'ignorados': 0, 'posicao': 0}
+    assert all(Venda.get_by_id(v.id).processada == 1 for v in vendas)
+    assert modo_diario.tamanho() == 0
+    assert PosicaoDiario.get(PosicaoDiario.nome == 'vendas').posicao == 0
+
+
+def test_queda_entre_zerar_posicao_e_truncar_reaplica_sem_duplicar(modo_diario, monkeypatch):
+    venda = _vender()
+    aplicador = AplicadorDiario(modo_diario)
+
+    # A "queda" acontece depois de a posição 0 ir para o disco e antes do truncamento
+    zerar_posicao = aplicador._zerar_posicao
+
+    def cair():
+        zerar_posicao()
+        raise SystemExit
+    monkeypatch.setattr(aplicador, '_zerar_posicao', cair)
+    with pytest.raises(SystemExit):
+        aplicador.aplicar_pendentes()
+    assert modo_diario.tamanho() > 0
+
+    resultado = AplicadorDiario(diario.Diario(modo_diario.caminho)).recuperar()
+
+    assert resultado == {'aplicados': 0, 'ignorados': 1, 'posicao': 0}
+    assert modo_diario.tamanho() == 0
+    assert Transacao.select().where(Transacao.venda == venda.id).count() == 1
+    assert Produto.get(Produto.codigo == 'P000').estoque == 8
+
+
+def test_registro_com_erro_nao_e_pulado(modo_diario, monkeypatch):
+    vendas = [_vender('P000'), _vender('P001', 3), _vender('P000', 1)]
+    aplicar_finalizacao = VendaRepository.aplicar_finalizacao
+
+    def falhar_na_segunda(venda, *args, **kwargs):
+        if venda.id == vendas[1].id:
+            raise RuntimeError("disco cheio")
+        return aplicar_finalizacao(venda, *args, **kwargs)
+
+    monkeypatch.setattr(VendaRepository, 'aplicar_finalizacao', staticmethod(falhar_na_segunda))
+    aplicador = AplicadorDiario(modo_diario)
+    resultado = aplicador.aplicar_pendentes()
+
+    assert resultado['aplicados'] == 1
+    assert [Venda.get_by_id(v.id).processada for v in vendas] == [1, 0, 0]
+    assert 0 < aplicador.posicao() < modo_diario.tamanho()
+
+    monkeypatch.setattr(VendaRepository, 'aplicar_finalizacao', staticmethod(aplicar_finalizacao))
+    resultado = aplicador.aplicar_pendentes()
+
+    assert resultado == {'aplicados': 2, 'ignorados': 0, 'posicao': 0}
+    assert [Venda.get_by_id(v.id).processada for v in vendas] == [1, 1, 1]
+    assert modo_diario.tamanho() == 0
+    assert Produto.get(Produto.codigo == 'P000').estoque == 7
+    assert Produto.get(Produto.codigo == 'P001').estoque == 7
+
+
+def test_venda_no_diario_nao_e_finalizada_de_novo(modo_diario):
+    venda = _vender()
+
+    with pytest.raises(ValueError, match="já foi finalizada"):
+        VendaRepository.finalizar_venda(venda.id, Decimal('100.00'))
+
+    AplicadorDiario(modo_diario).aplicar_pendentes()
+    assert Produto.get(Produto.codigo == 'P000').estoque == 8
+    assert Transacao.select().where(Transacao.venda == venda.id).count() == 1
+
+
+def test_carrinho_no_diario_grava_os_itens_antes_do_registro(modo_diario, monkeypatch):
+    import sqlite3
+    from src.database import connection
+    from src.services.venda_service import VendaService
+
+    anexar = modo_diario.anexar
+    vistos = []
+
+    def anexar_conferindo(dados):
+        # Outra conexão já enxerga os itens: estão confirmados, fora de transação
+        with sqlite3.connect(str(connection.DB_PATH)) as outra:
+            vistos.append((connection.get_db().in_transaction(), outra.execute(
+                "SELECT count(*) FROM itens_venda WHERE venda_id = ?", (dados['venda'],)
+            ).fetchone()[0]))
+        return anexar(dados)
+
+    monkeypatch.setattr(modo_diario, 'anexar', anexar_conferindo)
+    servico = VendaService()
+    venda = servico.iniciar_venda('Dinheiro')
+
+    servico.finalizar_carrinho(venda['id'], [('P000', 2), ('P001', 1)], 0, 50)
+
+    assert vistos == [(False, 2)]
+    AplicadorDiario(modo_diario).aplicar_pendentes()
+    assert Venda.get_by_id(venda['id']).processada == 1
+
+
+def test_carrinho_no_diario_com_valor_insuficiente_nao_grava_nada(modo_diario):
+    from src.database.models import ItemVenda
+    from src.services.venda_service import VendaService
+
+    servico = VendaService()
+    venda = servico.iniciar_venda('Dinheiro')
+
+    with pytest.raises(ValueError, match="insuficiente"):
+        servico.finalizar_carrinho(venda['id'], [('P000', 2)], 0, 5)
+
+    assert ItemVenda.select().where(ItemVenda.venda == venda['id']).count() == 0
+    assert modo_diario.tamanho() == 0
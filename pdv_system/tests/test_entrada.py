@@ -0,0 +1,36 @@
+"""Entrada de mercadorias: custo inválido aponta o item/linha"""
+from decimal import Decimal
+
+import pytest
+
+from src.database.models import Produto
+from src.services.entrada_service import EntradaMercadoriaService
+
+
+@pytest.mark.parametrize('custo', [Decimal('NaN'), Decimal('Infinity'), float('nan'), 'nan', '-1'])
+def test_custo_nao_finito_ou_negativo_aponta_o_item(produtos, custo):
+    produtos(2, estoque=5)
+    itens = [{'codigo': 'P000', 'quantidade': 3, 'preco_custo': Decimal('6.50')},
+             {'codigo': 'P001', 'quantidade': 2, 'preco_custo': custo}]
+
+    with pytest.raises(ValueError, match=r"Item 2: Preço de custo inválido"):
+        EntradaMercadoriaService().registrar_entrada('NF-1', itens)
+    assert {p.estoque for p in Produto.select()} == {5}
+
+
+def test_custo_nao_finito_no_arquivo_aponta_a_linha(produtos, tmp_path):
+    produtos(2, estoque=5)
+    arquivo = tmp_path / 'entrega.csv'
+    arquivo.write_text("codigo;quantidade;preco_custo\nP000;3;6,50\nP001;2;NaN\n",
+                       encoding='utf-8')
+
+    with pytest.raises(ValueError, match=r"linha 3: Preço de custo inválido"):
+        EntradaMercadoriaService().importar_arquivo(str(arquivo))
+
+
+def test_custo_decimal_valido(produtos):
+    produtos(1, estoque=5)
+    EntradaMercadoriaService().registrar_entrada(
+        'NF-2', [{'codigo': 'P000', 'quantidade': 3, 'preco_custo': Decimal('6.5')}])
+    produto = Produto.get(Produto.codigo == 'P000')
+    assert (produto.estoque, produto.preco_custo) == (8, Decimal('6.50'))
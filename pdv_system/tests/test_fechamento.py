@@ -0,0 +1,102 @@
+"""Fechamento do período: mesmos totais do fechamento dia a dia"""
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from src.database.models import FechamentoDia, Transacao, Venda
+from src.models.financeiro_repository import FechamentoDiaRepository
+from src.services.financeiro_service import FinanceiroService
+
+INICIO, FIM = date(2026, 3, 14), date(2026, 3, 19)
+CAMPOS = ['data', 'total_vendas', 'total_despesas', 'total_entradas', 'saldo',
+          'quantidade_transacoes']
+
+
+@pytest.fixture
+def movimento(criar_venda):
+    """
+    14: duas vendas (uma com desconto, uma no último instante do dia) e uma despesa
+    15: sem movimento          16: só uma despesa          17: já fechado
+    18: só venda não finalizada 19: venda à meia-noite
+    """
+    venda = criar_venda(1, datetime(2026, 3, 14, 9, 0))
+    venda.desconto = Decimal('1.50')
+    venda.save()
+    criar_venda(2, datetime(2026, 3, 14, 23, 59, 59, 999999))
+    Transacao.create(tipo='SAIDA', categoria='FORNECEDOR', descricao="Gás",
+                     valor=Decimal('110.00'), data_transacao=datetime(2026, 3, 14, 15, 0))
+    Transacao.create(tipo='SAIDA', categoria='OUTROS', descricao="Limpeza",
+                     valor=Decimal('7.35'), data_transacao=datetime(2026, 3, 16, 8, 0))
+    criar_venda(3, datetime(2026, 3, 17, 12, 0))
+    FechamentoDiaRepository.criar_fechamento(date(2026, 3, 17))
+    Venda.create(numero=4, data_hora=datetime(2026, 3, 18, 10, 0), total=Decimal('5.00'),
+                 forma_pagamento='Dinheiro', processada=0)
+    criar_venda(5, datetime(2026, 3, 19, 0, 0))
+    # Fora do período
+    criar_venda(6, datetime(2026, 3, 13, 23, 59, 59))
+    criar_venda(7, datetime(2026, 3, 20, 0, 0))
+
+
+def _fechamentos(dias):
+    return [
+        {campo: getattr(f, campo) for campo in CAMPOS}
+        for f in (FechamentoDia.select()
+                  .where(FechamentoDia.data.in_(
+                      [datetime.combine(dia, datetime.min.time()) for dia in dias]))
+                  .order_by(FechamentoDia.data))
+    ]
+
+
+def test_periodo_igual_ao_fechamento_de_cada_dia(movimento):
+    resultado = FechamentoDiaRepository.criar_fechamentos_periodo(INICIO, FIM)
+
+    criados = [date(2026, 3, 14), date(2026, 3, 16), date(2026, 3, 19)]
+    assert resultado == {'criados': criados, 'ja_fechados': [date(2026, 3, 17)],
+                         'sem_movimento': 2}
+    em_lote = _fechamentos(criados)
+    assert em_lote[0]['total_vendas'] == Decimal('38.50')
+    assert em_lote[0]['saldo'] == Decimal('-70.00')
+
+    FechamentoDia.delete().where(FechamentoDia.data.in_(
+        [datetime.combine(dia, datetime.min.time()) for dia in criados])).execute()
+    for dia in criados:
+        FechamentoDiaRepository.criar_fechamento(dia)
+
+    assert em_lote == _fechamentos(criados)
+
+
+def test_dia_ja_fechado_fica_como_esta(movimento):
+    antes = _fechamentos([date(2026, 3, 17)])
+    Transacao.create(tipo='ENTRADA', categoria='OUTROS', descricao="Lançamento tardio",
+                     valor=Decimal('3.00'), data_transacao=datetime(2026, 3, 17, 20, 0))
+
+    FechamentoDiaRepository.criar_fechamentos_periodo(INICIO, FIM)
+
+    assert _fechamentos([date(2026, 3, 17)]) == antes
+    assert FechamentoDia.select().count() == 4
+
+
+def test_periodo_sem_movimento(banco):
+    resultado = FechamentoDiaRepository.criar_fechamentos_periodo(INICIO, FIM)
+
+    assert resultado == {'criados': [], 'ja_fechados': [], 'sem_movimento': 6}
+    assert FechamentoDia.select().count() == 0
+
+
+def test_servico(movimento):
+    servico = FinanceiroService()
+
+    assert servico.criar_fechamentos_periodo(INICIO, FIM) == {
+        'criados': ['2026-03-14', '2026-03-16', '2026-03-19'],
+        'ja_fechados': ['2026-03-17'],
+        'sem_movimento': 2,
+    }
+    # De novo: nada a criar
+    assert servico.criar_fechamentos_periodo(INICIO, FIM) == {
+        'criados': [],
+        'ja_fechados': ['2026-03-14', '2026-03-16', '2026-03-17', '2026-03-19'],
+        'sem_movimento': 2,
+    }
+    with pytest.raises(ValueError, match="Erro ao criar fechamentos"):
+        servico.criar_fechamentos_periodo(FIM, INICIO)
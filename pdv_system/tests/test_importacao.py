@@ -0,0 +1,94 @@
+"""Importação de catálogo: linhas inválidas são rejeitadas uma a uma"""
+from decimal import Decimal
+
+import pytest
+
+from src.services.importacao_service import ImportacaoService
+
+
+@pytest.mark.parametrize('texto', ['nan', 'NaN', 'inf', '-Infinity', 'snan', '1e400'])
+def test_converter_decimal_recusa_nao_finitos(texto):
+    assert ImportacaoService._converter_decimal(texto) is None
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('1.234,56', Decimal('1234.56')),
+    ('R$ 10,5', Decimal('10.50')),
+    ('7', Decimal('7.00')),
+])
+def test_converter_decimal(texto, esperado):
+    assert ImportacaoService._converter_decimal(texto) == esperado
+
+
+def test_preco_nao_finito_rejeita_so_a_linha(banco, tmp_path):
+    arquivo = tmp_path / 'catalogo.csv'
+    arquivo.write_text(
+        "codigo;nome;preco_venda;preco_custo\n"
+        "A001;Arroz 5kg;25,90;18\n"
+        "A002;Feijão 1kg;nan;5\n"
+        "A003;Açúcar 1kg;6,50;inf\n"
+        "A004;Café 500g;18,00;12\n",
+        encoding='utf-8',
+    )
+
+    relatorio = ImportacaoService().importar_arquivo(str(arquivo))
+
+    assert relatorio['novos'] == 2
+    assert [(r['linha'], r['codigo'], r['motivo']) for r in relatorio['rejeitados']] == [
+        (3, 'A002', "Preço de venda inválido"),
+        (4, 'A003', "Preço de custo inválido"),
+    ]
+
+
+def test_linhas_em_branco_nao_deslocam_a_numeracao_ao_retomar(banco, tmp_path, monkeypatch):
+    from peewee import OperationalError
+    from src.models.produto_repository import ProdutoRepository
+
+    arquivo = tmp_path / 'catalogo.csv'
+    arquivo.write_text(
+        "codigo;nome;preco_venda;preco_custo\n"
+        "A001;Arroz 5kg;25,90;18\n"
+        "\n"
+        "A002;Feijão 1kg;8,50;5\n"
+        ";;;\n"
+        "A003;Açúcar 1kg;nan;4\n"
+        "A004;Café 500g;18,00;12\n"
+        "\n"
+        "A005;Sal 1kg;3,00;inf\n"
+        "A006;Óleo 900ml;9,00;6\n",
+        encoding='utf-8',
+    )
+    upsert_lote = ProdutoRepository.upsert_lote
+
+    def cair_no_segundo_lote(linhas, *args, **kwargs):
+        if any(l['codigo'] == 'A004' for l in linhas):
+            raise OperationalError("disk I/O error")
+        return upsert_lote(linhas, *args, **kwargs)
+
+    monkeypatch.setattr(ProdutoRepository, 'upsert_lote', staticmethod(cair_no_segundo_lote))
+    with pytest.raises(ValueError, match=r"linha 6\)"):
+        ImportacaoService().importar_arquivo(str(arquivo), tamanho_lote=2)
+
+    monkeypatch.setattr(ProdutoRepository, 'upsert_lote', staticmethod(upsert_lote))
+    relatorio = ImportacaoService().importar_arquivo(str(arquivo), tamanho_lote=2, retomar=True)
+
+    assert relatorio['retomado_da_linha'] == 6
+    assert relatorio['novos'] == 4
+    assert [(r['linha'], r['codigo']) for r in relatorio['rejeitados']] == [
+        (6, 'A003'), (9, 'A005'),
+    ]
+
+
+def test_reimportar_reativa_produto_desativado(banco, tmp_path):
+    from src.database.models import Produto
+
+    Produto.create(nome="Arroz 5kg", codigo="A001", preco_venda=Decimal('20.00'),
+                   estoque=5, ativo=0)
+    arquivo = tmp_path / 'catalogo.csv'
+    arquivo.write_text("codigo;nome;preco_venda\nA001;Arroz 5kg;25,90\n", encoding='utf-8')
+
+    relatorio = ImportacaoService().importar_arquivo(str(arquivo))
+
+    assert relatorio['atualizados'] == 1
+    produto = Produto.get(Produto.codigo == 'A001')
+    assert (produto.ativo, produto.preco_venda) == (1, Decimal('25.90'))
@@ -0,0 +1,61 @@
+"""Modelos de leitura: mesmas chaves e valores dos dicionários dos serviços"""
+from datetime import date, datetime
+from decimal import Decimal
+import json
+
+from src.database.models import Produto, Transacao, Venda
+from src.services.financeiro_service import FinanceiroService
+from src.services.produto_service import ProdutoService
+from src.services.venda_service import VendaService
+
+DIA = date(2026, 3, 14)
+
+
+def _conferir(leituras, modelos, serializar):
+    esperados = [serializar(m) for m in modelos]
+    assert [dict(leitura) for leitura in leituras] == esperados
+    assert [leitura.como_dict() for leitura in leituras] == esperados
+    for leitura, esperado in zip(leituras, esperados):
+        assert list(leitura.keys()) == list(esperado)
+        assert all(leitura[chave] == valor and leitura.get(chave) == valor
+                   for chave, valor in esperado.items())
+        assert json.dumps(leitura.como_dict()) == json.dumps(esperado)
+
+
+def test_produto(banco):
+    Produto.create(nome="Arroz 5kg", codigo="A001", preco_venda=Decimal('25.90'),
+                   preco_custo=Decimal('18.35'), estoque=4, descricao="Tipo 1",
+                   criado_em=datetime(2026, 3, 14, 9, 30, 0, 123456))
+    Produto.create(nome="Brinde", codigo="B001", preco_venda=Decimal('0.01'),
+                   preco_custo=Decimal('0.00'), estoque=0,
+                   criado_em=datetime(2026, 3, 14, 9, 30))
+
+    modelos = list(Produto.select().order_by(Produto.nome))
+    _conferir(ProdutoService().listar_produtos(), modelos, ProdutoService._serializar_produto)
+
+
+def test_venda(banco):
+    Venda.create(numero=1, data_hora=datetime(2026, 3, 14, 10, 5, 7, 250000),
+                 total=Decimal('30.10'), desconto=Decimal('0.20'), valor_pago=Decimal('50.00'),
+                 troco=Decimal('20.10'), forma_pagamento='Dinheiro', processada=1,
+                 observacoes="Cliente fiel")
+    Venda.create(numero=2, data_hora=datetime(2026, 3, 14, 18, 0),
+                 total=Decimal('12.00'), forma_pagamento='PIX', processada=1)
+
+    modelos = list(Venda.select().order_by(Venda.data_hora.desc()))
+    _conferir(VendaService().listar_vendas_dia(DIA), modelos, VendaService._serializar_venda)
+
+
+def test_transacao(banco):
+    Transacao.create(tipo='ENTRADA', categoria='VENDA', descricao="Venda #1",
+                     valor=Decimal('29.90'), data_transacao=datetime(2026, 3, 14, 10, 5, 7, 1))
+    Transacao.create(tipo='SAIDA', categoria='FORNECEDOR', descricao="Gás",
+                     valor=Decimal('110.00'), data_transacao=datetime(2026, 3, 14, 15, 0),
+                     observacoes="Nota 123")
+
+    servico = FinanceiroService()
+    modelos = list(Transacao.select().order_by(Transacao.data_transacao.desc()))
+    _conferir(servico.listar_transacoes_dia(DIA), modelos,
+              FinanceiroService._serializar_transacao)
+    _conferir(servico.listar_transacoes_periodo(DIA, DIA), modelos,
+              FinanceiroService._serializar_transacao)
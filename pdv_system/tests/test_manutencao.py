@@ -0,0 +1,107 @@
+"""Manutenção do banco: ciclo completo, fatias interrompidas e banco ocupado"""
+from datetime import datetime, timedelta
+import sqlite3
+
+import pytest
+
+from src.database import connection
+from src.database.models import ConsumidorOutbox, EventoOutbox, ReservaEstoque, Venda
+from src.services.manutencao_service import ManutencaoService
+
+TAREFAS = [nome for nome, _ in ManutencaoService.TAREFAS]
+
+
+@pytest.fixture
+def servico(banco):
+    servico = ManutencaoService(banco=connection.DB_PATH, fatia_segundos=5)
+    yield servico
+    servico.fechar()
+
+
+def test_ciclo_completo(servico, produtos):
+    produtos(1)
+    venda = Venda.create(numero=1, forma_pagamento='Dinheiro')
+    antigo = datetime.now() - timedelta(days=30)
+    EventoOutbox.insert_many(
+        [{'tipo': 'teste', 'dados': '{}', 'criado_em': antigo} for _ in range(5)]
+        + [{'tipo': 'teste', 'dados': '{}'}]
+    ).execute()
+    ConsumidorOutbox.create(nome='integracao', posicao=3)
+    ReservaEstoque.create(venda=venda, produto=1, quantidade=1,
+                          expira_em=datetime.now() - timedelta(minutes=1))
+    connection.get_db().close()
+
+    executadas = servico.executar_ciclo()
+
+    assert set(executadas) == set(TAREFAS)
+    assert not any(str(detalhe).startswith('erro') for detalhe in executadas.values())
+    assert servico.pendentes() == []
+    # Só os eventos antigos já confirmados pelo consumidor saem
+    assert [e.id for e in EventoOutbox.select().order_by(EventoOutbox.id)] == [4, 5, 6]
+    assert ReservaEstoque.select().count() == 0
+    assert servico.conexao().execute(
+        "SELECT count(*) FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchone()[0] == 1
+
+    estatisticas = servico.estatisticas()
+    assert set(estatisticas['tarefas']) == set(TAREFAS)
+    assert estatisticas['tarefas']['checkpoint']['resultado'].endswith("WAL truncado")
+
+
+def test_vacuo_incremental_devolve_paginas_livres(servico):
+    db = connection.get_db()
+    db.execute_sql("CREATE TABLE lixo (texto TEXT)")
+    db.execute_sql("INSERT INTO lixo SELECT hex(randomblob(500)) "
+                   "FROM (WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 "
+                   "FROM n WHERE i < 2000) SELECT i FROM n)")
+    db.close()
+    servico.ativar_vacuo_incremental()
+    servico.conexao().execute("DROP TABLE lixo")
+    assert servico.conexao().execute("PRAGMA freelist_count").fetchone()[0] > 0
+
+    concluida, detalhe = servico._tarefa_vacuo(float('inf'))
+
+    assert concluida and detalhe.endswith("devolvidas ao sistema")
+    assert servico.conexao().execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+
+def test_caixa_ocupado_nao_executa_e_analise_continua_no_proximo_ciclo(servico):
+    assert servico.executar_ciclo(lambda: False) == {}
+    assert servico.pendentes() == TAREFAS
+
+    # Fatia zerada: ANALYZE faz uma tabela por chamada e fica pendente
+    servico.fatia = 0
+    servico.ultimas = {nome: {'concluida_em': float('inf')} for nome in TAREFAS}
+    servico.ultimas['analisar'] = None
+    chamadas = iter([True, True, False])
+
+    executadas = servico.executar_ciclo(lambda: next(chamadas))
+
+    assert 'restante' in executadas['analisar']
+    assert servico.ultimas['analisar'] is None
+    assert servico._tabelas_pendentes
+
+
+def test_banco_ocupado(servico):
+    outra = sqlite3.connect(str(connection.DB_PATH), isolation_level=None)
+    try:
+        # Leitor com snapshot aberto: o checkpoint não consegue truncar o WAL
+        Venda.create(numero=1, forma_pagamento='Dinheiro')
+        outra.execute("BEGIN")
+        outra.execute("SELECT count(*) FROM vendas").fetchone()
+        Venda.create(numero=2, forma_pagamento='Dinheiro')
+        concluida, detalhe = servico._tarefa_checkpoint(float('inf'))
+        assert concluida and "banco ocupado" in detalhe
+        outra.execute("COMMIT")
+
+        # Escritor segurando o lock: a tarefa é registrada com erro e o ciclo segue
+        outra.execute("BEGIN IMMEDIATE")
+        servico.ultimas = {nome: {'concluida_em': float('inf')} for nome in TAREFAS}
+        servico.ultimas['reservas'] = servico.ultimas['otimizar'] = None
+        executadas = servico.executar_ciclo()
+        assert executadas['reservas'].startswith("erro: database is locked")
+        assert executadas['otimizar'] == "ok"
+    finally:
+        if outra.in_transaction:
+            outra.execute("ROLLBACK")
+        outra.close()
@@ -0,0 +1,101 @@
+"""Migrações: banco novo e banco da versão inicial chegam ao mesmo esquema"""
+import sqlite3
+
+from src.database import connection
+from src.database.migrations import MIGRACOES, aplicar_migracoes, versao_atual
+
+# Esquema criado pela versão inicial do sistema (antes das migrações)
+ESQUEMA_INICIAL = """
+CREATE TABLE "fechamento_dia" ("id" INTEGER NOT NULL PRIMARY KEY, "data" DATETIME NOT NULL, "total_vendas" DECIMAL(10, 2) NOT NULL, "total_despesas" DECIMAL(10, 2) NOT NULL, "total_entradas" DECIMAL(10, 2) NOT NULL, "saldo" DECIMAL(10, 2) NOT NULL, "quantidade_transacoes" INTEGER NOT NULL, "observacoes" VARCHAR(500), "criado_em" DATETIME NOT NULL);
+CREATE UNIQUE INDEX "fechamentodia_data" ON "fechamento_dia" ("data");
+CREATE TABLE "vendas" ("id" INTEGER NOT NULL PRIMARY KEY, "numero" INTEGER NOT NULL, "data_hora" DATETIME NOT NULL, "total" DECIMAL(10, 2) NOT NULL, "desconto" DECIMAL(10, 2) NOT NULL, "valor_pago" DECIMAL(10, 2) NOT NULL, "troco" DECIMAL(10, 2) NOT NULL, "forma_pagamento" VARCHAR(50) NOT NULL, "observacoes" VARCHAR(500), "processada" INTEGER NOT NULL);
+CREATE UNIQUE INDEX "venda_numero" ON "vendas" ("numero");
+CREATE INDEX "venda_data_hora" ON "vendas" ("data_hora");
+CREATE TABLE "produtos" ("id" INTEGER NOT NULL PRIMARY KEY, "nome" VARCHAR(200) NOT NULL, "codigo" VARCHAR(50) NOT NULL, "preco_custo" DECIMAL(10, 2) NOT NULL, "preco_venda" DECIMAL(10, 2) NOT NULL, "estoque" INTEGER NOT NULL, "ativo" INTEGER NOT NULL, "descricao" VARCHAR(500), "criado_em" DATETIME NOT NULL, "atualizado_em" DATETIME NOT NULL);
+CREATE UNIQUE INDEX "produto_nome" ON "produtos" ("nome");
+CREATE UNIQUE INDEX "produto_codigo" ON "produtos" ("codigo");
+CREATE INDEX "produto_ativo" ON "produtos" ("ativo");
+CREATE TABLE "itens_venda" ("id" INTEGER NOT NULL PRIMARY KEY, "venda_id" INTEGER NOT NULL, "produto_id" INTEGER NOT NULL, "quantidade" INTEGER NOT NULL, "preco_unitario" DECIMAL(10, 2) NOT NULL, "subtotal" DECIMAL(10, 2) NOT NULL, FOREIGN KEY ("venda_id") REFERENCES "vendas" ("id"), FOREIGN KEY ("produto_id") REFERENCES "produtos" ("id"));
+CREATE INDEX "itemvenda_venda_id" ON "itens_venda" ("venda_id");
+CREATE INDEX "itemvenda_produto_id" ON "itens_venda" ("produto_id");
+CREATE TABLE "transacoes" ("id" INTEGER NOT NULL PRIMARY KEY, "tipo" VARCHAR(10) NOT NULL, "categoria" VARCHAR(20) NOT NULL, "descricao" VARCHAR(300) NOT NULL, "valor" DECIMAL(10, 2) NOT NULL, "data_transacao" DATETIME NOT NULL, "data_criacao" DATETIME NOT NULL, "venda_id" INTEGER, "observacoes" VARCHAR(500), FOREIGN KEY ("venda_id") REFERENCES "vendas" ("id"));
+CREATE INDEX "transacao_data_transacao" ON "transacoes" ("data_transacao");
+CREATE INDEX "transacao_venda_id" ON "transacoes" ("venda_id");
+CREATE INDEX "transacao_tipo" ON "transacoes" ("tipo");
+CREATE INDEX "transacao_categoria" ON "transacoes" ("categoria");
+INSERT INTO "produtos" VALUES (1, 'Arroz 5kg', 'A001', 18, 25.9, 10, 1, NULL,
+                               '2026-01-05 10:00:00', '2026-01-05 10:00:00');
+"""
+
+INDICES_MIGRACOES = {
+    'idx_produtos_ativo_nome', 'idx_vendas_processada_data',
+    'idx_itens_venda_venda_produto', 'idx_transacoes_data_tipo',
+    'idx_sync_mudancas_pendentes', 'idx_outbox_eventos_tipo_chave',
+}
+INDICES_REMOVIDOS = {
+    'produto_ativo', 'venda_data_hora', 'itemvenda_venda_id',
+    'transacao_data_transacao', 'transacao_tipo', 'transacao_categoria',
+}
+TABELAS_CACHE = ('produtos', 'vendas', 'itens_venda', 'transacoes',
+                 'fechamento_dia', 'historico_precos')
+
+
+def _objetos(db, tipo: str) -> set:
+    cursor = db.execute_sql("SELECT name FROM sqlite_master WHERE type = ?", (tipo,))
+    return {nome for (nome,) in cursor}
+
+
+def _conferir_esquema_final(db):
+    assert versao_atual(db) == MIGRACOES[-1][0]
+    indices = _objetos(db, 'index')
+    assert INDICES_MIGRACOES <= indices
+    assert not INDICES_REMOVIDOS & indices
+    assert _objetos(db, 'trigger') == {
+        f"trg_cache_{tabela}_{operacao}"
+        for tabela in TABELAS_CACHE for operacao in ('insert', 'update', 'delete')
+    }
+
+
+def test_banco_novo_chega_na_ultima_versao(banco):
+    _conferir_esquema_final(banco)
+
+
+def test_banco_da_versao_inicial_chega_na_ultima_versao(dados):
+    with sqlite3.connect(dados / 'loja.db') as antigo:
+        antigo.executescript(ESQUEMA_INICIAL)
+    antigo.close()
+
+    assert connection.init_db()
+
+    db = connection.get_db()
+    _conferir_esquema_final(db)
+    assert db.execute_sql('SELECT codigo, estoque FROM produtos').fetchall() == [('A001', 10)]
+
+
+def test_migrar_de_novo_nao_faz_nada(banco):
+    antes = banco.execute_sql('SELECT type, name, sql FROM sqlite_master').fetchall()
+    versoes = banco.execute_sql('SELECT versao FROM schema_versao').fetchall()
+
+    assert aplicar_migracoes(banco) == 0
+    banco.close()
+    assert connection.init_db()
+
+    assert banco.execute_sql('SELECT type, name, sql FROM sqlite_master').fetchall() == antes
+    assert banco.execute_sql('SELECT versao FROM schema_versao').fetchall() == versoes
+
+
+def test_gatilhos_contam_escritas_por_tabela(produtos):
+    from src.database.models import Produto
+
+    def versao(tabela):
+        return connection.get_db().execute_sql(
+            'SELECT versao FROM cache_versoes WHERE tabela = ?', (tabela,)
+        ).fetchone()[0]
+
+    # Os gatilhos são por linha: 2 inserções + 2 atualizações + 1 exclusão
+    inicial = versao('produtos'), versao('vendas')
+    produtos(2)
+    Produto.update(estoque=5).execute()
+    Produto.delete().where(Produto.codigo == 'P000').execute()
+
+    assert (versao('produtos'), versao('vendas')) == (inicial[0] + 5, inicial[1])
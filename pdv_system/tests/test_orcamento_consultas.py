@@ -0,0 +1,65 @@
+"""Orçamento de consultas das chamadas quentes do caixa e dos relatórios"""
+import pytest
+
+from src.database.instrumentacao import OrcamentoConsultasExcedido, orcamento_consultas
+from src.database.models import ItemVenda
+from src.services.entrada_service import EntradaMercadoriaService
+from src.services.financeiro_service import FinanceiroService
+from src.services.produto_service import ProdutoService
+from src.services.relatorio_service import RelatorioService
+from src.services.venda_service import VendaService
+from src.utils.orcamento_consultas import ITENS_POR_VENDA, ORCAMENTOS
+
+
+def orcamento(nome: str):
+    maximo, repeticoes = ORCAMENTOS[nome]
+    return orcamento_consultas(maximo, repeticoes=repeticoes, nome=nome)
+
+
+@pytest.fixture
+def carrinho(produtos):
+    """Venda aberta com ITENS_POR_VENDA - 1 itens"""
+    produtos(100, estoque=1000)
+    vendas = VendaService()
+    venda = vendas.iniciar_venda('DINHEIRO')
+    for i in range(1, ITENS_POR_VENDA):
+        vendas.adicionar_item_carrinho(venda['id'], f"P{i:03d}", 1)
+    return venda['id']
+
+
+def test_leitura_de_produto(produtos):
+    produtos(100)
+    with orcamento('produto.obter_por_codigo'):
+        ProdutoService().obter_produto_por_codigo('P050')
+    with orcamento('produto.buscar'):
+        ProdutoService().buscar_produtos('Produto 01')
+
+
+def test_venda_do_inicio_ao_fim(carrinho):
+    vendas = VendaService()
+    with orcamento('venda.iniciar'):
+        vendas.iniciar_venda('DINHEIRO')
+    with orcamento('venda.adicionar_item'):
+        vendas.adicionar_item_carrinho(carrinho, 'P099', 2)
+    with orcamento('venda.carrinho'):
+        vendas.obter_carrinho(carrinho)
+    with orcamento('venda.finalizar'):
+        vendas.finalizar_venda(carrinho, 1000)
+    with orcamento('financeiro.resumo_dia'):
+        FinanceiroService().obter_resumo_dia()
+    with orcamento('relatorio.dia'):
+        RelatorioService.gerar_relatorio_dia()
+
+
+def test_entrada_de_mercadorias(produtos):
+    produtos(20)
+    with orcamento('entrada.registrar'):
+        EntradaMercadoriaService().registrar_entrada(
+            'NF-ORCAMENTO', [{'codigo': f"P{i:03d}", 'quantidade': 5} for i in range(20)]
+        )
+
+
+def test_n_mais_1_estoura_o_orcamento(carrinho):
+    with pytest.raises(OrcamentoConsultasExcedido, match="formato repetido"):
+        with orcamento('venda.carrinho'):
+            [item.produto.codigo for item in ItemVenda.select().where(ItemVenda.venda == carrinho)]
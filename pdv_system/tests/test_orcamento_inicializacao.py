@@ -0,0 +1,44 @@
+"""
+Orçamento de inicialização: importações sob demanda e tempo de inicializar()
+
+Os limites em milissegundos dependem da máquina e só rodam com
+``PDV_TESTAR_TEMPOS=1`` (ex.: no CI do caixa de referência).
+"""
+import os
+
+import pytest
+
+from src.utils.orcamento_inicializacao import (
+    LIMITE_INICIALIZAR_MS, LIMITE_PADRAO_MS, MODULOS_PROIBIDOS, CAMINHO_INICIALIZACAO,
+    medir_importacao, medir_inicializar, verificar, verificar_inicializar,
+)
+
+tempos = pytest.mark.skipif(os.getenv('PDV_TESTAR_TEMPOS') != '1',
+                            reason="limites de tempo só com PDV_TESTAR_TEMPOS=1")
+
+
+def test_modulos_pesados_nao_carregam_na_inicializacao():
+    carregados = medir_importacao(CAMINHO_INICIALIZACAO)
+    indevidos = [m for m in MODULOS_PROIBIDOS
+                 if any(nome == m or nome.startswith(m + ".") for nome in carregados)]
+    assert not indevidos
+
+
+def test_inicializar_em_processo_novo(tmp_path):
+    # Cria o banco e depois reabre, como na abertura normal do caixa
+    medir_inicializar(tmp_path)
+    medir_inicializar(tmp_path)
+    assert (tmp_path / 'loja.db').exists()
+    assert (tmp_path / 'pdv_system.log').exists()
+
+
+@tempos
+def test_importacao_dentro_do_orcamento():
+    ok, relatorio = verificar(LIMITE_PADRAO_MS)
+    assert ok, "\n".join(relatorio)
+
+
+@tempos
+def test_inicializar_dentro_do_orcamento():
+    ok, relatorio = verificar_inicializar(LIMITE_INICIALIZAR_MS)
+    assert ok, "\n".join(relatorio)
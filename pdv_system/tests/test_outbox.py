@@ -0,0 +1,108 @@
+"""Outbox: evento na transação da venda, entrega, nova tentativa e confirmação"""
+from decimal import Decimal
+
+import pytest
+
+from src.database.models import EventoOutbox, Produto, Venda
+from src.models import venda_repository
+from src.models.outbox_repository import OutboxRepository
+from src.models.venda_repository import VendaRepository
+from src.services.outbox_service import DespachanteOutbox
+
+
+def _carrinho(codigo: str = 'P000', quantidade: int = 2) -> Venda:
+    venda = VendaRepository.criar_venda('Dinheiro')
+    produto = Produto.get(Produto.codigo == codigo)
+    VendaRepository.adicionar_item(venda.id, produto.id, quantidade)
+    return venda
+
+
+def test_evento_entra_com_a_venda(produtos):
+    produtos(1, estoque=10)
+    venda = VendaRepository.finalizar_venda(_carrinho().id, Decimal('50.00'))
+
+    eventos = OutboxRepository.ler_desde(0)
+    assert [e['tipo'] for e in eventos] == ['venda.finalizada', 'transacao.registrada']
+    assert eventos[0]['chave'] == str(venda.numero)
+    assert eventos[0]['dados']['itens'] == [
+        {'codigo': 'P000', 'quantidade': 2, 'preco_unitario': '10.00', 'estoque': 8}
+    ]
+
+
+def test_evento_desfeito_com_a_venda(produtos, monkeypatch):
+    produtos(1, estoque=10)
+    venda = _carrinho()
+    log_venda = venda_repository.log_venda
+
+    def cair_depois_de_publicar(numero, acao, detalhes=""):
+        if acao == "FINALIZADA":
+            raise RuntimeError("queda no fim da finalização")
+        log_venda(numero, acao, detalhes)
+
+    monkeypatch.setattr(venda_repository, 'log_venda', cair_depois_de_publicar)
+    with pytest.raises(RuntimeError):
+        VendaRepository.finalizar_venda(venda.id, Decimal('50.00'))
+
+    assert EventoOutbox.select().where(EventoOutbox.tipo == 'venda.finalizada').count() == 0
+    assert Venda.get_by_id(venda.id).processada == 0
+    assert Produto.get(Produto.codigo == 'P000').estoque == 10
+
+
+def _publicar(quantidade: int):
+    OutboxRepository.publicar_lote(
+        ('teste', str(i), {'i': i}) for i in range(quantidade)
+    )
+
+
+def test_despachante_entrega_em_lotes_e_confirma(banco):
+    _publicar(7)
+    lotes = []
+
+    entregues = DespachanteOutbox('integracao', lotes.append, tamanho_lote=3).despachar()
+
+    assert entregues == 7
+    assert [len(lote) for lote in lotes] == [3, 3, 1]
+    assert OutboxRepository.posicao('integracao') == OutboxRepository.ultimo_offset()
+
+
+def test_despachar_de_novo_nao_repete_eventos(banco):
+    _publicar(3)
+    recebidos = []
+    despachante = DespachanteOutbox('integracao', recebidos.extend)
+
+    assert despachante.despachar() == 3
+    assert despachante.despachar() == 0
+    _publicar(1)
+    assert despachante.despachar() == 1
+    assert [e['offset'] for e in recebidos] == [1, 2, 3, 4]
+
+
+def test_falha_no_tratador_entrega_o_lote_de_novo(banco):
+    _publicar(4)
+    recebidos, falhar = [], [True]
+
+    def tratador(eventos):
+        if eventos[0]['offset'] == 3 and falhar[0]:
+            raise ConnectionError("integração fora do ar")
+        recebidos.extend(eventos)
+
+    despachante = DespachanteOutbox('integracao', tratador, tamanho_lote=2)
+    with pytest.raises(ConnectionError):
+        despachante.despachar()
+    assert OutboxRepository.posicao('integracao') == 2
+
+    falhar[0] = False
+    assert despachante.despachar() == 2
+    assert [e['offset'] for e in recebidos] == [1, 2, 3, 4]
+
+
+def test_confirmar_nao_volta_a_posicao(banco):
+    _publicar(5)
+    OutboxRepository.registrar_consumidor('integracao')
+
+    assert OutboxRepository.confirmar('integracao', 4) == 4
+    assert OutboxRepository.confirmar('integracao', 4) == 4
+    assert OutboxRepository.confirmar('integracao', 2) == 4
+    with pytest.raises(ValueError):
+        OutboxRepository.confirmar('integracao', 6)
+    assert [e['offset'] for e in OutboxRepository.ler('integracao')] == [5]
@@ -0,0 +1,82 @@
+"""Listagem paginada por cursor: avanço, volta, empates, filtros e contagem"""
+from decimal import Decimal
+
+import pytest
+
+from src.database.models import Produto
+from src.models.produto_repository import ProdutoRepository
+from src.services.produto_service import ProdutoService
+
+
+def _percorrer(servico: ProdutoService, **kwargs) -> list:
+    """Códigos de todas as páginas seguintes, a partir da primeira"""
+    codigos, cursor = [], None
+    while True:
+        pagina = servico.listar_produtos_paginado(cursor=cursor, **kwargs)
+        codigos += [p['codigo'] for p in pagina['itens']]
+        if not pagina['tem_mais']:
+            return codigos
+        cursor = pagina['cursor_fim']
+
+
+@pytest.mark.parametrize('ordem, decrescente', [
+    ('nome', False), ('codigo', True), ('preco_venda', False), ('estoque', True),
+])
+def test_percorre_todas_as_paginas_sem_repetir(produtos, ordem, decrescente):
+    # Mesmo preço e estoque em todos: o desempate fica com o id
+    codigos = produtos(23)
+
+    vistos = _percorrer(ProdutoService(), limite=5, ordem=ordem, decrescente=decrescente)
+
+    assert sorted(vistos) == codigos
+    assert len(vistos) == len(set(vistos))
+
+
+def test_pagina_anterior_devolve_a_mesma_pagina(produtos):
+    produtos(12, preco='5.00')
+    servico = ProdutoService()
+
+    primeira = servico.listar_produtos_paginado(limite=5, ordem='preco_venda')
+    segunda = servico.listar_produtos_paginado(cursor=primeira['cursor_fim'], limite=5,
+                                               ordem='preco_venda')
+    volta = servico.listar_produtos_paginado(cursor=segunda['cursor_inicio'], limite=5,
+                                             ordem='preco_venda', anterior=True)
+
+    assert [p['codigo'] for p in volta['itens']] == [p['codigo'] for p in primeira['itens']]
+    assert volta['tem_mais'] is False
+    assert [p['codigo'] for p in segunda['itens']] == [f"P{i:03d}" for i in range(5, 10)]
+
+
+def test_filtros(produtos):
+    produtos(6)
+    Produto.update(ativo=0).where(Produto.codigo == 'P001').execute()
+    Produto.update(estoque=2).where(Produto.codigo.in_(['P002', 'P003'])).execute()
+    Produto.update(preco_venda=Decimal('30.00')).where(Produto.codigo == 'P004').execute()
+    servico = ProdutoService()
+
+    assert 'P001' not in _percorrer(servico, limite=2)
+    assert 'P001' in _percorrer(servico, limite=2, filtros={'ativo': None})
+    assert _percorrer(servico, limite=2, filtros={'estoque_maximo': 5}) == ['P002', 'P003']
+    assert _percorrer(servico, limite=2, filtros={'preco_min': 20}) == ['P004']
+    assert _percorrer(servico, limite=2, filtros={'termo': 'P005'}) == ['P005']
+
+
+def test_contagem_estimada(produtos, monkeypatch):
+    produtos(8)
+
+    pagina = ProdutoService().listar_produtos_paginado(limite=3, contar=True)
+    assert (pagina['total'], pagina['total_exato']) == (8, True)
+
+    monkeypatch.setattr(ProdutoRepository, 'LIMITE_CONTAGEM', 5)
+    assert ProdutoRepository.contar_estimado() == (5, False)
+
+
+def test_cursor_de_outra_ordenacao_e_recusado(produtos):
+    produtos(3)
+    servico = ProdutoService()
+    cursor = servico.listar_produtos_paginado(limite=1)['cursor_fim']
+
+    with pytest.raises(ValueError):
+        servico.listar_produtos_paginado(cursor=cursor, ordem='codigo')
+    with pytest.raises(ValueError):
+        servico.listar_produtos_paginado(cursor='nao-e-um-cursor')
@@ -0,0 +1,77 @@
+"""Perfilador: perfil recusado pelo Python e relatório de memória"""
+import json
+import threading
+
+import pytest
+
+from src.utils import perfilador
+
+
+@pytest.fixture
+def perfilando(tmp_path, monkeypatch):
+    monkeypatch.setattr(perfilador, '_ativo', True)
+    monkeypatch.setattr(perfilador, '_memoria', False)
+    monkeypatch.setattr(perfilador, '_diretorio_base', lambda: tmp_path)
+    return tmp_path
+
+
+def _arquivos(base, padrao):
+    return sorted(base.glob(f"*/{padrao}"))
+
+
+def test_perfil_recusado_roda_o_bloco_sem_perfil(perfilando, monkeypatch):
+    import cProfile
+    original = cProfile.Profile
+
+    class OutroPerfilAtivo(original):
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+    monkeypatch.setattr(cProfile, 'Profile', OutroPerfilAtivo)
+
+    with perfilador.perfilar('api.POST /api/vendas'):
+        executado = True
+
+    assert executado
+    assert not getattr(perfilador._local, 'ocupado', False)
+    assert _arquivos(perfilando, '*.prof') == []
+
+    # A thread não fica presa como "ocupada": a próxima ação é perfilada
+    monkeypatch.setattr(cProfile, 'Profile', original)
+    with perfilador.perfilar('pdv.finalizar'):
+        pass
+    assert len(_arquivos(perfilando, '*.prof')) == 1
+
+
+def test_threads_simultaneas_nao_falham(perfilando):
+    barreira = threading.Barrier(4)
+    erros = []
+
+    def acao():
+        try:
+            with perfilador.perfilar('servico.finalizar'):
+                barreira.wait(5)
+                sum(range(10000))
+        except Exception as e:
+            erros.append(e)
+
+    threads = [threading.Thread(target=acao) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert erros == []
+    assert 1 <= len(_arquivos(perfilando, '*.prof')) <= 4
+
+
+def test_memoria_sem_quadros_do_perfilador(perfilando, monkeypatch):
+    monkeypatch.setattr(perfilador, '_memoria', True)
+
+    with perfilador.perfilar('pdv.carrinho'):
+        blocos = [bytearray(1024) for _ in range(2000)]
+
+    relatorio = json.loads(_arquivos(perfilando, '*.mem.json')[0].read_text(encoding='utf-8'))
+    locais = [a['local'] for a in relatorio['alocacoes']]
+    assert locais[0].startswith(__file__)
+    assert not [local for local in locais if 'cProfile' in local or 'pstats' in local]
+    assert len(blocos) == 2000
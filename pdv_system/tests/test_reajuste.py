@@ -0,0 +1,72 @@
+"""Reajuste em massa: cálculo do novo preço e arredondamento psicológico"""
+from decimal import Decimal
+
+import pytest
+
+from src.database.models import Produto
+from src.services.reajuste_service import ReajusteService
+
+
+def _novo_preco(preco: str, regra: dict) -> Decimal:
+    from src.models.reajuste_repository import ReajusteRepository
+
+    Produto.delete().execute()
+    Produto.create(nome="Produto teste", codigo="T001", preco_venda=Decimal(preco),
+                   preco_custo=Decimal('1.00'), estoque=1)
+    valor = (Produto
+             .select(ReajusteRepository.expressao_novo_preco(regra))
+             .scalar())
+    return Decimal(str(valor)).quantize(Decimal('0.01'))
+
+
+@pytest.mark.parametrize('preco, percentual, arredondamento, esperado', [
+    ('10.00', 29, '90', '12.90'),   # 12.900000000000002 em ponto flutuante
+    ('12.90', 0, '90', '12.90'),    # já termina em ,90
+    ('12.91', 0, '90', '13.90'),
+    ('12.34', 0, '90', '12.90'),
+    ('12.95', 0, '90', '13.90'),
+    ('12.00', 0, '90', '12.90'),
+    ('10.00', 29, '99', '12.99'),
+    ('12.99', 0, '99', '12.99'),
+    ('13.00', 0, '99', '13.99'),
+    ('10.00', 29, None, '12.90'),
+    ('0.10', 10, None, '0.11'),
+])
+def test_expressao_novo_preco(banco, preco, percentual, arredondamento, esperado):
+    regra = {'tipo': 'percentual', 'valor': percentual, 'arredondamento': arredondamento}
+    assert _novo_preco(preco, regra) == Decimal(esperado)
+
+
+def test_absoluto_com_arredondamento(banco):
+    regra = {'tipo': 'absoluto', 'valor': '1.15', 'arredondamento': '90'}
+    assert _novo_preco('9.75', regra) == Decimal('10.90')
+
+
+def test_aplicar_grava_preco_arredondado(banco, produtos):
+    produtos(3, preco='10.00')
+
+    resultado = ReajusteService().aplicar({'tipo': 'percentual', 'valor': 29,
+                                           'arredondamento': '90'})
+
+    assert resultado['total_produtos'] == 3
+    assert {p.preco_venda for p in Produto.select()} == {Decimal('12.90')}
+
+
+@pytest.mark.parametrize('regra', [
+    {'tipo': 'percentual', 'valor': 'Infinity'},
+    {'tipo': 'absoluto', 'valor': '-inf'},
+    {'tipo': 'percentual', 'valor': 'nan'},
+    {'tipo': 'percentual', 'valor': 'sNaN'},
+    {'tipo': 'percentual', 'valor': 10, 'margem_min': 'nan'},
+    {'tipo': 'percentual', 'valor': 10, 'custo_max': 'Infinity'},
+])
+def test_regra_nao_finita_e_recusada_sem_alterar_precos(banco, produtos, regra):
+    produtos(3, preco='10.00')
+    servico = ReajusteService()
+
+    with pytest.raises(ValueError):
+        servico.previsualizar(regra)
+    with pytest.raises(ValueError):
+        servico.aplicar(regra)
+
+    assert {p.preco_venda for p in Produto.select()} == {Decimal('10.00')}
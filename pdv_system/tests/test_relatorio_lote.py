@@ -0,0 +1,87 @@
+"""Relatórios em lote: ZIP na ordem do lote, erros.txt e geração sem o pool"""
+from datetime import date, datetime
+import zipfile
+
+import pytest
+
+from src.services import relatorio_lote_service
+from src.services.relatorio_lote_service import RelatorioLoteService
+from src.services.relatorio_service import RelatorioService
+
+INICIO, FIM = date(2026, 3, 14), date(2026, 3, 16)
+DIAS = [f"relatorios/relatorio_2026-03-{dia}.pdf" for dia in (14, 15, 16)]
+CUPONS = ["cupons/2026-03-14/cupom_1.pdf", "cupons/2026-03-15/cupom_2.pdf"]
+
+
+@pytest.fixture
+def vendas(criar_venda):
+    criar_venda(1, datetime(2026, 3, 14, 10, 0))
+    criar_venda(2, datetime(2026, 3, 15, 11, 0))
+
+
+@pytest.fixture
+def sem_pool(monkeypatch):
+    """Pool que não sobe: tudo roda neste processo (e os monkeypatches valem)"""
+    class PoolIndisponivel:
+        def __init__(self, *args, **kwargs):
+            raise OSError("sem processos disponíveis")
+
+    monkeypatch.setattr(relatorio_lote_service, 'ProcessPoolExecutor', PoolIndisponivel)
+
+
+def _conteudo(resultado):
+    with zipfile.ZipFile(resultado['zip']) as arquivo_zip:
+        return {nome: arquivo_zip.read(nome) for nome in arquivo_zip.namelist()}
+
+
+def test_listar_tarefas(vendas):
+    tarefas = RelatorioLoteService.listar_tarefas(INICIO, FIM, cupons=True)
+
+    assert [nome for nome, _tipo, _chave in tarefas] == DIAS + CUPONS
+    assert RelatorioLoteService.listar_tarefas(INICIO, FIM) == tarefas[:3]
+    with pytest.raises(ValueError):
+        RelatorioLoteService.listar_tarefas(FIM, INICIO)
+
+
+def test_pool_gera_os_pdfs_e_registra_a_falha(vendas, monkeypatch):
+    listar_tarefas = RelatorioLoteService.listar_tarefas
+
+    def com_venda_inexistente(*args):
+        return listar_tarefas(*args) + [("cupons/2026-03-16/cupom_99.pdf", 'cupom', 99)]
+
+    monkeypatch.setattr(RelatorioLoteService, 'listar_tarefas',
+                        staticmethod(com_venda_inexistente))
+    avisos = []
+
+    resultado = RelatorioLoteService(processos=2).gerar_zip(
+        INICIO, FIM, cupons=True, progresso=lambda *args: avisos.append(args)
+    )
+
+    arquivos = _conteudo(resultado)
+    assert list(arquivos) == DIAS + CUPONS + ['erros.txt']
+    assert all(arquivos[nome].startswith(b'%PDF') for nome in DIAS + CUPONS)
+    assert arquivos['erros.txt'].decode().startswith("cupons/2026-03-16/cupom_99.pdf: ")
+    assert (resultado['arquivos'], resultado['processos']) == (5, 2)
+    assert sorted(feitos for feitos, _total, _nome in avisos) == [1, 2, 3, 4, 5, 6]
+
+
+def test_sem_pool_gera_no_proprio_processo(vendas, sem_pool, monkeypatch):
+    def cupom(venda_id, *args):
+        if venda_id == 2:
+            raise ValueError("impressora sem papel")
+        return relatorio_lote_service.BytesIO(b'%PDF cupom')
+
+    monkeypatch.setattr(RelatorioService, 'gerar_cupom_venda', staticmethod(cupom))
+    avisos = []
+
+    resultado = RelatorioLoteService(processos=4).gerar_zip(
+        INICIO, FIM, cupons=True, progresso=lambda *args: avisos.append(args)
+    )
+
+    arquivos = _conteudo(resultado)
+    assert list(arquivos) == DIAS + CUPONS[:1] + ['erros.txt']
+    assert arquivos[CUPONS[0]] == b'%PDF cupom'
+    assert arquivos['erros.txt'] == f"{CUPONS[1]}: impressora sem papel\n".encode()
+    assert resultado['erros'] == {CUPONS[1]: "impressora sem papel"}
+    assert resultado['processos'] == 1
+    assert avisos == [(i, 5, nome) for i, nome in enumerate(DIAS + CUPONS, start=1)]
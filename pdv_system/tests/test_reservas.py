@@ -0,0 +1,100 @@
+"""Reservas de estoque: validade, caixas simultâneos e finalização"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+import threading
+import time
+
+import pytest
+
+from src.database import connection
+from src.database.models import Produto, ReservaEstoque
+from src.models.reserva_repository import ReservaEstoqueRepository
+from src.models.venda_repository import VendaRepository
+
+
+@pytest.fixture
+def produto(produtos):
+    produtos(1, estoque=10)
+    return Produto.get(Produto.codigo == 'P000')
+
+
+def _carrinho():
+    return VendaRepository.criar_venda('Dinheiro').id
+
+
+def test_reserva_vencida_libera_o_estoque(produto):
+    primeiro, segundo = _carrinho(), _carrinho()
+
+    assert ReservaEstoqueRepository.reservar(primeiro, produto.id, 8, ttl=0.05)
+    assert ReservaEstoqueRepository.disponivel(produto.id, segundo) == 2
+    assert not ReservaEstoqueRepository.reservar(segundo, produto.id, 5)
+
+    time.sleep(0.1)
+
+    assert ReservaEstoqueRepository.disponivel(produto.id, segundo) == 10
+    assert ReservaEstoqueRepository.reservar(segundo, produto.id, 5)
+    assert not ReservaEstoqueRepository.reservar(primeiro, produto.id, 8)
+    # A linha vencida só sai na limpeza; a ativa fica
+    assert ReservaEstoqueRepository.expirar() == 1
+    assert [r.venda_id for r in ReservaEstoque.select()] == [segundo]
+
+
+def test_reservar_renova_as_outras_reservas_do_carrinho(produtos):
+    produtos(2, estoque=10)
+    venda = _carrinho()
+    ReservaEstoqueRepository.reservar(venda, 1, 1, ttl=0.05)
+    time.sleep(0.1)
+
+    assert ReservaEstoqueRepository.reservar(venda, 2, 1)
+    assert ReservaEstoqueRepository.expirar() == 0
+    assert ReservaEstoqueRepository.disponivel(1) == 9
+
+
+def test_caixas_simultaneos_nao_vendem_a_mais(produto):
+    caixas = 8
+    carrinhos = [_carrinho() for _ in range(caixas)]
+    largada = threading.Barrier(caixas)
+    resultados = {}
+
+    def caixa(venda_id):
+        try:
+            largada.wait()
+            resultados[venda_id] = ReservaEstoqueRepository.reservar(venda_id, produto.id, 3)
+        finally:
+            connection.get_db().close()
+
+    threads = [threading.Thread(target=caixa, args=(venda_id,)) for venda_id in carrinhos]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(resultados.values()) == 3
+    assert sum(r.quantidade for r in ReservaEstoque.select()) == 9
+    assert ReservaEstoqueRepository.disponivel(produto.id) == 1
+
+
+def test_finalizacao_consome_a_reserva(produto):
+    venda, outro = _carrinho(), _carrinho()
+    VendaRepository.adicionar_item(venda, produto.id, 4)
+    assert ReservaEstoqueRepository.disponivel(produto.id, outro) == 6
+
+    VendaRepository.finalizar_venda(venda, Decimal('100.00'))
+
+    assert Produto.get_by_id(produto.id).estoque == 6
+    assert ReservaEstoque.select().where(ReservaEstoque.venda == venda).count() == 0
+    # Baixado uma vez só: nem estoque nem reserva contam as 4 unidades de novo
+    assert ReservaEstoqueRepository.disponivel(produto.id, outro) == 6
+    assert ReservaEstoqueRepository.reservar(outro, produto.id, 6)
+
+
+def test_reserva_vencida_tomada_por_outro_caixa_impede_a_finalizacao(produto):
+    venda, outro = _carrinho(), _carrinho()
+    VendaRepository.adicionar_item(venda, produto.id, 4)
+    ReservaEstoque.update(expira_em=datetime.now() - timedelta(seconds=1)).execute()
+    assert ReservaEstoqueRepository.reservar(outro, produto.id, 8)
+
+    with pytest.raises(ValueError, match="Estoque insuficiente"):
+        VendaRepository.finalizar_venda(venda, Decimal('100.00'))
+
+    assert Produto.get_by_id(produto.id).estoque == 10
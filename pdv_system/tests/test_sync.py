@@ -0,0 +1,55 @@
+"""Sincronização: token do nó central e conflitos no catálogo recebido"""
+from decimal import Decimal
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from src.database.models import Produto
+from src.sync.cliente import ClienteSync
+from src.sync.no_central import criar_servidor, iniciar_em_thread
+
+
+@pytest.fixture
+def no_central(tmp_path):
+    servidor = iniciar_em_thread(banco=tmp_path / 'central.db', token='segredo')
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _url(servidor) -> str:
+    host, porta = servidor.server_address[:2]
+    return f"http://{host}:{porta}"
+
+
+def test_no_central_exige_token(tmp_path):
+    with pytest.raises(ValueError):
+        criar_servidor(porta=0, banco=tmp_path / 'central.db')
+
+
+def test_requisicao_sem_token_recebe_401(no_central, banco):
+    with pytest.raises(HTTPError) as erro:
+        urlopen(f"{_url(no_central)}/sync/status", timeout=3)
+    assert erro.value.code == 401
+
+    resultado = ClienteSync(_url(no_central), 'caixa-01', 'errado').sincronizar()
+    assert resultado['online'] is False
+
+
+def test_conflito_de_nome_pula_so_o_produto(no_central, banco):
+    Produto.create(nome="Arroz", codigo="LOCAL1", preco_venda=Decimal('5.00'), estoque=3)
+    no_central.no.publicar_catalogo([
+        {'codigo': 'C1', 'nome': 'Arroz', 'preco_venda': '6.00', 'estoque': 10},
+        {'codigo': 'C2', 'nome': 'Feijão', 'preco_venda': '8.00', 'estoque': 20},
+    ])
+
+    cliente = ClienteSync(_url(no_central), 'caixa-01', 'segredo')
+    resultado = cliente.sincronizar()
+
+    assert resultado['online'] is True
+    assert resultado['recebidos'] == 1
+    assert resultado['versao'] == no_central.no.versao
+    assert Produto.get(Produto.codigo == 'C2').estoque == 20
+    assert not Produto.select().where(Produto.codigo == 'C1').exists()
+    assert Produto.get(Produto.codigo == 'LOCAL1').nome == "Arroz"
@@ -0,0 +1,168 @@
+"""Registro de telas: montadas na primeira visita e reaproveitadas depois"""
+import flet as ft
+import pytest
+
+from src.ui import main_app, pdv_view, produtos_view
+from src.ui.telas import RegistroTelas
+from src.utils import dashboard
+
+
+class PaginaFalsa:
+    """O que o registro e o main_app usam de ``ft.Page``"""
+
+    def __init__(self):
+        self.controls = []
+        self.route = None
+        self.on_route_change = None
+        self.atualizacoes = 0
+
+    def go(self, rota):
+        self.route = rota
+        self.on_route_change(rota)
+
+    def update(self):
+        self.atualizacoes += 1
+
+
+class VisaoFalsa:
+    """Visão com ``criar_interface`` e ganchos que registram as chamadas"""
+    criadas = []
+
+    def __init__(self, page=None, descartavel=True):
+        self.chamadas = []
+        self.descartavel = descartavel
+        VisaoFalsa.criadas.append(self)
+
+    def criar_interface(self):
+        self.chamadas.append('criar_interface')
+        return ft.Container()
+
+    def ao_exibir(self):
+        self.chamadas.append('ao_exibir')
+
+    def ao_ocultar(self):
+        self.chamadas.append('ao_ocultar')
+
+    def pode_descartar(self):
+        return self.descartavel
+
+    def ao_descartar(self):
+        self.chamadas.append('ao_descartar')
+
+
+@pytest.fixture(autouse=True)
+def visoes():
+    VisaoFalsa.criadas = []
+    yield VisaoFalsa.criadas
+
+
+def test_tela_montada_so_na_primeira_visita(visoes):
+    pagina = PaginaFalsa()
+    registro = RegistroTelas(pagina, maximo_ocultas=4)
+    registro.registrar('/vendas', VisaoFalsa)
+    registro.registrar('/produtos', VisaoFalsa)
+
+    assert visoes == [] and pagina.controls == []
+
+    registro.exibir('/vendas')
+    [vendas] = visoes
+    registro.exibir('/produtos')
+    registro.exibir('/vendas')
+    registro.exibir('/vendas')
+
+    assert len(visoes) == 2
+    assert vendas.chamadas == ['criar_interface', 'ao_ocultar', 'ao_exibir']
+    assert [controle.visible for controle in pagina.controls] == [True, False]
+    assert registro.montadas() == ['/produtos', '/vendas']
+
+
+def test_tela_sem_classe_propria_usa_os_ganchos_do_registro():
+    pagina = PaginaFalsa()
+    registro = RegistroTelas(pagina, maximo_ocultas=4)
+    chamadas = []
+    montagens = []
+    registro.registrar('/', lambda: montagens.append(ft.Container()) or montagens[-1],
+                       ao_exibir=lambda: chamadas.append('exibir'),
+                       ao_ocultar=lambda: chamadas.append('ocultar'))
+    registro.registrar('/vendas', VisaoFalsa)
+
+    for rota in ('/', '/vendas', '/', '/vendas', '/'):
+        registro.exibir(rota)
+
+    assert len(montagens) == 1 and pagina.controls[0] is montagens[0]
+    assert chamadas == ['ocultar', 'exibir', 'ocultar', 'exibir']
+
+
+def test_descarta_a_oculta_menos_usada_e_monta_de_novo(visoes):
+    pagina = PaginaFalsa()
+    registro = RegistroTelas(pagina, maximo_ocultas=1)
+    registro.registrar('/vendas', lambda: VisaoFalsa(descartavel=False))
+    for rota in ('/a', '/b'):
+        registro.registrar(rota, VisaoFalsa)
+
+    registro.exibir('/vendas')
+    registro.exibir('/a')
+    registro.exibir('/b')      # '/vendas' não pode sair: sai '/a'
+
+    vendas, a = visoes[:2]
+    assert registro.montadas() == ['/vendas', '/b'] and len(pagina.controls) == 2
+    assert a.chamadas[-1] == 'ao_descartar' and 'ao_descartar' not in vendas.chamadas
+
+    registro.exibir('/a')
+    assert len(visoes) == 4 and visoes[-1] is not a
+
+
+def test_rota_desconhecida_oculta_a_atual():
+    pagina = PaginaFalsa()
+    registro = RegistroTelas(pagina, maximo_ocultas=4)
+    registro.registrar('/', VisaoFalsa)
+    registro.exibir('/')
+
+    assert registro.exibir('/nada') is False
+    assert pagina.controls[0].visible is False
+
+
+class PainelFalso:
+    def __init__(self):
+        self.ouvintes = 0
+        self.cancelados = 0
+
+    def dados(self):
+        return {'total_vendas': 'R$ 0,00', 'total_despesas': 'R$ 0,00',
+                'saldo_liquido': 'R$ 0,00'}
+
+    def ouvir(self, _funcao):
+        self.ouvintes += 1
+        return self._cancelar
+
+    def _cancelar(self):
+        self.cancelados += 1
+
+
+def test_main_app_reaproveita_as_telas(monkeypatch, visoes):
+    painel = PainelFalso()
+    monkeypatch.setattr(dashboard, 'painel_dia', lambda: painel)
+    monkeypatch.setattr(pdv_view, 'PDVView', VisaoFalsa)
+    monkeypatch.setattr(produtos_view, 'ProdutosView', VisaoFalsa)
+    monkeypatch.setattr(ft, 'app', lambda target: target(pagina))
+    pagina = PaginaFalsa()
+
+    main_app.main()
+
+    assert len(pagina.controls) == 1 and visoes == []
+    inicial = pagina.controls[0]
+
+    for rota in ('/vendas', '/', '/vendas', '/', '/vendas'):
+        pagina.go(rota)
+
+    [pdv] = visoes
+    assert pdv.chamadas.count('criar_interface') == 1
+    assert pagina.controls[0] is inicial and len(pagina.controls) == 2
+    assert [controle.visible for controle in pagina.controls] == [False, True]
+    # Cards da tela inicial: ouvem enquanto ela está visível
+    assert (painel.ouvintes, painel.cancelados) == (3, 3)
+
+    pagina.go('/financeiro')
+    pagina.go('/relatorios')
+    pagina.go('/vendas')
+    assert len(pagina.controls) == 4 and len(visoes) == 1
@@ -0,0 +1,23 @@
+"""Finalização de vendas: baixa e log de estoque"""
+import logging
+from decimal import Decimal
+
+from src.database.models import ItemVenda, Produto
+from src.models.venda_repository import VendaRepository
+
+
+def test_produto_em_duas_linhas_loga_a_baixa_somada(produtos, caplog):
+    produtos(1, estoque=10)
+    produto = Produto.get(Produto.codigo == 'P000')
+    venda = VendaRepository.criar_venda('Dinheiro')
+    for quantidade in (2, 3):
+        ItemVenda.create(venda=venda, produto=produto, quantidade=quantidade,
+                         preco_unitario=Decimal('10.00'), subtotal=Decimal('10.00') * quantidade)
+    VendaRepository._atualizar_total_venda(venda.id)
+
+    caplog.set_level(logging.DEBUG, logger='pdv_system')
+    VendaRepository.finalizar_venda(venda.id, Decimal('50.00'))
+
+    assert Produto.get_by_id(produto.id).estoque == 5
+    logs = [r.getMessage() for r in caplog.records if 'Estoque atualizado' in r.getMessage()]
+    assert logs == ["Estoque atualizado: P000 10 -> 5"]